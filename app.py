@@ -1,10 +1,11 @@
 import sys
 import io
+import os
 import json
 from flask import Flask, render_template, request, jsonify
-from src.lexer import Lexer
-from src.parser import Parser
-from src.interpreter import Interpreter
+from src.engines import ENGINES
+from src.cache import ParseCache
+from src.incremental import IncrementalParser
 from src.error import CompilerError
 from src.visualizer import ASTVisualizer  # Add this import
 
@@ -12,6 +13,14 @@ from src.visualizer import ASTVisualizer  # Add this import
 sys.path.insert(0, './src')
 
 app = Flask(__name__)
+app.config.setdefault('PARSE_CACHE_SIZE', int(os.environ.get('L25_PARSE_CACHE_SIZE', 128)))
+app.config.setdefault('ENGINE', os.environ.get('L25_ENGINE', 'tree'))
+
+# /compile and /visualize are usually requested for the same code, so both
+# share one cache of parsed programs keyed by a hash of the source text. On a
+# miss (the code was edited) only the changed top-level definitions are reparsed.
+incremental_parser = IncrementalParser()
+parse_cache = ParseCache(app.config['PARSE_CACHE_SIZE'], parse=incremental_parser.parse)
 
 # Store example file contents in memory
 EXAMPLES = {}
@@ -30,6 +39,12 @@ def load_examples():
         except FileNotFoundError:
             print(f"Warning: Example file not found at {path}")
             EXAMPLES[name] = f"# Error: Could not load {path}"
+            continue
+        # Parse the examples up front so running them never hits the lexer/parser.
+        try:
+            parse_cache.parse(EXAMPLES[name])
+        except Exception as e:
+            print(f"Warning: Example '{name}' does not parse: {e}")
 
 @app.route('/')
 def index():
@@ -45,6 +60,9 @@ def ast_viewer():
 def compile_code():
     """API endpoint to compile and run L25 code."""
     source_code = request.json.get('code', '')
+    engine = ENGINES.get(request.json.get('engine') or app.config['ENGINE'])
+    if engine is None:
+        return jsonify({'output': '', 'error': f"Unknown engine. Available engines: {', '.join(sorted(ENGINES))}"})
     
     # Redirect stdout to capture output from the 'output' statement
     old_stdout = sys.stdout
@@ -54,10 +72,7 @@ def compile_code():
     error_string = ""
 
     try:
-        lexer = Lexer(source_code)
-        tokens = lexer.tokens()
-        parser = Parser(tokens)
-        interpreter = Interpreter(parser)
+        interpreter = engine(tree=parse_cache.parse(source_code))
         interpreter.interpret()
         
     except CompilerError as e:
@@ -80,10 +95,7 @@ def visualize_ast():
     source_code = request.json.get('code', '')
     
     try:
-        lexer = Lexer(source_code)
-        tokens = lexer.tokens()
-        parser = Parser(tokens)
-        ast = parser.parse()  # Get the AST without interpreting
+        ast = parse_cache.parse(source_code)  # Get the AST without interpreting
         
         # Generate Mermaid diagram
         visualizer = ASTVisualizer(ast)
@@ -105,6 +117,11 @@ def visualize_ast():
             'error': f"An unexpected system error occurred: {e}"
         })
 
+@app.route('/cache-stats')
+def cache_stats():
+    """Hit/miss/eviction counters of the shared parse cache and the incremental parser."""
+    return jsonify(dict(parse_cache.stats(), incremental=incremental_parser.stats()))
+
 if __name__ == '__main__':
     load_examples()
     app.run(debug=True, port=5001)
@@ -0,0 +1,99 @@
+"""
+Memory and speed of integer arrays: one million ints in a list and in an
+IntArray, then an L25 program that fills arrays of ints and sums them on each
+engine, with its peak memory.
+
+    python -m benchmarks.bench_arrays
+    python -m benchmarks.bench_arrays --count 200000 --engines tree,vm
+    python -m benchmarks.bench_arrays --no-program
+"""
+import argparse
+import contextlib
+import io
+import time
+import tracemalloc
+
+from src.arrays import new_array
+from src.engines import ENGINES
+from src.parser import parse_source
+
+# `{rows}` arrays of 1000 ints; `{zeros}` is a list of 1000 zeros.
+PROGRAM = """program Ints {{
+    main {{
+        let rows = [{zeros}]; let i = 0; let total = 0;
+        while (i < {rows}) {{
+            let row = [{zeros}]; let j = 0;
+            while (j < 1000) {{ row[j] = i * 1000 + j; j = j + 1; }};
+            rows[i] = row; i = i + 1;
+        }};
+        i = 0;
+        while (i < {rows}) {{
+            let row = rows[i]; let j = 0;
+            while (j < 1000) {{ total = total + row[j] - row[999 - j]; j = j + 1; }};
+            i = i + 1;
+        }};
+        output(total);
+    }}
+}}
+"""
+
+def measure(build, read):
+    """Retained memory of `build()`, and the time it took and the time `read` takes on its result."""
+    tracemalloc.start()
+    values = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del values
+    start = time.perf_counter()
+    values = build()
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    read(values)
+    return size, built, time.perf_counter() - start
+
+def compare_layouts(count):
+    def read(values):
+        return sum(values[index] for index in range(len(values)))
+
+    print(f"{count} ints:")
+    results = {name: measure(build, read) for name, build in (
+        ('list', lambda: [i * 1000 for i in range(count)]),
+        ('IntArray', lambda: new_array([i * 1000 for i in range(count)])))}
+    for name, (size, built, read_time) in results.items():
+        print(f"  {name:>9}: {size / 2**20:7.1f} MiB ({size / count:5.1f} B each), "
+              f"built in {built * 1e3:7.1f} ms, read in {read_time * 1e3:7.1f} ms")
+    (old, _, _), (new, _, _) = results.values()
+    print(f"  {'':>9}  {old / new:.1f}x less memory")
+
+def run_program(engine, tree, traced):
+    output = io.StringIO()
+    if traced:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        ENGINES[engine](tree=tree).interpret()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if traced else None
+    if traced:
+        tracemalloc.stop()
+    return elapsed, peak, output.getvalue()
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark integer array memory and speed')
+    arg_parser.add_argument('--count', type=int, default=1000000, help='Array elements (a multiple of 1000)')
+    arg_parser.add_argument('--engines', default='tree,slots,closure,vm', help='Comma-separated engines to run the program on')
+    arg_parser.add_argument('--no-program', action='store_true', help='Only compare the array layouts')
+    args = arg_parser.parse_args()
+
+    compare_layouts(args.count)
+    if args.no_program:
+        return
+    tree = parse_source(PROGRAM.format(rows=args.count // 1000, zeros=", ".join(["0"] * 1000)))
+    print(f"Program filling and summing arrays of {args.count} ints:")
+    for engine in args.engines.split(','):
+        elapsed, _, output = run_program(engine, tree, traced=False)
+        _, peak, _ = run_program(engine, tree, traced=True)
+        print(f"  {engine:>8}: {elapsed * 1e3:9.1f} ms, peak {peak / 2**20:7.1f} MiB -> {output.strip()}")
+
+if __name__ == '__main__':
+    main()
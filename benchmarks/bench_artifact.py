@@ -0,0 +1,52 @@
+"""
+Parse-and-run from source versus load-and-run from a precompiled .l25c artifact.
+
+    python -m benchmarks.bench_artifact --funcs 2000
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from src.artifact import load_program, write_artifact
+from src.interpreter import Interpreter
+from src.parser import parse_source
+from benchmarks.programs import generate_program
+
+def run(program):
+    with contextlib.redirect_stdout(io.StringIO()):
+        Interpreter(tree=program).interpret()
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark parsing from source vs loading a .l25c artifact')
+    arg_parser.add_argument('--funcs', type=int, default=2000, help='Number of generated functions')
+    args = arg_parser.parse_args()
+
+    source = generate_program(args.funcs)
+    with tempfile.TemporaryDirectory() as directory:
+        source_path = os.path.join(directory, 'generated.l25')
+        artifact_path = os.path.join(directory, 'generated.l25c')
+        with open(source_path, 'w') as f:
+            f.write(source)
+        write_artifact(artifact_path, parse_source(source), source, source_path)
+
+        program, parse_seconds = timed(parse_source, source)
+        _, parse_run_seconds = timed(run, program)
+        (program, status), load_seconds = timed(load_program, artifact_path)
+        _, load_run_seconds = timed(run, program)
+        size = os.path.getsize(artifact_path)
+
+    print(f"source: {len(source) / 1e6:.2f} MB, artifact: {size / 1e6:.2f} MB ({status})")
+    print(f"parse + run: {parse_seconds:.3f}s + {parse_run_seconds:.3f}s")
+    print(f" load + run: {load_seconds:.3f}s + {load_run_seconds:.3f}s")
+    print(f"front end speedup: {parse_seconds / load_seconds:.1f}x")
+
+if __name__ == '__main__':
+    main()
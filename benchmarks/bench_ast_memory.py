@@ -0,0 +1,67 @@
+"""
+AST memory per node: the previous __dict__-based node layout, the slotted node
+classes, and the flat ASTArena.
+
+The dict-based layout is reproduced by mirroring the parsed tree into plain
+classes with the same fields, so all three numbers come from the same program.
+
+    python -m benchmarks.bench_ast_memory --funcs 2000
+"""
+import argparse
+import tracemalloc
+
+from src.arena import ASTArena, SCHEMA, NODE, LIST
+from src.lexer import RegexLexer
+from src.parser import Parser
+from benchmarks.programs import generate_program
+
+class DictToken:
+    def __init__(self, token):
+        self.type = token.type
+        self.value = token.value
+        self.line = token.line
+        self.column = token.column
+
+_DICT_CLASSES = {cls: type(cls.__name__, (), {}) for cls in SCHEMA}
+
+def to_dict_nodes(node):
+    """Mirrors a tree into __dict__-based nodes holding __dict__-based tokens."""
+    mirror = _DICT_CLASSES[type(node)]()
+    for name, field_kind in SCHEMA[type(node)]:
+        value = getattr(node, name)
+        if field_kind == NODE:
+            value = to_dict_nodes(value) if value is not None else None
+        elif field_kind == LIST:
+            value = [to_dict_nodes(item) for item in value]
+        else:
+            value = DictToken(value)
+            mirror.value = value.value if hasattr(node, 'value') else None
+        setattr(mirror, name, value)
+    return mirror
+
+def retained(build):
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark AST memory per node')
+    arg_parser.add_argument('--funcs', type=int, default=2000, help='Number of generated functions')
+    args = arg_parser.parse_args()
+
+    source = generate_program(args.funcs)
+    tree, slotted = retained(lambda: Parser(RegexLexer(source).stream()).parse())
+    mirror, dict_based = retained(lambda: to_dict_nodes(tree))
+    arena, flat = retained(lambda: ASTArena.from_tree(tree))
+    nodes = len(arena)
+    del mirror
+
+    print(f"{nodes} nodes (nodes + tokens retained)")
+    print(f"  __dict__ nodes : {dict_based / nodes:6.1f} bytes/node")
+    print(f"  slotted nodes  : {slotted / nodes:6.1f} bytes/node")
+    print(f"  ASTArena       : {flat / nodes:6.1f} bytes/node ({arena.nbytes / nodes:.1f} in typed arrays)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Batch compilation throughput over a generated corpus of .l25 files, for an
+increasing number of worker processes.
+
+    python -m benchmarks.bench_batch --files 2000 --funcs 20 --execute
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from src.batch import collect_files, run_batch, summarize
+from benchmarks.programs import generate_program
+
+def write_corpus(directory, files, funcs):
+    for i in range(files):
+        with open(os.path.join(directory, f"program_{i}.l25"), 'w') as f:
+            f.write(generate_program(funcs, name=f"Program{i}"))
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark parallel batch compilation')
+    arg_parser.add_argument('--files', type=int, default=2000, help='Number of generated files')
+    arg_parser.add_argument('--funcs', type=int, default=20, help='Functions per generated file')
+    arg_parser.add_argument('--execute', action='store_true', help='Also run every program')
+    args = arg_parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    job_counts = sorted({1, 2, cores // 2 or 1, cores})
+    with tempfile.TemporaryDirectory() as directory:
+        write_corpus(directory, args.files, args.funcs)
+        paths = collect_files([directory])
+        print(f"{len(paths)} files, {cores} cores")
+        baseline = None
+        for jobs in job_counts:
+            start = time.perf_counter()
+            results = run_batch(paths, jobs=jobs, execute=args.execute)
+            seconds = time.perf_counter() - start
+            summary = summarize(results, seconds)
+            baseline = baseline or seconds
+            print(f"jobs {jobs:>3}: {seconds:.2f}s, {len(paths) / seconds:.0f} files/s, "
+                  f"speedup {baseline / seconds:.2f}x ({summary['ok']} ok)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Execution time of the native executables built by src.cbackend against the
+in-process engines, on the engine benchmark workloads. The time to generate
+and compile the C code is reported separately.
+
+    python -m benchmarks.bench_cbackend --size 200000
+    python -m benchmarks.bench_cbackend --workload loop --engines tree,python
+"""
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+
+from src.cbackend import build_executable, find_compiler
+from src.engines import ENGINES
+from src.parser import parse_source
+from benchmarks.bench_engines import timed_run
+from benchmarks.programs import WORKLOADS, generate_workload
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark the C backend against the execution engines')
+    arg_parser.add_argument('--workload', choices=sorted(WORKLOADS), action='append',
+                            help='Workload to run (repeatable; default: all)')
+    arg_parser.add_argument('--size', type=int, default=20000, help='Loop iterations per workload')
+    arg_parser.add_argument('--engines', default='tree,python', help='Comma-separated engines to compare, the first is the baseline')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Runs per engine (best is reported)')
+    args = arg_parser.parse_args()
+
+    if find_compiler() is None:
+        arg_parser.error("no C compiler found (set CC)")
+    engines = args.engines.split(',')
+    with tempfile.TemporaryDirectory() as work_dir:
+        for workload in args.workload or sorted(WORKLOADS):
+            tree = parse_source(generate_workload(workload, args.size))
+            print(f"{workload} (size {args.size}):")
+            baseline = None
+            expected = None
+            for name in engines:
+                runs = [timed_run(ENGINES[name], tree) for _ in range(args.repeat)]
+                seconds = min(run[0] for run in runs)
+                if expected is None:
+                    baseline, expected = seconds, runs[0][1]
+                status = "" if runs[0][1] == expected else "  OUTPUT DIFFERS"
+                print(f"  {name:>8}: {seconds * 1e3:8.1f} ms ({baseline / seconds:6.1f}x){status}")
+
+            executable = os.path.join(work_dir, workload)
+            start = time.perf_counter()
+            build_executable(tree, executable)
+            build_seconds = time.perf_counter() - start
+            runs = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                result = subprocess.run([executable], capture_output=True, text=True)
+                runs.append((time.perf_counter() - start, result.stdout))
+            seconds = min(run[0] for run in runs)
+            status = "" if runs[0][1] == expected else "  OUTPUT DIFFERS"
+            print(f"  {'native':>8}: {seconds * 1e3:8.1f} ms ({baseline / seconds:6.1f}x){status}, "
+                  f"build {build_seconds * 1e3:.0f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Execution time of every engine in src.engines on the same parsed programs:
+a loop-heavy, a call-heavy (recursion and struct construction) and an
+array-heavy workload.
+
+    python -m benchmarks.bench_engines --size 20000
+    python -m benchmarks.bench_engines --workload call --engines tree,vm
+    python -m benchmarks.bench_engines --engines tree,python
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from src.engines import ENGINES
+from src.parser import parse_source
+from benchmarks.programs import WORKLOADS, generate_workload
+
+def timed_run(engine, tree):
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        engine(tree=tree).interpret()
+    return time.perf_counter() - start, output.getvalue()
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark the execution engines')
+    arg_parser.add_argument('--workload', choices=sorted(WORKLOADS), action='append',
+                            help='Workload to run (repeatable; default: all)')
+    arg_parser.add_argument('--size', type=int, default=20000, help='Loop iterations per workload')
+    arg_parser.add_argument('--engines', default=','.join(ENGINES), help='Comma-separated engines, the first is the baseline')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Runs per engine (best is reported)')
+    args = arg_parser.parse_args()
+
+    engines = args.engines.split(',')
+    for workload in args.workload or sorted(WORKLOADS):
+        tree = parse_source(generate_workload(workload, args.size))
+        print(f"{workload} (size {args.size}):")
+        baseline = None
+        expected = None
+        for name in engines:
+            runs = [timed_run(ENGINES[name], tree) for _ in range(args.repeat)]
+            seconds = min(run[0] for run in runs)
+            output = runs[0][1]
+            if expected is None:
+                baseline, expected = seconds, output
+            status = "" if output == expected else "  OUTPUT DIFFERS"
+            print(f"  {name:>8}: {seconds * 1e3:8.1f} ms ({baseline / seconds:4.1f}x){status}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+Edit-to-tree latency: full reparse versus IncrementalParser after a small edit
+inside one function of a large program, with and without a line-count change
+(which moves every later definition).
+
+    python -m benchmarks.bench_incremental --funcs 500
+"""
+import argparse
+import time
+
+from src.incremental import IncrementalParser
+from src.parser import parse_source
+from benchmarks.programs import generate_program
+
+def timed(parse, source):
+    start = time.perf_counter()
+    parse(source)
+    return time.perf_counter() - start
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark incremental reparsing after an edit')
+    arg_parser.add_argument('--funcs', type=int, default=500, help='Number of generated functions')
+    args = arg_parser.parse_args()
+
+    source = generate_program(args.funcs)
+    target = f"total = total + {args.funcs // 2};"
+    edits = {
+        'same lines': source.replace(target, target.replace('total + ', 'total + 1 + '), 1),
+        'added line': source.replace(target, target + "\n                total = total + 1;", 1),
+    }
+    print(f"source: {len(source) / 1e3:.0f} kB, {args.funcs} functions")
+    for name, edited in edits.items():
+        incremental = IncrementalParser()
+        incremental.parse(source)  # the editor's previous version
+        full_seconds = timed(parse_source, edited)
+        incremental_seconds = timed(incremental.parse, edited)
+        print(f"{name:>10}: full {full_seconds * 1e3:7.1f} ms, incremental {incremental_seconds * 1e3:6.1f} ms "
+              f"({full_seconds / incremental_seconds:.0f}x) {incremental.stats()}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""
+Lexer throughput benchmark: tokens/sec of the char-by-char Lexer versus the
+single-pattern RegexLexer on a generated L25 source.
+
+    python -m benchmarks.bench_lexer --funcs 2000 --repeat 3
+"""
+import argparse
+import time
+
+from src.lexer import LEXERS
+from benchmarks.programs import generate_program
+
+def bench(lexer_cls, source, repeat):
+    best = float('inf')
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = len(lexer_cls(source).tokens())
+        best = min(best, time.perf_counter() - start)
+    return count, best
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark the L25 lexers')
+    arg_parser.add_argument('--funcs', type=int, default=2000, help='Number of generated functions')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Runs per lexer (best time is reported)')
+    args = arg_parser.parse_args()
+
+    source = generate_program(args.funcs)
+    print(f"source: {len(source) / 1e6:.2f} MB")
+    results = {}
+    for name, lexer_cls in LEXERS.items():
+        count, seconds = bench(lexer_cls, source, args.repeat)
+        results[name] = seconds
+        print(f"{name:>6}: {count} tokens in {seconds:.3f}s ({count / seconds:,.0f} tokens/sec)")
+    print(f"speedup (char / regex): {results['char'] / results['regex']:.2f}x")
+
+if __name__ == '__main__':
+    main()
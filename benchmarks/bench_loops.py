@@ -0,0 +1,97 @@
+"""
+Execution time of counted loops on the tree and slots engines, with the loop
+idioms (range-driven counted loops and bulk reductions) off and on: a
+counting loop with a body, an array sum, a conditional count, an array fill
+and nested loops whose inner loop is not a reduction.
+
+    python -m benchmarks.bench_loops --size 200000
+    python -m benchmarks.bench_loops --loop sum --loop fill --engines tree
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from src.engines import ENGINES
+from src.parser import parse_source
+
+# `{n}` is the number of iterations and `{zeros}` a list of 1000 zeros: the
+# array loops run n / 1000 rounds over it.
+LOOPS = {
+    'count': """program Count {{ main {{
+        let i = 0; let n = {n}; let odd = 0;
+        while (i < n) {{
+            if (i / 2 * 2 != i) {{ odd = odd + 1; }};
+            i = i + 1;
+        }};
+        output(odd);
+    }} }}""",
+    'sum': """program Sum {{ main {{
+        let a = [{zeros}]; let size = 1000; let round = 0; let s = 0; let i = 0;
+        while (i < size) {{ a[i] = i; i = i + 1; }};
+        while (round < {n} / size) {{
+            i = 0;
+            while (i < size) {{ s = s + a[i]; i = i + 1; }};
+            round = round + 1;
+        }};
+        output(s);
+    }} }}""",
+    'countif': """program CountIf {{ main {{
+        let a = [{zeros}]; let size = 1000; let round = 0; let zeros = 0; let i = 0;
+        while (round < {n} / size) {{
+            i = 0;
+            while (i < size) {{ if (a[i] == 0) {{ zeros = zeros + 1; }}; i = i + 1; }};
+            a[round] = 1;
+            round = round + 1;
+        }};
+        output(zeros);
+    }} }}""",
+    'fill': """program Fill {{ main {{
+        let a = [{zeros}]; let size = 1000; let round = 0; let i = 0;
+        while (round < {n} / size) {{
+            i = 0;
+            while (i < size) {{ a[i] = round; i = i + 1; }};
+            round = round + 1;
+        }};
+        output(a[0], a[size - 1]);
+    }} }}""",
+    'nested': """program Nested {{ main {{
+        let i = 0; let rows = {n} / 100; let total = 0;
+        while (i < rows) {{
+            let j = 0;
+            while (j < 100) {{ total = total + j * i; j = j + 1; }};
+            i = i + 1;
+        }};
+        output(total);
+    }} }}""",
+}
+
+def timed_run(engine, tree, loop_idioms):
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        engine(tree=tree, loop_idioms=loop_idioms).interpret()
+    return time.perf_counter() - start, output.getvalue()
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark counted loops with and without loop idioms')
+    arg_parser.add_argument('--loop', choices=sorted(LOOPS), action='append', help='Loop to run (repeatable; default: all)')
+    arg_parser.add_argument('--size', type=int, default=200000, help='Iterations per loop')
+    arg_parser.add_argument('--engines', default='tree,slots', help='Comma-separated engines taking loop_idioms')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Runs per configuration (best is reported)')
+    args = arg_parser.parse_args()
+
+    for name in args.loop or sorted(LOOPS):
+        tree = parse_source(LOOPS[name].format(n=args.size, zeros=", ".join(["0"] * 1000)))
+        print(f"{name} (size {args.size}):")
+        for engine in args.engines.split(','):
+            results = {}
+            for loop_idioms in (False, True):
+                runs = [timed_run(ENGINES[engine], tree, loop_idioms) for _ in range(args.repeat)]
+                results[loop_idioms] = (min(run[0] for run in runs), runs[0][1])
+            (plain, expected), (idioms, output) = results[False], results[True]
+            status = "" if output == expected else "  OUTPUT DIFFERS"
+            print(f"  {engine:>8}: {plain * 1e3:8.1f} ms -> {idioms * 1e3:8.1f} ms ({plain / idioms:5.1f}x){status}")
+
+if __name__ == '__main__':
+    main()
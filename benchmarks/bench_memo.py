@@ -0,0 +1,80 @@
+"""
+Execution time of recursive programs with and without memoization of pure
+functions: naive Fibonacci, a binomial coefficient by Pascal's rule and a
+pure helper called in a loop with few distinct arguments. Exponential
+programs are only run without memoization up to --max-plain.
+
+    python -m benchmarks.bench_memo
+    python -m benchmarks.bench_memo --size 25 --engines tree,slots,tiered
+    python -m benchmarks.bench_memo --program fib --size 80 --memo-size 16
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from src.engines import ENGINES
+from src.parser import parse_source
+
+# `{n}` is the size of the problem.
+PROGRAMS = {
+    'fib': """program Fib {{
+    func fib(n) {{ let r = n; if (n > 1) {{ r = fib(n - 1) + fib(n - 2); }}; return r; }}
+    main {{ output(fib({n})); }}
+}}""",
+    'binomial': """program Binomial {{
+    func choose(n, k) {{
+        let r = 1;
+        if (k > 0) {{ if (k < n) {{ r = choose(n - 1, k - 1) + choose(n - 1, k); }}; }};
+        return r;
+    }}
+    main {{ output(choose({n}, 5)); }}
+}}""",
+    'helper': """program Helper {{
+    func digits(n) {{ let d = 1; let m = n; while (m >= 10) {{ m = m / 10; d = d + 1; }}; return d; }}
+    main {{
+        let i = 0; let total = 0;
+        while (i < {n} * 1000) {{ total = total + digits(i / 100 * 100); i = i + 1; }};
+        output(total);
+    }}
+}}""",
+}
+
+def timed_run(engine, tree, memoize, memo_size):
+    output = io.StringIO()
+    interpreter = engine(tree=tree, memoize=memoize, memo_size=memo_size)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        interpreter.interpret()
+    return time.perf_counter() - start, output.getvalue(), interpreter
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark memoization of pure functions')
+    arg_parser.add_argument('--program', choices=sorted(PROGRAMS), action='append', help='Program to run (repeatable; default: all)')
+    arg_parser.add_argument('--size', type=int, default=22, help='Problem size')
+    arg_parser.add_argument('--max-plain', type=int, default=24, help='Largest size of fib and binomial run without memoization')
+    arg_parser.add_argument('--memo-size', type=int, default=1024, help='Results memoized per function')
+    arg_parser.add_argument('--engines', default='tree,slots', help='Comma-separated engines taking memoize')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Runs per configuration (best is reported)')
+    args = arg_parser.parse_args()
+
+    for name in args.program or sorted(PROGRAMS):
+        tree = parse_source(PROGRAMS[name].format(n=args.size))
+        print(f"{name} (size {args.size}):")
+        for engine in args.engines.split(','):
+            runs = [timed_run(ENGINES[engine], tree, True, args.memo_size) for _ in range(args.repeat)]
+            memoized, output, interpreter = min(run[0] for run in runs), runs[0][1], runs[0][2]
+            line = f"  {engine:>8}: "
+            if name == 'helper' or args.size <= args.max_plain:
+                plain, expected, _ = min((timed_run(ENGINES[engine], tree, False, args.memo_size) for _ in range(args.repeat)),
+                                         key=lambda run: run[0])
+                status = "" if output == expected else "  OUTPUT DIFFERS"
+                line += f"{plain * 1e3:9.1f} ms -> {memoized * 1e3:8.1f} ms ({plain / memoized:7.1f}x){status}"
+            else:
+                line += f"{'-':>9} ms -> {memoized * 1e3:8.1f} ms"
+            print(line)
+            for function, stats in interpreter.memo_stats().items():
+                print(f"  {'':>8}  {function}: {stats}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Scaling of parse_parallel against the sequential Parser on one huge program,
+for an increasing number of worker processes. Workers are started before the
+timed runs, as a long-lived service (or the CLI on a huge file) would amortise
+their start-up.
+
+    python -m benchmarks.bench_parallel_parse --funcs 20000
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.parallel import parse_parallel
+from src.parser import parse_source
+from benchmarks.programs import generate_program
+
+def timed(parse, source):
+    start = time.perf_counter()
+    parse(source)
+    return time.perf_counter() - start
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark parallel parsing of a single program')
+    arg_parser.add_argument('--funcs', type=int, default=20000, help='Number of generated functions')
+    args = arg_parser.parse_args()
+
+    source = generate_program(args.funcs)
+    cores = os.cpu_count() or 1
+    print(f"source: {len(source) / 1e6:.1f} MB, {args.funcs} functions, {cores} cores")
+    sequential = timed(parse_source, source)
+    print(f"sequential: {sequential:.2f}s")
+    for jobs in sorted({1, 2, cores // 2 or 1, cores}):
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            executor.map(int, range(jobs))  # start the workers
+            seconds = timed(lambda text: parse_parallel(text, jobs=jobs, executor=executor), source)
+        print(f"jobs {jobs:>3}: {seconds:.2f}s, speedup {sequential / seconds:.2f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Parse throughput on expression-heavy code: the precedence-climbing expression
+parser versus the previous recursive-descent expr/term/factor/call_access
+chain (kept below as RecursiveParser for reference), plus the deepest
+parenthesised expression each one accepts.
+
+    python -m benchmarks.bench_parser --funcs 2000
+"""
+import argparse
+import sys
+import time
+
+from src.ast import BinaryOp, UnaryOp, Identifier, Number, String, FuncCall, StructInit, MemberAccess, ArrayAccess, ArrayLiteral
+from src.lexer import RegexLexer, TokenType
+from src.parser import Parser
+
+EXPR_FUNC_TEMPLATE = """
+    func expr_{i}(a, b, c) {{
+        let p = Point(a, b);
+        let v = [a, b + c, -a * (b - c), p.x];
+        let r = (a + b) * (c - a) / (b + 1) - -c + v[1] * v[a - a] - p.y / (1 + c * c);
+        r = r + ((((a + b) * c) - (a * (b + c))) / (1 + a * a)) * -(b - a) + expr_{i}_helper(a, b);
+        return r * (a - (b - (c - (a - b)))) + +v[2] - p.x * p.y;
+    }}
+    func expr_{i}_helper(x, y) {{
+        let unused = 0;
+        return x * y + x / (y + 1) - (x - y) * (x + y);
+    }}
+"""
+
+def generate_expression_program(num_funcs):
+    parts = ["program Expressions {\n    struct Point { x, y };\n"]
+    parts.extend(EXPR_FUNC_TEMPLATE.format(i=i) for i in range(num_funcs))
+    parts.append("    main {\n        output(expr_0(1, 2, 3));\n    }\n}\n")
+    return "".join(parts)
+
+class RecursiveParser(Parser):
+    """The recursive-descent expression grammar the Parser used before."""
+
+    def expr(self):
+        node = self.term()
+        while self.current_token and self.current_token.type in (TokenType.PLUS, TokenType.MINUS):
+            op = self.eat(self.current_token.type)
+            node = BinaryOp(left=node, op=op, right=self.term())
+        return node
+
+    def term(self):
+        node = self.factor()
+        while self.current_token and self.current_token.type in (TokenType.MULTIPLY, TokenType.DIVIDE):
+            op = self.eat(self.current_token.type)
+            node = BinaryOp(left=node, op=op, right=self.factor())
+        return node
+
+    def factor(self):
+        token = self.current_token
+        if token.type in (TokenType.PLUS, TokenType.MINUS):
+            self.eat(token.type)
+            return UnaryOp(op=token, expr=self.factor())
+        return self.call_access()
+
+    def call_access(self):
+        node = self.primary()
+        while self.current_token.type in (TokenType.LPAREN, TokenType.LBRACKET, TokenType.DOT):
+            if self.current_token.type == TokenType.LPAREN:
+                self.eat(TokenType.LPAREN)
+                args = self.arg_list() if self.current_token.type != TokenType.RPAREN else []
+                self.eat(TokenType.RPAREN)
+                if isinstance(node, Identifier) and node.value in self.struct_names:
+                    node = StructInit(node, args)
+                else:
+                    node = FuncCall(node, args)
+            elif self.current_token.type == TokenType.LBRACKET:
+                self.eat(TokenType.LBRACKET)
+                index_expr = self.expr()
+                self.eat(TokenType.RBRACKET)
+                node = ArrayAccess(node, index_expr)
+            else:
+                self.eat(TokenType.DOT)
+                node = MemberAccess(node, Identifier(self.eat(TokenType.IDENT)))
+        return node
+
+    def primary(self):
+        token = self.current_token
+        if token.type == TokenType.NUMBER:
+            self.eat(TokenType.NUMBER)
+            return Number(token)
+        if token.type == TokenType.STRING:
+            self.eat(TokenType.STRING)
+            return String(token)
+        if token.type == TokenType.LPAREN:
+            self.eat(TokenType.LPAREN)
+            node = self.expr()
+            self.eat(TokenType.RPAREN)
+            return node
+        if token.type == TokenType.IDENT:
+            return Identifier(self.eat(TokenType.IDENT))
+        if token.type == TokenType.LBRACKET:
+            self.eat(TokenType.LBRACKET)
+            elements = self.arg_list() if self.current_token.type != TokenType.RBRACKET else []
+            self.eat(TokenType.RBRACKET)
+            return ArrayLiteral(elements)
+        self.error("Invalid syntax for expression.")
+
+def best_time(parser_cls, tokens, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser_cls(tokens).parse()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def max_depth(parser_cls, limit):
+    """Largest nesting depth (up to `limit`, doubling) of `((...1...))` that parses."""
+    depth, ok = 1, 0
+    while depth <= limit:
+        source = f"program D {{ main {{ output({'(' * depth}1{')' * depth}); }} }}"
+        try:
+            parser_cls(RegexLexer(source).tokens()).parse()
+        except RecursionError:
+            break
+        ok, depth = depth, depth * 2
+    return ok
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark expression parsing')
+    arg_parser.add_argument('--funcs', type=int, default=2000, help='Number of generated functions')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Runs per parser (best time is reported)')
+    arg_parser.add_argument('--depth-limit', type=int, default=1 << 17, help='Largest nesting depth to try')
+    args = arg_parser.parse_args()
+
+    source = generate_expression_program(args.funcs)
+    tokens = RegexLexer(source).tokens()  # lexing is excluded from the timings
+    print(f"source: {len(source) / 1e6:.2f} MB, {len(tokens)} tokens, recursion limit {sys.getrecursionlimit()}")
+    for name, parser_cls in (('recursive', RecursiveParser), ('precedence', Parser)):
+        seconds = best_time(parser_cls, tokens, args.repeat)
+        depth = max_depth(parser_cls, args.depth_limit)
+        print(f"{name:>10}: {seconds:.3f}s ({len(tokens) / seconds / 1e6:.2f}M tokens/s), max nesting depth >= {depth}")
+
+if __name__ == '__main__':
+    main()
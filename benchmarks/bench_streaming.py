@@ -0,0 +1,42 @@
+"""
+Peak memory and time of parsing from a fully materialised token list versus
+parsing from a lazily fed TokenStream.
+
+    python -m benchmarks.bench_streaming --funcs 2000
+"""
+import argparse
+import time
+import tracemalloc
+
+from src.lexer import RegexLexer
+from src.parser import Parser
+from benchmarks.programs import generate_program
+
+def parse_from_list(source):
+    return Parser(RegexLexer(source).tokens()).parse()
+
+def parse_from_stream(source):
+    return Parser(RegexLexer(source).stream()).parse()
+
+def measure(parse, source):
+    tracemalloc.start()
+    start = time.perf_counter()
+    parse(source)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark list-based vs streaming parsing')
+    arg_parser.add_argument('--funcs', type=int, default=2000, help='Number of generated functions')
+    args = arg_parser.parse_args()
+
+    source = generate_program(args.funcs)
+    print(f"source: {len(source) / 1e6:.2f} MB")
+    for name, parse in (('list', parse_from_list), ('stream', parse_from_stream)):
+        seconds, peak = measure(parse, source)
+        print(f"{name:>6}: {seconds:.3f}s, peak {peak / 1e6:.1f} MB (traced)")
+
+if __name__ == '__main__':
+    main()
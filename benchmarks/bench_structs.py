@@ -0,0 +1,125 @@
+"""
+Memory and speed of struct instances: one million `Point { x, y }` instances
+in the previous layout (a `members` dict per instance) and in the slotted
+per-struct classes, then an L25 program that fills an array of them and sums
+their fields on each engine, with its peak memory.
+
+The dict-based layout is reproduced by DictInstance, which holds the same
+members the way StructInstance used to.
+
+    python -m benchmarks.bench_structs
+    python -m benchmarks.bench_structs --count 200000 --engines tree,vm
+    python -m benchmarks.bench_structs --no-program
+"""
+import argparse
+import contextlib
+import io
+import time
+import tracemalloc
+
+from src.ast import Identifier
+from src.engines import ENGINES
+from src.lexer import Token, TokenType
+from src.parser import parse_source
+from src.structs import StructDefinition, field_slot
+
+class DictInstance:
+    def __init__(self, type_name):
+        self.type_name = type_name
+        self.members = {}
+
+# `{rows}` arrays of 1000 Points; `{zeros}` is a list of 1000 zeros.
+PROGRAM = """program Points {{
+    struct Point {{ x, y }};
+    main {{
+        let rows = [{zeros}]; let i = 0; let total = 0;
+        while (i < {rows}) {{
+            let row = [{zeros}]; let j = 0;
+            while (j < 1000) {{ row[j] = Point(i, j); j = j + 1; }};
+            rows[i] = row; i = i + 1;
+        }};
+        i = 0;
+        while (i < {rows}) {{
+            let row = rows[i]; let j = 0;
+            while (j < 1000) {{ let p = row[j]; total = total + p.x - p.y; j = j + 1; }};
+            i = i + 1;
+        }};
+        output(total);
+    }}
+}}
+"""
+
+def measure(build, read):
+    """Retained memory of `build()`, and the time it took and the time `read` takes on its result."""
+    tracemalloc.start()
+    instances = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del instances
+    start = time.perf_counter()
+    instances = build()
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    read(instances)
+    return size, built, time.perf_counter() - start
+
+def compare_layouts(count):
+    def build_dicts():
+        points = []
+        for i in range(count):
+            instance = DictInstance('Point')
+            instance.members['x'] = i
+            instance.members['y'] = i
+            points.append(instance)
+        return points
+    def read_dicts(points):
+        return sum(point.members['x'] - point.members['y'] for point in points)
+
+    blueprint = StructDefinition('Point', [Identifier(Token(TokenType.IDENT, name)) for name in ('x', 'y')])
+    def build_slots():
+        return [blueprint.new('Point', (i, i)) for i in range(count)]
+    x, y = field_slot('x'), field_slot('y')
+    def read_slots(points):
+        return sum(getattr(point, x) - getattr(point, y) for point in points)
+
+    print(f"{count} Point instances:")
+    results = {name: measure(build, read) for name, build, read in (
+        ('members dict', build_dicts, read_dicts), ('slotted class', build_slots, read_slots))}
+    for name, (size, built, read) in results.items():
+        print(f"  {name:>14}: {size / 2**20:7.1f} MiB ({size / count:5.1f} B each), "
+              f"built in {built * 1e3:7.1f} ms, read in {read * 1e3:7.1f} ms")
+    (old, _, _), (new, _, _) = results.values()
+    print(f"  {'':>14}  {old / new:.1f}x less memory")
+
+def run_program(engine, tree, traced):
+    output = io.StringIO()
+    if traced:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        ENGINES[engine](tree=tree).interpret()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if traced else None
+    if traced:
+        tracemalloc.stop()
+    return elapsed, peak, output.getvalue()
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark struct instance memory and speed')
+    arg_parser.add_argument('--count', type=int, default=1000000, help='Point instances (a multiple of 1000)')
+    arg_parser.add_argument('--engines', default='tree,slots,closure,vm', help='Comma-separated engines to run the program on')
+    arg_parser.add_argument('--no-program', action='store_true', help='Only compare the instance layouts')
+    args = arg_parser.parse_args()
+
+    compare_layouts(args.count)
+    if args.no_program:
+        return
+    tree = parse_source(PROGRAM.format(rows=args.count // 1000, zeros=", ".join(["0"] * 1000)))
+    print(f"Program filling and summing an array of {args.count} Points:")
+    for engine in args.engines.split(','):
+        elapsed, _, output = run_program(engine, tree, traced=False)
+        _, peak, _ = run_program(engine, tree, traced=True)
+        print(f"  {engine:>8}: {elapsed * 1e3:9.1f} ms, peak {peak / 2**20:7.1f} MiB -> {output.strip()}")
+
+if __name__ == '__main__':
+    main()
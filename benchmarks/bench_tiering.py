@@ -0,0 +1,88 @@
+"""
+Execution time of call-heavy programs on the tree engine and on the tiered
+engine, which specializes hot functions for the argument types they are
+called with: the engine `call` workload, a recursive fib and a helper called
+with arguments whose type changes halfway (one deopt). The tiered engine's
+stats report is printed after its runs.
+
+    python -m benchmarks.bench_tiering
+    python -m benchmarks.bench_tiering --size 50000 --threshold 10
+    python -m benchmarks.bench_tiering --program fib --program deopt
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from src.interpreter import Interpreter
+from src.parser import parse_source
+from src.tiering import TieredInterpreter, DEFAULT_THRESHOLD
+from benchmarks.programs import generate_workload
+
+# `{n}` scales the amount of work.
+PROGRAMS = {
+    'fib': """program Fib {{
+    func fib(n) {{
+        let r = n;
+        if (n > 1) {{ r = fib(n - 1) + fib(n - 2); }};
+        return r;
+    }}
+    main {{
+        let depth = 10; let calls = 1;
+        while (calls * 2 < {n}) {{ depth = depth + 1; calls = calls * 2; }};
+        output(fib(depth));
+    }}
+}}
+""",
+    'deopt': """program Deopt {{
+    func scale(v, k) {{
+        let r = v * k + k;
+        return r;
+    }}
+    main {{
+        let i = 0; let total = 0; let text = "";
+        while (i < {n} / 2) {{ total = scale(i, 3) - total; i = i + 1; }};
+        while (i < {n}) {{ text = scale("ab", i / 1000 + 1); i = i + 1; }};
+        output(total, text);
+    }}
+}}
+""",
+}
+
+def source_of(name, n):
+    if name == 'call':
+        return generate_workload('call', n)
+    return PROGRAMS[name].format(n=n)
+
+def timed_run(tree, tiered, threshold):
+    output = io.StringIO()
+    interpreter = TieredInterpreter(tree=tree, threshold=threshold) if tiered else Interpreter(tree=tree)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        interpreter.interpret()
+    return time.perf_counter() - start, output.getvalue(), interpreter
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark tiered specialization of hot functions')
+    arg_parser.add_argument('--program', choices=['call'] + sorted(PROGRAMS), action='append',
+                            help='Program to run (repeatable; default: all)')
+    arg_parser.add_argument('--size', type=int, default=20000, help='Loop iterations (or fib calls) per program')
+    arg_parser.add_argument('--threshold', type=int, default=DEFAULT_THRESHOLD, help='Calls before a function is specialized')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Runs per configuration (best is reported)')
+    args = arg_parser.parse_args()
+
+    for name in args.program or ['call'] + sorted(PROGRAMS):
+        tree = parse_source(source_of(name, args.size))
+        results = {}
+        for tiered in (False, True):
+            runs = [timed_run(tree, tiered, args.threshold) for _ in range(args.repeat)]
+            results[tiered] = (min(run[0] for run in runs), runs[0][1], runs[0][2])
+        (generic, expected, _), (specialized, output, interpreter) = results[False], results[True]
+        status = "" if output == expected else "  OUTPUT DIFFERS"
+        print(f"{name} (size {args.size}): {generic * 1e3:8.1f} ms -> {specialized * 1e3:8.1f} ms "
+              f"({generic / specialized:4.2f}x){status}")
+        for line in interpreter.report().splitlines():
+            print(f"  {line}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Memory and time of lexing into Token objects (RegexLexer) versus the compact
+struct-of-arrays TokenBuffer, plus the cost of parsing on top of each.
+
+    python -m benchmarks.bench_token_buffer --funcs 2000
+"""
+import argparse
+import time
+import tracemalloc
+
+from src.lexer import RegexLexer, TokenBuffer
+from src.parser import Parser
+from benchmarks.programs import generate_program
+
+def measure(build):
+    start = time.perf_counter()
+    tracemalloc.start()
+    result = build()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, time.perf_counter() - start, retained
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark the compact token buffer')
+    arg_parser.add_argument('--funcs', type=int, default=2000, help='Number of generated functions')
+    args = arg_parser.parse_args()
+
+    source = generate_program(args.funcs)
+    print(f"source: {len(source) / 1e6:.2f} MB")
+
+    tokens, seconds, retained = measure(lambda: RegexLexer(source).tokens())
+    print(f"Token list : {seconds:.3f}s, {retained / len(tokens):.1f} bytes/token retained")
+    del tokens
+    buffer, seconds, retained = measure(lambda: TokenBuffer(source))
+    print(f"TokenBuffer: {seconds:.3f}s, {retained / len(buffer):.1f} bytes/token retained")
+    del buffer
+
+    for name, make_tokens in (('regex stream', lambda: RegexLexer(source).stream()),
+                              ('token buffer', lambda: TokenBuffer(source))):
+        start = time.perf_counter()
+        Parser(make_tokens()).parse()
+        print(f"lex+parse via {name}: {time.perf_counter() - start:.3f}s")
+
+if __name__ == '__main__':
+    main()
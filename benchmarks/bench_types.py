@@ -0,0 +1,74 @@
+"""
+Type specialization: the share of arithmetic, indexing and member operations
+TypeInference proves the types of in the test programs, and the execution
+time of the engine workloads with and without the specialized fast paths.
+
+    python -m benchmarks.bench_types
+    python -m benchmarks.bench_types --size 50000 --engines tree
+    python -m benchmarks.bench_types --programs tests/test_programs --no-timing
+"""
+import argparse
+import contextlib
+import glob
+import io
+import os
+import time
+
+from src.engines import ENGINES
+from src.inference import infer_types
+from src.parser import parse_source
+from benchmarks.programs import WORKLOADS, generate_workload
+
+def report_fractions(directory):
+    totals = {}
+    for path in sorted(glob.glob(os.path.join(directory, '*.l25'))):
+        with open(path) as f:
+            stats = infer_types(parse_source(f.read())).stats()
+        specialized = sum(done for done, _ in stats.values())
+        total = sum(count for _, count in stats.values())
+        print(f"  {os.path.basename(path):>28}: {specialized:3d}/{total:3d} operations specialized")
+        for kind, (done, count) in stats.items():
+            kind_totals = totals.setdefault(kind, [0, 0])
+            kind_totals[0] += done
+            kind_totals[1] += count
+    for kind, (done, count) in totals.items():
+        print(f"  {kind:>28}: {done:3d}/{count:3d} ({done / max(count, 1):.0%})")
+    done = sum(kind_totals[0] for kind_totals in totals.values())
+    count = sum(kind_totals[1] for kind_totals in totals.values())
+    print(f"  {'all':>28}: {done:3d}/{count:3d} ({done / max(count, 1):.0%})")
+
+def timed_run(engine, tree, typed):
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        engine(tree=tree, typed=typed).interpret()
+    return time.perf_counter() - start, output.getvalue()
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark type-specialized execution')
+    arg_parser.add_argument('--programs', default=os.path.join('tests', 'test_programs'),
+                            help='Directory of .l25 programs to report the specialized share of')
+    arg_parser.add_argument('--size', type=int, default=20000, help='Loop iterations per workload')
+    arg_parser.add_argument('--engines', default='tree,slots', help='Comma-separated engines taking typed')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Runs per configuration (best is reported)')
+    arg_parser.add_argument('--no-timing', action='store_true', help='Only report the specialized share')
+    args = arg_parser.parse_args()
+
+    print(f"{args.programs}:")
+    report_fractions(args.programs)
+    if args.no_timing:
+        return
+    for workload in sorted(WORKLOADS):
+        tree = parse_source(generate_workload(workload, args.size))
+        print(f"{workload} (size {args.size}):")
+        for engine in args.engines.split(','):
+            results = {}
+            for typed in (False, True):
+                runs = [timed_run(ENGINES[engine], tree, typed) for _ in range(args.repeat)]
+                results[typed] = (min(run[0] for run in runs), runs[0][1])
+            (checked, expected), (typed, output) = results[False], results[True]
+            status = "" if output == expected else "  OUTPUT DIFFERS"
+            print(f"  {engine:>8}: {checked * 1e3:8.1f} ms -> {typed * 1e3:8.1f} ms ({checked / typed:4.2f}x){status}")
+
+if __name__ == '__main__':
+    main()
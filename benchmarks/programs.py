@@ -0,0 +1,104 @@
+"""Synthetic L25 sources shared by the benchmark scripts."""
+
+FUNC_TEMPLATE = """
+    func compute_{i}(a, b) {{
+        let total = 0;
+        let i = 0;
+        let label = "result of compute_{i}";
+        let values = [a, b, {i}, a * b];
+        while (i < 4) {{
+            total = total + values[i] * (a - b) / 2;
+            if (total >= 1000) {{
+                total = total - 1000;
+            }} else {{
+                total = total + {i};
+            }};
+            i = i + 1;
+        }};
+        return total;
+    }}
+"""
+
+def generate_program(num_funcs, name="Generated"):
+    """Returns a valid L25 program with `num_funcs` loop-heavy functions."""
+    parts = [f"program {name} {{\n    struct Point {{ x, y }};\n"]
+    for i in range(num_funcs):
+        parts.append(FUNC_TEMPLATE.format(i=i))
+    parts.append("    main {\n        let p = Point(1, 2);\n")
+    for i in range(min(num_funcs, 10)):
+        parts.append(f"        output(compute_{i}(p.x + {i}, p.y));\n")
+    parts.append("        output(\"done\");\n    }\n}\n")
+    return "".join(parts)
+
+# Execution-heavy programs for the engine benchmarks, by what they stress.
+# `{n}` scales the amount of work; `{zeros}` is a list of 64 zeros.
+WORKLOADS = {
+    'loop': """program LoopWorkload {{
+    main {{
+        let i = 0;
+        let total = 0;
+        while (i < {n}) {{
+            total = total + i * 3 - i / 7;
+            if (total >= 100000) {{
+                total = total - 100000;
+            }} else {{
+                total = total + 1;
+            }};
+            i = i + 1;
+        }};
+        output(total);
+    }}
+}}
+""",
+    'call': """program CallWorkload {{
+    struct Point {{ x, y }};
+    func fib(n) {{
+        let r = n;
+        if (n > 1) {{
+            r = fib(n - 1) + fib(n - 2);
+        }};
+        return r;
+    }}
+    func dot(p, q) {{
+        let s = p.x * q.x;
+        return s + p.y * q.y;
+    }}
+    main {{
+        let i = 0;
+        let total = 0;
+        while (i < {n}) {{
+            total = total + dot(Point(i, 2), Point(3, i)) / 5;
+            i = i + 1;
+        }};
+        output(total, fib(16));
+    }}
+}}
+""",
+    'array': """program ArrayWorkload {{
+    main {{
+        let size = 64;
+        let values = [{zeros}];
+        let grid = [{zeros}];
+        let i = 0;
+        while (i < size) {{
+            values[i] = i;
+            i = i + 1;
+        }};
+        let round = 0;
+        while (round < {n} / size) {{
+            i = 0;
+            while (i < size) {{
+                grid[i] = grid[i] + values[size - 1 - i] * round;
+                i = i + 1;
+            }};
+            round = round + 1;
+        }};
+        output(grid[0], grid[size - 1]);
+    }}
+}}
+""",
+}
+
+def generate_workload(name, n):
+    """Returns the L25 source of workload `name` scaled to about `n` loop iterations."""
+    return WORKLOADS[name].format(n=n, zeros=", ".join(["0"] * 64))
@@ -0,0 +1,302 @@
+import copy
+import gc
+import sys
+from array import array
+
+from src.ast import (
+    Program, FuncDef, StructDef, StmtList, DeclareStmt, AssignStmt, IfStmt, WhileStmt,
+    InputStmt, OutputStmt, ReturnStmt, FuncCall, StructInit, MemberAccess,
+    ArrayLiteral, ArrayAccess, TryCatch, BoolExpr, BinaryOp, UnaryOp,
+    Identifier, Number, String
+)
+from src.lexer import Token, TOKEN_KINDS, KIND_IDS
+
+# Field kinds: a child node (or None), a list of child nodes, or a token.
+NODE, LIST, TOKEN = range(3)
+
+# Fields of every node class in constructor order. Literal and identifier nodes
+# only store their token; their `value` is the token value.
+SCHEMA = {
+    Program: (('name', NODE), ('struct_defs', LIST), ('func_defs', LIST), ('main_block', NODE)),
+    FuncDef: (('name', NODE), ('params', LIST), ('body', NODE)),
+    StructDef: (('name', NODE), ('fields', LIST)),
+    StmtList: (('stmts', LIST),),
+    DeclareStmt: (('ident', NODE), ('expr', NODE)),
+    AssignStmt: (('left', NODE), ('expr', NODE)),
+    IfStmt: (('bool_expr', NODE), ('if_block', NODE), ('else_block', NODE)),
+    WhileStmt: (('bool_expr', NODE), ('body', NODE)),
+    InputStmt: (('idents', LIST),),
+    OutputStmt: (('exprs', LIST),),
+    ReturnStmt: (('expr', NODE),),
+    FuncCall: (('name', NODE), ('args', LIST)),
+    TryCatch: (('try_block', NODE), ('catch_block', NODE)),
+    BoolExpr: (('left', NODE), ('op', TOKEN), ('right', NODE)),
+    BinaryOp: (('left', NODE), ('op', TOKEN), ('right', NODE)),
+    UnaryOp: (('op', TOKEN), ('expr', NODE)),
+    Identifier: (('token', TOKEN),),
+    Number: (('token', TOKEN),),
+    String: (('token', TOKEN),),
+    ArrayLiteral: (('elements', LIST),),
+    ArrayAccess: (('ident', NODE), ('index_expr', NODE)),
+    StructInit: (('name', NODE), ('args', LIST)),
+    MemberAccess: (('struct_expr', NODE), ('member_ident', NODE)),
+}
+NODE_CLASSES = tuple(SCHEMA)
+CLASS_IDS = {cls: class_id for class_id, cls in enumerate(NODE_CLASSES)}
+
+# Typed arrays making up an arena, in serialisation order.
+ARRAY_NAMES = ('kinds', 'offsets', 'fields', 'lists', 'token_kinds', 'token_values', 'token_lines', 'token_columns')
+
+class ASTArena:
+    """
+    Stores an AST in flat, index-linked typed arrays instead of node objects.
+
+    Node `i` has a class id in `kinds[i]` and its fields start at
+    `fields[offsets[i]]`, one slot per schema entry: a child node index (-1 for
+    None), the start of a `[length, item...]` block in `lists`, or a token index.
+    Tokens are stored column-wise with their values interned in `values`.
+
+    `node(i)` / `root` return read-only views that subclass the regular node
+    classes (and share their names), so the Interpreter and ASTVisualizer run on
+    an arena unchanged. `kind`, `children` and `walk` traverse by index only.
+    """
+    def __init__(self):
+        self.kinds = array('B')
+        self.offsets = array('I')
+        self.fields = array('i')
+        self.lists = array('I')
+        self.token_kinds = array('B')
+        self.token_values = array('I')
+        self.token_lines = array('I')
+        self.token_columns = array('I')
+        self.values = []
+        self._value_ids = {}
+
+    @classmethod
+    def from_tree(cls, root):
+        arena = cls()
+        arena.add(root)
+        return arena
+
+    def to_payload(self):
+        """A dict of bytes, strings and ints (marshal/pickle friendly) describing the arena."""
+        payload = {name: getattr(self, name).tobytes() for name in ARRAY_NAMES}
+        payload['values'] = self.values
+        payload['byteorder'] = sys.byteorder
+        return payload
+
+    @classmethod
+    def from_payload(cls, payload):
+        arena = cls()
+        for name in ARRAY_NAMES:
+            array_ = getattr(arena, name)
+            array_.frombytes(payload[name])
+            if payload['byteorder'] != sys.byteorder:
+                array_.byteswap()
+        arena.values = list(payload['values'])
+        arena._value_ids = {(type(value), value): value_id for value_id, value in enumerate(arena.values)}
+        return arena
+
+    def moved(self, lines, columns, first_line):
+        """
+        A copy whose tokens sit `lines` lines further down, tokens on `first_line`
+        also moving `columns` columns right. Node arrays are shared with this arena.
+        """
+        arena = copy.copy(self)
+        arena.token_lines = array('I', [line + lines for line in self.token_lines])
+        if columns:
+            arena.token_columns = array('I', [column + columns if line == first_line else column
+                                              for line, column in zip(self.token_lines, self.token_columns)])
+        return arena
+
+    def __len__(self):
+        return len(self.kinds)
+
+    @property
+    def nbytes(self):
+        """Bytes used by the typed arrays (interned values not included)."""
+        return sum(len(getattr(self, name)) * getattr(self, name).itemsize for name in ARRAY_NAMES)
+
+    def add(self, root):
+        """Appends a tree in pre-order (parents before children) and returns its index."""
+        kinds, offsets, fields, lists = self.kinds, self.offsets, self.fields, self.lists
+        root_index = len(kinds)
+        pending = [(root, None, 0)]  # node, array to patch with its index, position
+        while pending:
+            node, target, position = pending.pop()
+            index = len(kinds)
+            if target is not None:
+                target[position] = index
+            cls = type(node)
+            kinds.append(CLASS_IDS[cls])
+            offsets.append(len(fields))
+            children = []
+            for name, field_kind in SCHEMA[cls]:
+                value = getattr(node, name)
+                if field_kind == NODE:
+                    if value is not None:
+                        children.append((value, fields, len(fields)))
+                    fields.append(-1)
+                elif field_kind == LIST:
+                    block = len(lists)
+                    lists.append(len(value))
+                    lists.extend([0] * len(value))
+                    children.extend((item, lists, block + 1 + i) for i, item in enumerate(value))
+                    fields.append(block)
+                else:
+                    fields.append(self._add_token(value))
+            pending.extend(reversed(children))
+        return root_index
+
+    def _add_token(self, token):
+        value = token.value
+        key = (type(value), value)
+        value_id = self._value_ids.get(key)
+        if value_id is None:
+            value_id = self._value_ids[key] = len(self.values)
+            self.values.append(value)
+        self.token_kinds.append(KIND_IDS[token.type])
+        self.token_values.append(value_id)
+        self.token_lines.append(token.line)
+        self.token_columns.append(token.column)
+        return len(self.token_kinds) - 1
+
+    def token(self, token_index):
+        return Token(TOKEN_KINDS[self.token_kinds[token_index]], self.values[self.token_values[token_index]],
+                     self.token_lines[token_index], self.token_columns[token_index])
+
+    # Index-based traversal
+
+    def kind(self, index):
+        """The node class of node `index`."""
+        return NODE_CLASSES[self.kinds[index]]
+
+    def children(self, index):
+        """Child node indices of node `index` in field order."""
+        result = []
+        offset = self.offsets[index]
+        for position, (_, field_kind) in enumerate(SCHEMA[NODE_CLASSES[self.kinds[index]]]):
+            slot = self.fields[offset + position]
+            if field_kind == NODE:
+                if slot >= 0:
+                    result.append(slot)
+            elif field_kind == LIST:
+                result.extend(self.lists[slot + 1:slot + 1 + self.lists[slot]])
+        return result
+
+    def walk(self, index=0):
+        """Yields node indices of the subtree at `index` in pre-order, without recursion."""
+        pending = [index]
+        while pending:
+            index = pending.pop()
+            yield index
+            pending.extend(reversed(self.children(index)))
+
+    # Object views
+
+    @property
+    def root(self):
+        return self.node(0)
+
+    def node(self, index):
+        return _VIEW_CLASSES[self.kinds[index]](self, index)
+
+    def to_tree(self, index=0, end=None):
+        """
+        Materialises regular node objects for the subtree at `index`. `end`, if
+        known (e.g. the index of the next root added), saves walking the subtree.
+        """
+        # Pre-order numbering keeps every subtree contiguous and puts children
+        # after their parent, so building back to front always finds the
+        # children already built. built[-1] stays None for absent children.
+        if end is None:
+            end = index + sum(1 for _ in self.walk(index)) if index else len(self.kinds)
+        built = [None] * (end + 1)
+        builders = _BUILDERS
+        kinds, offsets, fields, lists, token = self.kinds, self.offsets, self.fields, self.lists, self.token
+        # Only new, acyclic objects are created here; pausing the cyclic GC keeps
+        # it from repeatedly scanning the growing tree.
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for i in range(end - 1, index - 1, -1):
+                built[i] = builders[kinds[i]](fields, offsets[i], built, lists, token)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        return built[index]
+
+def materialize(node):
+    """Returns `node` unchanged, or regular node objects if it is an arena view."""
+    arena = getattr(node, '_arena', None)
+    return node if arena is None else arena.to_tree(node._index)
+
+def _view_init(self, arena, index):
+    self._arena = arena
+    self._index = index
+
+def _view_eq(self, other):
+    return getattr(other, '_arena', None) is self._arena and other._index == self._index
+
+def _view_hash(self):
+    return hash((id(self._arena), self._index))
+
+def _node_getter(position):
+    def get(self):
+        arena = self._arena
+        slot = arena.fields[arena.offsets[self._index] + position]
+        return arena.node(slot) if slot >= 0 else None
+    return get
+
+def _list_getter(position):
+    def get(self):
+        arena = self._arena
+        block = arena.fields[arena.offsets[self._index] + position]
+        return [arena.node(item) for item in arena.lists[block + 1:block + 1 + arena.lists[block]]]
+    return get
+
+def _token_getter(position):
+    def get(self):
+        arena = self._arena
+        return arena.token(arena.fields[arena.offsets[self._index] + position])
+    return get
+
+def _value_getter(self):
+    arena = self._arena
+    return arena.values[arena.token_values[arena.fields[arena.offsets[self._index]]]]
+
+def _make_view_class(cls):
+    getters = {NODE: _node_getter, LIST: _list_getter, TOKEN: _token_getter}
+    # Views are made afresh on every access; those of one node compare equal, so
+    # they key per-node caches (such as the Interpreter's counted loops).
+    namespace = {'__slots__': ('_arena', '_index'), '__init__': _view_init, '__module__': __name__,
+                 '__eq__': _view_eq, '__hash__': _view_hash}
+    for position, (name, field_kind) in enumerate(SCHEMA[cls]):
+        namespace[name] = property(getters[field_kind](position))
+    if cls in (Identifier, Number, String):
+        namespace['value'] = property(_value_getter)
+    # Same name as the node class so visitors dispatching on the class name work.
+    return type(cls.__name__, (cls,), namespace)
+
+_VIEW_CLASSES = tuple(_make_view_class(cls) for cls in NODE_CLASSES)
+
+def _make_builder(cls):
+    """
+    Generates a function that constructs one `cls` node from its arena fields,
+    with the schema unrolled so materialising a tree does no per-field dispatch.
+    """
+    args = []
+    for position, (_, field_kind) in enumerate(SCHEMA[cls]):
+        slot = f"fields[offset + {position}]"
+        if field_kind == NODE:
+            args.append(f"built[{slot}]")
+        elif field_kind == LIST:
+            args.append(f"[built[i] for i in lists[{slot} + 1:{slot} + 1 + lists[{slot}]]]")
+        else:
+            args.append(f"token({slot})")
+    source = f"def build(fields, offset, built, lists, token):\n    return cls({', '.join(args)})\n"
+    namespace = {'cls': cls}
+    exec(source, namespace)
+    return namespace['build']
+
+_BUILDERS = tuple(_make_builder(cls) for cls in NODE_CLASSES)
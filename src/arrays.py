@@ -0,0 +1,197 @@
+import copy
+from array import array
+
+# Element type of an IntArray: a signed 64-bit integer.
+TYPECODE = 'q'
+
+class Array(array):
+    """
+    An L25 array kept in an `array` buffer rather than a list of references.
+    An array literal of ints only is built as an IntArray, which stores each
+    element as a machine integer; storing anything else in it (or an int too
+    large for 64 bits) turns the same object into an ObjectArray, whose
+    elements are in the list `items`, so every reference to the array sees
+    the change (see make_generic). Other arrays are plain lists.
+
+    Arrays of all three kinds compare and print like lists and report `list`
+    as their type name, so output and error messages are the same whatever
+    holds the elements.
+    """
+    __slots__ = ('items',)
+
+    def __repr__(self):
+        return repr(self.tolist())
+
+    def __eq__(self, other):
+        return self.tolist() == as_list(other) if is_array(other) else NotImplemented
+
+    def __ne__(self, other):
+        return self.tolist() != as_list(other) if is_array(other) else NotImplemented
+
+    def __lt__(self, other):
+        return self.tolist() < as_list(other) if is_array(other) else NotImplemented
+
+    def __le__(self, other):
+        return self.tolist() <= as_list(other) if is_array(other) else NotImplemented
+
+    def __gt__(self, other):
+        return self.tolist() > as_list(other) if is_array(other) else NotImplemented
+
+    def __ge__(self, other):
+        return self.tolist() >= as_list(other) if is_array(other) else NotImplemented
+
+class IntArray(Array):
+    __slots__ = ()
+
+class ObjectArray(Array):
+    """
+    A former IntArray: the `array` buffer is empty and `items` holds the
+    elements. Every list-like method works on `items`; the methods that read
+    or write the buffer itself raise TypeError instead of seeing it empty.
+    """
+    __slots__ = ()
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __setitem__(self, index, value):
+        self.items[index] = value
+
+    def __delitem__(self, index):
+        del self.items[index]
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __contains__(self, value):
+        return value in self.items
+
+    def __add__(self, other):
+        return object_array(self.items + as_list(other)) if is_array(other) else NotImplemented
+
+    def __iadd__(self, other):
+        if not is_array(other):
+            return NotImplemented
+        self.items += as_list(other)
+        return self
+
+    def __mul__(self, count):
+        return object_array(self.items * count)
+
+    __rmul__ = __mul__
+
+    def __imul__(self, count):
+        self.items *= count
+        return self
+
+    def __copy__(self):
+        return object_array(list(self.items))
+
+    def __deepcopy__(self, memo):
+        return object_array(copy.deepcopy(self.items, memo))
+
+    def __reduce_ex__(self, protocol):
+        return object_array, (self.items,)
+
+    def append(self, value):
+        self.items.append(value)
+
+    def extend(self, values):
+        self.items.extend(values)
+
+    def insert(self, index, value):
+        self.items.insert(index, value)
+
+    def pop(self, index=-1):
+        return self.items.pop(index)
+
+    def remove(self, value):
+        self.items.remove(value)
+
+    def reverse(self):
+        self.items.reverse()
+
+    def count(self, value):
+        return self.items.count(value)
+
+    def index(self, value, *bounds):
+        return self.items.index(value, *bounds)
+
+    def tolist(self):
+        return list(self.items)
+
+    def __repr__(self):
+        return repr(self.items)
+
+def _buffer_method(name):
+    def method(self, *args):
+        raise TypeError(f"'{name}' needs the int buffer of an IntArray, and this array holds objects")
+    method.__name__ = name
+    return method
+
+def _buffer_attribute(name):
+    def getter(self):
+        raise AttributeError(f"'{name}' needs the int buffer of an IntArray, and this array holds objects")
+    return property(getter)
+
+for _name in ('buffer_info', 'byteswap', 'frombytes', 'fromfile', 'fromlist', 'fromunicode', 'tobytes', 'tofile', 'tounicode'):
+    setattr(ObjectArray, _name, _buffer_method(_name))
+for _name in ('itemsize', 'typecode'):
+    setattr(ObjectArray, _name, _buffer_attribute(_name))
+del _name
+
+IntArray.__name__ = ObjectArray.__name__ = 'list'
+
+# Every type an L25 array can have, for isinstance checks.
+ARRAY_TYPES = (list, Array)
+
+def is_array(value):
+    return isinstance(value, ARRAY_TYPES)
+
+def as_list(value):
+    """The elements of array `value` as a list (`value` itself if it is one)."""
+    return value if isinstance(value, list) else value.tolist()
+
+def new_array(values):
+    """The L25 array holding the list `values`: an IntArray if they are all ints that fit one."""
+    for value in values:
+        if type(value) is not int:
+            return values
+    try:
+        return IntArray(TYPECODE, values)
+    except OverflowError:
+        return values
+
+def object_array(items):
+    """A new ObjectArray holding the list `items`."""
+    array_obj = ObjectArray(TYPECODE)
+    array_obj.items = items
+    return array_obj
+
+def make_generic(int_array):
+    """Turns `int_array` into an ObjectArray with the same elements, in place, and returns its items."""
+    items = int_array.tolist()
+    del int_array[:]
+    int_array.items = items
+    int_array.__class__ = ObjectArray
+    return items
+
+def store(array_obj, index, value):
+    """`array_obj[index] = value` for an index already checked to be in bounds."""
+    try:
+        array_obj[index] = value
+    except (TypeError, OverflowError):
+        make_generic(array_obj)[index] = value
+
+def store_slice(array_obj, indices, values):
+    """`array_obj[indices] = values` for a slice `indices` of as many elements as `values`."""
+    if type(array_obj) is IntArray:
+        try:
+            array_obj[indices] = IntArray(TYPECODE, values)
+            return
+        except (TypeError, OverflowError):
+            make_generic(array_obj)
+    array_obj[indices] = values
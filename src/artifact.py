@@ -0,0 +1,94 @@
+import hashlib
+import marshal
+import os
+import struct
+
+from src.arena import ASTArena
+from src.error import ArtifactError
+from src.parser import parse_source
+
+# Layout of a .l25c file:
+#   header  magic, format version, SHA-256 of the source, length of the source path
+#   path    UTF-8 path of the source file the artifact was compiled from ('' if unknown)
+#   payload marshal-encoded ASTArena payload of the compiled Program
+# The header and path keep this layout across format versions so that an
+# outdated artifact can still be traced back to its source and recompiled.
+MAGIC = b'L25C'
+FORMAT_VERSION = 1
+ARTIFACT_SUFFIX = '.l25c'
+_HEADER = struct.Struct('<4sH32sH')
+
+def source_hash(source):
+    return hashlib.sha256(source.encode('utf-8', 'surrogatepass')).digest()
+
+def artifact_path_for(source_path):
+    return os.path.splitext(source_path)[0] + ARTIFACT_SUFFIX
+
+class Artifact:
+    """The decoded contents of a .l25c file."""
+    def __init__(self, version, source_hash, source_path, arena=None):
+        self.version = version
+        self.source_hash = source_hash
+        self.source_path = source_path
+        self.arena = arena
+
+    def program(self):
+        return self.arena.to_tree()
+
+def write_artifact(path, program, source, source_path=None):
+    """Serialises a parsed Program together with the hash of the source it came from."""
+    encoded_path = os.path.abspath(source_path).encode('utf-8') if source_path else b''
+    payload = marshal.dumps(ASTArena.from_tree(program).to_payload())
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, source_hash(source), len(encoded_path)))
+        f.write(encoded_path)
+        f.write(payload)
+
+def read_artifact(path):
+    """
+    Reads a .l25c file. An artifact written by another format version is
+    returned without an arena so the caller can fall back to its source.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < _HEADER.size:
+        raise ArtifactError("Not an L25 artifact (file too short).", path)
+    magic, version, digest, path_length = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ArtifactError("Not an L25 artifact (bad magic number).", path)
+    body = _HEADER.size + path_length
+    source_path = data[_HEADER.size:body].decode('utf-8') or None
+    artifact = Artifact(version, digest, source_path)
+    if version == FORMAT_VERSION:
+        try:
+            artifact.arena = ASTArena.from_payload(marshal.loads(data[body:]))
+        except (EOFError, ValueError, TypeError, KeyError) as e:
+            raise ArtifactError(f"Corrupted artifact: {e}", path)
+    return artifact
+
+def load_program(path):
+    """
+    Loads the Program stored in a .l25c file.
+
+    Returns (program, status). The status is 'fresh' when the recorded source
+    still has the same hash, 'unchecked' when the source is no longer available,
+    and 'stale' when the source changed (or the artifact uses another format
+    version): the source is then reparsed and the artifact rewritten.
+    """
+    artifact = read_artifact(path)
+    source = None
+    if artifact.source_path and os.path.exists(artifact.source_path):
+        with open(artifact.source_path, 'r') as f:
+            source = f.read()
+
+    if source is None:
+        if artifact.arena is None:
+            raise ArtifactError(f"Unsupported format version {artifact.version} and the source is not available.", path)
+        return artifact.program(), 'unchecked'
+
+    if artifact.arena is not None and artifact.source_hash == source_hash(source):
+        return artifact.program(), 'fresh'
+
+    program = parse_source(source)
+    write_artifact(path, program, source, artifact.source_path)
+    return program, 'stale'
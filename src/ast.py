@@ -1,9 +1,13 @@
 from src.lexer import Token
 
 class ASTNode:
-    pass
+    # Every node class declares __slots__ in constructor order, which keeps nodes
+    # free of a per-instance __dict__ and doubles as the list of node fields.
+    __slots__ = ()
 
 class Program(ASTNode):
+    __slots__ = ('name', 'struct_defs', 'func_defs', 'main_block')
+
     def __init__(self, name, struct_defs, func_defs, main_block):
         self.name = name
         self.struct_defs = struct_defs
@@ -11,6 +15,8 @@ class Program(ASTNode):
         self.main_block = main_block
 
 class FuncDef(ASTNode):
+    __slots__ = ('name', 'params', 'body')
+
     def __init__(self, name, params, body):
         self.name = name
         self.params = params
@@ -18,109 +24,151 @@ class FuncDef(ASTNode):
 
 # Group 3: Struct Definition
 class StructDef(ASTNode):
+    __slots__ = ('name', 'fields')
+
     def __init__(self, name, fields):
         self.name = name
         self.fields = fields
 
 class StmtList(ASTNode):
+    __slots__ = ('stmts',)
+
     def __init__(self, stmts):
         self.stmts = stmts
 
 class DeclareStmt(ASTNode):
+    __slots__ = ('ident', 'expr')
+
     def __init__(self, ident, expr=None):
         self.ident = ident
         self.expr = expr
 
 class AssignStmt(ASTNode):
+    __slots__ = ('left', 'expr')
+
     def __init__(self, left, expr):
         self.left = left # Can be Identifier, MemberAccess, or ArrayAccess
         self.expr = expr
 
 class IfStmt(ASTNode):
+    __slots__ = ('bool_expr', 'if_block', 'else_block')
+
     def __init__(self, bool_expr, if_block, else_block=None):
         self.bool_expr = bool_expr
         self.if_block = if_block
         self.else_block = else_block
 
 class WhileStmt(ASTNode):
+    __slots__ = ('bool_expr', 'body')
+
     def __init__(self, bool_expr, body):
         self.bool_expr = bool_expr
         self.body = body
 
 class InputStmt(ASTNode):
+    __slots__ = ('idents',)
+
     def __init__(self, idents):
         self.idents = idents
 
 class OutputStmt(ASTNode):
+    __slots__ = ('exprs',)
+
     def __init__(self, exprs):
         self.exprs = exprs
 
 class ReturnStmt(ASTNode):
+    __slots__ = ('expr',)
+
     def __init__(self, expr):
         self.expr = expr
 
 class FuncCall(ASTNode):
+    __slots__ = ('name', 'args')
+
     def __init__(self, name, args):
         self.name = name
         self.args = args
 
 class TryCatch(ASTNode):
+    __slots__ = ('try_block', 'catch_block')
+
     def __init__(self, try_block, catch_block):
         self.try_block = try_block
         self.catch_block = catch_block
 
 class BoolExpr(ASTNode):
+    __slots__ = ('left', 'op', 'right')
+
     def __init__(self, left, op, right):
         self.left = left
         self.op = op
         self.right = right
 
 class BinaryOp(ASTNode):
+    __slots__ = ('left', 'op', 'right')
+
     def __init__(self, left, op, right):
         self.left = left
         self.op = op
         self.right = right
 
 class UnaryOp(ASTNode):
+    __slots__ = ('op', 'expr')
+
     def __init__(self, op, expr):
         self.op = op
         self.expr = expr
 
 class Identifier(ASTNode):
+    __slots__ = ('token', 'value')
+
     def __init__(self, token: Token):
         self.token = token
         self.value = token.value
 
 class Number(ASTNode):
+    __slots__ = ('token', 'value')
+
     def __init__(self, token: Token):
         self.token = token
         self.value = token.value
 
 # Group 2: String Literal
 class String(ASTNode):
+    __slots__ = ('token', 'value')
+
     def __init__(self, token: Token):
         self.token = token
         self.value = token.value
 
 # Group 3: Array Literal
 class ArrayLiteral(ASTNode):
+    __slots__ = ('elements',)
+
     def __init__(self, elements):
         self.elements = elements
 
 # Group 3: Array Access (e.g., my_array[0])
 class ArrayAccess(ASTNode):
+    __slots__ = ('ident', 'index_expr')
+
     def __init__(self, ident, index_expr):
         self.ident = ident
         self.index_expr = index_expr
 
 # Group 3: Struct Initialization (e.g., Point(1, 2))
 class StructInit(ASTNode):
+    __slots__ = ('name', 'args')
+
     def __init__(self, name, args):
         self.name = name
         self.args = args
 
 # Group 3: Member Access (e.g., my_struct.field)
 class MemberAccess(ASTNode):
+    __slots__ = ('struct_expr', 'member_ident')
+
     def __init__(self, struct_expr, member_ident):
         self.struct_expr = struct_expr
         self.member_ident = member_ident
\ No newline at end of file
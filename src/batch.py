@@ -0,0 +1,148 @@
+import contextlib
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from src.error import CompilerError
+from src.engines import ENGINES, memo_options
+from src.lexer import LEXERS
+from src.parser import Parser
+from src.optimizer import Optimizer
+
+SOURCE_SUFFIX = '.l25'
+PHASES = ('read', 'lex', 'parse', 'execute')
+
+class BatchResult:
+    """
+    Outcome of compiling (and optionally running) one file in a batch.
+
+    `status` is 'ok', 'compiler_error' (a CompilerError was raised) or 'error'
+    (any other exception, e.g. an invalid character from the lexer).
+    `timings` maps each phase that ran to its duration in seconds.
+    """
+    def __init__(self, path, status='ok', error=None, output='', timings=None):
+        self.path = path
+        self.status = status
+        self.error = error
+        self.output = output
+        self.timings = timings if timings is not None else {}
+
+    @property
+    def ok(self):
+        return self.status == 'ok'
+
+def collect_files(paths):
+    """Expands directories into the .l25 files below them (sorted); files are kept as given."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            found = []
+            for directory, _, names in os.walk(path):
+                found.extend(os.path.join(directory, name) for name in names if name.endswith(SOURCE_SUFFIX))
+            files.extend(sorted(found))
+        else:
+            files.append(path)
+    return files
+
+def compile_file(path, execute=False, lexer='regex', engine='tree', optimize=True, memoize=True):
+    """
+    Reads, lexes and parses one file, and runs it (optimized unless `optimize`
+    is False, with pure functions memoized unless `memoize` is False) when
+    `execute` is set.
+
+    Program output is captured and `input()` sees an empty stdin, so files can
+    run side by side in worker processes. Never raises for a failing program:
+    the failure is recorded in the returned BatchResult.
+    """
+    result = BatchResult(path)
+    timings = result.timings
+    phase = 'read'
+    start = time.perf_counter()
+    captured_output = io.StringIO()
+    try:
+        with open(path, 'r') as f:
+            source = f.read()
+        timings['read'] = time.perf_counter() - start
+
+        phase, start = 'lex', time.perf_counter()
+        tokens = LEXERS[lexer](source).tokens()
+        timings['lex'] = time.perf_counter() - start
+
+        phase, start = 'parse', time.perf_counter()
+        tree = Parser(tokens).parse()
+        timings['parse'] = time.perf_counter() - start
+
+        if execute:
+            phase, start = 'execute', time.perf_counter()
+            if optimize:
+                tree = Optimizer(tree).optimize()
+            with contextlib.redirect_stdout(captured_output), _empty_stdin():
+                ENGINES[engine](tree=tree, **memo_options(engine, memoize)).interpret()
+            timings['execute'] = time.perf_counter() - start
+    except CompilerError as e:
+        timings[phase] = time.perf_counter() - start
+        result.status = 'compiler_error'
+        result.error = str(e)
+    except Exception as e:
+        timings[phase] = time.perf_counter() - start
+        result.status = 'error'
+        result.error = f"{type(e).__name__}: {e}"
+    result.output = captured_output.getvalue()
+    return result
+
+@contextlib.contextmanager
+def _empty_stdin():
+    stdin = sys.stdin
+    sys.stdin = io.StringIO()
+    try:
+        yield
+    finally:
+        sys.stdin = stdin
+
+def run_batch(paths, jobs=None, execute=False, lexer='regex', engine='tree', optimize=True, memoize=True):
+    """
+    Compiles every file in `paths` across `jobs` worker processes (all cores
+    by default; 1 runs in this process) and returns a BatchResult per file,
+    in input order. Files are handed out in chunks to keep IPC overhead low.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    work = partial(compile_file, execute=execute, lexer=lexer, engine=engine, optimize=optimize, memoize=memoize)
+    if jobs == 1 or len(paths) < 2:
+        return [work(path) for path in paths]
+    chunksize = max(1, len(paths) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(work, paths, chunksize=chunksize))
+
+def summarize(results, wall_time=None):
+    """Counts per status and per-phase times summed over all files."""
+    summary = {
+        'files': len(results),
+        'ok': sum(1 for result in results if result.status == 'ok'),
+        'compiler_errors': sum(1 for result in results if result.status == 'compiler_error'),
+        'errors': sum(1 for result in results if result.status == 'error'),
+        'phases': {phase: sum(result.timings.get(phase, 0.0) for result in results) for phase in PHASES},
+    }
+    if wall_time is not None:
+        summary['wall_time'] = wall_time
+    return summary
+
+def format_report(results, summary, show_output=False):
+    lines = []
+    for result in results:
+        timing = ", ".join(f"{phase} {result.timings[phase] * 1e3:.1f} ms" for phase in PHASES if phase in result.timings)
+        line = f"{result.status.upper():<15} {result.path} ({timing})"
+        if result.error:
+            line += f"\n    {result.error}"
+        lines.append(line)
+        if show_output and result.output:
+            lines.extend("    | " + output_line for output_line in result.output.splitlines())
+    lines.append(f"{summary['files']} files: {summary['ok']} ok, {summary['compiler_errors']} compiler errors, "
+                 f"{summary['errors']} other errors")
+    phases = ", ".join(f"{phase} {seconds * 1e3:.1f} ms" for phase, seconds in summary['phases'].items() if seconds)
+    lines.append(f"Phase totals: {phases}")
+    if summary.get('wall_time'):
+        lines.append(f"Wall time: {summary['wall_time']:.3f}s ({summary['files'] / summary['wall_time']:.0f} files/s)")
+    return "\n".join(lines)
@@ -0,0 +1,314 @@
+from array import array
+
+from src.ast import FuncCall, Identifier, MemberAccess, ArrayAccess
+from src.lexer import TokenType
+
+# Opcodes. Every instruction is two slots in CodeObject.code: the opcode and
+# its argument (0 when unused). The numbering roughly follows how often the VM
+# meets each instruction, as it dispatches with a chain of comparisons.
+LOAD_NAME = 0           # push the value of names[arg]
+LOAD_CONST = 1          # push constants[arg]
+STORE_NAME = 2          # pop into the existing variable names[arg]
+BINARY_ADD = 3
+BINARY_SUBTRACT = 4
+BINARY_MULTIPLY = 5
+BINARY_DIVIDE = 6
+COMPARE_OP = 7          # pop b, a; push a <COMPARE_OPERATORS[arg]> b
+POP_JUMP_IF_FALSE = 8   # pop; jump to arg if falsy
+JUMP = 9                # jump to arg
+CHECK_ARRAY = 10        # fail unless the top of the stack is an array
+BINARY_INDEX = 11       # pop index, array; push array[index]
+LOAD_MEMBER = 12        # pop struct; push its member names[arg]
+LOAD_FUNCTION = 13      # push the code of function constants[arg] = (name, argc)
+CALL_FUNCTION = 14      # pop arg arguments and a code object; push the result
+RETURN_VALUE = 15
+DECLARE_NAME = 16       # pop into a new variable names[arg] of the current frame
+STORE_INDEX = 17        # pop index, array, value; array[index] = value
+STORE_MEMBER = 18       # pop struct, value; set its member names[arg]
+LOAD_STRUCT = 19        # push the blueprint of struct constants[arg] = (name, argc)
+BUILD_STRUCT = 20       # pop the fields and a blueprint; push an instance of constants[arg]
+BUILD_ARRAY = 21        # pop arg values; push them as an array
+UNARY_NEGATIVE = 22
+OUTPUT = 23             # pop and print arg values
+INPUT = 24              # read a line into the existing variable names[arg]
+POP_TOP = 25
+SETUP_TRY = 26          # enter a try block whose catch block starts at arg
+POP_TRY = 27            # leave a try block normally
+POP_CATCH = 28          # leave a catch block
+RAISE_ERROR = 29        # raise an InterpreterError with message constants[arg]
+
+OPNAMES = (
+    'LOAD_NAME', 'LOAD_CONST', 'STORE_NAME', 'BINARY_ADD',
+    'BINARY_SUBTRACT', 'BINARY_MULTIPLY', 'BINARY_DIVIDE', 'COMPARE_OP',
+    'POP_JUMP_IF_FALSE', 'JUMP', 'CHECK_ARRAY', 'BINARY_INDEX',
+    'LOAD_MEMBER', 'LOAD_FUNCTION', 'CALL_FUNCTION', 'RETURN_VALUE',
+    'DECLARE_NAME', 'STORE_INDEX', 'STORE_MEMBER', 'LOAD_STRUCT',
+    'BUILD_STRUCT', 'BUILD_ARRAY', 'UNARY_NEGATIVE', 'OUTPUT',
+    'INPUT', 'POP_TOP', 'SETUP_TRY', 'POP_TRY',
+    'POP_CATCH', 'RAISE_ERROR',
+)
+
+JUMPS = frozenset((POP_JUMP_IF_FALSE, JUMP, SETUP_TRY))
+NAME_OPS = frozenset((LOAD_NAME, STORE_NAME, LOAD_MEMBER, DECLARE_NAME, STORE_MEMBER, INPUT))
+CONST_OPS = frozenset((LOAD_CONST, RAISE_ERROR))
+CALL_OPS = frozenset((LOAD_FUNCTION, LOAD_STRUCT, BUILD_STRUCT))  # argument: constants[arg] = (name, argc)
+HAS_ARG = JUMPS | NAME_OPS | CONST_OPS | CALL_OPS | {COMPARE_OP, CALL_FUNCTION, BUILD_ARRAY, OUTPUT}
+
+BINARY_OPS = {
+    TokenType.PLUS: BINARY_ADD,
+    TokenType.MINUS: BINARY_SUBTRACT,
+    TokenType.MULTIPLY: BINARY_MULTIPLY,
+    TokenType.DIVIDE: BINARY_DIVIDE,
+}
+COMPARE_OPERATORS = (TokenType.EQ, TokenType.NEQ, TokenType.LT, TokenType.LTE, TokenType.GT, TokenType.GTE)
+COMPARE_SYMBOLS = ('==', '!=', '<', '<=', '>', '>=')
+
+class CodeObject:
+    """
+    Compiled body of a function (or of the main block): a flat array of
+    (opcode, argument) pairs with its constant pool and name table.
+
+    `positions` maps the offset of each instruction that can fail to the token
+    (or, for CHECK_ARRAY, the node) its error message points at.
+    """
+    def __init__(self, name, params=()):
+        self.name = name
+        self.params = params
+        self.code = array('i')
+        self.constants = []
+        self.names = []
+        self.positions = {}
+        self._constant_index = {}
+        self._name_index = {}
+
+    def __repr__(self):
+        return f"<code {self.name} ({len(self.code) // 2} instructions)>"
+
+class CompiledProgram:
+    """The code of the main block and of every FuncDef of a Program."""
+    def __init__(self, main, functions):
+        self.main = main
+        self.functions = functions
+
+class BytecodeCompiler:
+    """
+    Compiles a Program into CodeObjects for the stack-based VirtualMachine.
+
+    Instructions keep the evaluation order of Interpreter, including where it
+    checks before evaluating the operands (a function's arity is checked before
+    its arguments run, an array before its index), so errors and output match.
+    """
+    def compile_program(self, program):
+        functions = {func_def: self.compile_function(func_def) for func_def in program.func_defs}
+        self.code = CodeObject('<main>')
+        self.compile(program.main_block)
+        return CompiledProgram(self.finish(), functions)
+
+    def compile_function(self, func_def):
+        self.code = CodeObject(func_def.name.value, tuple(param.value for param in func_def.params))
+        self.compile(func_def.body)
+        return self.finish()
+
+    def finish(self):
+        """Ends the current code object with a `return None` unless it already returns."""
+        if not self.code.code or self.code.code[-2] != RETURN_VALUE:
+            self.emit(LOAD_CONST, self.constant(None))
+            self.emit(RETURN_VALUE)
+        return self.code
+
+    # Code object helpers
+
+    def emit(self, opcode, arg=0, position=None):
+        """Appends an instruction and returns its offset."""
+        offset = len(self.code.code)
+        self.code.code.extend((opcode, arg))
+        if position is not None:
+            self.code.positions[offset] = position
+        return offset
+
+    def patch(self, offset, target=None):
+        """Points the jump at `offset` to `target` (default: the next instruction)."""
+        self.code.code[offset + 1] = len(self.code.code) if target is None else target
+
+    def constant(self, value):
+        key = (type(value), value)
+        index = self.code._constant_index.get(key)
+        if index is None:
+            index = self.code._constant_index[key] = len(self.code.constants)
+            self.code.constants.append(value)
+        return index
+
+    def name(self, name):
+        index = self.code._name_index.get(name)
+        if index is None:
+            index = self.code._name_index[name] = len(self.code.names)
+            self.code.names.append(name)
+        return index
+
+    def compile(self, node):
+        getattr(self, f'compile_{type(node).__name__}', self.generic_compile)(node)
+
+    def generic_compile(self, node):
+        self.emit(RAISE_ERROR, self.constant(f'No visit_{type(node).__name__} method'))
+
+    # Statements
+
+    def compile_StmtList(self, node):
+        for stmt in node.stmts:
+            self.compile(stmt)
+            if isinstance(stmt, FuncCall):
+                # A bare function call used as a statement drops its result.
+                self.emit(POP_TOP)
+
+    def compile_DeclareStmt(self, node):
+        if node.expr is None:
+            self.emit(LOAD_CONST, self.constant(None))
+        else:
+            self.compile(node.expr)
+        self.emit(DECLARE_NAME, self.name(node.ident.value))
+
+    def compile_AssignStmt(self, node):
+        self.compile(node.expr)
+        left = node.left
+        if isinstance(left, Identifier):
+            self.emit(STORE_NAME, self.name(left.value))
+        elif isinstance(left, MemberAccess):
+            self.compile(left.struct_expr)
+            self.emit(STORE_MEMBER, self.name(left.member_ident.value), left.member_ident.token)
+        elif isinstance(left, ArrayAccess):
+            self.compile(left.ident)
+            self.emit(CHECK_ARRAY, 0, left.ident)
+            self.compile(left.index_expr)
+            self.emit(STORE_INDEX)
+        else:
+            self.emit(RAISE_ERROR, self.constant("Invalid target for assignment."))
+
+    def compile_IfStmt(self, node):
+        self.compile(node.bool_expr)
+        to_else = self.emit(POP_JUMP_IF_FALSE)
+        self.compile(node.if_block)
+        if node.else_block is None:
+            self.patch(to_else)
+            return
+        to_end = self.emit(JUMP)
+        self.patch(to_else)
+        self.compile(node.else_block)
+        self.patch(to_end)
+
+    def compile_WhileStmt(self, node):
+        start = len(self.code.code)
+        self.compile(node.bool_expr)
+        to_end = self.emit(POP_JUMP_IF_FALSE)
+        self.compile(node.body)
+        self.emit(JUMP, start)
+        self.patch(to_end)
+
+    def compile_InputStmt(self, node):
+        for ident in node.idents:
+            self.emit(INPUT, self.name(ident.value), ident.token)
+
+    def compile_OutputStmt(self, node):
+        for expr in node.exprs:
+            self.compile(expr)
+        self.emit(OUTPUT, len(node.exprs))
+
+    def compile_ReturnStmt(self, node):
+        self.compile(node.expr)
+        self.emit(RETURN_VALUE)
+
+    def compile_TryCatch(self, node):
+        setup = self.emit(SETUP_TRY)
+        self.compile(node.try_block)
+        self.emit(POP_TRY)
+        to_end = self.emit(JUMP)
+        self.patch(setup)
+        self.compile(node.catch_block)
+        self.emit(POP_CATCH)
+        self.patch(to_end)
+
+    def compile_FuncCall(self, node):
+        self.emit(LOAD_FUNCTION, self.constant((node.name.value, len(node.args))), node.name.token)
+        for arg in node.args:
+            self.compile(arg)
+        self.emit(CALL_FUNCTION, len(node.args), node.name.token)
+
+    # Expressions
+
+    def compile_BoolExpr(self, node):
+        self.compile(node.left)
+        self.compile(node.right)
+        self.emit(COMPARE_OP, COMPARE_OPERATORS.index(node.op.type))
+
+    def compile_BinaryOp(self, node):
+        self.compile(node.left)
+        self.compile(node.right)
+        self.emit(BINARY_OPS[node.op.type], 0, node.op)
+
+    def compile_UnaryOp(self, node):
+        self.compile(node.expr)
+        if node.op.type == TokenType.MINUS:
+            self.emit(UNARY_NEGATIVE)
+
+    def compile_Identifier(self, node):
+        self.emit(LOAD_NAME, self.name(node.value), node.token)
+
+    def compile_Number(self, node):
+        self.emit(LOAD_CONST, self.constant(node.value))
+
+    compile_String = compile_Number
+
+    def compile_ArrayLiteral(self, node):
+        for element in node.elements:
+            self.compile(element)
+        self.emit(BUILD_ARRAY, len(node.elements))
+
+    def compile_ArrayAccess(self, node):
+        self.compile(node.ident)
+        self.emit(CHECK_ARRAY, 0, node.ident)
+        self.compile(node.index_expr)
+        self.emit(BINARY_INDEX)
+
+    def compile_StructInit(self, node):
+        call = self.constant((node.name.value, len(node.args)))
+        self.emit(LOAD_STRUCT, call, node.name.token)
+        for arg in node.args:
+            self.compile(arg)
+        self.emit(BUILD_STRUCT, call)
+
+    def compile_MemberAccess(self, node):
+        self.compile(node.struct_expr)
+        self.emit(LOAD_MEMBER, self.name(node.member_ident.value), node.member_ident.token)
+
+def compile_program(program):
+    return BytecodeCompiler().compile_program(program)
+
+def disassemble(code):
+    """Human-readable listing of a CodeObject, one instruction per line."""
+    params = ", ".join(code.params)
+    lines = [f"Disassembly of {code.name}({params}):" if code.name != '<main>' else "Disassembly of <main>:"]
+    targets = {code.code[offset + 1] for offset in range(0, len(code.code), 2) if code.code[offset] in JUMPS}
+    for offset in range(0, len(code.code), 2):
+        opcode, arg = code.code[offset], code.code[offset + 1]
+        name = OPNAMES[opcode]
+        if opcode in JUMPS:
+            detail = f"(to {arg})"
+        elif opcode in NAME_OPS:
+            detail = f"({code.names[arg]})"
+        elif opcode in CALL_OPS:
+            callee, argc = code.constants[arg]
+            detail = f"({callee}, {argc} args)"
+        elif opcode in CONST_OPS:
+            detail = f"({code.constants[arg]!r})"
+        elif opcode == COMPARE_OP:
+            detail = f"({COMPARE_SYMBOLS[arg]})"
+        else:
+            detail = ""
+        marker = ">>" if offset in targets else "  "
+        lines.append(f"{marker}{offset:6d} {name:<18} {arg if opcode in HAS_ARG else '':<4} {detail}".rstrip())
+    return "\n".join(lines)
+
+def disassemble_program(program):
+    """Listings of every function and of the main block of a CompiledProgram."""
+    parts = [disassemble(code) for code in program.functions.values()]
+    parts.append(disassemble(program.main))
+    return "\n\n".join(parts)
@@ -0,0 +1,68 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from src.parser import parse_source
+
+class ParseCache:
+    """
+    Bounded LRU cache from a hash of the source text to its parsed Program.
+
+    Cached trees are shared between callers, so they must be treated as
+    read-only (the Interpreter and ASTVisualizer never modify a tree). Sources
+    that fail to parse are not cached. A `maxsize` of 0 disables caching while
+    still counting misses.
+    """
+    def __init__(self, maxsize=128, parse=parse_source):
+        self.maxsize = maxsize
+        self.parse_fn = parse
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(source):
+        return hashlib.sha256(source.encode('utf-8', 'surrogatepass')).hexdigest()
+
+    def parse(self, source):
+        """Returns the Program for `source`, lexing and parsing only on a miss."""
+        key = self.key(source)
+        with self._lock:
+            tree = self._entries.get(key)
+            if tree is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return tree
+            self.misses += 1
+
+        tree = self.parse_fn(source)
+
+        with self._lock:
+            if self.maxsize > 0:
+                self._entries[key] = tree
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return tree
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, source):
+        return self.key(source) in self._entries
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+        }
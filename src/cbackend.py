@@ -0,0 +1,482 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from src.arena import SCHEMA, NODE, LIST, materialize
+from src.ast import DeclareStmt, TryCatch, Identifier, MemberAccess, ArrayAccess, String
+from src.error import BackendError
+from src.lexer import TokenType
+
+RUNTIME_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cruntime.h')
+
+DEFAULT_FLAGS = ('-O2', '-std=gnu11')
+
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+C_OPERATORS = {
+    TokenType.PLUS: 'l25_add',
+    TokenType.MINUS: 'l25_subtract',
+    TokenType.MULTIPLY: 'l25_multiply',
+    TokenType.DIVIDE: 'l25_divide',
+}
+
+C_COMPARISONS = {
+    TokenType.LT: 'L25_LT',
+    TokenType.LTE: 'L25_LTE',
+    TokenType.GT: 'L25_GT',
+    TokenType.GTE: 'L25_GTE',
+}
+
+NONE = 'L25_VALUE(L25_NONE)'
+
+def c_string(text):
+    """A C string literal for `text`, encoded as UTF-8."""
+    parts = []
+    for byte in text.encode('utf-8'):
+        char = chr(byte)
+        if char in '"\\?':
+            parts.append('\\' + char)
+        elif 32 <= byte < 127:
+            parts.append(char)
+        else:
+            parts.append(f'\\{byte:03o}')
+    return '"' + ''.join(parts) + '"'
+
+def c_variable(family, name):
+    """
+    C name of the L25 variable `name` in a `family` (g: main's variables,
+    v: function locals); the optimizer's temporaries (`.t0`) get their own.
+    """
+    if name.startswith('.'):
+        return f"{family}t_{name[1:]}"
+    return f"{family}_{name}"
+
+def walk(node):
+    """`node` and every node below it."""
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        yield node
+        for name, field_kind in SCHEMA[type(node)]:
+            if field_kind == NODE:
+                child = getattr(node, name)
+                if child is not None:
+                    pending.append(child)
+            elif field_kind == LIST:
+                pending.extend(getattr(node, name))
+
+class CGenerator:
+    """
+    Translates a Program into a self-contained C file that behaves like
+    Interpreter, for programs computing with integers, arrays and structs.
+
+    - Each L25 function becomes a C function (`f<index>_<name>`) taking and
+      returning l25_value, and its variables C locals. As with PythonTranspiler,
+      a local that is not certainly declared yet starts out MISSING and its
+      reads fall back to the globals.
+    - The main block is the C `main`; its variables are C globals (`g_<name>`),
+      which are also the L25 global scope functions fall back to.
+    - Expressions are flattened into temporaries so operands run left to right,
+      as in Interpreter, whatever order the C compiler picks.
+    - try/catch becomes setjmp/longjmp around the try-state flag.
+
+    Strings are only supported as literal arguments of output(), and function
+    and struct names only as callees. Anything else raises BackendError at
+    generation time, with the position of the offending node.
+    """
+    def __init__(self, program):
+        self.program = program
+        # Later definitions replace earlier ones in Interpreter's globals, and
+        # functions replace structs of the same name.
+        self.functions = {}
+        self.function_names = {}
+        for index, func_def in enumerate(program.func_defs):
+            self.functions[func_def.name.value] = func_def
+            self.function_names[func_def] = f"f{index}_{func_def.name.value}"
+        self.structs = {}
+        for index, struct_def in enumerate(program.struct_defs):
+            self.structs[struct_def.name.value] = (index, struct_def)
+        self.fields = {}
+        for struct_def in program.struct_defs:
+            for field in struct_def.fields:
+                self.field(field.value)
+        self.main_names = {node.ident.value for node in walk(program.main_block) if isinstance(node, DeclareStmt)}
+
+    def generate(self):
+        functions = []
+        for func_def in self.program.func_defs:
+            functions.extend(self.function(func_def))
+        main = self.main(self.program.main_block)
+
+        lines = [f"/* Generated from L25 program {self.program.name.value} */"]
+        struct_names = [c_string(struct_def.name.value) for struct_def in self.program.struct_defs]
+        lines.append(f"static const char *const l25_struct_names[] = {{{', '.join(struct_names + ['0'])}}};")
+        field_names = [c_string(name) for name in self.fields]
+        lines.append(f"static const char *const l25_field_names[] = {{{', '.join(field_names + ['0'])}}};")
+        with open(RUNTIME_PATH) as f:
+            lines.append(f.read())
+        for index, struct_def in enumerate(self.program.struct_defs):
+            if struct_def.fields:
+                ids = ", ".join(str(self.fields[field.value]) for field in struct_def.fields)
+                lines.append(f"static const int l25_fields_{index}[] = {{{ids}}};")
+        for name in sorted(self.main_names):
+            lines.append(f"static l25_value {c_variable('g', name)} = {{.tag = L25_UNDEF}};")
+        for func_def in self.program.func_defs:
+            lines.append(self.signature(func_def) + ";")
+        lines.extend(functions)
+        lines.extend(main)
+        return "\n".join(lines) + "\n"
+
+    def field(self, name):
+        return self.fields.setdefault(name, len(self.fields))
+
+    # Frames
+
+    def begin(self, locals_, definite, valueless):
+        # `locals_` is None in main, whose variables are the C globals.
+        self.locals = locals_
+        self.definite = set(definite)
+        self.valueless = valueless
+        self.temps = 0
+        self.lines = []
+        self.depth = 1
+
+    def temp(self):
+        self.temps += 1
+        return f"t{self.temps}"
+
+    def emit(self, line):
+        self.lines.append("    " * self.depth + line)
+
+    def signature(self, func_def):
+        params = ", ".join(f"l25_value p_{param.value}" for param in func_def.params) or "void"
+        return f"static l25_value {self.function_names[func_def]}({params})"
+
+    def function(self, func_def):
+        for param in func_def.params:
+            self.check_variable(param.value, param.token)
+        params = [param.value for param in func_def.params]
+        declared = set(params)
+        valueless = set()
+        has_try = False
+        for node in walk(func_def.body):
+            if isinstance(node, DeclareStmt):
+                declared.add(node.ident.value)
+                if node.expr is None:
+                    valueless.add(node.ident.value)
+            elif isinstance(node, TryCatch):
+                has_try = True
+        self.begin(declared, params, valueless)
+        # Locals changed in a try block must survive the longjmp to its catch block.
+        storage = "volatile l25_value" if has_try else "l25_value"
+        for name in params:
+            self.emit(f"{storage} {c_variable('v', name)} = p_{name};")
+        for name in sorted(declared - set(params)):
+            self.emit(f"{storage} {c_variable('v', name)} = L25_VALUE(L25_MISSING);")
+        self.emit("l25_enter();")
+        stmts = func_def.body.stmts
+        self.statements(stmts[:-1], top_level=True)
+        result = self.expr(stmts[-1].expr)
+        self.emit("l25_depth--;")
+        self.emit(f"return {result};")
+        return [self.signature(func_def), "{"] + self.lines + ["}"]
+
+    def main(self, main_block):
+        valueless = {node.ident.value for node in walk(main_block)
+                     if isinstance(node, DeclareStmt) and node.expr is None}
+        self.begin(None, (), valueless)
+        self.statements(main_block.stmts, top_level=True)
+        self.emit("return 0;")
+        return ["int main(void)", "{"] + self.lines + ["}"]
+
+    def check_variable(self, name, token):
+        if name in self.functions or name in self.structs:
+            raise BackendError(f"The C backend does not support using '{name}', a function or struct name, as a variable.", token)
+
+    # Statements
+
+    def statements(self, stmts, top_level=False):
+        for stmt in stmts:
+            getattr(self, f'stmt_{type(stmt).__name__}', self.generic_stmt)(stmt)
+            # Only a declaration at the top level of a body is certain to have
+            # run before the statements after it.
+            if top_level and isinstance(stmt, DeclareStmt) and stmt.expr is not None:
+                self.definite.add(stmt.ident.value)
+
+    def block(self, stmt_list):
+        self.depth += 1
+        self.statements(stmt_list.stmts)
+        self.depth -= 1
+
+    def generic_stmt(self, node):
+        raise BackendError(f"The C backend does not support {type(node).__name__} statements here.")
+
+    def stmt_DeclareStmt(self, node):
+        name = node.ident.value
+        self.check_variable(name, node.ident.token)
+        value = NONE if node.expr is None else self.expr(node.expr)
+        self.emit(f"{c_variable('g' if self.locals is None else 'v', name)} = {value};")
+
+    def store(self, name, value, message, position="0, 0"):
+        """Emits the assignment of `value` to an existing variable, failing with `message` (Scope.set)."""
+        failure = f"l25_error({position}, {c_string(message)});"
+        if name in self.definite:
+            self.emit(f"{c_variable('g' if self.locals is None else 'v', name)} = {value};")
+            return
+        branches = []
+        if self.locals is not None and name in self.locals:
+            branches.append((f"{c_variable('v', name)}.tag != L25_MISSING", f"{c_variable('v', name)} = {value};"))
+        if name in self.main_names:
+            branches.append((f"{c_variable('g', name)}.tag != L25_UNDEF", f"{c_variable('g', name)} = {value};"))
+        keyword = "if"
+        for condition, assignment in branches:
+            self.emit(f"{keyword} ({condition})")
+            self.emit(f"    {assignment}")
+            keyword = "else if"
+        if branches:
+            self.emit("else")
+            self.emit(f"    {failure}")
+        else:
+            self.emit(failure)
+
+    def stmt_AssignStmt(self, node):
+        left = node.left
+        if isinstance(left, Identifier):
+            self.check_variable(left.value, left.token)
+            self.store(left.value, self.expr(node.expr), f"Variable '{left.value}' not defined before assignment.")
+        elif isinstance(left, MemberAccess):
+            value = self.expr(node.expr)
+            instance = self.expr(left.struct_expr)
+            field = self.field(left.member_ident.value)
+            self.emit(f"l25_set_member({instance}, {field}, {value}, {self.position(left.member_ident.token)});")
+        elif isinstance(left, ArrayAccess):
+            value = self.expr(node.expr)
+            array_obj = self.array(left.ident)
+            index = self.expr(left.index_expr)
+            self.emit(f"*l25_element({array_obj}, {index}) = {value};")
+        else:
+            self.expr(node.expr)
+            self.emit('l25_error(0, 0, "Invalid target for assignment.");')
+
+    def stmt_IfStmt(self, node):
+        self.emit(f"if ({self.expr(node.bool_expr)}) {{")
+        self.block(node.if_block)
+        if node.else_block is not None:
+            self.emit("} else {")
+            self.block(node.else_block)
+        self.emit("}")
+
+    def stmt_WhileStmt(self, node):
+        self.emit("for (;;) {")
+        self.depth += 1
+        self.emit(f"if (!{self.expr(node.bool_expr)})")
+        self.emit("    break;")
+        self.statements(node.body.stmts)
+        self.depth -= 1
+        self.emit("}")
+
+    def stmt_InputStmt(self, node):
+        for ident in node.idents:
+            self.check_variable(ident.value, ident.token)
+            message = f"Failed to read input for '{ident.value}'"
+            value = self.temp()
+            position = self.position(ident.token)
+            self.emit(f"l25_value {value} = l25_input({position}, {c_string(message)});")
+            self.store(ident.value, value, message, position)
+
+    def stmt_OutputStmt(self, node):
+        text = self.temp()
+        self.emit(f"l25_text {text} = {{0}};")
+        for index, expr in enumerate(node.exprs):
+            if index:
+                self.emit(f'l25_append(&{text}, " ", 1);')
+            if isinstance(expr, String):
+                self.emit(f"l25_append(&{text}, {c_string(expr.value)}, {len(expr.value.encode('utf-8'))});")
+            else:
+                self.emit(f"l25_append_value(&{text}, {self.expr(expr)});")
+        self.emit(f"l25_print(&{text});")
+
+    def stmt_FuncCall(self, node):
+        # A bare function call used as a statement drops its result.
+        self.emit(f"(void){self.expr(node)};")
+
+    def stmt_TryCatch(self, node):
+        state, handler = self.temp(), self.temp()
+        self.emit("{")
+        self.depth += 1
+        self.emit(f"int {state} = l25_in_try;")
+        self.emit(f"l25_handler {handler};")
+        self.emit(f"{handler}.outer = l25_handlers;")
+        self.emit(f"{handler}.depth = l25_depth;")
+        self.emit(f"l25_handlers = &{handler};")
+        self.emit(f"if (!setjmp({handler}.jump)) {{")
+        self.emit("    l25_in_try = 1;")
+        self.block(node.try_block)
+        self.emit(f"    l25_handlers = {handler}.outer;")
+        self.emit("} else {")
+        # The catch block runs with the try state of its try block.
+        self.emit(f"    l25_depth = {handler}.depth;")
+        self.emit("    l25_in_try = 1;")
+        self.emit('    fputs("Error: Division by zero detected. Jumping to catch block.\\n", stdout);')
+        self.block(node.catch_block)
+        self.emit("}")
+        self.emit(f"l25_in_try = {state};")
+        self.depth -= 1
+        self.emit("}")
+
+    # Expressions
+
+    def position(self, token):
+        return f"{token.line}, {token.column}"
+
+    def expr(self, node):
+        """Emits the statements computing `node` and returns a C expression for its value."""
+        return getattr(self, f'expr_{type(node).__name__}', self.generic_expr)(node)
+
+    def generic_expr(self, node):
+        raise BackendError(f"The C backend does not support {type(node).__name__} expressions.", getattr(node, 'token', None))
+
+    def bind(self, value):
+        temp = self.temp()
+        self.emit(f"l25_value {temp} = {value};")
+        return temp
+
+    def expr_Identifier(self, node):
+        name = node.value
+        self.check_variable(name, node.token)
+        message = c_string(f"Variable or struct '{name}' not defined.")
+        position = self.position(node.token)
+        global_ = c_variable('g', name) if name in self.main_names else "L25_VALUE(L25_UNDEF)"
+        if self.locals is not None and name in self.locals:
+            if name in self.definite and name not in self.valueless:
+                # Callees cannot reassign a local, so it can be read in place.
+                return c_variable('v', name)
+            return self.bind(f"l25_read_local({c_variable('v', name)}, {global_}, {position}, {message})")
+        if name in self.definite and name not in self.valueless:
+            return self.bind(global_)
+        return self.bind(f"l25_read({global_}, {position}, {message})")
+
+    def expr_Number(self, node):
+        if not INT64_MIN <= node.value <= INT64_MAX:
+            raise BackendError("The C backend only supports 64-bit integers.", node.token)
+        return f"L25_INT({node.value}LL)"
+
+    def expr_String(self, node):
+        raise BackendError("The C backend only supports strings as literal arguments of output().", node.token)
+
+    def expr_BoolExpr(self, node):
+        left = self.expr(node.left)
+        right = self.expr(node.right)
+        op = node.op.type
+        if op == TokenType.EQ:
+            return f"l25_equal({left}, {right})"
+        if op == TokenType.NEQ:
+            return f"!l25_equal({left}, {right})"
+        return f"l25_order({left}, {right}, {C_COMPARISONS[op]})"
+
+    def expr_BinaryOp(self, node):
+        left = self.expr(node.left)
+        right = self.expr(node.right)
+        return self.bind(f"{C_OPERATORS[node.op.type]}({left}, {right}, {self.position(node.op)})")
+
+    def expr_UnaryOp(self, node):
+        value = self.expr(node.expr)
+        if node.op.type == TokenType.MINUS:
+            return self.bind(f"l25_negate({value}, {self.position(node.op)})")
+        return value
+
+    def expr_ArrayLiteral(self, node):
+        elements = [self.expr(element) for element in node.elements]
+        if not elements:
+            return self.bind("l25_new_array(0, 0)")
+        return self.bind(f"l25_new_array({len(elements)}, (l25_value[]){{{', '.join(elements)}}})")
+
+    def array(self, node):
+        """Emits `node` and the check that it is an array, reporting it at node.token like Interpreter."""
+        array_obj = self.expr(node)
+        token = getattr(node, 'token', None)
+        if token is not None:
+            self.emit(f"l25_check_array({array_obj}, {self.position(token)}, 0);")
+        else:
+            self.emit(f"l25_check_array({array_obj}, 0, 0, {c_string(type(node).__name__)});")
+        return array_obj
+
+    def expr_ArrayAccess(self, node):
+        array_obj = self.array(node.ident)
+        # The index is only evaluated once the array is known to be one.
+        index = self.expr(node.index_expr)
+        return self.bind(f"*l25_element({array_obj}, {index})")
+
+    def expr_MemberAccess(self, node):
+        instance = self.expr(node.struct_expr)
+        field = self.field(node.member_ident.value)
+        return self.bind(f"l25_member({instance}, {field}, {self.position(node.member_ident.token)})")
+
+    def fail(self, message, token):
+        self.emit(f"l25_error({self.position(token)}, {c_string(message)});")
+        return NONE
+
+    def expr_FuncCall(self, node):
+        name = node.name.value
+        func_def = self.functions.get(name)
+        if func_def is None:
+            return self.fail(f"'{name}' is not a function", node.name.token)
+        if len(node.args) != len(func_def.params):
+            return self.fail(f"Function '{name}' expects {len(func_def.params)} arguments but got {len(node.args)}", node.name.token)
+        args = [self.expr(arg) for arg in node.args]
+        return self.bind(f"{self.function_names[func_def]}({', '.join(args)})")
+
+    def expr_StructInit(self, node):
+        name = node.name.value
+        if name in self.functions or name not in self.structs:
+            return self.fail(f"'{name}' is not a defined struct type.", node.name.token)
+        index, struct_def = self.structs[name]
+        if len(node.args) != len(struct_def.fields):
+            return self.fail(f"Struct '{name}' expects {len(struct_def.fields)} fields but got {len(node.args)}", node.name.token)
+        if not node.args:
+            return self.bind(f"l25_new_struct({index}, 0, 0, 0)")
+        args = [self.expr(arg) for arg in node.args]
+        return self.bind(f"l25_new_struct({index}, {len(args)}, l25_fields_{index}, (l25_value[]){{{', '.join(args)}}})")
+
+def generate_c(program):
+    """Returns the C source of `program` (a Program tree or arena view); raises BackendError if unsupported."""
+    return CGenerator(materialize(program)).generate()
+
+def find_compiler(compiler=None):
+    """The C compiler to use: `compiler`, else $CC, else `cc`; None if it is not installed."""
+    return shutil.which(compiler or os.environ.get('CC') or 'cc')
+
+def build_executable(program, output_path, compiler=None, flags=DEFAULT_FLAGS):
+    """
+    Compiles `program` to a native executable at `output_path` with the system
+    C compiler and returns the path. Raises BackendError if the program uses
+    a feature the backend does not support or if the C compiler fails.
+    """
+    source = generate_c(program)
+    executable = find_compiler(compiler)
+    if executable is None:
+        raise BackendError(f"C compiler '{compiler or os.environ.get('CC') or 'cc'}' not found")
+    with tempfile.TemporaryDirectory(prefix='l25c-') as work_dir:
+        source_path = os.path.join(work_dir, 'program.c')
+        with open(source_path, 'w', encoding='utf-8') as f:
+            f.write(source)
+        result = subprocess.run([executable, *flags, '-o', output_path, source_path],
+                                capture_output=True, text=True)
+    if result.returncode != 0:
+        raise BackendError(f"C compiler failed:\n{result.stderr.strip()}")
+    return output_path
+
+def run_native(program, executable_path=None, compiler=None, flags=DEFAULT_FLAGS):
+    """
+    Builds `program` and runs the executable with this process's standard
+    streams, returning its exit status. The executable is kept at
+    `executable_path` if given, else built in a temporary directory.
+    """
+    with tempfile.TemporaryDirectory(prefix='l25c-') as work_dir:
+        path = os.path.abspath(executable_path or os.path.join(work_dir, 'program'))
+        build_executable(program, path, compiler, flags)
+        sys.stdout.flush()
+        return subprocess.run([path]).returncode
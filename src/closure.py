@@ -0,0 +1,553 @@
+from src.arena import SCHEMA, NODE, LIST, materialize
+from src.ast import (
+    FuncDef, StructDef, DeclareStmt, AssignStmt, InputStmt, ReturnStmt, MemberAccess,
+    ArrayAccess, Identifier, Number
+)
+from src.lexer import TokenType
+from src.error import InterpreterError
+from src.interpreter import ReturnValue, StructDefinition, StructInstance
+from src.arrays import ARRAY_TYPES, make_generic, new_array
+from src.structs import field_slot
+
+_MISSING = object()
+
+def binary_value(op, left, right, token, state):
+    """BinaryOp semantics of the tree-walking Interpreter for any operand types."""
+    if isinstance(left, str) or isinstance(right, str):
+        if op == TokenType.PLUS:
+            return str(left) + str(right)
+        if op == TokenType.MULTIPLY:
+            if isinstance(left, str) and isinstance(right, int):
+                return left * right
+            if isinstance(left, int) and isinstance(right, str):
+                return right * left
+            raise InterpreterError("String multiplication must be between a string and an integer", token)
+
+    if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+        if op == TokenType.PLUS: return left + right
+        if op == TokenType.MINUS: return left - right
+        if op == TokenType.MULTIPLY: return left * right
+        if op == TokenType.DIVIDE:
+            if right == 0:
+                if state.is_in_try_block:
+                    raise InterpreterError("Division by zero", token)
+                raise InterpreterError("Fatal: Division by zero outside a try block", token)
+            return left // right
+
+    raise InterpreterError(f"Unsupported operand types for {op}: {type(left).__name__} and {type(right).__name__}", token)
+
+def assigned_names(program):
+    """Every name a program can (re)bind: declarations, parameters, input targets and assignments."""
+    names = set()
+    pending = [program]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, DeclareStmt):
+            names.add(node.ident.value)
+        elif isinstance(node, FuncDef):
+            names.update(param.value for param in node.params)
+        elif isinstance(node, InputStmt):
+            names.update(ident.value for ident in node.idents)
+        elif isinstance(node, AssignStmt) and isinstance(node.left, Identifier):
+            names.add(node.left.value)
+        for name, field_kind in SCHEMA[type(node)]:
+            if field_kind == NODE:
+                child = getattr(node, name)
+                if child is not None:
+                    pending.append(child)
+            elif field_kind == LIST:
+                pending.extend(getattr(node, name))
+    return names
+
+class CompiledFunction:
+    """Parameter names and compiled body of a FuncDef; the body is filled in after all call sites exist."""
+    __slots__ = ('params', 'body')
+
+    def __init__(self, params):
+        self.params = params
+        self.body = None
+
+class ClosureCompiler:
+    """
+    Turns a Program into nested Python closures, each taking the current frame:
+    the global variable dict in main, a dict of locals inside a function (whose
+    parent scope is the global dict, as with Interpreter's Scope chain).
+
+    Node kinds, operators, constant operands and, when no statement can rebind
+    them, the functions called are all resolved here, once, instead of on every
+    evaluation.
+    """
+    def __init__(self, state, program):
+        self.state = state
+        self.globals = state.globals
+        self.in_function = False
+        self.functions = {func_def: CompiledFunction(tuple(param.value for param in func_def.params))
+                          for func_def in program.func_defs}
+        rebound = assigned_names(program)
+        # Final global bindings of names nothing can rebind: functions override
+        # structs of the same name, as they are declared after them.
+        self.fixed = {}
+        for struct_def in program.struct_defs:
+            self.fixed[struct_def.name.value] = struct_def
+        for func_def in program.func_defs:
+            self.fixed[func_def.name.value] = func_def
+        for name in rebound:
+            self.fixed.pop(name, None)
+
+    def compile_program(self, program):
+        """Compiles every function body and returns the compiled main block."""
+        for func_def in program.func_defs:
+            self.functions[func_def].body = self.compile_function(func_def)
+        return self.compile(program.main_block)
+
+    def compile(self, node):
+        return getattr(self, f'compile_{type(node).__name__}', self.generic_compile)(node)
+
+    def compile_function(self, func_def):
+        self.in_function = True
+        try:
+            stmts = list(func_def.body.stmts)
+            result = None
+            if stmts and isinstance(stmts[-1], ReturnStmt):
+                result = self.compile(stmts.pop().expr)
+            body = self.compile_statements(stmts)
+        finally:
+            self.in_function = False
+
+        if result is None:
+            def run(frame):
+                body(frame)
+                return None
+        else:
+            def run(frame):
+                body(frame)
+                return result(frame)
+        return run
+
+    def compile_statements(self, stmts):
+        compiled = tuple(self.compile(stmt) for stmt in stmts)
+        if len(compiled) == 1:
+            return compiled[0]
+        def run(frame):
+            for stmt in compiled:
+                stmt(frame)
+        return run
+
+    # Name resolution
+
+    def lookup(self, name):
+        """A closure returning the value `name` resolves to (None if undefined)."""
+        if not self.in_function:
+            return lambda frame: frame.get(name)
+        globals_ = self.globals
+        def get(frame):
+            value = frame.get(name, _MISSING)
+            if value is _MISSING:
+                return globals_.get(name)
+            return value
+        return get
+
+    def assigner(self, name):
+        """A closure (frame, value) setting an existing variable like Scope.set."""
+        globals_ = self.globals
+        in_function = self.in_function
+        def assign(frame, value):
+            if name in frame:
+                frame[name] = value
+            elif in_function and name in globals_:
+                globals_[name] = value
+            else:
+                raise InterpreterError(f"Variable '{name}' not defined before assignment.")
+        return assign
+
+    # Statements
+
+    def compile_StmtList(self, node):
+        return self.compile_statements(node.stmts)
+
+    def compile_DeclareStmt(self, node):
+        name = node.ident.value
+        if node.expr is None:
+            def declare(frame):
+                frame[name] = None
+            return declare
+        expr = self.compile(node.expr)
+        def declare(frame):
+            frame[name] = expr(frame)
+        return declare
+
+    def compile_AssignStmt(self, node):
+        expr = self.compile(node.expr)
+        left = node.left
+        if isinstance(left, Identifier):
+            name = left.value
+            if not self.in_function:
+                def assign(frame):
+                    value = expr(frame)
+                    if name not in frame:
+                        raise InterpreterError(f"Variable '{name}' not defined before assignment.")
+                    frame[name] = value
+                return assign
+            assign_value = self.assigner(name)
+            def assign(frame):
+                assign_value(frame, expr(frame))
+            return assign
+
+        if isinstance(left, MemberAccess):
+            struct_expr = self.compile(left.struct_expr)
+            member_name = left.member_ident.value
+            slot = field_slot(member_name)
+            member_token = left.member_ident.token
+            def assign(frame):
+                value = expr(frame)
+                instance = struct_expr(frame)
+                if not isinstance(instance, StructInstance):
+                    raise InterpreterError("Cannot access member of a non-struct type.", member_token)
+                try:
+                    setattr(instance, slot, value)
+                except AttributeError:
+                    instance.set(member_name, value)
+            return assign
+
+        if isinstance(left, ArrayAccess):
+            array_expr = self.compile(left.ident)
+            index_expr = self.compile(left.index_expr)
+            array_node = left.ident
+            def assign(frame):
+                value = expr(frame)
+                array_obj = array_expr(frame)
+                if not isinstance(array_obj, ARRAY_TYPES):
+                    raise InterpreterError("Cannot index a non-array type.", array_node.token)
+                index = index_expr(frame)
+                if not isinstance(index, int):
+                    raise InterpreterError("Array index must be an integer.")
+                if not 0 <= index < len(array_obj):
+                    raise InterpreterError(f"Array index {index} out of bounds for array of size {len(array_obj)}.")
+                try:
+                    array_obj[index] = value
+                except (TypeError, OverflowError):
+                    make_generic(array_obj)[index] = value
+            return assign
+
+        def assign(frame):
+            expr(frame)
+            raise InterpreterError("Invalid target for assignment.")
+        return assign
+
+    def compile_IfStmt(self, node):
+        condition = self.compile(node.bool_expr)
+        if_block = self.compile(node.if_block)
+        if node.else_block is None:
+            def run_if(frame):
+                if condition(frame):
+                    if_block(frame)
+            return run_if
+        else_block = self.compile(node.else_block)
+        def run_if(frame):
+            if condition(frame):
+                if_block(frame)
+            else:
+                else_block(frame)
+        return run_if
+
+    def compile_WhileStmt(self, node):
+        condition = self.compile(node.bool_expr)
+        body = self.compile(node.body)
+        def run_while(frame):
+            while condition(frame):
+                body(frame)
+        return run_while
+
+    def compile_InputStmt(self, node):
+        targets = [(ident.value, ident.token, self.assigner(ident.value)) for ident in node.idents]
+        def read_input(frame):
+            for name, token, assign in targets:
+                try:
+                    val = input()
+                    # Attempt to convert to int, otherwise treat as string
+                    try:
+                        num_val = int(val)
+                        assign(frame, num_val)
+                    except ValueError:
+                        assign(frame, val)
+                except Exception:
+                    raise InterpreterError(f"Failed to read input for '{name}'", token)
+        return read_input
+
+    def compile_OutputStmt(self, node):
+        exprs = tuple(self.compile(expr) for expr in node.exprs)
+        def output(frame):
+            print(' '.join([str(expr(frame)) for expr in exprs]))
+        return output
+
+    def compile_ReturnStmt(self, node):
+        # Only reached for a return that is not the last statement of a body.
+        expr = self.compile(node.expr)
+        def run_return(frame):
+            raise ReturnValue(expr(frame))
+        return run_return
+
+    def compile_TryCatch(self, node):
+        state = self.state
+        try_block = self.compile(node.try_block)
+        catch_block = self.compile(node.catch_block)
+        def run_try(frame):
+            old_try_state = state.is_in_try_block
+            try:
+                state.is_in_try_block = True
+                try_block(frame)
+            except InterpreterError as e:
+                if "Division by zero" in str(e):
+                    print("Error: Division by zero detected. Jumping to catch block.")
+                    catch_block(frame)
+                else:
+                    raise e
+            finally:
+                state.is_in_try_block = old_try_state
+        return run_try
+
+    def compile_FuncCall(self, node):
+        # A bare function call used as a statement is compiled like an expression.
+        name = node.name.value
+        token = node.name.token
+        args = tuple(self.compile(arg) for arg in node.args)
+        functions = self.functions
+        func = self.fixed.get(name)
+        if isinstance(func, FuncDef) and len(args) == len(func.params):
+            code = functions[func]
+            param_names = code.params
+            def call(frame):
+                local = {}
+                for param, arg in zip(param_names, args):
+                    local[param] = arg(frame)
+                try:
+                    return code.body(local)
+                except ReturnValue as ret:
+                    return ret.value
+            return call
+
+        lookup = self.lookup(name)
+        def call(frame):
+            func = lookup(frame)
+            if not isinstance(func, FuncDef):
+                raise InterpreterError(f"'{name}' is not a function", token)
+            if len(args) != len(func.params):
+                raise InterpreterError(f"Function '{name}' expects {len(func.params)} arguments but got {len(args)}", token)
+            code = functions[func]
+            local = {}
+            for param, arg in zip(code.params, args):
+                local[param] = arg(frame)
+            try:
+                return code.body(local)
+            except ReturnValue as ret:
+                return ret.value
+        return call
+
+    # Expressions
+
+    def compile_BoolExpr(self, node):
+        left = self.compile(node.left)
+        right = self.compile(node.right)
+        op = node.op.type
+        if op == TokenType.EQ: return lambda frame: left(frame) == right(frame)
+        if op == TokenType.NEQ: return lambda frame: left(frame) != right(frame)
+        if op == TokenType.LT: return lambda frame: left(frame) < right(frame)
+        if op == TokenType.LTE: return lambda frame: left(frame) <= right(frame)
+        if op == TokenType.GT: return lambda frame: left(frame) > right(frame)
+        if op == TokenType.GTE: return lambda frame: left(frame) >= right(frame)
+        def evaluate(frame):
+            left(frame)
+            right(frame)
+            return None
+        return evaluate
+
+    def compile_BinaryOp(self, node):
+        left = self.compile(node.left)
+        token = node.op
+        op = token.type
+        state = self.state
+        # Integer operands take the fast path; anything else goes through the
+        # general rules (strings, division by zero, type errors).
+        if isinstance(node.right, Number) and type(node.right.value) is int:
+            constant = node.right.value
+            if op == TokenType.PLUS:
+                def evaluate(frame):
+                    value = left(frame)
+                    if type(value) is int:
+                        return value + constant
+                    return binary_value(op, value, constant, token, state)
+                return evaluate
+            if op == TokenType.MINUS:
+                def evaluate(frame):
+                    value = left(frame)
+                    if type(value) is int:
+                        return value - constant
+                    return binary_value(op, value, constant, token, state)
+                return evaluate
+            if op == TokenType.MULTIPLY:
+                def evaluate(frame):
+                    value = left(frame)
+                    if type(value) is int:
+                        return value * constant
+                    return binary_value(op, value, constant, token, state)
+                return evaluate
+            if op == TokenType.DIVIDE and constant != 0:
+                def evaluate(frame):
+                    value = left(frame)
+                    if type(value) is int:
+                        return value // constant
+                    return binary_value(op, value, constant, token, state)
+                return evaluate
+
+        right = self.compile(node.right)
+        if op == TokenType.PLUS:
+            def evaluate(frame):
+                a = left(frame)
+                b = right(frame)
+                if type(a) is int and type(b) is int:
+                    return a + b
+                return binary_value(op, a, b, token, state)
+        elif op == TokenType.MINUS:
+            def evaluate(frame):
+                a = left(frame)
+                b = right(frame)
+                if type(a) is int and type(b) is int:
+                    return a - b
+                return binary_value(op, a, b, token, state)
+        elif op == TokenType.MULTIPLY:
+            def evaluate(frame):
+                a = left(frame)
+                b = right(frame)
+                if type(a) is int and type(b) is int:
+                    return a * b
+                return binary_value(op, a, b, token, state)
+        elif op == TokenType.DIVIDE:
+            def evaluate(frame):
+                a = left(frame)
+                b = right(frame)
+                if type(a) is int and type(b) is int and b:
+                    return a // b
+                return binary_value(op, a, b, token, state)
+        else:
+            def evaluate(frame):
+                return binary_value(op, left(frame), right(frame), token, state)
+        return evaluate
+
+    def compile_UnaryOp(self, node):
+        expr = self.compile(node.expr)
+        if node.op.type == TokenType.MINUS:
+            return lambda frame: -expr(frame)
+        return expr
+
+    def compile_Identifier(self, node):
+        name = node.value
+        token = node.token
+        if not self.in_function:
+            def read(frame):
+                value = frame.get(name)
+                if value is None:
+                    raise InterpreterError(f"Variable or struct '{name}' not defined.", token)
+                return value
+            return read
+        globals_ = self.globals
+        def read(frame):
+            value = frame.get(name, _MISSING)
+            if value is _MISSING:
+                value = globals_.get(name)
+            if value is None:
+                raise InterpreterError(f"Variable or struct '{name}' not defined.", token)
+            return value
+        return read
+
+    def compile_Number(self, node):
+        value = node.value
+        return lambda frame: value
+
+    compile_String = compile_Number
+
+    def compile_ArrayLiteral(self, node):
+        elements = tuple(self.compile(element) for element in node.elements)
+        return lambda frame: new_array([element(frame) for element in elements])
+
+    def compile_ArrayAccess(self, node):
+        array_expr = self.compile(node.ident)
+        index_expr = self.compile(node.index_expr)
+        array_node = node.ident
+        def access(frame):
+            array_obj = array_expr(frame)
+            if not isinstance(array_obj, ARRAY_TYPES):
+                raise InterpreterError("Cannot index a non-array type.", array_node.token)
+            index = index_expr(frame)
+            if type(index) is int and 0 <= index < len(array_obj):
+                return array_obj[index]
+            if not isinstance(index, int):
+                raise InterpreterError("Array index must be an integer.")
+            if not 0 <= index < len(array_obj):
+                raise InterpreterError(f"Array index {index} out of bounds for array of size {len(array_obj)}.")
+            return array_obj[index]
+        return access
+
+    def compile_StructInit(self, node):
+        struct_name = node.name.value
+        token = node.name.token
+        args = tuple(self.compile(arg) for arg in node.args)
+        if isinstance(self.fixed.get(struct_name), StructDef):
+            fixed_blueprint = self.globals[struct_name]
+            if len(args) == len(fixed_blueprint.fields):
+                instance_class = fixed_blueprint.instance_class(struct_name)
+                return lambda frame: instance_class([arg(frame) for arg in args])
+            lookup = lambda frame: fixed_blueprint
+        else:
+            lookup = self.lookup(struct_name)
+        def construct(frame):
+            blueprint = lookup(frame)
+            if not isinstance(blueprint, StructDefinition):
+                raise InterpreterError(f"'{struct_name}' is not a defined struct type.", token)
+            if len(args) != len(blueprint.fields):
+                raise InterpreterError(f"Struct '{struct_name}' expects {len(blueprint.fields)} fields but got {len(args)}", token)
+            return blueprint.new(struct_name, [arg(frame) for arg in args])
+        return construct
+
+    def compile_MemberAccess(self, node):
+        struct_expr = self.compile(node.struct_expr)
+        member_name = node.member_ident.value
+        slot = field_slot(member_name)
+        token = node.member_ident.token
+        def access(frame):
+            instance = struct_expr(frame)
+            if not isinstance(instance, StructInstance):
+                raise InterpreterError("Cannot access member of a non-struct type.", token)
+            value = getattr(instance, slot, _MISSING)
+            if value is _MISSING:
+                value = instance.get(member_name, _MISSING)
+            if value is _MISSING:
+                raise InterpreterError(f"Struct '{instance.type_name}' has no member '{member_name}'", token)
+            return value
+        return access
+
+    def generic_compile(self, node):
+        def fail(frame):
+            raise InterpreterError(f'No visit_{type(node).__name__} method')
+        return fail
+
+class ClosureInterpreter:
+    """
+    Execution engine with the same behaviour and error messages as Interpreter
+    that compiles the Program into closures once (see ClosureCompiler) instead
+    of dispatching on the node class at every evaluation.
+    """
+    def __init__(self, parser=None, tree=None):
+        # Compilation keys on node identity and class, which arena views lack.
+        self.tree = materialize(tree if tree is not None else parser.parse())
+        self.globals = {}
+        self.is_in_try_block = False
+
+    def interpret(self):
+        program = self.tree
+        for struct_def in program.struct_defs:
+            self.globals[struct_def.name.value] = StructDefinition(struct_def.name.value, struct_def.fields)
+        for func_def in program.func_defs:
+            self.globals[func_def.name.value] = func_def
+
+        main = ClosureCompiler(self, program).compile_program(program)
+        main(self.globals)
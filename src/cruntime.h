@@ -0,0 +1,482 @@
+/*
+ * Runtime of the C code generated by src/cbackend.py, pasted into every
+ * generated file after the l25_struct_names / l25_field_names tables.
+ *
+ * Every L25 value is an l25_value: a tag plus a 64-bit integer or a pointer to
+ * an array or struct. Arrays and structs are never freed; a program lives as
+ * long as one run. Errors are reported the way src/main.py reports the
+ * Interpreter's (same text, same positions, exit status 1), and what the C
+ * representation cannot express (integers beyond 64 bits, string input) stops
+ * the program with a BackendError instead of giving a different answer.
+ */
+#include <limits.h>
+#include <setjmp.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+#ifndef L25_MAX_DEPTH
+#define L25_MAX_DEPTH 10000
+#endif
+
+/* MISSING: a function local whose `let` has not run yet (reads fall back to the
+   globals). UNDEF: a global no `let` has created yet. NONE: `let x;`. */
+enum { L25_MISSING, L25_UNDEF, L25_NONE, L25_INT, L25_ARRAY, L25_STRUCT };
+
+typedef struct l25_array l25_array;
+typedef struct l25_struct l25_struct;
+
+typedef struct {
+    int tag;
+    union {
+        long long i;
+        l25_array *a;
+        l25_struct *s;
+    };
+} l25_value;
+
+struct l25_array {
+    long long len;
+    l25_value items[];
+};
+
+struct l25_struct {
+    int type;      /* index into l25_struct_names */
+    int len, cap;
+    int *fields;   /* indexes into l25_field_names, in insertion order */
+    l25_value *values;
+};
+
+#define L25_INT(n) ((l25_value){.tag = L25_INT, .i = (n)})
+#define L25_VALUE(t) ((l25_value){.tag = (t)})
+
+/* try/catch: the innermost handler is the target of a division by zero. */
+typedef struct l25_handler {
+    jmp_buf jump;
+    struct l25_handler *outer;
+    int depth;
+} l25_handler;
+
+static l25_handler *l25_handlers;
+static int l25_in_try;
+static int l25_depth;
+
+/* Errors */
+
+static _Noreturn void l25_report(const char *text)
+{
+    fflush(stdout);
+    fputs(text, stderr);
+    fputc('\n', stderr);
+    exit(1);
+}
+
+static _Noreturn void l25_error(int line, int column, const char *message)
+{
+    char text[512];
+    if (line)
+        snprintf(text, sizeof text, "[Line %d:%d] InterpreterError: %s", line, column, message);
+    else
+        snprintf(text, sizeof text, "InterpreterError: %s", message);
+    l25_report(text);
+}
+
+/* A Python exception other than InterpreterError, as src/main.py prints it. */
+static _Noreturn void l25_unexpected(const char *message)
+{
+    char text[512];
+    snprintf(text, sizeof text, "An unexpected error occurred: %s", message);
+    l25_report(text);
+}
+
+static _Noreturn void l25_unsupported(int line, int column, const char *message)
+{
+    char text[512];
+    if (line)
+        snprintf(text, sizeof text, "[Line %d:%d] BackendError: %s", line, column, message);
+    else
+        snprintf(text, sizeof text, "BackendError: %s", message);
+    l25_report(text);
+}
+
+static _Noreturn void l25_overflow(int line, int column)
+{
+    l25_unsupported(line, column, "Integer overflow: the C backend only supports 64-bit integers.");
+}
+
+static const char *l25_type_name(l25_value value)
+{
+    switch (value.tag) {
+    case L25_INT: return "int";
+    case L25_ARRAY: return "list";
+    case L25_STRUCT: return "StructInstance";
+    default: return "NoneType";
+    }
+}
+
+static _Noreturn void l25_operand_error(const char *op, l25_value left, l25_value right, int line, int column)
+{
+    char message[256];
+    snprintf(message, sizeof message, "Unsupported operand types for %s: %s and %s",
+             op, l25_type_name(left), l25_type_name(right));
+    l25_error(line, column, message);
+}
+
+static _Noreturn void l25_division_by_zero(int line, int column)
+{
+    const char *message = l25_in_try ? "Division by zero" : "Fatal: Division by zero outside a try block";
+    l25_handler *handler = l25_handlers;
+    if (handler) {
+        l25_handlers = handler->outer;
+        longjmp(handler->jump, 1);
+    }
+    l25_error(line, column, message);
+}
+
+static void l25_enter(void)
+{
+    if (++l25_depth > L25_MAX_DEPTH)
+        l25_unexpected("maximum recursion depth exceeded");
+}
+
+/* Variables */
+
+static l25_value l25_read(l25_value value, int line, int column, const char *message)
+{
+    if (value.tag < L25_INT)
+        l25_error(line, column, message);
+    return value;
+}
+
+/* A function local that may not be declared yet; `global` is the fallback (Scope.get). */
+static l25_value l25_read_local(l25_value value, l25_value global, int line, int column, const char *message)
+{
+    return l25_read(value.tag == L25_MISSING ? global : value, line, column, message);
+}
+
+/* Arithmetic */
+
+static l25_value l25_add(l25_value left, l25_value right, int line, int column)
+{
+    long long result;
+    if (left.tag != L25_INT || right.tag != L25_INT)
+        l25_operand_error("TokenType.PLUS", left, right, line, column);
+    if (__builtin_add_overflow(left.i, right.i, &result))
+        l25_overflow(line, column);
+    return L25_INT(result);
+}
+
+static l25_value l25_subtract(l25_value left, l25_value right, int line, int column)
+{
+    long long result;
+    if (left.tag != L25_INT || right.tag != L25_INT)
+        l25_operand_error("TokenType.MINUS", left, right, line, column);
+    if (__builtin_sub_overflow(left.i, right.i, &result))
+        l25_overflow(line, column);
+    return L25_INT(result);
+}
+
+static l25_value l25_multiply(l25_value left, l25_value right, int line, int column)
+{
+    long long result;
+    if (left.tag != L25_INT || right.tag != L25_INT)
+        l25_operand_error("TokenType.MULTIPLY", left, right, line, column);
+    if (__builtin_mul_overflow(left.i, right.i, &result))
+        l25_overflow(line, column);
+    return L25_INT(result);
+}
+
+/* Floor division, like Python's //. */
+static l25_value l25_divide(l25_value left, l25_value right, int line, int column)
+{
+    long long quotient;
+    if (left.tag != L25_INT || right.tag != L25_INT)
+        l25_operand_error("TokenType.DIVIDE", left, right, line, column);
+    if (right.i == 0)
+        l25_division_by_zero(line, column);
+    if (left.i == LLONG_MIN && right.i == -1)
+        l25_overflow(line, column);
+    quotient = left.i / right.i;
+    if (left.i % right.i != 0 && (left.i < 0) != (right.i < 0))
+        quotient--;
+    return L25_INT(quotient);
+}
+
+static l25_value l25_negate(l25_value value, int line, int column)
+{
+    char message[128];
+    if (value.tag == L25_INT) {
+        if (value.i == LLONG_MIN)
+            l25_overflow(line, column);
+        return L25_INT(-value.i);
+    }
+    snprintf(message, sizeof message, "bad operand type for unary -: '%s'", l25_type_name(value));
+    l25_unexpected(message);
+}
+
+/* Comparisons, with Python's rules for lists and objects */
+
+static int l25_equal(l25_value left, l25_value right)
+{
+    if (left.tag != right.tag)
+        return 0;
+    if (left.tag == L25_INT)
+        return left.i == right.i;
+    if (left.tag == L25_STRUCT)
+        return left.s == right.s;
+    if (left.a == right.a)
+        return 1;
+    if (left.a->len != right.a->len)
+        return 0;
+    for (long long i = 0; i < left.a->len; i++)
+        if (!l25_equal(left.a->items[i], right.a->items[i]))
+            return 0;
+    return 1;
+}
+
+enum { L25_LT, L25_LTE, L25_GT, L25_GTE };
+
+static int l25_order(l25_value left, l25_value right, int op)
+{
+    static const char *const symbols[] = {"<", "<=", ">", ">="};
+    long long a, b;
+    char message[160];
+    if (left.tag == L25_INT && right.tag == L25_INT) {
+        a = left.i;
+        b = right.i;
+    } else if (left.tag == L25_ARRAY && right.tag == L25_ARRAY) {
+        long long i;
+        for (i = 0; i < left.a->len && i < right.a->len; i++)
+            if (!l25_equal(left.a->items[i], right.a->items[i]))
+                return l25_order(left.a->items[i], right.a->items[i], op);
+        a = left.a->len;
+        b = right.a->len;
+    } else {
+        snprintf(message, sizeof message, "'%s' not supported between instances of '%s' and '%s'",
+                 symbols[op], l25_type_name(left), l25_type_name(right));
+        l25_unexpected(message);
+    }
+    switch (op) {
+    case L25_LT: return a < b;
+    case L25_LTE: return a <= b;
+    case L25_GT: return a > b;
+    default: return a >= b;
+    }
+}
+
+/* Arrays */
+
+static l25_value l25_new_array(long long len, const l25_value *items)
+{
+    l25_array *array = malloc(sizeof *array + len * sizeof(l25_value));
+    if (!array)
+        l25_unexpected("out of memory");
+    array->len = len;
+    if (len)
+        memcpy(array->items, items, len * sizeof(l25_value));
+    return (l25_value){.tag = L25_ARRAY, .a = array};
+}
+
+/* `node_type` names the indexed node when it has no token (Interpreter then
+   fails with an AttributeError instead). */
+static void l25_check_array(l25_value value, int line, int column, const char *node_type)
+{
+    char message[128];
+    if (value.tag == L25_ARRAY)
+        return;
+    if (!node_type)
+        l25_error(line, column, "Cannot index a non-array type.");
+    snprintf(message, sizeof message, "'%s' object has no attribute 'token'", node_type);
+    l25_unexpected(message);
+}
+
+static l25_value *l25_element(l25_value array, l25_value index)
+{
+    char message[128];
+    if (index.tag != L25_INT)
+        l25_error(0, 0, "Array index must be an integer.");
+    if (index.i < 0 || index.i >= array.a->len) {
+        snprintf(message, sizeof message, "Array index %lld out of bounds for array of size %lld.",
+                 index.i, array.a->len);
+        l25_error(0, 0, message);
+    }
+    return &array.a->items[index.i];
+}
+
+/* Structs */
+
+static void l25_set_member(l25_value instance, int field, l25_value value, int line, int column)
+{
+    l25_struct *s;
+    if (instance.tag != L25_STRUCT)
+        l25_error(line, column, "Cannot access member of a non-struct type.");
+    s = instance.s;
+    for (int i = 0; i < s->len; i++) {
+        if (s->fields[i] == field) {
+            s->values[i] = value;
+            return;
+        }
+    }
+    if (s->len == s->cap) {
+        s->cap = s->cap ? 2 * s->cap : 4;
+        s->fields = realloc(s->fields, s->cap * sizeof(int));
+        s->values = realloc(s->values, s->cap * sizeof(l25_value));
+        if (!s->fields || !s->values)
+            l25_unexpected("out of memory");
+    }
+    s->fields[s->len] = field;
+    s->values[s->len++] = value;
+}
+
+static l25_value l25_new_struct(int type, int len, const int *fields, const l25_value *values)
+{
+    l25_struct *s = calloc(1, sizeof *s);
+    l25_value instance = {.tag = L25_STRUCT, .s = s};
+    if (!s)
+        l25_unexpected("out of memory");
+    s->type = type;
+    for (int i = 0; i < len; i++)
+        l25_set_member(instance, fields[i], values[i], 0, 0);
+    return instance;
+}
+
+static l25_value l25_member(l25_value instance, int field, int line, int column)
+{
+    char message[256];
+    if (instance.tag != L25_STRUCT)
+        l25_error(line, column, "Cannot access member of a non-struct type.");
+    for (int i = 0; i < instance.s->len; i++)
+        if (instance.s->fields[i] == field)
+            return instance.s->values[i];
+    snprintf(message, sizeof message, "Struct '%s' has no member '%s'",
+             l25_struct_names[instance.s->type], l25_field_names[field]);
+    l25_error(line, column, message);
+}
+
+/* Output: each output statement formats into its own buffer first, as
+   Interpreter builds the whole line before printing it. */
+
+typedef struct {
+    char *data;
+    size_t len, cap;
+} l25_text;
+
+static void l25_append(l25_text *text, const char *data, size_t len)
+{
+    if (text->len + len + 1 > text->cap) {
+        text->cap = 2 * (text->len + len) + 64;
+        text->data = realloc(text->data, text->cap);
+        if (!text->data)
+            l25_unexpected("out of memory");
+    }
+    memcpy(text->data + text->len, data, len);
+    text->len += len;
+}
+
+static void l25_append_string(l25_text *text, const char *string)
+{
+    l25_append(text, string, strlen(string));
+}
+
+static void l25_append_value(l25_text *text, l25_value value)
+{
+    char number[32];
+    switch (value.tag) {
+    case L25_INT:
+        l25_append(text, number, snprintf(number, sizeof number, "%lld", value.i));
+        break;
+    case L25_ARRAY:
+        l25_append(text, "[", 1);
+        for (long long i = 0; i < value.a->len; i++) {
+            if (i)
+                l25_append(text, ", ", 2);
+            l25_append_value(text, value.a->items[i]);
+        }
+        l25_append(text, "]", 1);
+        break;
+    case L25_STRUCT:
+        l25_append_string(text, "<Struct ");
+        l25_append_string(text, l25_struct_names[value.s->type]);
+        l25_append(text, ": {", 3);
+        for (int i = 0; i < value.s->len; i++) {
+            if (i)
+                l25_append(text, ", ", 2);
+            l25_append(text, "'", 1);
+            l25_append_string(text, l25_field_names[value.s->fields[i]]);
+            l25_append(text, "': ", 3);
+            l25_append_value(text, value.s->values[i]);
+        }
+        l25_append(text, "}>", 2);
+        break;
+    default:
+        l25_append_string(text, "None");
+    }
+}
+
+static void l25_print(l25_text *text)
+{
+    l25_append(text, "\n", 1);
+    fwrite(text->data, 1, text->len, stdout);
+    free(text->data);
+}
+
+/* Input: a line parsed the way Python's int() does. */
+
+static int l25_parse_int(const char *line, long long *result)
+{
+    const char *p = line;
+    int negative = 0, digits = 0;
+    unsigned long long value = 0, limit;
+    while (*p == ' ' || (*p >= '\t' && *p <= '\r'))
+        p++;
+    if (*p == '+' || *p == '-')
+        negative = *p++ == '-';
+    limit = negative ? (unsigned long long)LLONG_MAX + 1 : LLONG_MAX;
+    for (; *p; p++) {
+        if (*p == '_' && digits && p[1] >= '0' && p[1] <= '9')
+            continue;
+        if (*p < '0' || *p > '9')
+            break;
+        if (value > (limit - (*p - '0')) / 10)
+            return -1;
+        value = 10 * value + (*p - '0');
+        digits++;
+    }
+    while (*p == ' ' || (*p >= '\t' && *p <= '\r'))
+        p++;
+    if (!digits || *p)
+        return 0;
+    *result = negative ? (long long)(0 - value) : (long long)value;
+    return 1;
+}
+
+/* Reads one line; returns 0 at the end of the input (Python's EOFError). */
+static int l25_read_line(char **line)
+{
+    size_t len = 0, cap = 64;
+    int c;
+    *line = malloc(cap);
+    while ((c = getchar()) != EOF && c != '\n') {
+        if (len + 1 == cap)
+            *line = realloc(*line, cap *= 2);
+        (*line)[len++] = (char)c;
+    }
+    (*line)[len] = '\0';
+    return c != EOF || len;
+}
+
+static l25_value l25_input(int line, int column, const char *failure)
+{
+    char *text;
+    long long value;
+    int parsed;
+    if (!l25_read_line(&text))
+        l25_error(line, column, failure);
+    parsed = l25_parse_int(text, &value);
+    free(text);
+    if (parsed < 0)
+        l25_overflow(line, column);
+    if (!parsed)
+        l25_unsupported(line, column, "Input that is not an integer is not supported by the C backend.");
+    return L25_INT(value);
+}
@@ -0,0 +1,24 @@
+from src.interpreter import Interpreter
+from src.memo import DEFAULT_MEMO_SIZE
+from src.resolver import SlotInterpreter
+from src.tiering import TieredInterpreter
+from src.closure import ClosureInterpreter
+from src.vm import VirtualMachine
+from src.transpiler import TranspiledInterpreter
+
+# Execution engines by name. Each one is constructed like Interpreter, with a
+# parser or an already parsed `tree`, and runs the program with interpret().
+ENGINES = {
+    'tree': Interpreter,
+    'slots': SlotInterpreter,
+    'tiered': TieredInterpreter,
+    'closure': ClosureInterpreter,
+    'vm': VirtualMachine,
+    'python': TranspiledInterpreter,
+}
+
+def memo_options(name, memoize=True, memo_size=DEFAULT_MEMO_SIZE):
+    """Keyword arguments setting up memoization of pure functions (see src.memo) for engine `name`, if it has it."""
+    if issubclass(ENGINES[name], Interpreter):
+        return {'memoize': memoize, 'memo_size': memo_size}
+    return {}
@@ -9,6 +9,10 @@ class ParserError(CompilerError):
         self.token = token
         super().__init__(self.message)
 
+    def __reduce__(self):
+        # Keep the token when the error is pickled (e.g. sent back by a worker process).
+        return (type(self), (self.message, self.token))
+
     def __str__(self):
         if self.token:
             return f'[Line {self.token.line}:{self.token.column}] ParserError: {self.message}'
@@ -21,7 +25,40 @@ class InterpreterError(CompilerError):
         self.token = token
         super().__init__(self.message)
 
+    def __reduce__(self):
+        return (type(self), (self.message, self.token))
+
     def __str__(self):
         if self.token:
             return f'[Line {self.token.line}:{self.token.column}] InterpreterError: {self.message}'
-        return f'InterpreterError: {self.message}'
\ No newline at end of file
+        return f'InterpreterError: {self.message}'
+
+class ArtifactError(CompilerError):
+    """Exception raised for unreadable or incompatible precompiled (.l25c) files."""
+    def __init__(self, message, path=None):
+        self.message = message
+        self.path = path
+        super().__init__(self.message)
+
+    def __reduce__(self):
+        return (type(self), (self.message, self.path))
+
+    def __str__(self):
+        if self.path:
+            return f'[{self.path}] ArtifactError: {self.message}'
+        return f'ArtifactError: {self.message}'
+
+class BackendError(CompilerError):
+    """Exception raised when a program cannot be compiled to native code."""
+    def __init__(self, message, token=None):
+        self.message = message
+        self.token = token
+        super().__init__(self.message)
+
+    def __reduce__(self):
+        return (type(self), (self.message, self.token))
+
+    def __str__(self):
+        if self.token:
+            return f'[Line {self.token.line}:{self.token.column}] BackendError: {self.message}'
+        return f'BackendError: {self.message}'
@@ -0,0 +1,183 @@
+import re
+import threading
+from collections import OrderedDict
+
+from src.arena import ASTArena
+from src.ast import Program
+from src.lexer import RegexLexer, TokenType
+from src.parser import Parser, parse_source
+
+# Everything that decides where a top-level definition starts and ends: string
+# literals (skipped whole, unterminated ones run to the end like in the lexer),
+# braces, and the keywords opening a definition or the main block.
+SPLIT_PATTERN = re.compile(r'"[^"]*"?|[{}]|(?<!\w)(?:func|struct|main)(?!\w)')
+STRUCT_END_PATTERN = re.compile(r'\s*;')
+
+def split_source(text):
+    """
+    Splits a program into consecutive pieces: the `program Name {` header, one
+    piece per top-level `func`/`struct` definition (with the whitespace before
+    it) and the main block up to the end of the text.
+
+    Returns a list of (kind, start, end) with kind 'program', 'func', 'struct'
+    or 'main', or None when the text does not have that layout. Pieces are
+    only cut between tokens, so lexing them one by one yields the same tokens
+    as lexing the whole text.
+    """
+    pieces = []
+    depth = 0
+    kind = 'program'  # the piece being scanned, None between definitions
+    start = 0
+    for match in SPLIT_PATTERN.finditer(text):
+        lexeme = match.group()
+        if lexeme == '{':
+            depth += 1
+            if kind != 'program' or depth != 1:
+                continue
+            end = match.end()
+        elif lexeme == '}':
+            depth -= 1
+            if kind is None or depth != 1:
+                continue
+            end = match.end()
+            if kind == 'struct':
+                # A struct definition ends with the ';' after its braces.
+                struct_end = STRUCT_END_PATTERN.match(text, end)
+                if struct_end is None:
+                    return None
+                end = struct_end.end()
+        else:
+            if lexeme[0] != '"' and depth == 1 and kind is None:
+                if lexeme == 'main':
+                    pieces.append(('main', start, len(text)))
+                    return pieces
+                kind = lexeme
+            continue
+        pieces.append((kind, start, end))
+        kind = None
+        start = end
+    return None
+
+class IncrementalParser:
+    """
+    Parses whole programs while reusing the FuncDef/StructDef subtrees (and the
+    main block) of earlier parses whose text has not changed.
+
+    The source is split at top-level definitions with a cheap scan; every piece
+    is looked up by its text and the struct names defined before it (which
+    decide StructInit vs FuncCall). Only pieces that are not cached are lexed
+    and parsed. A cached piece that moved to another line or column is rebuilt
+    with shifted token positions through an ASTArena instead of being reparsed.
+
+    Results equal Parser(...).parse() on the whole source. When a piece fails
+    to parse, or the layout is not recognised, the whole source is parsed
+    normally so errors are reported exactly as without this cache. Returned
+    trees share cached subtrees and must be treated as read-only.
+    """
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.reused = 0
+        self.moved = 0
+        self.parsed = 0
+        self.fallbacks = 0
+        # (kind, text, struct names) -> [node, line, column, arena]; the arena
+        # is only built once a piece has moved.
+        self._pieces = OrderedDict()
+        self._lock = threading.Lock()
+
+    def parse(self, source):
+        with self._lock:
+            try:
+                program = self._parse_pieces(source)
+            except Exception:
+                program = None
+            if program is None:
+                self.fallbacks += 1
+                return parse_source(source)
+            return program
+
+    def _parse_pieces(self, source):
+        pieces = split_source(source)
+        if pieces is None:
+            return None
+
+        name = None
+        struct_defs = []
+        func_defs = []
+        struct_names = []
+        main_block = None
+        line = 1
+        previous = 0
+        for kind, start, end in pieces:
+            line += source.count('\n', previous, start)
+            previous = start
+            column = start - source.rfind('\n', 0, start)
+            if kind == 'program':
+                parser = self._parser(source, start, end, line, ())
+                name = parser.program_header()
+                if parser.current_token.type != TokenType.EOF:
+                    return None
+                continue
+
+            context = tuple(struct_names) if kind != 'struct' else ()
+            node = self._piece(source, kind, start, end, line, column, context)
+            if kind == 'struct':
+                struct_names.append(node.name.value)
+                struct_defs.append(node)
+            elif kind == 'func':
+                func_defs.append(node)
+            else:
+                main_block = node
+        return Program(name, struct_defs, func_defs, main_block)
+
+    def _parser(self, source, start, end, line, struct_names):
+        parser = Parser(RegexLexer(source, start, end, line).stream())
+        parser.struct_names = set(struct_names)
+        return parser
+
+    def _piece(self, source, kind, start, end, line, column, context):
+        key = (kind, source[start:end], context)
+        entry = self._pieces.get(key)
+        if entry is not None:
+            self._pieces.move_to_end(key)
+            node, cached_line, cached_column, arena = entry
+            if (cached_line, cached_column) == (line, column):
+                self.reused += 1
+                return node
+            self.moved += 1
+            if arena is None:
+                arena = ASTArena.from_tree(node)
+            arena = arena.moved(line - cached_line, column - cached_column, cached_line)
+            node = arena.to_tree()
+        else:
+            self.parsed += 1
+            arena = None
+            parser = self._parser(source, start, end, line, context)
+            if kind == 'func':
+                node = parser.func_def()
+            elif kind == 'struct':
+                node = parser.struct_def()
+            else:
+                node = parser.main_def()
+                parser.eat(TokenType.RBRACE)  # closes the program; anything after it is ignored
+            if kind != 'main' and parser.current_token.type != TokenType.EOF:
+                raise ValueError(f"Unexpected text after a top-level {kind}")
+
+        self._pieces[key] = [node, line, column, arena]
+        while len(self._pieces) > self.maxsize:
+            self._pieces.popitem(last=False)
+        return node
+
+    def clear(self):
+        with self._lock:
+            self._pieces.clear()
+
+    def stats(self):
+        return {
+            'reused': self.reused,
+            'moved': self.moved,
+            'parsed': self.parsed,
+            'fallbacks': self.fallbacks,
+            'size': len(self._pieces),
+            'maxsize': self.maxsize,
+        }
@@ -0,0 +1,315 @@
+import operator
+
+from src.ast import (
+    StmtList, DeclareStmt, AssignStmt, IfStmt, WhileStmt, InputStmt, OutputStmt, ReturnStmt, TryCatch,
+    FuncCall, StructInit, BoolExpr, BinaryOp, UnaryOp, Identifier, Number, String, ArrayLiteral,
+    ArrayAccess, MemberAccess
+)
+from src.lexer import TokenType
+from src.structs import field_slot
+
+# Types of values. A struct instance has the type STRUCT + its type name; ANY
+# is a value of unknown type, and None (no type) an expression that never
+# produces a value because it always fails.
+INT = 'int'
+STR = 'str'
+ARRAY = 'array'
+NONE = 'none'
+STRUCT = 'struct '
+ANY = 'any'
+
+# Interpreter arithmetic on two ints.
+INT_OPERATORS = {
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+    TokenType.MULTIPLY: operator.mul,
+    TokenType.DIVIDE: operator.floordiv,
+}
+
+def concatenate(left, right):
+    """`left + right` when one of them is a string."""
+    return str(left) + str(right)
+
+def join(first, second):
+    """The type of a value that has type `first` or type `second`."""
+    if first is None:
+        return second
+    if second is None or first == second:
+        return first
+    return ANY
+
+def binary_type(op, left, right):
+    """The type of `left op right` as Interpreter.visit_BinaryOp computes it."""
+    if left is None or right is None:
+        return None
+    if left == STR or right == STR:
+        # Only + and * are defined on strings, and both make one.
+        return STR if op in (TokenType.PLUS, TokenType.MULTIPLY) else None
+    if left == ANY or right == ANY:
+        return ANY
+    return INT if left == INT and right == INT else None
+
+class TypeFacts:
+    """
+    What TypeInference proved about a Program, keyed by node: `operators`
+    maps a BinaryOp whose operand types make its result a plain operator call
+    to that operator (division still has to check for zero), `indexed` holds
+    the ArrayAccess nodes (read or assigned) of an array by an int, and
+    `members` maps the MemberAccess nodes of a field every instance there
+    declares to the slot holding that field.
+    """
+    def __init__(self):
+        self.operators = {}
+        self.indexed = set()
+        self.members = {}
+        self.counts = {'arithmetic': 0, 'indexing': 0, 'members': 0}
+
+    def stats(self):
+        """Specialized and total operations of each kind."""
+        specialized = {'arithmetic': len(self.operators), 'indexing': len(self.indexed), 'members': len(self.members)}
+        return {kind: (specialized[kind], total) for kind, total in self.counts.items()}
+
+class TypeInference:
+    """
+    Flow-insensitive type inference over a Program. Every variable name gets
+    one type for the whole program, that of every value bound to it anywhere
+    (by a `let`, an assignment, input() or a call binding a parameter), since
+    a read may see the binding of any scope holding the name. Array elements
+    share one type, as do the members of one name, and each function's result
+    has the type of its returns (NONE if it can end without one). Bindings are
+    revisited until no type changes.
+
+    A call through a name that may hold something other than its function
+    binds and returns for every function taking as many arguments; likewise a
+    struct name that may be rebound.
+    """
+    def __init__(self, program):
+        self.program = program
+        self.names = {}
+        self.returns = {}
+        self.elements = None
+        self.member_types = {}
+        self.types = {}
+        self.changed = False
+        self.function = None
+
+    def infer(self):
+        program = self.program
+        self.functions = {func_def.name.value: func_def for func_def in program.func_defs}
+        self.structs = {struct_def.name.value: struct_def for struct_def in program.struct_defs}
+        bound = set()
+        for func_def in program.func_defs:
+            bound.update(param.value for param in func_def.params)
+            self.bound_names(func_def.body, bound)
+        self.bound_names(program.main_block, bound)
+        self.static_functions = set(self.functions) - bound
+        # A function declared with the same name replaces a struct.
+        self.static_structs = set(self.structs) - set(self.functions) - bound
+        for name in list(self.functions) + list(self.structs):
+            self.names[name] = ANY
+
+        self.changed = True
+        while self.changed:
+            self.changed = False
+            for func_def in program.func_defs:
+                self.function = func_def.name.value
+                self.block(func_def.body)
+                stmts = func_def.body.stmts
+                if not stmts or not isinstance(stmts[-1], ReturnStmt):
+                    self.bind_return(NONE)
+            self.function = None
+            self.block(program.main_block)
+        return self.facts()
+
+    def bound_names(self, node, bound):
+        """Adds the names `let`, assignments and input() bind below statement list `node` to `bound`."""
+        for stmt in node.stmts:
+            if isinstance(stmt, StmtList):
+                self.bound_names(stmt, bound)
+            elif isinstance(stmt, DeclareStmt):
+                bound.add(stmt.ident.value)
+            elif isinstance(stmt, AssignStmt) and isinstance(stmt.left, Identifier):
+                bound.add(stmt.left.value)
+            elif isinstance(stmt, InputStmt):
+                bound.update(ident.value for ident in stmt.idents)
+            elif isinstance(stmt, IfStmt):
+                self.bound_names(stmt.if_block, bound)
+                if stmt.else_block is not None:
+                    self.bound_names(stmt.else_block, bound)
+            elif isinstance(stmt, WhileStmt):
+                self.bound_names(stmt.body, bound)
+            elif isinstance(stmt, TryCatch):
+                self.bound_names(stmt.try_block, bound)
+                self.bound_names(stmt.catch_block, bound)
+
+    def facts(self):
+        facts = TypeFacts()
+        for node in self.types:
+            if isinstance(node, BinaryOp):
+                facts.counts['arithmetic'] += 1
+                left, right = self.types[node.left], self.types[node.right]
+                if left == INT and right == INT:
+                    facts.operators[node] = INT_OPERATORS[node.op.type]
+                elif node.op.type == TokenType.PLUS and STR in (left, right) and None not in (left, right):
+                    facts.operators[node] = operator.add if left == right else concatenate
+            elif isinstance(node, ArrayAccess):
+                facts.counts['indexing'] += 1
+                if self.types[node.ident] == ARRAY and self.types[node.index_expr] == INT:
+                    facts.indexed.add(node)
+            elif isinstance(node, MemberAccess):
+                facts.counts['members'] += 1
+                struct_type = self.types[node.struct_expr]
+                if struct_type is not None and struct_type.startswith(STRUCT):
+                    struct_name = struct_type[len(STRUCT):]
+                    if node.member_ident.value in [field.value for field in self.structs[struct_name].fields]:
+                        facts.members[node] = field_slot(node.member_ident.value)
+        return facts
+
+    # Bindings
+
+    def bind(self, name, value_type):
+        new = join(self.names.get(name), value_type)
+        if new != self.names.get(name):
+            self.names[name] = new
+            self.changed = True
+
+    def bind_return(self, value_type):
+        new = join(self.returns.get(self.function), value_type)
+        if new != self.returns.get(self.function):
+            self.returns[self.function] = new
+            self.changed = True
+
+    def bind_element(self, value_type):
+        new = join(self.elements, value_type)
+        if new != self.elements:
+            self.elements = new
+            self.changed = True
+
+    def bind_member(self, name, value_type):
+        new = join(self.member_types.get(name), value_type)
+        if new != self.member_types.get(name):
+            self.member_types[name] = new
+            self.changed = True
+
+    # Statements
+
+    def block(self, node):
+        for stmt in node.stmts:
+            self.statement(stmt)
+
+    def statement(self, node):
+        if isinstance(node, StmtList):
+            self.block(node)
+        elif isinstance(node, DeclareStmt):
+            if node.expr is not None:
+                self.bind(node.ident.value, self.expr(node.expr))
+        elif isinstance(node, AssignStmt):
+            value_type = self.expr(node.expr)
+            left = node.left
+            if isinstance(left, Identifier):
+                self.bind(left.value, value_type)
+            elif isinstance(left, MemberAccess):
+                self.expr(left.struct_expr)
+                self.record(left, None)
+                self.bind_member(left.member_ident.value, value_type)
+            elif isinstance(left, ArrayAccess):
+                self.expr(left.ident)
+                self.expr(left.index_expr)
+                self.record(left, None)
+                self.bind_element(value_type)
+        elif isinstance(node, IfStmt):
+            self.expr(node.bool_expr)
+            self.block(node.if_block)
+            if node.else_block is not None:
+                self.block(node.else_block)
+        elif isinstance(node, WhileStmt):
+            self.expr(node.bool_expr)
+            self.block(node.body)
+        elif isinstance(node, InputStmt):
+            for ident in node.idents:
+                self.bind(ident.value, ANY)
+        elif isinstance(node, OutputStmt):
+            for expr in node.exprs:
+                self.expr(expr)
+        elif isinstance(node, ReturnStmt):
+            value_type = self.expr(node.expr)
+            if self.function is not None:
+                self.bind_return(value_type)
+        elif isinstance(node, TryCatch):
+            self.block(node.try_block)
+            self.block(node.catch_block)
+        elif isinstance(node, FuncCall):
+            # A call statement binds the parameters of its callee like any call.
+            self.expr(node)
+
+    # Expressions
+
+    def record(self, node, node_type):
+        self.types[node] = node_type
+        return node_type
+
+    def expr(self, node):
+        if isinstance(node, Number):
+            return self.record(node, INT)
+        if isinstance(node, String):
+            return self.record(node, STR)
+        if isinstance(node, Identifier):
+            return self.record(node, self.names.get(node.value))
+        if isinstance(node, BinaryOp):
+            return self.record(node, binary_type(node.op.type, self.expr(node.left), self.expr(node.right)))
+        if isinstance(node, UnaryOp):
+            operand = self.expr(node.expr)
+            # Negation only succeeds on an int.
+            return self.record(node, operand if node.op.type != TokenType.MINUS or operand is None else INT)
+        if isinstance(node, BoolExpr):
+            self.expr(node.left)
+            self.expr(node.right)
+            return None
+        if isinstance(node, ArrayLiteral):
+            for element in node.elements:
+                self.bind_element(self.expr(element))
+            return self.record(node, ARRAY)
+        if isinstance(node, ArrayAccess):
+            array_type = self.expr(node.ident)
+            self.expr(node.index_expr)
+            return self.record(node, self.elements if array_type in (ARRAY, ANY) else None)
+        if isinstance(node, MemberAccess):
+            struct_type = self.expr(node.struct_expr)
+            may_be_struct = struct_type == ANY or (struct_type is not None and struct_type.startswith(STRUCT))
+            return self.record(node, self.member_types.get(node.member_ident.value) if may_be_struct else None)
+        if isinstance(node, FuncCall):
+            return self.record(node, self.call(node))
+        if isinstance(node, StructInit):
+            return self.record(node, self.struct_init(node))
+        return None
+
+    def call(self, node):
+        arg_types = [self.expr(arg) for arg in node.args]
+        name = node.name.value
+        if name in self.static_functions:
+            callees = [self.functions[name]]
+        else:
+            callees = list(self.functions.values())
+        result = None
+        for func_def in callees:
+            if len(func_def.params) != len(arg_types):
+                continue
+            for param, arg_type in zip(func_def.params, arg_types):
+                self.bind(param.value, arg_type)
+            result = join(result, self.returns.get(func_def.name.value))
+        return result
+
+    def struct_init(self, node):
+        arg_types = [self.expr(arg) for arg in node.args]
+        name = node.name.value
+        static = name in self.static_structs
+        blueprints = [self.structs[name]] if static else list(self.structs.values())
+        for struct_def in blueprints:
+            if len(struct_def.fields) == len(arg_types):
+                for field, arg_type in zip(struct_def.fields, arg_types):
+                    self.bind_member(field.value, arg_type)
+        return STRUCT + name if static else ANY
+
+def infer_types(program):
+    """Runs TypeInference on `program` and returns its TypeFacts."""
+    return TypeInference(program).infer()
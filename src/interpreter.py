@@ -1,3 +1,6 @@
+import operator
+from functools import partial
+
 from src.ast import (
     Program, FuncDef, StructDef, StmtList, DeclareStmt, AssignStmt, IfStmt, WhileStmt,
     InputStmt, OutputStmt, ReturnStmt, FuncCall, StructInit, MemberAccess,
@@ -6,27 +9,19 @@ from src.ast import (
 )
 from src.lexer import TokenType
 from src.error import InterpreterError
+from src.inference import infer_types
+from src.arrays import ARRAY_TYPES, new_array, store, store_slice
+from src.structs import StructDefinition, StructInstance
+from src.memo import DEFAULT_MEMO_SIZE, memo_tables
+from src.loops import CountedLoops, SUM_ELEMENTS, SUM_COUNTER, SUM_VALUE, FILL, FILL_COUNTER
+
+_MISSING = object()
 
 class ReturnValue(Exception):
     """Exception used to unwind the stack and return a value from a function."""
     def __init__(self, value):
         self.value = value
 
-class StructDefinition:
-    """Represents the blueprint of a struct."""
-    def __init__(self, name, fields):
-        self.name = name
-        self.fields = [field.value for field in fields]
-
-class StructInstance:
-    """Represents an instance of a struct."""
-    def __init__(self, type_name):
-        self.type_name = type_name
-        self.members = {}
-    def __repr__(self):
-        return f"<Struct {self.type_name}: {self.members}>"
-
-
 class Scope:
     def __init__(self, parent=None):
         self.parent = parent
@@ -51,11 +46,28 @@ class Scope:
         self.variables[name] = value
 
 class Interpreter:
-    def __init__(self, parser):
-        self.tree = parser.parse()
+    def __init__(self, parser=None, tree=None, loop_idioms=True, typed=True, memoize=True, memo_size=DEFAULT_MEMO_SIZE):
+        # Runs either the tree produced by `parser` or an already parsed `tree`.
+        # With `loop_idioms`, counted loops run over a range (see run_counted);
+        # with `typed`, operations whose operand types TypeInference proved skip
+        # their type checks. Arena views are not specialized: hashing them to
+        # find their facts would cost more than the checks. With `memoize`,
+        # calls of pure functions keep up to `memo_size` results each (see
+        # src.memo).
+        self.tree = tree if tree is not None else parser.parse()
         self.global_scope = Scope()
         self.current_scope = self.global_scope
         self.is_in_try_block = False
+        self.counted_loops = CountedLoops(self.tree) if loop_idioms else None
+        self.type_facts = infer_types(self.tree) if typed and not hasattr(self.tree, '_arena') else None
+        self.operators = self.type_facts.operators if self.type_facts else {}
+        self.indexed = self.type_facts.indexed if self.type_facts else set()
+        self.members = self.type_facts.members if self.type_facts else {}
+        self.memo_tables = memo_tables(self.tree, memo_size) if memoize else {}
+
+    def memo_stats(self):
+        """The MemoTable stats of every pure function called, by name."""
+        return {func.name.value: table.stats() for func, table in self.memo_tables.items() if table.hits or table.misses or table.skipped}
 
     def interpret(self):
         return self.visit(self.tree)
@@ -68,12 +80,13 @@ class Interpreter:
         if scope:
             self.current_scope = scope
         
-        result = visitor(node)
-        
-        if scope:
-            self.current_scope = old_scope
-            
-        return result
+        try:
+            return visitor(node)
+        finally:
+            # Restored even when a ReturnValue unwinds the function body, so
+            # the caller does not go on running in the callee's scope.
+            if scope:
+                self.current_scope = old_scope
 
     def generic_visit(self, node):
         raise InterpreterError(f'No visit_{type(node).__name__} method')
@@ -110,22 +123,29 @@ class Interpreter:
         
         if isinstance(node.left, Identifier):
             self.current_scope.set(node.left.value, rvalue)
+        elif self.members and node.left in self.members:
+            setattr(self.visit(node.left.struct_expr), self.members[node.left], rvalue)
+        elif self.indexed and node.left in self.indexed:
+            array_obj = self.visit(node.left.ident)
+            index = self.visit(node.left.index_expr)
+            if not 0 <= index < len(array_obj):
+                raise InterpreterError(f"Array index {index} out of bounds for array of size {len(array_obj)}.")
+            store(array_obj, index, rvalue)
         elif isinstance(node.left, MemberAccess):
             struct_instance = self.visit(node.left.struct_expr)
             if not isinstance(struct_instance, StructInstance):
                 raise InterpreterError("Cannot access member of a non-struct type.", node.left.member_ident.token)
-            member_name = node.left.member_ident.value
-            struct_instance.members[member_name] = rvalue
+            struct_instance.set(node.left.member_ident.value, rvalue)
         elif isinstance(node.left, ArrayAccess):
             array_obj = self.visit(node.left.ident)
-            if not isinstance(array_obj, list):
+            if not isinstance(array_obj, ARRAY_TYPES):
                 raise InterpreterError("Cannot index a non-array type.", node.left.ident.token)
             index = self.visit(node.left.index_expr)
             if not isinstance(index, int):
                 raise InterpreterError("Array index must be an integer.")
             if not 0 <= index < len(array_obj):
                 raise InterpreterError(f"Array index {index} out of bounds for array of size {len(array_obj)}.")
-            array_obj[index] = rvalue
+            store(array_obj, index, rvalue)
         else:
             raise InterpreterError("Invalid target for assignment.")
 
@@ -136,9 +156,98 @@ class Interpreter:
             self.visit(node.else_block)
 
     def visit_WhileStmt(self, node):
+        loop = self.counted_loops.get(node) if self.counted_loops is not None else None
+        if loop is not None and self.run_counted(loop):
+            return
         while self.visit(node.bool_expr):
             self.visit(node.body)
 
+    def run_counted(self, loop):
+        """
+        Runs CountedLoop `loop` as a loop over the range of its counter, if the
+        counter and limit hold integers; returns False, having run nothing,
+        otherwise. The counter is assigned after every iteration as the last
+        statement would, so the body and an error leaving it see the same values.
+        """
+        start = self.visit(loop.counter)
+        stop = self.visit(loop.limit)
+        if type(start) is not int or type(stop) is not int:
+            return False
+        values = range(start, stop + 1 if loop.inclusive else stop, loop.step)
+        if not values:
+            return True
+        set_counter = self.variable_setter(loop.target)
+        body, step = loop.body, loop.step
+        if not body:
+            set_counter(values[-1] + step)
+            return True
+        if loop.reduction is not None and len(values) > 1:
+            # The first iteration runs as usual, so an error is raised as and
+            # where it would be; after it, only the values can rule out the
+            # bulk operation.
+            for stmt in body:
+                self.visit(stmt)
+            set_counter(values[0] + step)
+            values = values[1:]
+            if self.reduce(loop.reduction, values):
+                set_counter(values[-1] + step)
+                return True
+        for value in values:
+            for stmt in body:
+                self.visit(stmt)
+            set_counter(value + step)
+        return True
+
+    def reduce(self, reduction, values):
+        """
+        Performs the iterations `values` of a Reduction as one bulk operation;
+        returns False, having changed nothing, unless every value involved is
+        one the iterations would have handled without an error.
+        """
+        kind = reduction.kind
+        if reduction.array is not None:
+            array = self.visit(reduction.array)
+            if not isinstance(array, ARRAY_TYPES) or values[-1] >= len(array):
+                return False
+            indices = slice(values[0], values[-1] + 1, values.step)
+        if kind == FILL_COUNTER:
+            store_slice(array, indices, values)
+            return True
+        if kind == FILL:
+            store_slice(array, indices, [self.visit(reduction.value)] * len(values))
+            return True
+        if kind == SUM_ELEMENTS:
+            items = array[indices]
+            if not all(type(item) is int for item in items):
+                return False
+            total = sum(items)
+        elif kind == SUM_COUNTER:
+            total = len(values) * (values[0] + values[-1]) // 2
+        elif kind == SUM_VALUE:
+            value = self.visit(reduction.value)
+            if type(value) is not int:
+                return False
+            total = value * len(values)
+        else:
+            total = reduction.amount * array[indices].count(self.visit(reduction.value))
+        current = self.visit(reduction.target)
+        if type(current) is not int:
+            return False
+        self.variable_setter(reduction.target)(current + total)
+        return True
+
+    def variable_setter(self, ident):
+        """
+        A function assigning the variable `ident` names as AssignStmt would,
+        valid until a `let` of that name runs in the current scope.
+        """
+        scope = self.current_scope
+        while ident.value not in scope.variables:
+            if scope.parent is None:
+                raise InterpreterError(f"Variable '{ident.value}' not defined before assignment.")
+            scope = scope.parent
+        return partial(scope.variables.__setitem__, ident.value)
+
     def visit_InputStmt(self, node):
         for ident in node.idents:
             try:
@@ -157,26 +266,75 @@ class Interpreter:
         print(' '.join(values))
 
     def visit_ReturnStmt(self, node):
+        # Only reached for a return that is not the last statement of a body;
+        # visit_FuncCall evaluates the final one directly.
         raise ReturnValue(self.visit(node.expr))
 
     def visit_FuncCall(self, node):
-        func_name = node.name.value
-        func = self.current_scope.get(func_name)
-        if not isinstance(func, FuncDef):
-            raise InterpreterError(f"'{func_name}' is not a function", node.name.token)
-        
-        if len(node.args) != len(func.params):
-            raise InterpreterError(f"Function '{func_name}' expects {len(func.params)} arguments but got {len(node.args)}", node.name.token)
-
-        func_scope = Scope(parent=self.global_scope)
-        for param, arg_expr in zip(func.params, node.args):
-            func_scope.declare(param.value, self.visit(arg_expr))
+        caller_scope = self.current_scope
+        try:
+            # Each iteration runs one function; a call in tail position
+            # (`return f(...)`) continues the loop instead of recursing.
+            while True:
+                func_name = node.name.value
+                func = self.current_scope.get(func_name)
+                if not isinstance(func, FuncDef):
+                    raise InterpreterError(f"'{func_name}' is not a function", node.name.token)
+
+                if len(node.args) != len(func.params):
+                    raise InterpreterError(f"Function '{func_name}' expects {len(func.params)} arguments but got {len(node.args)}", node.name.token)
+
+                if self.memo_tables:
+                    table = self.memo_tables.get(func)
+                    if table is not None:
+                        return table.call(self.call_function, func, [self.visit(arg_expr) for arg_expr in node.args])
+
+                func_scope = Scope(parent=self.global_scope)
+                for param, arg_expr in zip(func.params, node.args):
+                    func_scope.declare(param.value, self.visit(arg_expr))
+
+                self.current_scope = func_scope
+                stmts = func.body.stmts
+                last = len(stmts) - 1
+                for index in range(last):
+                    self.visit(stmts[index])
+                if last < 0:
+                    return None
+                if not isinstance(stmts[last], ReturnStmt):
+                    self.visit(stmts[last])
+                    return None
+                result = stmts[last].expr
+                if isinstance(result, FuncCall):
+                    node = result
+                    continue
+                return self.visit(result)
+        except ReturnValue as ret:
+            return ret.value
+        finally:
+            self.current_scope = caller_scope
 
+    def call_function(self, func, args):
+        """Runs `func` on the already evaluated `args` and returns its result."""
+        caller_scope = self.current_scope
         try:
-            self.visit(func.body, scope=func_scope)
+            func_scope = Scope(parent=self.global_scope)
+            for param, value in zip(func.params, args):
+                func_scope.declare(param.value, value)
+            self.current_scope = func_scope
+            stmts = func.body.stmts
+            last = len(stmts) - 1
+            for index in range(last):
+                self.visit(stmts[index])
+            if last < 0:
+                return None
+            if not isinstance(stmts[last], ReturnStmt):
+                self.visit(stmts[last])
+                return None
+            return self.visit(stmts[last].expr)
         except ReturnValue as ret:
             return ret.value
-        return None
+        finally:
+            self.current_scope = caller_scope
 
     def visit_TryCatch(self, node):
         old_try_state = self.is_in_try_block
@@ -206,6 +364,10 @@ class Interpreter:
     def visit_BinaryOp(self, node):
         left = self.visit(node.left)
         right = self.visit(node.right)
+        fast = self.operators.get(node) if self.operators else None
+        # A division by zero still takes the checked path, for its error.
+        if fast is not None and (right != 0 or fast is not operator.floordiv):
+            return fast(left, right)
         op = node.op.type
 
         # Group 2: String Operations
@@ -252,11 +414,17 @@ class Interpreter:
         return node.value
 
     def visit_ArrayLiteral(self, node):
-        return [self.visit(elem) for elem in node.elements]
+        return new_array([self.visit(elem) for elem in node.elements])
 
     def visit_ArrayAccess(self, node):
+        if self.indexed and node in self.indexed:
+            array_obj = self.visit(node.ident)
+            index = self.visit(node.index_expr)
+            if not 0 <= index < len(array_obj):
+                raise InterpreterError(f"Array index {index} out of bounds for array of size {len(array_obj)}.")
+            return array_obj[index]
         array_obj = self.visit(node.ident)
-        if not isinstance(array_obj, list):
+        if not isinstance(array_obj, ARRAY_TYPES):
             raise InterpreterError("Cannot index a non-array type.", node.ident.token)
         index = self.visit(node.index_expr)
         if not isinstance(index, int):
@@ -273,16 +441,16 @@ class Interpreter:
         if len(node.args) != len(blueprint.fields):
             raise InterpreterError(f"Struct '{struct_name}' expects {len(blueprint.fields)} fields but got {len(node.args)}", node.name.token)
         
-        instance = StructInstance(struct_name)
-        for field_name, arg_expr in zip(blueprint.fields, node.args):
-            instance.members[field_name] = self.visit(arg_expr)
-        return instance
+        return blueprint.new(struct_name, [self.visit(arg_expr) for arg_expr in node.args])
 
     def visit_MemberAccess(self, node):
+        if self.members and node in self.members:
+            return getattr(self.visit(node.struct_expr), self.members[node])
         struct_instance = self.visit(node.struct_expr)
         if not isinstance(struct_instance, StructInstance):
             raise InterpreterError("Cannot access member of a non-struct type.", node.member_ident.token)
         member_name = node.member_ident.value
-        if member_name not in struct_instance.members:
+        value = struct_instance.get(member_name, _MISSING)
+        if value is _MISSING:
             raise InterpreterError(f"Struct '{struct_instance.type_name}' has no member '{member_name}'", node.member_ident.token)
-        return struct_instance.members[member_name]
\ No newline at end of file
+        return value
\ No newline at end of file
@@ -1,5 +1,10 @@
 import enum
 import re
+from array import array
+from bisect import bisect_right
+from collections import deque
+from functools import partial
+from itertools import repeat
 
 class TokenType(enum.Enum):
     # Keywords
@@ -51,7 +56,41 @@ class TokenType(enum.Enum):
     # End of file
     EOF = 'EOF'
 
+KEYWORDS = {
+    'program': TokenType.PROGRAM,
+    'func': TokenType.FUNC,
+    'main': TokenType.MAIN,
+    'let': TokenType.LET,
+    'if': TokenType.IF,
+    'else': TokenType.ELSE,
+    'while': TokenType.WHILE,
+    'return': TokenType.RETURN,
+    'input': TokenType.INPUT,
+    'output': TokenType.OUTPUT,
+    'try': TokenType.TRY,
+    'catch': TokenType.CATCH,
+    'struct': TokenType.STRUCT,
+}
+
+SINGLE_CHAR_TOKENS = {
+    '+': TokenType.PLUS,
+    '-': TokenType.MINUS,
+    '*': TokenType.MULTIPLY,
+    '/': TokenType.DIVIDE,
+    '(': TokenType.LPAREN,
+    ')': TokenType.RPAREN,
+    '{': TokenType.LBRACE,
+    '}': TokenType.RBRACE,
+    '[': TokenType.LBRACKET,
+    ']': TokenType.RBRACKET,
+    ',': TokenType.COMMA,
+    ';': TokenType.SEMICOLON,
+    '.': TokenType.DOT,
+}
+
 class Token:
+    __slots__ = ('type', 'value', 'line', 'column')
+
     def __init__(self, type, value, line=0, column=0):
         self.type = type
         self.value = value
@@ -98,24 +137,8 @@ class Lexer:
         while self.current_char is not None and (self.current_char.isalnum() or self.current_char == '_'):
             result += self.current_char
             self.advance()
-        
-        token_map = {
-            'program': TokenType.PROGRAM,
-            'func': TokenType.FUNC,
-            'main': TokenType.MAIN,
-            'let': TokenType.LET,
-            'if': TokenType.IF,
-            'else': TokenType.ELSE,
-            'while': TokenType.WHILE,
-            'return': TokenType.RETURN,
-            'input': TokenType.INPUT,
-            'output': TokenType.OUTPUT,
-            'try': TokenType.TRY,
-            'catch': TokenType.CATCH,
-            'struct': TokenType.STRUCT,
-        }
-        
-        token_type = token_map.get(result, TokenType.IDENT)
+
+        token_type = KEYWORDS.get(result, TokenType.IDENT)
         return Token(token_type, result, self.line, self.column)
 
     def string(self):
@@ -177,23 +200,8 @@ class Lexer:
                 self.advance()
                 return Token(TokenType.GT, '>', start_line, start_column)
 
-            single_char_tokens = {
-                '+': TokenType.PLUS,
-                '-': TokenType.MINUS,
-                '*': TokenType.MULTIPLY,
-                '/': TokenType.DIVIDE,
-                '(': TokenType.LPAREN,
-                ')': TokenType.RPAREN,
-                '{': TokenType.LBRACE,
-                '}': TokenType.RBRACE,
-                '[': TokenType.LBRACKET,
-                ']': TokenType.RBRACKET,
-                ',': TokenType.COMMA,
-                ';': TokenType.SEMICOLON,
-                '.': TokenType.DOT,
-            }
-            if self.current_char in single_char_tokens:
-                token_type = single_char_tokens[self.current_char]
+            if self.current_char in SINGLE_CHAR_TOKENS:
+                token_type = SINGLE_CHAR_TOKENS[self.current_char]
                 char = self.current_char
                 self.advance()
                 return Token(token_type, char, start_line, start_column)
@@ -207,4 +215,348 @@ class Lexer:
         while (token := self.get_next_token()).type != TokenType.EOF:
             tokens.append(token)
         tokens.append(token) # append EOF
-        return tokens
\ No newline at end of file
+        return tokens
+
+    def stream(self):
+        return TokenStream(self)
+
+OPERATOR_TOKENS = {
+    '==': TokenType.EQ,
+    '!=': TokenType.NEQ,
+    '<=': TokenType.LTE,
+    '>=': TokenType.GTE,
+    '=': TokenType.ASSIGN,
+    '<': TokenType.LT,
+    '>': TokenType.GT,
+    **SINGLE_CHAR_TOKENS,
+}
+
+# One master pattern: leading whitespace, then exactly one lexeme whose kind is
+# given by the index of the group that matched (see RegexLexer.get_next_token).
+TOKEN_PATTERN = re.compile(r'''
+    \s*
+    (?:
+        (\d+)                               # 1: number
+      | (\w+)                               # 2: identifier or keyword
+      | ("[^"]*"?)                          # 3: string (may be unterminated)
+      | ([=!<>]=|[=<>+\-*/(){}\[\],;.])     # 4: operator or punctuation
+    )
+''', re.VERBOSE)
+WHITESPACE_PATTERN = re.compile(r'\s*')
+
+_NUMBER, _IDENT, _STRING, _OPERATOR = 1, 2, 3, 4
+
+class RegexLexer:
+    """
+    Drop-in replacement for Lexer that scans with a single precompiled pattern.
+
+    Lexemes are sliced out of the source instead of being built one character at
+    a time, and line/column data is derived from the offset of the last newline.
+    The produced Token stream (including line/column values) is identical to the
+    one produced by the character-by-character Lexer.
+
+    `start`/`end` restrict scanning to a slice of `text` (EOF is reported at
+    `end`); `line` is the line number at `start`. Positions are the ones the
+    tokens have when the whole text is scanned.
+    """
+    def __init__(self, text, start=0, end=None, line=1):
+        self.text = text
+        self.start = start
+        self.end = len(text) if end is None else end
+        self.line = line
+        self._stream = self._scan()
+
+    def _scan(self):
+        """Generator behind get_next_token(); yields EOF forever once the input is exhausted."""
+        text = self.text
+        keyword = KEYWORDS.get
+        operators = OPERATOR_TOKENS
+        ident, number, string = TokenType.IDENT, TokenType.NUMBER, TokenType.STRING
+        end_pos = self.end
+        line = self.line
+        line_start = text.rfind('\n', 0, self.start) + 1  # offset of the first character of the current line
+        eof_padding = 0  # the char lexer steps once past EOF after an unterminated string
+        pos = self.start
+
+        while True:
+            match = None
+            for match in iter(TOKEN_PATTERN.scanner(text, pos, end_pos).match, None):
+                kind = match.lastindex
+                start, end = match.span(kind)
+                skipped = match.start()
+                if start != skipped and (newlines := text.count('\n', skipped, start)):
+                    line += newlines
+                    line_start = text.rfind('\n', skipped, start) + 1
+                lexeme = match[kind]
+                if kind == _IDENT:
+                    # Identifiers and keywords report the column just past the lexeme.
+                    yield Token(keyword(lexeme, ident), lexeme, line, end - line_start + 1)
+                elif kind == _OPERATOR:
+                    yield Token(operators[lexeme], lexeme, line, start - line_start + 1)
+                elif kind == _NUMBER:
+                    yield Token(number, int(lexeme), line, start - line_start + 1)
+                else:
+                    if end - start >= 2 and lexeme[-1] == '"':
+                        value = lexeme[1:-1]
+                    else:
+                        value = lexeme[1:]
+                        eof_padding = 1
+                    yield Token(string, value, line, start - line_start + 1)
+                    if newlines := lexeme.count('\n'):
+                        line += newlines
+                        line_start = text.rfind('\n', start, end) + 1
+            if match is not None:
+                pos = match.end()
+
+            # The master pattern stopped matching: end of input or a character it rejects.
+            skipped = WHITESPACE_PATTERN.match(text, pos, end_pos).end()
+            if newlines := text.count('\n', pos, skipped):
+                line += newlines
+                line_start = text.rfind('\n', pos, skipped) + 1
+            pos = skipped
+            column = pos - line_start + 1
+            if pos >= end_pos:
+                eof = Token(TokenType.EOF, None, line, column + eof_padding)
+                while True:
+                    yield eof
+
+            char = text[pos]
+            if char == '!':
+                # Like Lexer, a lone '!' is dropped and the following operator is
+                # reported at the position of the '!'.
+                next_char = text[pos + 1] if pos + 1 < end_pos else None
+                if next_char is not None and (next_char in '<>' or next_char in SINGLE_CHAR_TOKENS):
+                    lexeme = next_char
+                    if next_char in '<>' and text[pos + 2:min(pos + 3, end_pos)] == '=':
+                        lexeme += '='
+                    pos += 1 + len(lexeme)
+                    yield Token(operators[lexeme], lexeme, line, column)
+                    continue
+                char = next_char
+                column += 1
+            raise Exception(f"Invalid character '{char}' at line {line} column {column}")
+
+    def get_next_token(self):
+        return next(self._stream)
+
+    def tokens(self):
+        tokens = []
+        append = tokens.append
+        eof = TokenType.EOF
+        for token in self._stream:
+            append(token)
+            if token.type is eof:
+                return tokens
+
+    def stream(self):
+        return TokenStream(self)
+
+class TokenStream:
+    """
+    Lazily pulls tokens from a lexer (or any token iterable) for the Parser.
+
+    Only the tokens in the lookahead window are kept alive, so token memory stays
+    bounded regardless of the source size and parsing starts with the first token
+    instead of after the whole file has been lexed.
+    """
+    def __init__(self, source):
+        if hasattr(source, 'get_next_token'):
+            self._pull = source.get_next_token
+        else:
+            self._pull = partial(next, iter(source), None)
+        self._lookahead = deque()
+
+    def next(self):
+        if self._lookahead:
+            return self._lookahead.popleft()
+        return self._pull()
+
+    def peek(self, offset=0):
+        """Returns the token `offset` positions ahead of the next one without consuming it."""
+        while len(self._lookahead) <= offset:
+            self._lookahead.append(self._pull())
+        return self._lookahead[offset]
+
+TOKEN_KINDS = tuple(TokenType)
+KIND_IDS = {token_type: kind_id for kind_id, token_type in enumerate(TOKEN_KINDS)}
+
+def _buffer_pattern():
+    """
+    Builds the master pattern used by TokenBuffer: one capture group per token
+    kind, so the kind id follows from match.lastindex without slicing the lexeme.
+    """
+    groups = [(r'\d+', TokenType.NUMBER)]
+    groups += [(re.escape(word) + r'(?!\w)', token_type) for word, token_type in KEYWORDS.items()]
+    groups.append((r'\w+', TokenType.IDENT))
+    groups.append((r'"[^"]*"', TokenType.STRING))
+    groups.append((r'"[^"]*', None))  # unterminated string, runs to the end of input
+    for lexeme in sorted(OPERATOR_TOKENS, key=len, reverse=True):
+        groups.append((re.escape(lexeme), OPERATOR_TOKENS[lexeme]))
+    pattern = re.compile(r'\s*(?:' + '|'.join(f'({regex})' for regex, _ in groups) + ')')
+    kind_by_group = [None] + [KIND_IDS.get(token_type) for _, token_type in groups]
+    return pattern, kind_by_group
+
+BUFFER_PATTERN, _BUFFER_KIND_BY_GROUP = _buffer_pattern()
+_WORD_KINDS = frozenset(KEYWORDS.values()) | {TokenType.IDENT}
+_SLICED_KINDS = _WORD_KINDS | {TokenType.STRING}
+_UNTERMINATED_STRING_GROUP = _BUFFER_KIND_BY_GROUP.index(None, 1)
+
+class TokenBuffer:
+    """
+    Compact struct-of-arrays token store.
+
+    Lexing only appends a kind id and a start/end offset per token to typed
+    arrays; no per-token objects are created. Values are sliced out of the source
+    on demand and line/column data is resolved lazily by binary search over an
+    index of line-start offsets, built the first time a position is requested.
+    Iterating (or indexing) yields BufferToken views that the Parser,
+    ParserError and InterpreterError use exactly like Token objects.
+    """
+    def __init__(self, text):
+        self.text = text
+        self.kinds = array('B')
+        self.starts = array('I')  # value span; strings exclude their quotes
+        self.ends = array('I')
+        self.eof_padding = 0  # the char lexer steps once past EOF after an unterminated string
+        self._line_starts = None
+        self._scan()
+
+    def _scan(self):
+        text = self.text
+        kind_by_group = _BUFFER_KIND_BY_GROUP
+        unterminated = _UNTERMINATED_STRING_GROUP
+        string_id = KIND_IDS[TokenType.STRING]
+        kinds, starts, ends = self.kinds.append, self.starts.append, self.ends.append
+        pos = 0
+        while True:
+            match = None
+            for match in iter(BUFFER_PATTERN.scanner(text, pos).match, None):
+                group = match.lastindex
+                start, end = match.span(group)
+                kind = kind_by_group[group]
+                if kind == string_id:
+                    start += 1
+                    end -= 1
+                elif group == unterminated:
+                    kind = string_id
+                    start += 1
+                    self.eof_padding = 1
+                kinds(kind)
+                starts(start)
+                ends(end)
+            if match is not None:
+                pos = match.end()
+
+            pos = WHITESPACE_PATTERN.match(text, pos).end()
+            if pos >= len(text):
+                kinds(KIND_IDS[TokenType.EOF])
+                starts(pos)
+                ends(pos)
+                return
+
+            char = text[pos]
+            if char == '!':
+                # Like Lexer, a lone '!' is dropped and the following operator is
+                # reported at the position of the '!'.
+                next_char = text[pos + 1] if pos + 1 < len(text) else None
+                if next_char is not None and (next_char in '<>' or next_char in SINGLE_CHAR_TOKENS):
+                    lexeme = next_char
+                    if next_char in '<>' and text[pos + 2:pos + 3] == '=':
+                        lexeme += '='
+                    kinds(KIND_IDS[OPERATOR_TOKENS[lexeme]])
+                    starts(pos)
+                    ends(pos + 1 + len(lexeme))
+                    pos += 1 + len(lexeme)
+                    continue
+                char = next_char
+                pos += 1
+            line, column = self.offset_position(pos)
+            raise Exception(f"Invalid character '{char}' at line {line} column {column}")
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.kinds)
+        return BufferToken(self, index)
+
+    def __iter__(self):
+        return map(BufferToken, repeat(self), range(len(self.kinds)))
+
+    def tokens(self):
+        return list(self)
+
+    def stream(self):
+        return TokenStream(self)
+
+    def type(self, index):
+        return TOKEN_KINDS[self.kinds[index]]
+
+    def value(self, index):
+        token_type = TOKEN_KINDS[self.kinds[index]]
+        if token_type in _SLICED_KINDS:
+            return self.text[self.starts[index]:self.ends[index]]
+        if token_type == TokenType.NUMBER:
+            return int(self.text[self.starts[index]:self.ends[index]])
+        if token_type == TokenType.EOF:
+            return None
+        return token_type.value  # operators and punctuation are their own lexeme
+
+    def position(self, index):
+        """Returns (line, column) of a token, matching what Lexer reports."""
+        token_type = TOKEN_KINDS[self.kinds[index]]
+        if token_type == TokenType.STRING:
+            offset = self.starts[index] - 1  # opening quote
+        elif token_type in _WORD_KINDS:
+            offset = self.ends[index]  # identifiers report the column past the lexeme
+        elif token_type == TokenType.EOF:
+            offset = self.starts[index] + self.eof_padding
+        else:
+            offset = self.starts[index]
+        return self.offset_position(offset)
+
+    def offset_position(self, offset):
+        if self._line_starts is None:
+            self._line_starts = self._index_lines()
+        line = bisect_right(self._line_starts, offset)
+        return line, offset - self._line_starts[line - 1] + 1
+
+    def _index_lines(self):
+        text = self.text
+        line_starts = array('I', [0])
+        newline = text.find('\n')
+        while newline != -1:
+            line_starts.append(newline + 1)
+            newline = text.find('\n', newline + 1)
+        return line_starts
+
+class BufferToken:
+    """A lightweight view of one token in a TokenBuffer with the Token interface."""
+    __slots__ = ('buffer', 'index', 'type')
+
+    def __init__(self, buffer, index):
+        self.buffer = buffer
+        self.index = index
+        self.type = TOKEN_KINDS[buffer.kinds[index]]
+
+    @property
+    def value(self):
+        return self.buffer.value(self.index)
+
+    @property
+    def line(self):
+        return self.buffer.position(self.index)[0]
+
+    @property
+    def column(self):
+        return self.buffer.position(self.index)[1]
+
+    def __repr__(self):
+        return f'Token({self.type}, {repr(self.value)}, line={self.line}, column={self.column})'
+
+LEXERS = {
+    'regex': RegexLexer,
+    'buffer': TokenBuffer,
+    'char': Lexer,
+}
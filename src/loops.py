@@ -0,0 +1,163 @@
+from src.arena import materialize
+from src.ast import (
+    DeclareStmt, AssignStmt, IfStmt, FuncCall, BoolExpr, BinaryOp, Identifier, Number, String, ArrayAccess
+)
+from src.lexer import TokenType
+from src.optimizer import walk, assigned_names, function_effects
+
+# Kinds of Reduction: `s = s + a[i]`, `s = s + i`, `s = s + x` (x a literal or
+# another variable), `if (a[i] == x) { c = c + k; }`, `a[i] = x` and `a[i] = i`.
+SUM_ELEMENTS, SUM_COUNTER, SUM_VALUE, COUNT, FILL, FILL_COUNTER = range(6)
+
+class Reduction:
+    """
+    A counted loop body that reduces to one bulk operation. `target` is the
+    Identifier accumulated into (None for a fill), `array` the Identifier of the
+    array indexed by the counter, `value` the node added, compared or stored,
+    and `amount` what a COUNT adds per match.
+    """
+    __slots__ = ('kind', 'target', 'array', 'value', 'amount')
+
+    def __init__(self, kind, target=None, array=None, value=None, amount=None):
+        self.kind = kind
+        self.target = target
+        self.array = array
+        self.value = value
+        self.amount = amount
+
+class CountedLoop:
+    """
+    A `while (i < n) { ...; i = i + k; }` loop (or `i <= n`) whose other
+    statements never assign or declare `i` or `n`, nor call a function that may
+    assign them: `counter` and `limit` are the condition's operands, `target`
+    the Identifier the last statement assigns, `step` the constant k > 0 and
+    `body` the statements before it. With integer operands the loop runs its
+    body once for each value of range(i, n, k).
+    """
+    __slots__ = ('counter', 'limit', 'inclusive', 'target', 'step', 'body', 'reduction')
+
+    def __init__(self, counter, limit, inclusive, target, step, body, reduction=None):
+        self.counter = counter
+        self.limit = limit
+        self.inclusive = inclusive
+        self.target = target
+        self.step = step
+        self.body = body
+        self.reduction = reduction
+
+def increment(stmt, name):
+    """k if `stmt` is `name = name + k` (or `name = k + name`) for a constant k > 0, else None."""
+    if not (isinstance(stmt, AssignStmt) and isinstance(stmt.left, Identifier) and stmt.left.value == name):
+        return None
+    expr = stmt.expr
+    if not isinstance(expr, BinaryOp) or expr.op.type != TokenType.PLUS:
+        return None
+    for variable, step in ((expr.left, expr.right), (expr.right, expr.left)):
+        if isinstance(variable, Identifier) and variable.value == name and isinstance(step, Number):
+            return step.value if step.value > 0 else None
+    return None
+
+def operand(expr, name):
+    """The other operand if `expr` is `name + x` or `x + name`, else None."""
+    if not isinstance(expr, BinaryOp) or expr.op.type != TokenType.PLUS:
+        return None
+    if isinstance(expr.left, Identifier) and expr.left.value == name:
+        return expr.right
+    if isinstance(expr.right, Identifier) and expr.right.value == name:
+        return expr.left
+    return None
+
+def element(node, counter):
+    """Whether `node` is `a[counter]`."""
+    return isinstance(node, ArrayAccess) and isinstance(node.index_expr, Identifier) and node.index_expr.value == counter
+
+def reduction(body, counter):
+    """The Reduction the statements `body` of a loop counting with `counter` perform, or None."""
+    if len(body) != 1:
+        return None
+    stmt = body[0]
+    if isinstance(stmt, AssignStmt) and isinstance(stmt.left, Identifier):
+        target = stmt.left.value
+        term = operand(stmt.expr, target)
+        if element(term, counter) and term.ident.value != target:
+            return Reduction(SUM_ELEMENTS, stmt.left, array=term.ident)
+        if isinstance(term, Identifier) and term.value == counter:
+            return Reduction(SUM_COUNTER, stmt.left)
+        if isinstance(term, Number) or (isinstance(term, Identifier) and term.value != target):
+            return Reduction(SUM_VALUE, stmt.left, value=term)
+    elif isinstance(stmt, AssignStmt) and element(stmt.left, counter):
+        if isinstance(stmt.expr, Identifier) and stmt.expr.value == counter:
+            return Reduction(FILL_COUNTER, array=stmt.left.ident)
+        if isinstance(stmt.expr, (Number, String, Identifier)):
+            return Reduction(FILL, array=stmt.left.ident, value=stmt.expr)
+    elif isinstance(stmt, IfStmt) and stmt.else_block is None and len(stmt.if_block.stmts) == 1:
+        cond, update = stmt.bool_expr, stmt.if_block.stmts[0]
+        if not isinstance(cond, BoolExpr) or cond.op.type != TokenType.EQ:
+            return None
+        if not isinstance(update, AssignStmt) or not isinstance(update.left, Identifier):
+            return None
+        target = update.left.value
+        array, value = (cond.left, cond.right) if element(cond.left, counter) else (cond.right, cond.left)
+        amount = increment(update, target)
+        if amount is None or not element(array, counter) or not isinstance(value, (Number, String, Identifier)):
+            return None
+        if target in (array.ident.value, counter) or (isinstance(value, Identifier) and value.value in (target, counter)):
+            return None
+        return Reduction(COUNT, update.left, array=array.ident, value=value, amount=amount)
+    return None
+
+class CountedLoops:
+    """
+    Recognizes the counted loops of a Program (see CountedLoop), caching the
+    result per WhileStmt node (or arena view). Calls in a loop body are judged by function_effects,
+    computed the first time a body has one.
+    """
+    def __init__(self, program):
+        self.program = program
+        self.effects = None
+        self.loops = {}
+
+    def get(self, node):
+        """The CountedLoop WhileStmt `node` runs, or None."""
+        try:
+            return self.loops[node]
+        except KeyError:
+            # An arena view is analysed (and its loop run) as regular nodes.
+            loop = self.loops[node] = self.recognize(materialize(node))
+            return loop
+
+    def recognize(self, node):
+        cond = node.bool_expr
+        if not isinstance(cond, BoolExpr) or cond.op.type not in (TokenType.LT, TokenType.LTE):
+            return None
+        if not isinstance(cond.left, Identifier) or not isinstance(cond.right, (Identifier, Number)):
+            return None
+        counter = cond.left.value
+        fixed = {counter}
+        if isinstance(cond.right, Identifier):
+            if cond.right.value == counter:
+                return None
+            fixed.add(cond.right.value)
+        stmts = node.body.stmts
+        step = increment(stmts[-1], counter) if stmts else None
+        if step is None:
+            return None
+        body = stmts[:-1]
+        for stmt in body:
+            if fixed & (assigned_names(stmt) | self.declared_or_called(stmt)):
+                return None
+        return CountedLoop(cond.left, cond.right, cond.op.type == TokenType.LTE, stmts[-1].left, step,
+                           body, reduction(body, counter))
+
+    def declared_or_called(self, stmt):
+        """Names declared below `stmt`, and those the functions it calls may assign."""
+        names = set()
+        for child in walk(stmt):
+            if isinstance(child, DeclareStmt):
+                names.add(child.ident.value)
+            elif isinstance(child, FuncCall):
+                if self.effects is None:
+                    self.effects = function_effects(materialize(self.program))
+                effects, anything = self.effects
+                names |= effects.get(child.name.value, anything).writes
+        return names
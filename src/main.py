@@ -1,49 +1,179 @@
 import argparse
+import os
 import sys
-from lexer import Lexer
-from parser import Parser
-from interpreter import Interpreter
-from error import CompilerError
-from visualizer import ASTVisualizer
+import time
+from src.lexer import LEXERS
+from src.parser import Parser
+from src.engines import ENGINES, memo_options
+from src.memo import DEFAULT_MEMO_SIZE
+from src.bytecode import compile_program, disassemble_program
+from src.transpiler import PythonTranspiler
+from src.cbackend import generate_c, run_native
+from src.resolver import resolve
+from src.optimizer import Optimizer
+from src.vm import VirtualMachine, DEFAULT_MAX_DEPTH
+from src.interpreter import Interpreter
+from src.tiering import TieredInterpreter, DEFAULT_THRESHOLD
+from src.error import CompilerError
+from src.visualizer import ASTVisualizer
+from src.arena import ASTArena, materialize
+from src.cache import ParseCache
+from src.parallel import parse_parallel
+from src.batch import collect_files, run_batch, summarize, format_report
+from src.artifact import ARTIFACT_SUFFIX, artifact_path_for, load_program, write_artifact
 
 def main():
     arg_parser = argparse.ArgumentParser(description='L25 Compiler and Interpreter')
-    arg_parser.add_argument('file_path', help='Path to the L25 source file')
+    arg_parser.add_argument('file_paths', nargs='+', metavar='file_path',
+                            help='L25 source file or precompiled .l25c artifact; several files or directories run a batch')
     arg_parser.add_argument('--visualize', action='store_true', help='Visualize the AST')
+    arg_parser.add_argument('--lexer', choices=sorted(LEXERS), default='regex', help='Tokenizer engine (default: regex)')
+    arg_parser.add_argument('--engine', choices=sorted(ENGINES), default='tree', help='Execution engine (default: tree)')
+    arg_parser.add_argument('--max-depth', type=int, default=DEFAULT_MAX_DEPTH, help=f'Maximum L25 call depth of the vm engine (default: {DEFAULT_MAX_DEPTH})')
+    arg_parser.add_argument('--tier-threshold', type=int, default=DEFAULT_THRESHOLD,
+                            help=f'Calls of a function before the tiered engine specializes it (default: {DEFAULT_THRESHOLD})')
+    arg_parser.add_argument('--tier-stats', action='store_true', help='Print what the tiered engine specialized and deoptimized to stderr')
+    arg_parser.add_argument('--no-memo', action='store_true', help='Do not memoize calls of pure functions')
+    arg_parser.add_argument('--memo-size', type=int, default=DEFAULT_MEMO_SIZE,
+                            help=f'Results memoized per pure function (default: {DEFAULT_MEMO_SIZE})')
+    arg_parser.add_argument('--memo-stats', action='store_true', help='Print memoized call counters of each pure function to stderr')
+    arg_parser.add_argument('--check', action='store_true', help='Report variables that can never be defined, without running the program')
+    arg_parser.add_argument('--disassemble', action='store_true', help='Print the bytecode of the program instead of running it')
+    arg_parser.add_argument('--emit-python', action='store_true', help='Print the Python code the python engine runs instead of running it')
+    arg_parser.add_argument('--emit-c', action='store_true', help='Print the C translation of the program instead of running it')
+    arg_parser.add_argument('--native', action='store_true', help='Compile the program with the system C compiler and run the executable')
+    arg_parser.add_argument('--no-optimize', action='store_true', help='Run the program as parsed, without constant folding and dead-branch elimination')
+    arg_parser.add_argument('--optimize-stats', action='store_true', help='Print what the optimizer folded, propagated and removed to stderr')
+    arg_parser.add_argument('--arena', action='store_true', help='Keep the AST in a compact flat arena')
+    arg_parser.add_argument('--cache-size', type=int, default=128, help='Maximum number of parsed programs to cache (0 disables)')
+    arg_parser.add_argument('--cache-stats', action='store_true', help='Print parse cache counters to stderr')
+    arg_parser.add_argument('--compile', action='store_true', help='Write the parsed program to a .l25c artifact instead of running it')
+    arg_parser.add_argument('-o', '--output', help='Artifact path for --compile (default: the source path with a .l25c suffix), or where --native keeps the executable')
+    arg_parser.add_argument('--parse-jobs', type=int, default=None,
+                            help='Parse one large program with its definitions split across this many processes')
+    arg_parser.add_argument('--jobs', type=int, default=None, help='Worker processes for a batch (default: all cores)')
+    arg_parser.add_argument('--execute', action='store_true', help='Also run every program of a batch')
+    arg_parser.add_argument('--show-output', action='store_true', help='Print the captured output of every program of a batch')
     args = arg_parser.parse_args()
 
-    try:
-        with open(args.file_path, 'r') as f:
-            source_code = f.read()
-    except FileNotFoundError:
+    if len(args.file_paths) > 1 or os.path.isdir(args.file_paths[0]):
+        if args.visualize or args.compile or args.check or args.disassemble or args.emit_python or args.emit_c or args.native:
+            arg_parser.error("--visualize, --compile, --check, --disassemble, --emit-python, --emit-c and --native take a single file")
+        sys.exit(batch_main(args))
+    args.file_path = args.file_paths[0]
+
+    is_artifact = args.file_path.endswith(ARTIFACT_SUFFIX)
+    source_code = None
+    if not is_artifact:
+        try:
+            with open(args.file_path, 'r') as f:
+                source_code = f.read()
+        except FileNotFoundError:
+            print(f"Error: File not found at '{args.file_path}'")
+            sys.exit(1)
+    elif not os.path.exists(args.file_path):
         print(f"Error: File not found at '{args.file_path}'")
         sys.exit(1)
 
+    # 1. Lexical Analysis and 2. Parsing (Syntax Analysis), with the lexer feeding
+    # the parser lazily; skipped entirely when the source is already cached.
+    if args.parse_jobs:
+        parse = lambda source: parse_parallel(source, jobs=args.parse_jobs)
+    else:
+        parse = lambda source: Parser(LEXERS[args.lexer](source).stream()).parse()
+    parse_cache = ParseCache(args.cache_size, parse=parse)
+    interpreter = None
+
     try:
-        # 1. Lexical Analysis
-        lexer = Lexer(source_code)
-        tokens = lexer.tokens()
-        
-        # 2. Parsing (Syntax Analysis)
-        parser = Parser(tokens)
-        
-        # If visualization is requested, generate and print the AST diagram
+        if is_artifact:
+            ast, status = load_program(args.file_path)
+            if status == 'stale':
+                print(f"Note: '{args.file_path}' was out of date and has been recompiled.", file=sys.stderr)
+        else:
+            ast = parse_cache.parse(source_code)
+
+        # --visualize and --check look at the program as parsed, before the
+        # optimizer folds constants, prunes branches and rewrites loops.
         if args.visualize:
-            ast = parser.parse()  # Get the AST without interpreting
             visualizer = ASTVisualizer(ast)
             print(visualizer.generate())
             sys.exit(0)
+
+        if args.check:
+            errors = resolve(ast).errors
+            for error in errors:
+                print(str(error), file=sys.stderr)
+            sys.exit(1 if errors else 0)
+
+        if not args.no_optimize:
+            optimizer = Optimizer(materialize(ast))
+            ast = optimizer.optimize()
+            if args.optimize_stats:
+                print(f"Optimizer: {optimizer.stats()}", file=sys.stderr)
+
+        if args.compile:
+            if is_artifact:
+                print("Error: --compile expects an L25 source file", file=sys.stderr)
+                sys.exit(1)
+            output_path = args.output or artifact_path_for(args.file_path)
+            write_artifact(output_path, ast, source_code, args.file_path)
+            print(f"Compiled '{args.file_path}' to '{output_path}'")
+            sys.exit(0)
+
+        if args.arena:
+            ast = ASTArena.from_tree(ast).root
+
+        if args.disassemble:
+            print(disassemble_program(compile_program(materialize(ast))))
+            sys.exit(0)
+
+        if args.emit_python:
+            print(PythonTranspiler(materialize(ast)).transpile(), end='')
+            sys.exit(0)
+
+        if args.emit_c:
+            print(generate_c(ast), end='')
+            sys.exit(0)
+
+        if args.native:
+            sys.exit(run_native(ast, args.output))
         
         # 3. Interpretation (only if not visualizing)
-        interpreter = Interpreter(parser)
+        if args.engine == 'vm':
+            interpreter = VirtualMachine(tree=ast, max_depth=args.max_depth)
+        else:
+            options = memo_options(args.engine, not args.no_memo, args.memo_size)
+            if args.engine == 'tiered':
+                options['threshold'] = args.tier_threshold
+            interpreter = ENGINES[args.engine](tree=ast, **options)
         interpreter.interpret()
 
     except CompilerError as e:
         print(str(e), file=sys.stderr)
         sys.exit(1)
+    except RecursionError:
+        print("The program recursed too deeply for this engine; run it with --engine vm", file=sys.stderr)
+        sys.exit(1)
     except Exception as e:
         print(f"An unexpected error occurred: {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        if args.cache_stats:
+            print(f"Parse cache: {parse_cache.stats()}", file=sys.stderr)
+        if args.memo_stats and isinstance(interpreter, Interpreter):
+            print(f"Memo: {interpreter.memo_stats()}", file=sys.stderr)
+        if args.tier_stats and isinstance(interpreter, TieredInterpreter):
+            print(interpreter.report(), file=sys.stderr)
+
+def batch_main(args):
+    """Compiles (and with --execute runs) many files in parallel and prints a summary."""
+    paths = collect_files(args.file_paths)
+    start = time.perf_counter()
+    results = run_batch(paths, jobs=args.jobs, execute=args.execute, lexer=args.lexer, engine=args.engine,
+                          optimize=not args.no_optimize, memoize=not args.no_memo)
+    summary = summarize(results, wall_time=time.perf_counter() - start)
+    print(format_report(results, summary, show_output=args.show_output))
+    return 0 if summary['ok'] == summary['files'] else 1
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,193 @@
+from collections import OrderedDict
+
+from src.arena import materialize
+from src.ast import (
+    FuncDef, StmtList, DeclareStmt, AssignStmt, IfStmt, WhileStmt, ReturnStmt, FuncCall, StructInit,
+    BoolExpr, BinaryOp, UnaryOp, Identifier, Number, String, ArrayLiteral, ArrayAccess, MemberAccess
+)
+from src.optimizer import walk, assigned_names
+
+# Results kept per pure function, least recently used first out.
+DEFAULT_MEMO_SIZE = 1024
+
+_MISSING = object()
+
+class Impure(Exception):
+    """Raised by Purity on the first statement or expression a pure function cannot contain."""
+
+class Purity:
+    """
+    Checks one FuncDef body for what makes a call's result depend on more
+    than its arguments, or a call do more than produce it: input() and
+    output(), member and element stores, try/catch (which reports a caught
+    division by zero), reading or assigning a variable not certainly local,
+    and calls or struct constructions through a name that may be rebound.
+
+    Locals are tracked in statement order: a `let` makes its name local for
+    the statements after it, and one in a branch or loop body only inside
+    it, since there it may not have run. `calls` collects the function names
+    called, for pure_functions() to check in turn.
+    """
+    def __init__(self, functions, structs):
+        self.functions = functions
+        self.structs = structs
+        self.calls = set()
+
+    def check(self, func_def):
+        """Whether `func_def` is pure, provided every function in `calls` is."""
+        try:
+            self.block(func_def.body, {param.value for param in func_def.params})
+        except Impure:
+            return False
+        return True
+
+    def block(self, node, local):
+        for stmt in node.stmts:
+            self.statement(stmt, local)
+
+    def statement(self, node, local):
+        if isinstance(node, StmtList):
+            self.block(node, local)
+        elif isinstance(node, DeclareStmt):
+            if node.expr is not None:
+                self.expr(node.expr, local)
+            local.add(node.ident.value)
+        elif isinstance(node, AssignStmt):
+            self.expr(node.expr, local)
+            if not isinstance(node.left, Identifier) or node.left.value not in local:
+                raise Impure()
+        elif isinstance(node, IfStmt):
+            self.expr(node.bool_expr, local)
+            self.block(node.if_block, set(local))
+            if node.else_block is not None:
+                self.block(node.else_block, set(local))
+        elif isinstance(node, WhileStmt):
+            self.expr(node.bool_expr, local)
+            self.block(node.body, set(local))
+        elif isinstance(node, ReturnStmt):
+            self.expr(node.expr, local)
+        elif isinstance(node, FuncCall):
+            self.expr(node, local)
+        else:
+            raise Impure()
+
+    def expr(self, node, local):
+        if isinstance(node, (Number, String)):
+            return
+        if isinstance(node, Identifier):
+            if node.value not in local and node.value not in self.functions and node.value not in self.structs:
+                raise Impure()
+        elif isinstance(node, (BinaryOp, BoolExpr)):
+            self.expr(node.left, local)
+            self.expr(node.right, local)
+        elif isinstance(node, UnaryOp):
+            self.expr(node.expr, local)
+        elif isinstance(node, ArrayLiteral):
+            for element in node.elements:
+                self.expr(element, local)
+        elif isinstance(node, ArrayAccess):
+            self.expr(node.ident, local)
+            self.expr(node.index_expr, local)
+        elif isinstance(node, MemberAccess):
+            self.expr(node.struct_expr, local)
+        elif isinstance(node, FuncCall):
+            if node.name.value not in self.functions:
+                raise Impure()
+            self.calls.add(node.name.value)
+            for arg in node.args:
+                self.expr(arg, local)
+        elif isinstance(node, StructInit):
+            if node.name.value not in self.structs:
+                raise Impure()
+            for arg in node.args:
+                self.expr(arg, local)
+        else:
+            raise Impure()
+
+def pure_functions(program):
+    """
+    The FuncDefs of `program` whose calls can be memoized: each is pure by
+    Purity and only calls pure functions. Only names nothing rebinds count as
+    calls of a known function; of several functions of one name, the last.
+    """
+    rebound = assigned_names(program)
+    for node in walk(program):
+        if isinstance(node, DeclareStmt):
+            rebound.add(node.ident.value)
+        elif isinstance(node, FuncDef):
+            rebound.update(param.value for param in node.params)
+    functions = {func_def.name.value: func_def for func_def in program.func_defs
+                 if func_def.name.value not in rebound}
+    # A function declared with the same name replaces a struct.
+    structs = {struct_def.name.value for struct_def in program.struct_defs} - rebound - set(functions)
+    callees = {}
+    for name, func_def in functions.items():
+        purity = Purity(functions, structs)
+        if purity.check(func_def):
+            callees[name] = purity.calls
+    changed = True
+    while changed:
+        changed = False
+        for name, calls in list(callees.items()):
+            if not calls <= callees.keys():
+                del callees[name]
+                changed = True
+    return {functions[name] for name in callees}
+
+class MemoTable:
+    """
+    Bounded LRU cache from the arguments of a pure function to its result.
+    Only calls whose arguments are all ints or strings are looked up (arrays
+    and structs can change after the call), and only int and string results
+    are kept, since the caller may modify an array or struct it gets back.
+    """
+    __slots__ = ('maxsize', 'hits', 'misses', 'skipped', 'evictions', '_entries')
+
+    def __init__(self, maxsize=DEFAULT_MEMO_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def call(self, run, func, args):
+        """The result of `run(func, args)`, from an earlier call with the same `args` if there was one."""
+        for value in args:
+            if type(value) is not int and type(value) is not str:
+                self.skipped += 1
+                return run(func, args)
+        key = tuple(args)
+        entries = self._entries
+        result = entries.get(key, _MISSING)
+        if result is not _MISSING:
+            entries.move_to_end(key)
+            self.hits += 1
+            return result
+        self.misses += 1
+        result = run(func, args)
+        if type(result) is int or type(result) is str:
+            entries[key] = result
+            if len(entries) > self.maxsize:
+                entries.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'skipped': self.skipped,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+        }
+
+def memo_tables(program, maxsize=DEFAULT_MEMO_SIZE):
+    """A MemoTable for every pure FuncDef of `program` (an arena view or a tree), keyed by that FuncDef."""
+    tree = materialize(program)
+    pure = pure_functions(tree)
+    return {func_def: MemoTable(maxsize) for func_def, node in zip(program.func_defs, tree.func_defs) if node in pure}
@@ -0,0 +1,826 @@
+import operator
+
+from src.arena import SCHEMA, NODE, LIST, materialize
+from src.ast import (
+    StmtList, DeclareStmt, AssignStmt, IfStmt, WhileStmt, InputStmt, OutputStmt, ReturnStmt, TryCatch,
+    FuncCall, StructInit, BoolExpr, BinaryOp, UnaryOp, Identifier, Number, String, ArrayLiteral,
+    ArrayAccess, MemberAccess
+)
+from src.lexer import Token, TokenType
+
+# Largest magnitude of a folded integer: every engine can hold it as a literal,
+# the C backend included (whose most negative value has no literal form).
+MAX_FOLDED_INT = 2 ** 63 - 1
+# Longest string a fold may produce; longer ones are still built at run time.
+MAX_FOLDED_STRING = 1024
+
+# A loop body is only peeled (copied for its first iteration) up to this many nodes.
+MAX_PEELED_NODES = 400
+
+# How evaluating a statement reaches an expression (see LoopOptimizer.reach).
+CLEAN, FOUND, RISKY = range(3)
+
+COMPARISONS = {
+    TokenType.EQ: operator.eq, TokenType.NEQ: operator.ne,
+    TokenType.LT: operator.lt, TokenType.LTE: operator.le,
+    TokenType.GT: operator.gt, TokenType.GTE: operator.ge,
+}
+
+def walk(node):
+    """`node` and every node below it."""
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        yield node
+        for name, field_kind in SCHEMA[type(node)]:
+            if field_kind == NODE:
+                child = getattr(node, name)
+                if child is not None:
+                    pending.append(child)
+            elif field_kind == LIST:
+                pending.extend(getattr(node, name))
+
+def assigned_names(node):
+    """Names assigned by an AssignStmt or read by input() anywhere below `node`."""
+    names = set()
+    for child in walk(node):
+        if isinstance(child, AssignStmt) and isinstance(child.left, Identifier):
+            names.add(child.left.value)
+        elif isinstance(child, InputStmt):
+            names.update(ident.value for ident in child.idents)
+    return names
+
+def literal(value, token):
+    """A Number or String node holding `value`, positioned at `token`."""
+    if isinstance(value, str):
+        return String(Token(TokenType.STRING, value, token.line, token.column))
+    return Number(Token(TokenType.NUMBER, value, token.line, token.column))
+
+def fits(value):
+    if isinstance(value, str):
+        return len(value) <= MAX_FOLDED_STRING
+    return -MAX_FOLDED_INT <= value <= MAX_FOLDED_INT
+
+def fold_binary(op, left, right):
+    """`left op right` as Interpreter computes it, or None if that fails at run time or is too large."""
+    if isinstance(left, str) or isinstance(right, str):
+        if op == TokenType.PLUS:
+            value = str(left) + str(right)
+        elif op == TokenType.MULTIPLY and isinstance(left, str) != isinstance(right, str):
+            text, count = (left, right) if isinstance(left, str) else (right, left)
+            if len(text) * max(count, 0) > MAX_FOLDED_STRING:
+                return None
+            value = text * count
+        else:
+            return None
+    elif op == TokenType.PLUS:
+        value = left + right
+    elif op == TokenType.MINUS:
+        value = left - right
+    elif op == TokenType.MULTIPLY:
+        value = left * right
+    elif right == 0:
+        # Division by zero keeps its run-time error (and its try/catch handling).
+        return None
+    else:
+        value = left // right
+    return value if fits(value) else None
+
+def rebuild(node, **fields):
+    """`node` itself if `fields` hold its current children, else a copy of it with them."""
+    changed = False
+    for name, value in fields.items():
+        old = getattr(node, name)
+        if isinstance(value, list):
+            changed = changed or len(value) != len(old) or any(new is not item for new, item in zip(value, old))
+        else:
+            changed = changed or value is not old
+    if not changed:
+        return node
+    return type(node)(*[fields.get(name, getattr(node, name)) for name, _ in SCHEMA[type(node)]])
+
+class Optimizer:
+    """
+    Rewrites a Program into an equivalent one that does less work at run time:
+
+    - Number/String arithmetic, unary operators and comparisons of constants
+      are folded into literals;
+    - a variable declared once, with a constant, by a top-level `let` of a body
+      and never assigned is replaced by that constant after the `let`;
+    - an `if` with a constant condition is replaced by the branch it takes, and
+      a `while` whose condition is constantly false is removed.
+
+    Anything that fails at run time (division by zero, unsupported operand
+    types) is left in place to fail there with its usual error. The input tree
+    is never modified: changed nodes are rebuilt and unchanged subtrees shared,
+    so a tree handed out by a parse cache stays valid.
+    """
+    def __init__(self, program):
+        self.program = program
+        self.folded = 0
+        self.propagated = 0
+        self.pruned = 0
+        self.nodes_before = 0
+        self.nodes_after = 0
+        self.constants = {}
+        self.loops = None
+
+    def optimize(self):
+        program = self.program
+        self.callables = {definition.name.value for definition in program.struct_defs + program.func_defs}
+        func_defs = []
+        for func_def in program.func_defs:
+            # Assignments in other functions cannot reach this function's locals.
+            assigned = assigned_names(func_def.body) | {param.value for param in func_def.params}
+            func_defs.append(rebuild(func_def, body=self.body(func_def.body, assigned)))
+        # Main's variables are globals, which a function may assign too.
+        main_block = self.body(program.main_block, assigned_names(program))
+        optimized = rebuild(program, func_defs=func_defs, main_block=main_block)
+        self.nodes_before = sum(1 for _ in walk(program))
+        self.nodes_after = sum(1 for _ in walk(optimized))
+        self.loops = LoopOptimizer(optimized)
+        return self.loops.optimize()
+
+    def stats(self):
+        return {
+            'folded': self.folded,
+            'propagated': self.propagated,
+            'pruned': self.pruned,
+            'removed': self.nodes_before - self.nodes_after,
+            'hoisted': self.loops.hoisted if self.loops else 0,
+            'shared': self.loops.shared if self.loops else 0,
+        }
+
+    # Statements
+
+    def body(self, block, assigned):
+        declarations = {}
+        for node in walk(block):
+            if isinstance(node, DeclareStmt):
+                declarations[node.ident.value] = declarations.get(node.ident.value, 0) + 1
+        stable = {name for name, count in declarations.items()
+                  if count == 1 and name not in assigned and name not in self.callables}
+        self.constants = {}
+        stmts = []
+        for stmt in block.stmts:
+            for new_stmt in self.statement(stmt):
+                stmts.append(new_stmt)
+                # A top-level declaration has run before every later statement.
+                if (isinstance(new_stmt, DeclareStmt) and new_stmt.ident.value in stable
+                        and isinstance(new_stmt.expr, (Number, String))):
+                    self.constants[new_stmt.ident.value] = new_stmt.expr
+        return rebuild(block, stmts=stmts)
+
+    def block(self, block):
+        if block is None:
+            return None
+        stmts = []
+        for stmt in block.stmts:
+            stmts.extend(self.statement(stmt))
+        return rebuild(block, stmts=stmts)
+
+    def statement(self, node):
+        """The statements replacing `node`."""
+        method = getattr(self, f'statement_{type(node).__name__}', None)
+        if method is not None:
+            return method(node)
+        return [rebuild(node, **{name: self.expr(getattr(node, name)) if field_kind == NODE
+                                 else [self.expr(child) for child in getattr(node, name)]
+                                 for name, field_kind in SCHEMA[type(node)]})]
+
+    def statement_DeclareStmt(self, node):
+        return [rebuild(node, expr=self.expr(node.expr) if node.expr is not None else None)]
+
+    def statement_AssignStmt(self, node):
+        return [rebuild(node, left=self.target(node.left), expr=self.expr(node.expr))]
+
+    def statement_InputStmt(self, node):
+        return [node]
+
+    def statement_IfStmt(self, node):
+        condition = self.condition(node.bool_expr)
+        if condition is True:
+            self.pruned += 1
+            return self.block(node.if_block).stmts
+        if condition is False:
+            self.pruned += 1
+            return self.block(node.else_block).stmts if node.else_block is not None else []
+        return [rebuild(node, bool_expr=condition, if_block=self.block(node.if_block),
+                        else_block=self.block(node.else_block))]
+
+    def statement_WhileStmt(self, node):
+        condition = self.condition(node.bool_expr)
+        if condition is False:
+            self.pruned += 1
+            return []
+        if condition is True:
+            # An endless loop stays one; only its body is optimized.
+            condition = node.bool_expr
+        return [rebuild(node, bool_expr=condition, body=self.block(node.body))]
+
+    def statement_TryCatch(self, node):
+        return [rebuild(node, try_block=self.block(node.try_block), catch_block=self.block(node.catch_block))]
+
+    def condition(self, node):
+        """True or False for a constant comparison, else the optimized BoolExpr."""
+        left = self.expr(node.left)
+        right = self.expr(node.right)
+        if isinstance(left, (Number, String)) and isinstance(right, (Number, String)):
+            op = node.op.type
+            # Ordering a string against a number fails at run time.
+            if op in (TokenType.EQ, TokenType.NEQ) or type(left.value) is type(right.value):
+                self.folded += 1
+                return bool(COMPARISONS[op](left.value, right.value))
+        return rebuild(node, left=left, right=right)
+
+    # Expressions
+
+    def target(self, node):
+        """An assignment target or the container of an access: names there are not replaced."""
+        if isinstance(node, Identifier):
+            return node
+        if isinstance(node, ArrayAccess):
+            return rebuild(node, ident=self.target(node.ident), index_expr=self.expr(node.index_expr))
+        if isinstance(node, MemberAccess):
+            return rebuild(node, struct_expr=self.target(node.struct_expr))
+        return self.expr(node)
+
+    def expr(self, node):
+        method = getattr(self, f'expr_{type(node).__name__}', None)
+        if method is not None:
+            return method(node)
+        return rebuild(node, **{name: [self.expr(child) for child in getattr(node, name)]
+                                for name, field_kind in SCHEMA[type(node)] if field_kind == LIST})
+
+    def expr_Identifier(self, node):
+        constant = self.constants.get(node.value)
+        if constant is None:
+            return node
+        self.propagated += 1
+        return literal(constant.value, node.token)
+
+    def expr_Number(self, node):
+        return node
+
+    expr_String = expr_Number
+
+    def expr_ArrayAccess(self, node):
+        return self.target(node)
+
+    def expr_MemberAccess(self, node):
+        return self.target(node)
+
+    def expr_UnaryOp(self, node):
+        operand = self.expr(node.expr)
+        if isinstance(operand, (Number, String)):
+            if node.op.type != TokenType.MINUS:
+                self.folded += 1
+                return operand
+            if isinstance(operand, Number) and fits(-operand.value):
+                self.folded += 1
+                return literal(-operand.value, node.op)
+        return rebuild(node, expr=operand)
+
+    def expr_BinaryOp(self, node):
+        left = self.expr(node.left)
+        right = self.expr(node.right)
+        if isinstance(left, (Number, String)) and isinstance(right, (Number, String)):
+            value = fold_binary(node.op.type, left.value, right.value)
+            if value is not None:
+                self.folded += 1
+                return literal(value, left.token)
+        return rebuild(node, left=left, right=right)
+
+def first_token(node):
+    """The token where the evaluation of a pure expression starts in the source."""
+    while True:
+        if isinstance(node, (Identifier, Number, String)):
+            return node.token
+        if isinstance(node, UnaryOp):
+            return node.op
+        if isinstance(node, BinaryOp):
+            node = node.left
+        elif isinstance(node, MemberAccess):
+            node = node.struct_expr
+        else:
+            node = node.ident
+
+class Effects:
+    """
+    What a call may change: the global variables its function (or any function
+    it calls) may assign, and whether it may store into a struct member or an
+    array element, which may be shared with its caller.
+    """
+    __slots__ = ('writes', 'stores')
+
+    def __init__(self, writes=(), stores=False):
+        self.writes = set(writes)
+        self.stores = stores
+
+    def add(self, other):
+        """Merges `other` into these effects; returns whether they grew."""
+        grew = not other.writes <= self.writes or (other.stores and not self.stores)
+        self.writes |= other.writes
+        self.stores = self.stores or other.stores
+        return grew
+
+def function_effects(program):
+    """
+    The Effects of a call to each function name that always refers to its
+    function, and the Effects of any other call (those of every function).
+    """
+    variables = assigned_names(program) | {node.ident.value for node in walk(program) if isinstance(node, DeclareStmt)}
+    static = {func_def.name.value for func_def in program.func_defs} - variables
+    static -= {struct_def.name.value for struct_def in program.struct_defs}
+    effects, callees, anything = {}, {}, Effects()
+    for func_def in program.func_defs:
+        name = func_def.name.value
+        own = effects.setdefault(name, Effects())
+        own.writes |= assigned_names(func_def.body) - {param.value for param in func_def.params}
+        calls = callees.setdefault(name, set())
+        for node in walk(func_def.body):
+            if isinstance(node, AssignStmt) and not isinstance(node.left, Identifier):
+                own.stores = True
+            elif isinstance(node, FuncCall):
+                calls.add(node.name.value)
+        anything.add(own)
+    for name, calls in callees.items():
+        if not calls <= static:
+            effects[name].add(anything)
+    grew = True
+    while grew:
+        grew = False
+        for name, calls in callees.items():
+            for callee in calls & static:
+                grew = effects[name].add(effects[callee]) or grew
+    return {name: effects[name] for name in static}, anything
+
+class LoopOptimizer:
+    """
+    Dataflow pass removing repeated work, run on the output of Optimizer:
+
+    - loop-invariant code motion: a pure expression (variables, literals,
+      arithmetic, member and element reads) whose inputs a `while` loop cannot
+      change is computed once into a temporary. One in the condition is
+      computed before the loop; one in a statement every iteration runs is
+      computed in a copy of the first iteration, peeled off before the loop;
+    - common-subexpression elimination: a pure expression used more than once
+      in a run of statements that cannot change its inputs is computed once.
+
+    A loop or statement changes the variables it assigns, declares or reads
+    with input(), the globals its calls may assign (see function_effects), and
+    any member or element if it, or one of its calls, stores into one. Calls,
+    struct and array literals are never moved or shared: they may fail or
+    output, and build a new object each time.
+
+    An expression is only computed ahead when nothing its statement evaluates
+    before it could fail or have an effect (reading a variable certain to be
+    defined cannot), so any error it raises comes at the same point as before.
+    Temporaries are named `.t0`, `.t1`, ..., which no L25 name can clash with.
+    """
+    def __init__(self, program):
+        self.program = program
+        self.hoisted = 0
+        self.shared = 0
+        self.temps = 0
+        self.keys = {}
+        self.inputs = {}
+        self.valueless = set()
+
+    def optimize(self):
+        program = self.program
+        self.effects, self.anything = function_effects(program)
+        func_defs = []
+        for func_def in program.func_defs:
+            self.begin(func_def.body)
+            params = {param.value for param in func_def.params} - self.valueless
+            body = rebuild(func_def.body, stmts=self.statements(func_def.body.stmts, params))
+            func_defs.append(rebuild(func_def, body=body))
+        self.begin(program.main_block)
+        main_block = rebuild(program.main_block, stmts=self.statements(program.main_block.stmts, set()))
+        return rebuild(program, func_defs=func_defs, main_block=main_block)
+
+    def begin(self, body):
+        # `let x;` makes x undefined again, so x is never certain to be defined.
+        self.valueless = {node.ident.value for node in walk(body) if isinstance(node, DeclareStmt) and node.expr is None}
+
+    # Expressions
+
+    def key(self, node):
+        """Equal for pure expressions computing equal values from equal inputs; None if `node` is not pure."""
+        try:
+            return self.keys[node]
+        except KeyError:
+            pass
+        kind = type(node)
+        key = None
+        if kind is Identifier:
+            key = ('name', node.value)
+        elif kind is Number or kind is String:
+            key = (kind.__name__, node.value)
+        elif kind is BinaryOp:
+            left, right = self.key(node.left), self.key(node.right)
+            if left is not None and right is not None:
+                key = ('binary', node.op.type, left, right)
+        elif kind is UnaryOp:
+            operand = self.key(node.expr)
+            if operand is not None:
+                key = ('unary', node.op.type, operand)
+        elif kind is MemberAccess:
+            struct = self.key(node.struct_expr)
+            if struct is not None:
+                key = ('member', struct, node.member_ident.value)
+        elif kind is ArrayAccess:
+            array, index = self.key(node.ident), self.key(node.index_expr)
+            if array is not None and index is not None:
+                key = ('element', array, index)
+        self.keys[node] = key
+        return key
+
+    def reads(self, key):
+        """The variables a pure expression reads, and whether it reads a member or element."""
+        found = self.inputs.get(key)
+        if found is None:
+            names, access = set(), False
+            pending = [key]
+            while pending:
+                item = pending.pop()
+                if item[0] == 'name':
+                    names.add(item[1])
+                elif item[0] in ('member', 'element'):
+                    access = True
+                pending.extend(part for part in item[1:] if isinstance(part, tuple))
+            found = self.inputs[key] = (frozenset(names), access)
+        return found
+
+    def candidate(self, node):
+        """The key of `node` if it is a pure expression worth computing once, else None."""
+        if type(node) not in (BinaryOp, UnaryOp, MemberAccess, ArrayAccess):
+            return None
+        key = self.key(node)
+        if key is None or not self.reads(key)[0]:
+            return None
+        return key
+
+    def nodes(self, node, fixed=False):
+        """
+        (node, fixed) for `node` and the expressions below it, in the order
+        their evaluation starts. `fixed` marks an assignment target and the
+        array of an element access, which are never replaced.
+        """
+        pending = [(node, fixed)]
+        while pending:
+            node, fixed = pending.pop()
+            yield node, fixed
+            kind = type(node)
+            if kind is BinaryOp or kind is BoolExpr:
+                pending.append((node.right, False))
+                pending.append((node.left, False))
+            elif kind is UnaryOp:
+                pending.append((node.expr, False))
+            elif kind is MemberAccess:
+                pending.append((node.struct_expr, False))
+            elif kind is ArrayAccess:
+                pending.append((node.index_expr, False))
+                pending.append((node.ident, True))
+            elif kind is FuncCall or kind is StructInit:
+                pending.extend((arg, False) for arg in reversed(node.args))
+            elif kind is ArrayLiteral:
+                pending.extend((element, False) for element in reversed(node.elements))
+
+    def expressions(self, stmt, deep):
+        """(node, fixed) for the expressions `stmt` evaluates (see nodes); with `deep` those of its blocks too."""
+        kind = type(stmt)
+        if kind is DeclareStmt:
+            if stmt.expr is not None:
+                yield from self.nodes(stmt.expr)
+        elif kind is AssignStmt:
+            yield from self.nodes(stmt.expr)
+            yield from self.nodes(stmt.left, fixed=True)
+        elif kind is OutputStmt:
+            for expr in stmt.exprs:
+                yield from self.nodes(expr)
+        elif kind is ReturnStmt:
+            yield from self.nodes(stmt.expr)
+        elif kind is IfStmt or kind is WhileStmt:
+            yield from self.nodes(stmt.bool_expr)
+        elif kind is FuncCall:
+            yield from self.nodes(stmt)
+        if deep:
+            for block in self.blocks(stmt):
+                for inner in block.stmts:
+                    yield from self.expressions(inner, deep)
+
+    def blocks(self, stmt):
+        kind = type(stmt)
+        if kind is IfStmt:
+            return [stmt.if_block] + ([stmt.else_block] if stmt.else_block is not None else [])
+        if kind is WhileStmt:
+            return [stmt.body]
+        if kind is TryCatch:
+            return [stmt.try_block, stmt.catch_block]
+        return []
+
+    def variables(self, expr):
+        return {node.value for node, _ in self.nodes(expr) if isinstance(node, Identifier)}
+
+    def reach(self, node, key, defined, fixed=False):
+        """
+        Follows the evaluation of `node` up to the first expression with `key`:
+        FOUND if that starts before anything that could fail or have an effect,
+        RISKY if something like that comes first, CLEAN if neither happens.
+        """
+        if not fixed and self.key(node) == key:
+            return FOUND
+        kind = type(node)
+        if kind is Number or kind is String:
+            return CLEAN
+        if kind is Identifier:
+            return CLEAN if node.value in defined or node.value.startswith('.') else RISKY
+        if kind is ArrayLiteral:
+            return self.reach_all(node.elements, key, defined)
+        if kind is BinaryOp or kind is BoolExpr:
+            return self.reach_all((node.left, node.right), key, defined) or RISKY
+        if kind is UnaryOp:
+            outcome = self.reach(node.expr, key, defined)
+            return outcome or (RISKY if node.op.type == TokenType.MINUS else CLEAN)
+        if kind is MemberAccess:
+            return self.reach(node.struct_expr, key, defined) or RISKY
+        if kind is ArrayAccess:
+            return self.reach(node.ident, key, defined, fixed=True) or RISKY
+        # A call or struct literal checks what it refers to before its arguments.
+        return RISKY
+
+    def reach_all(self, nodes, key, defined):
+        for node in nodes:
+            outcome = self.reach(node, key, defined)
+            if outcome:
+                return outcome
+        return CLEAN
+
+    def reach_statement(self, stmt, key, defined):
+        kind = type(stmt)
+        if kind is DeclareStmt:
+            return self.reach(stmt.expr, key, defined) if stmt.expr is not None else CLEAN
+        if kind is AssignStmt:
+            return self.reach(stmt.expr, key, defined) or self.reach(stmt.left, key, defined, fixed=True)
+        if kind is OutputStmt:
+            return self.reach_all(stmt.exprs, key, defined)
+        if kind is ReturnStmt:
+            return self.reach(stmt.expr, key, defined)
+        if kind is IfStmt or kind is WhileStmt:
+            return self.reach(stmt.bool_expr, key, defined)
+        return RISKY
+
+    def replace(self, node, key, name, fixed=False):
+        """`node` with every expression with `key` replaced by the temporary `name`."""
+        if not fixed and self.key(node) == key:
+            token = first_token(node)
+            return Identifier(Token(TokenType.IDENT, name, token.line, token.column))
+        kind = type(node)
+        if kind is BinaryOp or kind is BoolExpr:
+            return rebuild(node, left=self.replace(node.left, key, name), right=self.replace(node.right, key, name))
+        if kind is UnaryOp:
+            return rebuild(node, expr=self.replace(node.expr, key, name))
+        if kind is MemberAccess:
+            return rebuild(node, struct_expr=self.replace(node.struct_expr, key, name))
+        if kind is ArrayAccess:
+            return rebuild(node, ident=self.replace(node.ident, key, name, fixed=True),
+                           index_expr=self.replace(node.index_expr, key, name))
+        if kind is FuncCall or kind is StructInit:
+            return rebuild(node, args=[self.replace(arg, key, name) for arg in node.args])
+        if kind is ArrayLiteral:
+            return rebuild(node, elements=[self.replace(element, key, name) for element in node.elements])
+        return node
+
+    def replace_statement(self, stmt, key, name, deep):
+        kind = type(stmt)
+        if kind is DeclareStmt and stmt.expr is not None:
+            return rebuild(stmt, expr=self.replace(stmt.expr, key, name))
+        if kind is AssignStmt:
+            return rebuild(stmt, expr=self.replace(stmt.expr, key, name), left=self.replace(stmt.left, key, name, fixed=True))
+        if kind is OutputStmt:
+            return rebuild(stmt, exprs=[self.replace(expr, key, name) for expr in stmt.exprs])
+        if kind is ReturnStmt:
+            return rebuild(stmt, expr=self.replace(stmt.expr, key, name))
+        if kind is IfStmt or kind is WhileStmt:
+            stmt = rebuild(stmt, bool_expr=self.replace(stmt.bool_expr, key, name))
+        if not deep:
+            return stmt
+        if kind is IfStmt:
+            return rebuild(stmt, if_block=self.replace_block(stmt.if_block, key, name),
+                           else_block=self.replace_block(stmt.else_block, key, name))
+        if kind is WhileStmt:
+            return rebuild(stmt, body=self.replace_block(stmt.body, key, name))
+        if kind is TryCatch:
+            return rebuild(stmt, try_block=self.replace_block(stmt.try_block, key, name),
+                           catch_block=self.replace_block(stmt.catch_block, key, name))
+        return stmt
+
+    def replace_block(self, block, key, name):
+        if block is None:
+            return None
+        return rebuild(block, stmts=[self.replace_statement(stmt, key, name, deep=True) for stmt in block.stmts])
+
+    def temporary(self, node):
+        """A declaration of a new temporary holding `node`."""
+        token = first_token(node)
+        name = f'.t{self.temps}'
+        self.temps += 1
+        return DeclareStmt(Identifier(Token(TokenType.IDENT, name, token.line, token.column)), node)
+
+    # Effects
+
+    def changes(self, node):
+        """The variables running `node` may assign or declare, and whether it may store into a member or element."""
+        writes, stores = set(), False
+        for child in walk(node):
+            kind = type(child)
+            if kind is AssignStmt:
+                if isinstance(child.left, Identifier):
+                    writes.add(child.left.value)
+                else:
+                    stores = True
+            elif kind is DeclareStmt:
+                writes.add(child.ident.value)
+            elif kind is InputStmt:
+                writes.update(ident.value for ident in child.idents)
+            elif kind is FuncCall:
+                effects = self.effects.get(child.name.value, self.anything)
+                writes |= effects.writes
+                stores = stores or effects.stores
+        return writes, stores
+
+    def kills(self, key, writes, stores):
+        names, access = self.reads(key)
+        return not names.isdisjoint(writes) or (access and stores)
+
+    def call_kills(self, stmt, key):
+        """Whether a call `stmt` makes (outside its blocks) may change the value of `key`."""
+        for node, _ in self.expressions(stmt, deep=False):
+            if isinstance(node, FuncCall):
+                effects = self.effects.get(node.name.value, self.anything)
+                if self.kills(key, effects.writes, effects.stores):
+                    return True
+        return False
+
+    def store_kills(self, stmt, key):
+        """Whether what `stmt` itself assigns may change the value of `key`."""
+        kind = type(stmt)
+        if kind is DeclareStmt:
+            return self.kills(key, {stmt.ident.value}, False)
+        if kind is AssignStmt:
+            if isinstance(stmt.left, Identifier):
+                return self.kills(key, {stmt.left.value}, False)
+            return self.kills(key, set(), True)
+        if kind is InputStmt:
+            return self.kills(key, {ident.value for ident in stmt.idents}, False)
+        return False
+
+    def define(self, stmt, defined):
+        """Adds the variables certain to be defined after `stmt` has run to `defined`."""
+        kind = type(stmt)
+        if kind is DeclareStmt and stmt.expr is not None:
+            names = [stmt.ident.value]
+        elif kind is AssignStmt and isinstance(stmt.left, Identifier):
+            names = [stmt.left.value]
+        elif kind is InputStmt:
+            names = [ident.value for ident in stmt.idents]
+        else:
+            return
+        defined.update(name for name in names if name not in self.valueless)
+
+    # Statements
+
+    def statements(self, stmts, defined, share=True):
+        """Optimizes a block whose statements run with the variables in `defined` defined."""
+        result = []
+        current = set(defined)
+        for stmt in stmts:
+            for new_stmt in self.statement(stmt, current):
+                result.append(new_stmt)
+                self.define(new_stmt, current)
+        return self.share(result, defined) if share else result
+
+    def statement(self, stmt, defined):
+        kind = type(stmt)
+        if kind is IfStmt or kind is WhileStmt:
+            # The condition ran without error, so every variable it reads is defined.
+            inner = defined | (self.variables(stmt.bool_expr) - self.valueless)
+            if kind is WhileStmt:
+                # Invariants leave the body before what is left in it is shared.
+                loop = rebuild(stmt, body=rebuild(stmt.body, stmts=self.statements(stmt.body.stmts, inner, share=False)))
+                return self.hoist(loop, defined)
+            else_block = stmt.else_block
+            if else_block is not None:
+                else_block = rebuild(else_block, stmts=self.statements(else_block.stmts, inner))
+            return [rebuild(stmt, if_block=rebuild(stmt.if_block, stmts=self.statements(stmt.if_block.stmts, inner)),
+                            else_block=else_block)]
+        if kind is TryCatch:
+            return [rebuild(stmt, try_block=rebuild(stmt.try_block, stmts=self.statements(stmt.try_block.stmts, defined)),
+                            catch_block=rebuild(stmt.catch_block, stmts=self.statements(stmt.catch_block.stmts, defined)))]
+        return [stmt]
+
+    def hoist(self, loop, defined):
+        """The statements replacing `loop`, with its invariant expressions computed once."""
+        writes, stores = self.changes(loop)
+        inside = defined | (self.variables(loop.bool_expr) - self.valueless)
+        peel = sum(1 for _ in walk(loop.body)) <= MAX_PEELED_NODES
+        condition, stmts = loop.bool_expr, list(loop.body.stmts)
+        before, first, skipped = [], {}, set()
+        while True:
+            found = None
+            # The first invariant expression to be evaluated is in the condition
+            # or in the first statement that uses it.
+            for index, stmt in [(None, loop)] + list(enumerate(stmts)):
+                nodes = self.nodes(condition) if index is None else self.expressions(stmt, deep=True)
+                for node, fixed in nodes:
+                    key = None if fixed else self.candidate(node)
+                    if key is not None and key not in skipped and not self.kills(key, writes, stores):
+                        found = index, node, key
+                        break
+                if found:
+                    break
+            if found is None:
+                break
+            index, node, key = found
+            if index is None:
+                eligible = self.reach(condition, key, defined) == FOUND
+            else:
+                entry = set(inside)
+                for stmt in stmts[:index]:
+                    self.define(stmt, entry)
+                eligible = peel and self.reach_statement(stmts[index], key, entry) == FOUND
+            if not eligible:
+                skipped.add(key)
+                continue
+            declaration = self.temporary(node)
+            name = declaration.ident.value
+            condition = self.replace(condition, key, name)
+            stmts = [self.replace_statement(stmt, key, name, deep=True) for stmt in stmts]
+            if index is None:
+                before.append(declaration)
+            else:
+                first.setdefault(index, []).append(declaration)
+            self.hoisted += 1
+
+        loop = rebuild(loop, bool_expr=condition, body=rebuild(loop.body, stmts=self.share(stmts, inside)))
+        if not first:
+            return before + [loop]
+        # Run the first iteration, which computes the temporaries, on its own.
+        peeled = []
+        for index, stmt in enumerate(stmts):
+            peeled.extend(first.get(index, ()))
+            peeled.append(stmt)
+        return before + [IfStmt(condition, StmtList(self.share(peeled, inside) + [loop]))]
+
+    def share(self, stmts, defined):
+        """Computes each pure expression used more than once in a run of `stmts` only once."""
+        stmts = list(stmts)
+        defined = set(defined)
+        index = 0
+        skipped = set()
+        while index < len(stmts):
+            stmt = stmts[index]
+            for node, fixed in self.expressions(stmt, deep=False):
+                key = None if fixed else self.candidate(node)
+                if key is None or key in skipped:
+                    continue
+                end = self.run(stmts, index, key)
+                if end is None or self.reach_statement(stmt, key, defined) != FOUND:
+                    skipped.add(key)
+                    continue
+                declaration = self.temporary(node)
+                name = declaration.ident.value
+                stmts[index:end + 1] = [declaration] + [self.replace_statement(stmt, key, name, deep=False)
+                                                        for stmt in stmts[index:end + 1]]
+                self.shared += 1
+                index += 1
+                break
+            else:
+                self.define(stmt, defined)
+                index += 1
+                skipped = set()
+        return stmts
+
+    def run(self, stmts, index, key):
+        """The index of the last statement from `index` on that can share `key`, or None if it is used only once."""
+        uses, end = 0, None
+        for position in range(index, len(stmts)):
+            stmt = stmts[position]
+            if self.call_kills(stmt, key):
+                if position == index:
+                    return None
+                break
+            if isinstance(stmt, WhileStmt) and self.kills(key, *self.changes(stmt)):
+                # The condition is evaluated again after the body has run.
+                break
+            uses += sum(1 for node, fixed in self.expressions(stmt, deep=False) if not fixed and self.key(node) == key)
+            end = position
+            if self.store_kills(stmt, key) or self.blocks(stmt):
+                break
+        return end if uses > 1 else None
+
+def optimize(program):
+    """Optimizes `program` (a Program tree or arena view) and returns the new tree."""
+    return Optimizer(materialize(program)).optimize()
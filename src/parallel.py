@@ -0,0 +1,164 @@
+import gc
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from src.arena import ASTArena
+from src.ast import Program
+from src.error import ParserError
+from src.incremental import split_source
+from src.lexer import RegexLexer, TokenType
+from src.parser import Parser, parse_source
+
+STRUCT_NAME_PATTERN = re.compile(r'\s*struct\s+(\w+)')
+
+# Below this size starting worker processes costs more than it saves.
+MIN_PARALLEL_SIZE = 256 * 1024
+
+def parse_chunk(text, pieces, line, struct_names):
+    """
+    Parses consecutive top-level pieces of a program (see split_source) in a
+    worker. `text` starts at the beginning of the line holding the first piece
+    so columns come out as in a whole-file parse; `line` is that line's number
+    and `struct_names` the structs defined before the chunk.
+
+    Returns ('ok', arena payload, root indices), ('error', exception) for an
+    error the sequential Parser would report the same way, or ('fallback',)
+    when the chunk cannot be judged on its own.
+    """
+    # The chunk's trees are acyclic and dropped once added to the arena, so the
+    # cyclic GC would only rescan them while the worker builds them.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _parse_pieces(text, pieces, line, set(struct_names))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+def _parse_pieces(text, pieces, line, struct_names):
+    arena = ASTArena()
+    roots = []
+    previous = 0
+    for kind, start, end in pieces:
+        line += text.count('\n', previous, start)
+        previous = start
+        try:
+            parser = Parser(RegexLexer(text, start, end, line).stream())
+            parser.struct_names = struct_names
+            if kind != 'main' and parser.current_token.type not in (TokenType.FUNC, TokenType.STRUCT):
+                # Stray tokens before the definition: Parser.program() would
+                # stop its definition loop here and expect `main`.
+                return ('fallback',)
+            if kind == 'func':
+                node = parser.func_def()
+            elif kind == 'struct':
+                node = parser.struct_def()
+            else:
+                node = parser.main_def()
+                parser.eat(TokenType.RBRACE)
+            if kind != 'main' and parser.current_token.type != TokenType.EOF:
+                return ('fallback',)
+        except ParserError as e:
+            # Running into the end of a piece says nothing about what the next
+            # piece would have supplied; only the main piece ends at the real EOF.
+            if kind != 'main' and e.token is not None and e.token.type == TokenType.EOF:
+                return ('fallback',)
+            return ('error', e)
+        except RecursionError:
+            return ('fallback',)
+        except Exception as e:
+            # Lexer errors depend only on the text up to the bad character.
+            return ('error', e)
+        roots.append(arena.add(node))
+    return ('ok', arena.to_payload(), roots)
+
+def parse_parallel(source, jobs=None, executor=None, min_size=MIN_PARALLEL_SIZE):
+    """
+    Parses one program with its top-level definitions split across worker
+    processes, returning the same Program (and raising the same errors, at the
+    same positions) as parse_source.
+
+    The source is cut at top-level func/struct boundaries by split_source and
+    grouped into a few chunks per worker; each chunk comes back as an ASTArena
+    payload. The first chunk that reports an error decides the error, as every
+    chunk before it parsed cleanly. Whenever a chunk cannot be judged on its
+    own, or the source is small, the sequential Parser is used instead. Pass an
+    `executor` to reuse worker processes across calls.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    pieces = split_source(source) if len(source) >= min_size else None
+    if pieces is None or len(pieces) < 3:
+        return parse_source(source)
+
+    _, header_start, header_end = pieces[0]
+    header = Parser(RegexLexer(source, header_start, header_end).stream())
+    try:
+        name = header.program_header()
+    except Exception:
+        return parse_source(source)
+    if header.current_token.type != TokenType.EOF:
+        return parse_source(source)
+
+    chunks = _make_chunks(source, pieces[1:], jobs * 4)
+    if chunks is None:
+        return parse_source(source)
+
+    if executor is None and jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(parse_chunk, *zip(*chunks)))
+    elif executor is not None:
+        results = list(executor.map(parse_chunk, *zip(*chunks)))
+    else:
+        results = [parse_chunk(*chunk) for chunk in chunks]
+
+    struct_defs = []
+    func_defs = []
+    main_block = None
+    for (_, chunk_pieces, _, _), result in zip(chunks, results):
+        if result[0] == 'error':
+            raise result[1]
+        if result[0] != 'ok':
+            return parse_source(source)
+        _, payload, roots = result
+        arena = ASTArena.from_payload(payload)
+        ends = roots[1:] + [len(arena)]
+        for (kind, _, _), root, end in zip(chunk_pieces, roots, ends):
+            node = arena.to_tree(root, end)
+            if kind == 'struct':
+                struct_defs.append(node)
+            elif kind == 'func':
+                func_defs.append(node)
+            else:
+                main_block = node
+    return Program(name, struct_defs, func_defs, main_block)
+
+def _make_chunks(source, pieces, count):
+    """
+    Groups pieces into about `count` chunks of similar size, as parse_chunk
+    arguments. Returns None if a struct name cannot be read off its text.
+    """
+    target = max(1, (pieces[-1][2] - pieces[0][1]) // count)
+    chunks = []
+    struct_names = []
+    line = 1
+    previous = 0
+    group = []
+    for index, (kind, start, end) in enumerate(pieces):
+        group.append((kind, start, end))
+        if kind == 'struct':
+            match = STRUCT_NAME_PATTERN.match(source, start, end)
+            if match is None:
+                return None
+            struct_names.append(match.group(1))
+        if end - group[0][1] < target and index != len(pieces) - 1:
+            continue
+        chunk_start = group[0][1]
+        line_start = source.rfind('\n', 0, chunk_start) + 1
+        line += source.count('\n', previous, line_start)
+        previous = line_start
+        context = tuple(struct_names[:len(struct_names) - sum(1 for piece in group if piece[0] == 'struct')])
+        relative = [(kind, start - line_start, end - line_start) for kind, start, end in group]
+        chunks.append((source[line_start:group[-1][2]], relative, line, context))
+        group = []
+    return chunks
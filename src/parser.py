@@ -1,4 +1,4 @@
-from src.lexer import TokenType
+from src.lexer import TokenType, TokenStream, RegexLexer
 from src.ast import (
     Program, FuncDef, StructDef, StmtList, DeclareStmt, AssignStmt, IfStmt, WhileStmt,
     InputStmt, OutputStmt, ReturnStmt, FuncCall, StructInit, MemberAccess,
@@ -7,19 +7,49 @@ from src.ast import (
 )
 from src.error import ParserError
 
+def parse_source(source):
+    """Lexes and parses a complete L25 source string into a Program."""
+    return Parser(RegexLexer(source).stream()).parse()
+
+# Binding strength of binary operators; higher binds tighter. Unary operators
+# bind tighter than any binary operator but looser than calls, indexing and
+# member access.
+BINARY_PRECEDENCE = {
+    TokenType.PLUS: 1, TokenType.MINUS: 1,
+    TokenType.MULTIPLY: 2, TokenType.DIVIDE: 2,
+}
+UNARY_OPERATORS = (TokenType.PLUS, TokenType.MINUS)
+UNARY_PRECEDENCE = 3
+
+# Constructs that interrupt an expression in Parser.expression
+_GROUP, _CALL, _INDEX, _ARRAY = range(4)
+
+def reduce_operators(operands, pending, node, precedence):
+    """Folds pending operators binding at least as tightly as `precedence` into `node`."""
+    while pending and pending[-1][0] >= precedence:
+        op_precedence, op = pending.pop()
+        if op_precedence == UNARY_PRECEDENCE:
+            node = UnaryOp(op, node)
+        else:
+            node = BinaryOp(operands.pop(), op, node)
+    return node
+
 class Parser:
     def __init__(self, tokens):
+        # Accepts a full token list (as produced by Lexer.tokens()) or a lazily
+        # fed TokenStream (Lexer.stream()); both are consumed front to back.
+        if not isinstance(tokens, TokenStream):
+            tokens = TokenStream(tokens)
         self.tokens = tokens
-        self.pos = 0
-        self.current_token = self.tokens[self.pos]
+        self.current_token = self.tokens.next()
         self.struct_names = set() # Keep track of defined struct types
 
     def advance(self):
-        self.pos += 1
-        if self.pos < len(self.tokens):
-            self.current_token = self.tokens[self.pos]
-        else:
-            self.current_token = None # Should be EOF token
+        self.current_token = self.tokens.next() # None once the tokens run out
+
+    def peek(self, offset=0):
+        """Looks at the token after the current one without consuming anything."""
+        return self.tokens.peek(offset)
 
     def error(self, message):
         raise ParserError(message, self.current_token)
@@ -36,9 +66,7 @@ class Parser:
         return self.program()
 
     def program(self):
-        self.eat(TokenType.PROGRAM)
-        name = Identifier(self.eat(TokenType.IDENT))
-        self.eat(TokenType.LBRACE)
+        name = self.program_header()
         
         struct_defs = []
         func_defs = []
@@ -48,13 +76,23 @@ class Parser:
             else:
                 func_defs.append(self.func_def())
 
+        main_block = self.main_def()
+        self.eat(TokenType.RBRACE)
+        
+        return Program(name, struct_defs, func_defs, main_block)
+
+    def program_header(self):
+        self.eat(TokenType.PROGRAM)
+        name = Identifier(self.eat(TokenType.IDENT))
+        self.eat(TokenType.LBRACE)
+        return name
+
+    def main_def(self):
         self.eat(TokenType.MAIN)
         self.eat(TokenType.LBRACE)
         main_block = self.stmt_list()
         self.eat(TokenType.RBRACE)
-        self.eat(TokenType.RBRACE)
-        
-        return Program(name, struct_defs, func_defs, main_block)
+        return main_block
     
     def struct_def(self):
         self.eat(TokenType.STRUCT)
@@ -218,75 +256,119 @@ class Parser:
         return BoolExpr(left, op_token, right)
 
     def expr(self):
-        node = self.term()
-        while self.current_token and self.current_token.type in (TokenType.PLUS, TokenType.MINUS):
-            op = self.eat(self.current_token.type)
-            node = BinaryOp(left=node, op=op, right=self.term())
-        return node
-
-    def term(self):
-        node = self.factor()
-        while self.current_token and self.current_token.type in (TokenType.MULTIPLY, TokenType.DIVIDE):
-            op = self.eat(self.current_token.type)
-            node = BinaryOp(left=node, op=op, right=self.factor())
-        return node
-
-    def factor(self):
-        token = self.current_token
-        if token.type == TokenType.PLUS:
-            self.eat(TokenType.PLUS)
-            return UnaryOp(op=token, expr=self.factor())
-        elif token.type == TokenType.MINUS:
-            self.eat(TokenType.MINUS)
-            return UnaryOp(op=token, expr=self.factor())
-        else:
-            return self.call_access()
-            
+        return self.expression(binary=True)
+
     def call_access(self):
-        node = self.primary()
-        while self.current_token.type in (TokenType.LPAREN, TokenType.LBRACKET, TokenType.DOT):
-            if self.current_token.type == TokenType.LPAREN:
-                self.eat(TokenType.LPAREN)
-                args = self.arg_list() if self.current_token.type != TokenType.RPAREN else []
-                self.eat(TokenType.RPAREN)
-                # Check if it's a struct initialization or a function call
-                if isinstance(node, Identifier) and node.value in self.struct_names:
-                    node = StructInit(node, args)
+        """A primary followed by calls, indexing and member accesses (a statement head)."""
+        return self.expression(binary=False)
+
+    def expression(self, binary):
+        """
+        Precedence-climbing expression parser driven by BINARY_PRECEDENCE.
+
+        Parentheses, argument lists, indices and array literals push a frame
+        holding the interrupted operand and operator stacks instead of
+        recursing, so nesting depth is not bounded by the recursion limit.
+        Unary operators wait on the operator stack above every binary operator,
+        and postfix operations apply to an operand before anything is reduced,
+        which yields the same trees as the grammar's expr/term/factor levels.
+        With `binary` False the outermost level stops after its postfix chain.
+        """
+        next_token = self.tokens.next
+        frames = []
+        operands = []
+        pending = []  # (precedence, operator token) not yet folded into a node
+        while True:
+            # Prefix operators and a primary
+            token = self.current_token
+            if binary or frames:
+                while token.type in UNARY_OPERATORS:
+                    pending.append((UNARY_PRECEDENCE, token))
+                    token = self.current_token = next_token()
+            token_type = token.type
+            if token_type == TokenType.IDENT:
+                node = Identifier(token)
+                self.current_token = next_token()
+            elif token_type == TokenType.NUMBER:
+                node = Number(token)
+                self.current_token = next_token()
+            elif token_type == TokenType.STRING:
+                node = String(token)
+                self.current_token = next_token()
+            elif token_type == TokenType.LPAREN:
+                self.current_token = next_token()
+                frames.append((_GROUP, None, operands, pending))
+                operands, pending = [], []
+                continue
+            elif token_type == TokenType.LBRACKET:
+                self.current_token = next_token()
+                if self.current_token.type != TokenType.RBRACKET:
+                    frames.append((_ARRAY, [], operands, pending))
+                    operands, pending = [], []
+                    continue
+                self.current_token = next_token()
+                node = ArrayLiteral([])
+            else:
+                self.error("Invalid syntax for expression.")
+
+            while True:
+                # Postfix operations
+                token_type = self.current_token.type
+                if token_type == TokenType.LPAREN:
+                    self.current_token = next_token()
+                    if self.current_token.type != TokenType.RPAREN:
+                        frames.append((_CALL, (node, []), operands, pending))
+                        operands, pending = [], []
+                        break
+                    self.current_token = next_token()
+                    node = self.call(node, [])
+                    continue
+                if token_type == TokenType.LBRACKET:
+                    self.current_token = next_token()
+                    frames.append((_INDEX, node, operands, pending))
+                    operands, pending = [], []
+                    break
+                if token_type == TokenType.DOT:
+                    self.current_token = next_token()
+                    node = MemberAccess(node, Identifier(self.eat(TokenType.IDENT)))
+                    continue
+
+                # A binary operator: fold what binds at least as tightly, then read its right operand
+                precedence = BINARY_PRECEDENCE.get(token_type) if binary or frames else None
+                if precedence is not None:
+                    operands.append(reduce_operators(operands, pending, node, precedence))
+                    pending.append((precedence, self.current_token))
+                    self.current_token = next_token()
+                    break
+
+                # End of the (sub)expression: close the innermost frame
+                node = reduce_operators(operands, pending, node, 0)
+                if not frames:
+                    return node
+                kind, data, operands, pending = frames.pop()
+                if kind == _GROUP:
+                    self.eat(TokenType.RPAREN)
+                    continue
+                if kind == _INDEX:
+                    self.eat(TokenType.RBRACKET)
+                    node = ArrayAccess(data, node)
+                    continue
+                args = data[1] if kind == _CALL else data
+                args.append(node)
+                if self.current_token.type == TokenType.COMMA:
+                    self.current_token = next_token()
+                    frames.append((kind, data, operands, pending))
+                    operands, pending = [], []
+                    break
+                if kind == _CALL:
+                    self.eat(TokenType.RPAREN)
+                    node = self.call(*data)
                 else:
-                    node = FuncCall(node, args)
-            elif self.current_token.type == TokenType.LBRACKET:
-                self.eat(TokenType.LBRACKET)
-                index_expr = self.expr()
-                self.eat(TokenType.RBRACKET)
-                node = ArrayAccess(node, index_expr)
-            elif self.current_token.type == TokenType.DOT:
-                self.eat(TokenType.DOT)
-                member_ident = Identifier(self.eat(TokenType.IDENT))
-                node = MemberAccess(node, member_ident)
-        return node
-
-    def primary(self):
-        token = self.current_token
-        if token.type == TokenType.NUMBER:
-            self.eat(TokenType.NUMBER)
-            return Number(token)
-        if token.type == TokenType.STRING:
-            self.eat(TokenType.STRING)
-            return String(token)
-        if token.type == TokenType.LPAREN:
-            self.eat(TokenType.LPAREN)
-            node = self.expr()
-            self.eat(TokenType.RPAREN)
-            return node
-        if token.type == TokenType.IDENT:
-            return Identifier(self.eat(TokenType.IDENT))
-        if token.type == TokenType.LBRACKET:
-            return self.array_literal()
-        
-        self.error("Invalid syntax for expression.")
+                    self.eat(TokenType.RBRACKET)
+                    node = ArrayLiteral(args)
 
-    def array_literal(self):
-        self.eat(TokenType.LBRACKET)
-        elements = self.arg_list() if self.current_token.type != TokenType.RBRACKET else []
-        self.eat(TokenType.RBRACKET)
-        return ArrayLiteral(elements)
\ No newline at end of file
+    def call(self, node, args):
+        # Check if it's a struct initialization or a function call
+        if isinstance(node, Identifier) and node.value in self.struct_names:
+            return StructInit(node, args)
+        return FuncCall(node, args)
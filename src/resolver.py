@@ -0,0 +1,393 @@
+from functools import partial
+
+from src.arena import SCHEMA, NODE, LIST, materialize
+from src.ast import FuncDef, DeclareStmt, ReturnStmt, FuncCall, Identifier
+from src.error import InterpreterError
+from src.interpreter import Interpreter, ReturnValue, StructDefinition
+from src.memo import DEFAULT_MEMO_SIZE
+
+_MISSING = object()
+
+# Frame depths of an Address: the frame of the running function (main's is the
+# global frame) and, seen from a function, the global frame.
+LOCAL = 0
+GLOBAL = 1
+
+class Address:
+    """
+    Where a name lives: slot `slot` of the frame at `depth` (None when no frame
+    has a slot for it, so it is never defined). `fallback` is the global slot a
+    function local falls back to while its `let` has not run yet, and `checked`
+    is False when the resolver proved the slot always holds a value there.
+    """
+    __slots__ = ('depth', 'slot', 'fallback', 'checked')
+
+    def __init__(self, depth, slot, fallback=None, checked=True):
+        self.depth = depth
+        self.slot = slot
+        self.fallback = fallback
+        self.checked = checked
+
+    def __repr__(self):
+        return f"Address(depth={self.depth}, slot={self.slot}, fallback={self.fallback}, checked={self.checked})"
+
+class FrameLayout:
+    """Slot names of a function frame; its parameters take the slots in `param_slots`."""
+    __slots__ = ('names', 'param_slots')
+
+    def __init__(self, names, param_slots):
+        self.names = names
+        self.param_slots = param_slots
+
+class Resolution:
+    """
+    Result of resolving a Program: the Address of every name occurrence (keyed
+    by its Identifier node), the FrameLayout of every FuncDef, the global slot
+    names, and the undefined-variable errors found before running.
+    """
+    def __init__(self):
+        self.addresses = {}
+        self.frames = {}
+        self.global_names = []
+        self.errors = []
+
+class Resolver:
+    """
+    Binds every variable, function and struct name of a Program to a frame
+    slot, following Interpreter's scoping: main's variables and the function
+    and struct names share the global frame; a function frame holds its
+    parameters and every name it declares, anywhere in its body, and falls back
+    to the global frame.
+
+    A read is left unchecked when the name is a parameter or was declared with
+    a value by an earlier top-level statement of the same body (and never by a
+    `let x;`). A name with no slot anywhere can never be defined: using it is
+    reported in Resolution.errors.
+    """
+    def __init__(self, program):
+        self.program = program
+        self.resolution = Resolution()
+        self.global_slots = {}
+
+    def resolve(self):
+        program = self.program
+        for struct_def in program.struct_defs:
+            self.global_slot(struct_def.name.value)
+        for func_def in program.func_defs:
+            self.global_slot(func_def.name.value)
+        for node in self.walk(program.main_block):
+            if isinstance(node, DeclareStmt):
+                self.global_slot(node.ident.value)
+
+        for func_def in program.func_defs:
+            names = {}
+            for param in func_def.params:
+                names.setdefault(param.value, len(names))
+            param_slots = [names[param.value] for param in func_def.params]
+            for node in self.walk(func_def.body):
+                if isinstance(node, DeclareStmt):
+                    names.setdefault(node.ident.value, len(names))
+            self.resolution.frames[func_def] = FrameLayout(list(names), param_slots)
+            self.begin(names, [param.value for param in func_def.params], func_def.body)
+            self.statements(func_def.body.stmts, top_level=True)
+
+        self.begin(None, (), program.main_block)
+        self.statements(program.main_block.stmts, top_level=True)
+        self.resolution.global_names = list(self.global_slots)
+        return self.resolution
+
+    def global_slot(self, name):
+        return self.global_slots.setdefault(name, len(self.global_slots))
+
+    def walk(self, node):
+        """`node` and every node below it, in source order (slots are numbered in that order)."""
+        pending = [node]
+        while pending:
+            node = pending.pop()
+            yield node
+            children = []
+            for name, field_kind in SCHEMA[type(node)]:
+                if field_kind == NODE:
+                    child = getattr(node, name)
+                    if child is not None:
+                        children.append(child)
+                elif field_kind == LIST:
+                    children.extend(getattr(node, name))
+            pending.extend(reversed(children))
+
+    def begin(self, locals_, definite, body):
+        # `locals_` is None in main, whose frame is the global frame.
+        self.locals = locals_
+        self.definite = set(definite)
+        self.valueless = {node.ident.value for node in self.walk(body)
+                          if isinstance(node, DeclareStmt) and node.expr is None}
+
+    def address(self, name):
+        checked = name not in self.definite or name in self.valueless
+        if self.locals is not None:
+            if name in self.locals:
+                return Address(LOCAL, self.locals[name], self.global_slots.get(name), checked)
+            if name in self.global_slots:
+                return Address(GLOBAL, self.global_slots[name])
+        elif name in self.global_slots:
+            return Address(LOCAL, self.global_slots[name], None, checked)
+        return Address(None, None)
+
+    def bind(self, ident, message=None):
+        """Records the Address of `ident`, reporting `message` if the name can never be defined."""
+        address = self.address(ident.value)
+        self.resolution.addresses[ident] = address
+        if address.depth is None and message is not None:
+            self.resolution.errors.append(InterpreterError(message, ident.token))
+
+    # Statements
+
+    def statements(self, stmts, top_level=False):
+        for stmt in stmts:
+            self.node(stmt)
+            # Only a declaration at the top level of a body is certain to have
+            # run before the statements after it.
+            if top_level and isinstance(stmt, DeclareStmt) and stmt.expr is not None:
+                self.definite.add(stmt.ident.value)
+
+    def node(self, node):
+        getattr(self, f'resolve_{type(node).__name__}', self.generic_node)(node)
+
+    def generic_node(self, node):
+        for name, field_kind in SCHEMA[type(node)]:
+            if field_kind == NODE:
+                child = getattr(node, name)
+                if child is not None:
+                    self.node(child)
+            elif field_kind == LIST:
+                for child in getattr(node, name):
+                    self.node(child)
+
+    def resolve_StmtList(self, node):
+        self.statements(node.stmts)
+
+    def resolve_DeclareStmt(self, node):
+        if node.expr is not None:
+            self.node(node.expr)
+        self.bind(node.ident)
+
+    def resolve_AssignStmt(self, node):
+        self.node(node.expr)
+        if isinstance(node.left, Identifier):
+            self.bind(node.left, f"Variable '{node.left.value}' not defined before assignment.")
+        else:
+            self.node(node.left)
+
+    def resolve_InputStmt(self, node):
+        for ident in node.idents:
+            self.bind(ident, f"Variable '{ident.value}' not defined before assignment.")
+
+    # Expressions
+
+    def resolve_Identifier(self, node):
+        self.bind(node, f"Variable or struct '{node.value}' not defined.")
+
+    def resolve_FuncCall(self, node):
+        self.bind(node.name, f"'{node.name.value}' is not a function")
+        for arg in node.args:
+            self.node(arg)
+
+    def resolve_StructInit(self, node):
+        self.bind(node.name, f"'{node.name.value}' is not a defined struct type.")
+        for arg in node.args:
+            self.node(arg)
+
+    def resolve_MemberAccess(self, node):
+        # The member name is not a variable.
+        self.node(node.struct_expr)
+
+def resolve(program):
+    """Resolves `program` (a Program tree or arena view) and returns its Resolution."""
+    return Resolver(materialize(program)).resolve()
+
+class SlotInterpreter(Interpreter):
+    """
+    Interpreter running on the frames laid out by Resolver: each call gets a
+    list with one slot per local, every name is read and written at the
+    Address resolved for it, and the global frame is a list too. Reads the
+    resolver proved safe skip the undefined-variable check.
+
+    _MISSING marks a slot whose name does not exist yet in that frame (a
+    variable of a Scope's dict that is not there); None is still `let x;`.
+    """
+    def __init__(self, parser=None, tree=None, loop_idioms=True, typed=True, memoize=True, memo_size=DEFAULT_MEMO_SIZE):
+        # The resolution is keyed on nodes, which arena views do not keep.
+        super().__init__(tree=materialize(tree if tree is not None else parser.parse()),
+                         loop_idioms=loop_idioms, typed=typed, memoize=memoize, memo_size=memo_size)
+        self.resolution = None
+        self.addresses = None
+        self.globals = None
+        self.frame = None
+        self.visitors = {}
+
+    def interpret(self):
+        self.resolution = resolve(self.tree)
+        self.addresses = self.resolution.addresses
+        return self.visit(self.tree)
+
+    def visit(self, node, scope=None):
+        # Frames are switched by visit_FuncCall alone, so there is no scope to restore here.
+        visitor = self.visitors.get(type(node))
+        if visitor is None:
+            visitor = self.visitors[type(node)] = getattr(self, f'visit_{type(node).__name__}', self.generic_visit)
+        return visitor(node)
+
+    def visit_Program(self, node):
+        self.globals = [_MISSING] * len(self.resolution.global_names)
+        slots = {name: slot for slot, name in enumerate(self.resolution.global_names)}
+        for struct_def in node.struct_defs:
+            self.globals[slots[struct_def.name.value]] = StructDefinition(struct_def.name.value, struct_def.fields)
+        for func_def in node.func_defs:
+            self.globals[slots[func_def.name.value]] = func_def
+        self.frame = self.globals
+        self.visit(node.main_block)
+
+    def lookup(self, address):
+        """The value at `address`; _MISSING or None if the name is not defined (Scope.get)."""
+        if address.depth == LOCAL:
+            value = self.frame[address.slot]
+            if value is _MISSING and address.fallback is not None:
+                value = self.globals[address.fallback]
+            return value
+        if address.depth == GLOBAL:
+            return self.globals[address.slot]
+        return _MISSING
+
+    def store(self, address, name, value):
+        """Assigns an existing variable (Scope.set)."""
+        if address.depth == LOCAL:
+            if self.frame[address.slot] is not _MISSING:
+                self.frame[address.slot] = value
+                return
+            if address.fallback is not None and self.globals[address.fallback] is not _MISSING:
+                self.globals[address.fallback] = value
+                return
+        elif address.depth == GLOBAL and self.globals[address.slot] is not _MISSING:
+            self.globals[address.slot] = value
+            return
+        raise InterpreterError(f"Variable '{name}' not defined before assignment.")
+
+    def variable_setter(self, ident):
+        address = self.addresses[ident]
+        if address.depth == LOCAL and self.frame[address.slot] is not _MISSING:
+            return partial(self.frame.__setitem__, address.slot)
+        if address.depth == LOCAL and address.fallback is not None and self.globals[address.fallback] is not _MISSING:
+            return partial(self.globals.__setitem__, address.fallback)
+        if address.depth == GLOBAL and self.globals[address.slot] is not _MISSING:
+            return partial(self.globals.__setitem__, address.slot)
+        raise InterpreterError(f"Variable '{ident.value}' not defined before assignment.")
+
+    def visit_DeclareStmt(self, node):
+        val = None
+        if node.expr:
+            val = self.visit(node.expr)
+        self.frame[self.addresses[node.ident].slot] = val
+
+    def visit_AssignStmt(self, node):
+        if isinstance(node.left, Identifier):
+            self.store(self.addresses[node.left], node.left.value, self.visit(node.expr))
+        else:
+            super().visit_AssignStmt(node)
+
+    def visit_InputStmt(self, node):
+        for ident in node.idents:
+            try:
+                val = input()
+                # Attempt to convert to int, otherwise treat as string
+                try:
+                    val = int(val)
+                except ValueError:
+                    pass
+                self.store(self.addresses[ident], ident.value, val)
+            except Exception:
+                raise InterpreterError(f"Failed to read input for '{ident.value}'", ident.token)
+
+    def visit_FuncCall(self, node):
+        caller_frame = self.frame
+        try:
+            # As in Interpreter, a call in tail position reuses this loop.
+            while True:
+                func_name = node.name.value
+                func = self.lookup(self.addresses[node.name])
+                if not isinstance(func, FuncDef):
+                    raise InterpreterError(f"'{func_name}' is not a function", node.name.token)
+
+                if len(node.args) != len(func.params):
+                    raise InterpreterError(f"Function '{func_name}' expects {len(func.params)} arguments but got {len(node.args)}", node.name.token)
+
+                if self.memo_tables:
+                    table = self.memo_tables.get(func)
+                    if table is not None:
+                        return table.call(self.call_function, func, [self.visit(arg_expr) for arg_expr in node.args])
+
+                layout = self.resolution.frames[func]
+                frame = [_MISSING] * len(layout.names)
+                for slot, arg_expr in zip(layout.param_slots, node.args):
+                    frame[slot] = self.visit(arg_expr)
+
+                self.frame = frame
+                stmts = func.body.stmts
+                last = len(stmts) - 1
+                for index in range(last):
+                    self.visit(stmts[index])
+                if last < 0:
+                    return None
+                if not isinstance(stmts[last], ReturnStmt):
+                    self.visit(stmts[last])
+                    return None
+                result = stmts[last].expr
+                if isinstance(result, FuncCall):
+                    node = result
+                    continue
+                return self.visit(result)
+        except ReturnValue as ret:
+            return ret.value
+        finally:
+            self.frame = caller_frame
+
+    def call_function(self, func, args):
+        caller_frame = self.frame
+        try:
+            layout = self.resolution.frames[func]
+            frame = [_MISSING] * len(layout.names)
+            for slot, value in zip(layout.param_slots, args):
+                frame[slot] = value
+            self.frame = frame
+            stmts = func.body.stmts
+            last = len(stmts) - 1
+            for index in range(last):
+                self.visit(stmts[index])
+            if last < 0:
+                return None
+            if not isinstance(stmts[last], ReturnStmt):
+                self.visit(stmts[last])
+                return None
+            return self.visit(stmts[last].expr)
+        except ReturnValue as ret:
+            return ret.value
+        finally:
+            self.frame = caller_frame
+
+    def visit_Identifier(self, node):
+        address = self.addresses[node]
+        if not address.checked:
+            return self.frame[address.slot]
+        val = self.lookup(address)
+        if val is None or val is _MISSING:
+            raise InterpreterError(f"Variable or struct '{node.value}' not defined.", node.token)
+        return val
+
+    def visit_StructInit(self, node):
+        struct_name = node.name.value
+        blueprint = self.lookup(self.addresses[node.name])
+        if not isinstance(blueprint, StructDefinition):
+            raise InterpreterError(f"'{struct_name}' is not a defined struct type.", node.name.token)
+        if len(node.args) != len(blueprint.fields):
+            raise InterpreterError(f"Struct '{struct_name}' expects {len(blueprint.fields)} fields but got {len(node.args)}", node.name.token)
+
+        return blueprint.new(struct_name, [self.visit(arg_expr) for arg_expr in node.args])
@@ -0,0 +1,100 @@
+from threading import get_ident
+
+_MISSING = object()
+
+# Instances whose repr is being computed, with the thread computing it.
+_repr_running = set()
+
+def field_slot(name):
+    """Name of the slot holding the field `name` of a struct instance."""
+    return f"f_{name}"
+
+def struct_class(type_name, fields):
+    """
+    The StructInstance subclass for instances of `type_name` with `fields`
+    (names, repeats allowed): one slot per distinct field, in order of first
+    appearance, so each field sits at a fixed offset of every instance.
+    """
+    field_slots = {name: field_slot(name) for name in fields}
+    # Named like its base, which is the type name error messages show.
+    return type('StructInstance', (StructInstance,), {
+        '__slots__': tuple(field_slots.values()),
+        'type_name': type_name,
+        'field_slots': field_slots,
+        'init_slots': tuple(field_slots[name] for name in fields),
+    })
+
+class StructDefinition:
+    """Represents the blueprint of a struct."""
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = [field.value for field in fields]
+        # Instance class by the name the struct is instantiated under.
+        self.classes = {}
+
+    def instance_class(self, type_name):
+        cls = self.classes.get(type_name)
+        if cls is None:
+            cls = self.classes[type_name] = struct_class(type_name, self.fields)
+        return cls
+
+    def new(self, type_name, values):
+        """An instance named `type_name` whose fields take `values`, in declaration order."""
+        return self.instance_class(type_name)(values)
+
+class StructInstance:
+    """
+    Represents an instance of a struct. Each struct has its own subclass (see
+    struct_class) with a slot per declared field; members the program assigns
+    without the struct declaring them are kept in the `extra` dict. Engines
+    read a member `name` with getattr(instance, field_slot(name), default)
+    and fall back to get() for the members in `extra`.
+    """
+    __slots__ = ('extra',)
+    type_name = None
+    # Slot of each declared field, by name, in declaration order.
+    field_slots = {}
+    # Slot each value given to the constructor goes to.
+    init_slots = ()
+
+    def __init__(self, values):
+        self.extra = None
+        for slot, value in zip(self.init_slots, values):
+            setattr(self, slot, value)
+
+    def get(self, name, default=None):
+        """The member `name`, or `default` if the instance has none."""
+        value = getattr(self, field_slot(name), _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.extra is None:
+            return default
+        return self.extra.get(name, default)
+
+    def set(self, name, value):
+        try:
+            setattr(self, field_slot(name), value)
+        except AttributeError:
+            if self.extra is None:
+                self.extra = {name: value}
+            else:
+                self.extra[name] = value
+
+    @property
+    def members(self):
+        """A dict of every member, declared fields first."""
+        members = {name: getattr(self, slot) for name, slot in self.field_slots.items()}
+        if self.extra:
+            members.update(self.extra)
+        return members
+
+    def __repr__(self):
+        # As the repr of a members dict would, show an instance inside itself as {...}.
+        key = (id(self), get_ident())
+        if key in _repr_running:
+            return f"<Struct {self.type_name}: {{...}}>"
+        _repr_running.add(key)
+        try:
+            return f"<Struct {self.type_name}: {self.members}>"
+        finally:
+            _repr_running.discard(key)
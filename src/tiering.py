@@ -0,0 +1,309 @@
+from operator import attrgetter
+
+from src.arena import materialize
+from src.arrays import ARRAY_TYPES
+from src.ast import (
+    FuncDef, ReturnStmt, FuncCall, BinaryOp, UnaryOp, Identifier, Number, String
+)
+from src.closure import ClosureCompiler, assigned_names, binary_value
+from src.error import InterpreterError
+from src.inference import INT_OPERATORS, concatenate
+from src.interpreter import Interpreter, ReturnValue, Scope, StructInstance
+from src.lexer import TokenType
+
+# Generic calls of a function before it is specialized.
+DEFAULT_THRESHOLD = 100
+
+def signature(types):
+    """`types` (None for an argument of any type) as shown in the stats report."""
+    return ', '.join(value_type.__name__ if value_type is not None else 'any' for value_type in types)
+
+class FunctionProfile:
+    """
+    Calls of one FuncDef: `types` holds, per parameter, the type of every
+    argument seen since it was last (de)specialized, or None once two differed.
+    `code` is the specialized version while there is one, and `guard` the
+    (position, type) pairs an argument list must match to run it.
+    """
+    __slots__ = ('func', 'calls', 'types', 'code', 'guard', 'generic_calls', 'specialized_calls', 'deopts')
+
+    def __init__(self, func, args):
+        self.func = func
+        self.calls = 0
+        self.types = [type(value) for value in args]
+        self.code = None
+        self.guard = ()
+        self.generic_calls = 0
+        self.specialized_calls = 0
+        self.deopts = 0
+
+    def observe(self, args):
+        self.calls += 1
+        self.generic_calls += 1
+        self.types = [value_type if type(value) is value_type else None for value_type, value in zip(self.types, args)]
+
+class TailCall:
+    """A final `return f(...)` of specialized code, for TieredInterpreter.call_function to run."""
+    __slots__ = ('func', 'args')
+
+    def __init__(self, func, args):
+        self.func = func
+        self.args = args
+
+class SpecializingCompiler(ClosureCompiler):
+    """
+    Compiles one FuncDef into closures (see ClosureCompiler) for arguments of
+    the types in `types`, None meaning any type. A parameter the body never
+    declares or assigns keeps its argument's type, so arithmetic, indexing
+    and member access on such parameters (and on literals and the results of
+    arithmetic on them) skip the type checks that cannot fail. The functions
+    the body calls run through `interpreter.invoke`, in whatever tier they are,
+    except for a final `return f(...)`, which returns a TailCall instead.
+    """
+    def __init__(self, interpreter, program, func_def, types):
+        super().__init__(interpreter, program)
+        # The expression of the final return of the function being compiled.
+        self.tail = None
+        rebound = assigned_names(func_def.body)
+        self.known = {param.value: value_type for param, value_type in zip(func_def.params, types)
+                      if value_type is not None and param.value not in rebound}
+
+    def specialize(self, func_def):
+        """The specialized version of `func_def`: a function taking the argument list."""
+        params = tuple(param.value for param in func_def.params)
+        stmts = func_def.body.stmts
+        if stmts and isinstance(stmts[-1], ReturnStmt):
+            self.tail = stmts[-1].expr
+        run = self.compile_function(func_def)
+        def call(args):
+            return run(dict(zip(params, args)))
+        return call
+
+    def static_type(self, node):
+        """The Python type every value of expression `node` has, if known."""
+        if isinstance(node, Number):
+            return int
+        if isinstance(node, String):
+            return str
+        if isinstance(node, Identifier):
+            return self.known.get(node.value)
+        if isinstance(node, UnaryOp):
+            operand = self.static_type(node.expr)
+            if node.op.type == TokenType.MINUS:
+                return int if operand is int else None
+            return operand
+        if isinstance(node, BinaryOp):
+            left, right = self.static_type(node.left), self.static_type(node.right)
+            if left is int and right is int:
+                return int
+            if node.op.type == TokenType.PLUS and str in (left, right) and None not in (left, right):
+                return str
+        return None
+
+    def compile_Identifier(self, node):
+        name = node.value
+        if name in self.known:
+            # A parameter nothing rebinds is always in the frame, never None.
+            return lambda frame: frame[name]
+        return super().compile_Identifier(node)
+
+    def compile_BinaryOp(self, node):
+        left_type, right_type = self.static_type(node.left), self.static_type(node.right)
+        op = node.op.type
+        if left_type is int and right_type is int:
+            left, right = self.compile(node.left), self.compile(node.right)
+            if op == TokenType.DIVIDE:
+                token, state = node.op, self.state
+                def evaluate(frame):
+                    a = left(frame)
+                    b = right(frame)
+                    if b:
+                        return a // b
+                    return binary_value(op, a, b, token, state)
+                return evaluate
+            operation = INT_OPERATORS[op]
+            return lambda frame: operation(left(frame), right(frame))
+        if op == TokenType.PLUS and self.static_type(node) is str:
+            left, right = self.compile(node.left), self.compile(node.right)
+            return lambda frame: concatenate(left(frame), right(frame))
+        return super().compile_BinaryOp(node)
+
+    def compile_ArrayAccess(self, node):
+        array_type = self.static_type(node.ident)
+        if array_type is None or not issubclass(array_type, ARRAY_TYPES) or self.static_type(node.index_expr) is not int:
+            return super().compile_ArrayAccess(node)
+        array_expr = self.compile(node.ident)
+        index_expr = self.compile(node.index_expr)
+        def access(frame):
+            array_obj = array_expr(frame)
+            index = index_expr(frame)
+            if not 0 <= index < len(array_obj):
+                raise InterpreterError(f"Array index {index} out of bounds for array of size {len(array_obj)}.")
+            return array_obj[index]
+        return access
+
+    def compile_MemberAccess(self, node):
+        instance_class = self.static_type(node.struct_expr)
+        member_name = node.member_ident.value
+        if instance_class is None or not issubclass(instance_class, StructInstance) or member_name not in instance_class.field_slots:
+            return super().compile_MemberAccess(node)
+        # The field is at a known slot of every instance of the guarded class.
+        struct_expr = self.compile(node.struct_expr)
+        get = attrgetter(instance_class.field_slots[member_name])
+        return lambda frame: get(struct_expr(frame))
+
+    def compile_FuncCall(self, node):
+        name = node.name.value
+        token = node.name.token
+        args = tuple(self.compile(arg) for arg in node.args)
+        invoke = TailCall if node is self.tail else self.state.invoke
+        func = self.fixed.get(name)
+        if isinstance(func, FuncDef) and len(args) == len(func.params):
+            return lambda frame: invoke(func, [arg(frame) for arg in args])
+        lookup = self.lookup(name)
+        def call(frame):
+            func = lookup(frame)
+            if not isinstance(func, FuncDef):
+                raise InterpreterError(f"'{name}' is not a function", token)
+            if len(args) != len(func.params):
+                raise InterpreterError(f"Function '{name}' expects {len(func.params)} arguments but got {len(args)}", token)
+            return invoke(func, [arg(frame) for arg in args])
+        return call
+
+class TieredInterpreter(Interpreter):
+    """
+    Interpreter that counts the calls of every FuncDef and, after `threshold`
+    of them, compiles a version specialized for the argument types seen so far
+    (see SpecializingCompiler). A call whose arguments pass its type guard runs
+    that version; one that fails it deoptimizes the function: the call runs
+    generically, the failing parameters become untyped and the function is
+    specialized again after another `threshold` calls. Promotions and deopts
+    are kept in `events` for report().
+    """
+    def __init__(self, parser=None, tree=None, threshold=DEFAULT_THRESHOLD, **options):
+        # The compiler keys on node identity and class, which arena views lack.
+        super().__init__(tree=materialize(tree if tree is not None else parser.parse()), **options)
+        self.threshold = threshold
+        # The global variables, as the compiled closures find them.
+        self.globals = self.global_scope.variables
+        self.profiles = {}
+        self.events = []
+
+    def tier(self, func, args):
+        """The specialized version of `func` to run `args` with, or None to run the call generically."""
+        profile = self.profiles.get(func)
+        if profile is None:
+            profile = self.profiles[func] = FunctionProfile(func, args)
+        code = profile.code
+        if code is not None:
+            for position, value_type in profile.guard:
+                if type(args[position]) is not value_type:
+                    self.deoptimize(profile, args)
+                    return None
+            profile.specialized_calls += 1
+            return code
+        profile.observe(args)
+        if profile.calls >= self.threshold:
+            self.promote(profile)
+        return None
+
+    def promote(self, profile):
+        func = profile.func
+        profile.code = SpecializingCompiler(self, self.tree, func, profile.types).specialize(func)
+        profile.guard = tuple((position, value_type) for position, value_type in enumerate(profile.types) if value_type is not None)
+        self.events.append(f"promote {func.name.value}({signature(profile.types)}) after {profile.calls} calls")
+
+    def deoptimize(self, profile, args):
+        func = profile.func
+        self.events.append(f"deopt {func.name.value}({signature(profile.types)}): "
+                           f"called with ({signature(type(value) for value in args)})")
+        profile.deopts += 1
+        profile.code = None
+        profile.guard = ()
+        profile.calls = 0
+        profile.observe(args)
+
+    def stats(self):
+        profiles = self.profiles.values()
+        return {
+            'promotions': sum(1 for event in self.events if event.startswith('promote')),
+            'deopts': sum(profile.deopts for profile in profiles),
+            'specialized_calls': sum(profile.specialized_calls for profile in profiles),
+            'generic_calls': sum(profile.generic_calls for profile in profiles),
+        }
+
+    def report(self):
+        """The stats and every promotion and deopt event, one per line."""
+        return '\n'.join([f"Tiering: {self.stats()}"] + [f"  {event}" for event in self.events])
+
+    def visit_FuncCall(self, node):
+        return self.invoke(*self.evaluate_call(node))
+
+    def evaluate_call(self, node):
+        """The FuncDef FuncCall `node` calls from the current scope, and its evaluated arguments."""
+        func_name = node.name.value
+        func = self.current_scope.get(func_name)
+        if not isinstance(func, FuncDef):
+            raise InterpreterError(f"'{func_name}' is not a function", node.name.token)
+        if len(node.args) != len(func.params):
+            raise InterpreterError(f"Function '{func_name}' expects {len(func.params)} arguments but got {len(node.args)}", node.name.token)
+        return func, [self.visit(arg_expr) for arg_expr in node.args]
+
+    def invoke(self, func, args):
+        """Runs `func` with the evaluated `args` for a call from specialized code."""
+        if self.memo_tables:
+            table = self.memo_tables.get(func)
+            if table is not None:
+                return table.call(self.call_function, func, args)
+        return self.call_function(func, args)
+
+    def call_function(self, func, args):
+        caller_scope = self.current_scope
+        try:
+            # As in Interpreter, a call in tail position, generic or specialized,
+            # continues in this loop instead of recursing.
+            while True:
+                code = self.tier(func, args)
+                if code is not None:
+                    result = code(args)
+                    if type(result) is not TailCall:
+                        return result
+                    func, args = result.func, result.args
+                else:
+                    result = self.run_generic(func, args)
+                    if not isinstance(result, FuncCall):
+                        return result
+                    # Its arguments are evaluated in the scope of the function returning it.
+                    func, args = self.evaluate_call(result)
+                if self.memo_tables:
+                    table = self.memo_tables.get(func)
+                    if table is not None:
+                        return table.call(self.call_function, func, args)
+        except ReturnValue as ret:
+            return ret.value
+        finally:
+            self.current_scope = caller_scope
+
+    def run_generic(self, func, args):
+        """
+        Runs the body of `func` in a new scope holding `args`, which stays the
+        current scope. Returns the result, or the FuncCall of a final `return
+        f(...)` for the caller to run.
+        """
+        func_scope = Scope(parent=self.global_scope)
+        for param, value in zip(func.params, args):
+            func_scope.declare(param.value, value)
+        self.current_scope = func_scope
+        stmts = func.body.stmts
+        last = len(stmts) - 1
+        for index in range(last):
+            self.visit(stmts[index])
+        if last < 0:
+            return None
+        if not isinstance(stmts[last], ReturnStmt):
+            self.visit(stmts[last])
+            return None
+        result = stmts[last].expr
+        if isinstance(result, FuncCall):
+            return result
+        return self.visit(result)
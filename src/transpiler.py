@@ -0,0 +1,506 @@
+from src.arena import SCHEMA, NODE, LIST, materialize
+from src.arrays import ARRAY_TYPES, make_generic, new_array
+from src.ast import FuncDef, StructDef, DeclareStmt, FuncCall, Identifier, MemberAccess, ArrayAccess, Number, String
+from src.closure import ClosureInterpreter, assigned_names, binary_value
+from src.error import InterpreterError
+from src.interpreter import StructDefinition, StructInstance
+from src.lexer import TokenType
+from src.structs import field_slot
+
+_MISSING = object()
+
+PYTHON_OPERATORS = {
+    TokenType.PLUS: '+',
+    TokenType.MINUS: '-',
+    TokenType.MULTIPLY: '*',
+    TokenType.DIVIDE: '//',
+    TokenType.EQ: '==',
+    TokenType.NEQ: '!=',
+    TokenType.LT: '<',
+    TokenType.LTE: '<=',
+    TokenType.GT: '>',
+    TokenType.GTE: '>=',
+}
+
+def variable(name):
+    """
+    Python name of the L25 variable `name`; the prefix keeps it clear of
+    keywords and runtime helpers. The optimizer's temporaries (`.t0`) get
+    their own prefix.
+    """
+    if name.startswith('.'):
+        return 'vt_' + name[1:]
+    return 'v_' + name
+
+class PythonTranspiler:
+    """
+    Translates a Program into the source of a Python module whose functions
+    behave like Interpreter's, to be compiled with compile() and run natively.
+
+    - Each L25 function becomes a Python function (`f<index>_<name>`) and its
+      variables Python locals. As `let` may run conditionally, a local that is
+      not certainly declared yet starts out as _MISSING and its reads fall back
+      to the globals, like Scope.get.
+    - The main block is `_main()`; its variables are the module globals, which
+      is also the L25 global scope functions fall back to.
+    - Integer arithmetic, comparisons, array indexing and member access are
+      inlined with a type check; any other case calls the runtime helpers that
+      apply Interpreter's rules and raise its errors, with the same tokens.
+    - Calls to functions (and constructions of structs) no statement can rebind
+      are direct calls; others look the callee up at run time.
+    - try/catch becomes a Python try statement around the try-state flag.
+    """
+    def __init__(self, program):
+        self.program = program
+        self.tokens = []  # referenced as _T[i] by the generated code
+        self.nodes = []   # referenced as _N[i]
+        self.function_names = {func_def: f"f{index}_{func_def.name.value}"
+                               for index, func_def in enumerate(program.func_defs)}
+        self.struct_names = {struct_def: f"s{index}_{struct_def.name.value}"
+                             for index, struct_def in enumerate(program.struct_defs)}
+        rebound = assigned_names(program)
+        self.fixed = {}
+        for struct_def in program.struct_defs:
+            self.fixed[struct_def.name.value] = struct_def
+        for func_def in program.func_defs:
+            self.fixed[func_def.name.value] = func_def
+        for name in rebound:
+            self.fixed.pop(name, None)
+
+    def transpile(self):
+        lines = [f"# Generated from L25 program {self.program.name.value}"]
+        for struct_def in self.program.struct_defs:
+            lines.extend(self.struct_constructor(struct_def))
+        for func_def in self.program.func_defs:
+            lines.extend(self.function(func_def))
+        lines.extend(self.main(self.program.main_block))
+        return "\n".join(lines) + "\n"
+
+    # Frames
+
+    def begin(self, locals_, definite, valueless):
+        # `locals_` is None in main, whose variables are the module globals.
+        self.locals = locals_
+        self.definite = set(definite)
+        self.valueless = valueless
+        self.temps = 0
+        self.lines = []
+        self.depth = 1
+
+    def temp(self):
+        self.temps += 1
+        return f"_t{self.temps}"
+
+    def emit(self, line):
+        self.lines.append("    " * self.depth + line)
+
+    def struct_constructor(self, struct_def):
+        params = [f"a{index}" for index in range(len(struct_def.fields))]
+        name = struct_def.name.value
+        return [
+            f"def {self.struct_names[struct_def]}({', '.join(params)}):",
+            f"    return {variable(name)}.new({name!r}, ({''.join(param + ', ' for param in params)}))",
+        ]
+
+    def function(self, func_def):
+        params = [param.value for param in func_def.params]
+        declared = set(params)
+        valueless = set()
+        for node in self.walk(func_def.body):
+            if isinstance(node, DeclareStmt):
+                declared.add(node.ident.value)
+                if node.expr is None:
+                    valueless.add(node.ident.value)
+        self.begin(declared, params, valueless)
+        pending = sorted(declared - set(params))
+        if pending:
+            self.emit(" = ".join(variable(name) for name in pending) + " = _MISSING")
+        stmts = func_def.body.stmts
+        self.statements(stmts[:-1], top_level=True)
+        self.emit(f"return {self.expr(stmts[-1].expr)}")
+        header = f"def {self.function_names[func_def]}({', '.join(variable(name) for name in params)}):"
+        return [header] + self.lines
+
+    def main(self, main_block):
+        declared = set()
+        valueless = set()
+        for node in self.walk(main_block):
+            if isinstance(node, DeclareStmt):
+                declared.add(node.ident.value)
+                if node.expr is None:
+                    valueless.add(node.ident.value)
+        self.begin(None, (), valueless)
+        if declared:
+            self.emit("global " + ", ".join(variable(name) for name in sorted(declared)))
+        self.statements(main_block.stmts, top_level=True)
+        return ["def _main():"] + self.lines
+
+    def walk(self, node):
+        """`node` and every node below it."""
+        pending = [node]
+        while pending:
+            node = pending.pop()
+            yield node
+            for name, field_kind in SCHEMA[type(node)]:
+                if field_kind == NODE:
+                    child = getattr(node, name)
+                    if child is not None:
+                        pending.append(child)
+                elif field_kind == LIST:
+                    pending.extend(getattr(node, name))
+
+    # Statements
+
+    def statements(self, stmts, top_level=False):
+        for stmt in stmts:
+            getattr(self, f'stmt_{type(stmt).__name__}', self.generic_stmt)(stmt)
+            # Only a declaration at the top level of a body is certain to have
+            # run before the statements after it.
+            if top_level and isinstance(stmt, DeclareStmt) and stmt.expr is not None:
+                self.definite.add(stmt.ident.value)
+
+    def block(self, stmt_list):
+        self.depth += 1
+        self.statements(stmt_list.stmts)
+        self.depth -= 1
+
+    def generic_stmt(self, node):
+        self.emit(f"raise _InterpreterError({f'No visit_{type(node).__name__} method'!r})")
+
+    def stmt_DeclareStmt(self, node):
+        value = 'None' if node.expr is None else self.expr(node.expr)
+        self.emit(f"{variable(node.ident.value)} = {value}")
+
+    def store(self, name, value):
+        """Emits the assignment of the Python expression `value` to an existing variable."""
+        if name in self.definite:
+            self.emit(f"{variable(name)} = {value}")
+        elif self.locals is not None and name in self.locals:
+            temp = self.temp()
+            self.emit(f"{temp} = {value}")
+            self.emit(f"if {variable(name)} is not _MISSING:")
+            self.emit(f"    {variable(name)} = {temp}")
+            self.emit("else:")
+            self.emit(f"    _store({variable(name)!r}, {temp})")
+        else:
+            self.emit(f"_store({variable(name)!r}, {value})")
+
+    def stmt_AssignStmt(self, node):
+        left = node.left
+        if isinstance(left, Identifier):
+            self.store(left.value, self.expr(node.expr))
+        elif isinstance(left, MemberAccess):
+            value, instance = self.temp(), self.temp()
+            self.emit(f"{value} = {self.expr(node.expr)}")
+            self.emit(f"{instance} = {self.expr(left.struct_expr)}")
+            self.emit(f"if not isinstance({instance}, _StructInstance):")
+            self.emit(f"    _not_a_struct({self.token(left.member_ident.token)})")
+            self.emit(f"{instance}.set({left.member_ident.value!r}, {value})")
+        elif isinstance(left, ArrayAccess):
+            value, array_obj, index = self.temp(), self.temp(), self.temp()
+            self.emit(f"{value} = {self.expr(node.expr)}")
+            self.emit(f"{array_obj} = {self.expr(left.ident)}")
+            self.emit(f"if not isinstance({array_obj}, _ARRAYS):")
+            self.emit(f"    _not_an_array({self.node(left.ident)})")
+            self.emit(f"{index} = {self.expr(left.index_expr)}")
+            self.emit(f"if type({index}) is not int or not 0 <= {index} < len({array_obj}):")
+            self.emit(f"    _bad_index({array_obj}, {index})")
+            self.emit("try:")
+            self.emit(f"    {array_obj}[{index}] = {value}")
+            self.emit("except (TypeError, OverflowError):")
+            self.emit(f"    _make_generic({array_obj})[{index}] = {value}")
+        else:
+            self.emit(self.expr(node.expr))
+            self.emit("raise _InterpreterError('Invalid target for assignment.')")
+
+    def stmt_IfStmt(self, node):
+        self.emit(f"if {self.expr(node.bool_expr)}:")
+        self.block(node.if_block)
+        if node.else_block is not None:
+            self.emit("else:")
+            self.block(node.else_block)
+
+    def stmt_WhileStmt(self, node):
+        self.emit(f"while {self.expr(node.bool_expr)}:")
+        self.block(node.body)
+
+    def stmt_InputStmt(self, node):
+        for ident in node.idents:
+            value = self.temp()
+            self.emit("try:")
+            self.depth += 1
+            self.emit(f"{value} = input()")
+            # Attempt to convert to int, otherwise treat as string
+            self.emit("try:")
+            self.emit(f"    {value} = int({value})")
+            self.emit("except ValueError:")
+            self.emit("    pass")
+            self.store(ident.value, value)
+            self.depth -= 1
+            self.emit("except Exception:")
+            self.emit(f"    raise _InterpreterError({f'Failed to read input for {ident.value!r}'!r}, {self.token(ident.token)})")
+
+    def stmt_OutputStmt(self, node):
+        values = ", ".join(f"str({self.expr(expr)})" for expr in node.exprs)
+        self.emit(f"print(' '.join(({values},)))")
+
+    def stmt_FuncCall(self, node):
+        # A bare function call used as a statement drops its result.
+        self.emit(self.expr(node))
+
+    def stmt_TryCatch(self, node):
+        state = self.temp()
+        self.emit(f"{state} = _state.is_in_try_block")
+        self.emit("try:")
+        self.emit("    _state.is_in_try_block = True")
+        self.block(node.try_block)
+        self.emit("except _InterpreterError as _error:")
+        self.emit("    if 'Division by zero' not in str(_error):")
+        self.emit("        raise")
+        self.emit("    print('Error: Division by zero detected. Jumping to catch block.')")
+        self.block(node.catch_block)
+        self.emit("finally:")
+        self.emit(f"    _state.is_in_try_block = {state}")
+
+    # Expressions
+
+    def token(self, token):
+        self.tokens.append(token)
+        return f"_T[{len(self.tokens) - 1}]"
+
+    def node(self, node):
+        self.nodes.append(node)
+        return f"_N[{len(self.nodes) - 1}]"
+
+    def expr(self, node):
+        return getattr(self, f'expr_{type(node).__name__}', self.generic_expr)(node)
+
+    def generic_expr(self, node):
+        return f"_fail({f'No visit_{type(node).__name__} method'!r})"
+
+    def lookup(self, name):
+        """A Python expression for the value of `name`, None if undefined (Scope.get)."""
+        if self.locals is not None and name in self.locals:
+            if name in self.definite:
+                return variable(name)
+            return f"({variable(name)} if {variable(name)} is not _MISSING else _globals.get({variable(name)!r}))"
+        if name in self.definite:
+            return variable(name)
+        return f"_globals.get({variable(name)!r})"
+
+    def expr_Identifier(self, node):
+        name = node.value
+        if name in self.definite and name not in self.valueless:
+            return variable(name)
+        if self.locals is not None and name in self.locals:
+            python_name = variable(name)
+            return (f"({python_name} if {python_name} is not _MISSING and {python_name} is not None "
+                    f"else _read({python_name}, {python_name!r}, {self.token(node.token)}))")
+        return f"_load({variable(name)!r}, {self.token(node.token)})"
+
+    def expr_Number(self, node):
+        return repr(node.value)
+
+    expr_String = expr_Number
+
+    def expr_BoolExpr(self, node):
+        return f"({self.expr(node.left)} {PYTHON_OPERATORS[node.op.type]} {self.expr(node.right)})"
+
+    def operand(self, node, later=None):
+        """
+        Returns (code, value, literal type) for an operand: `code` evaluates it,
+        binding a temporary if needed, and `value` refers to the result after
+        that. A plain variable is read in place, unless `later` (the operands
+        evaluated after it) contains a call that could reassign it.
+        """
+        code = self.expr(node)
+        if isinstance(node, (Number, String)):
+            return code, code, type(node.value)
+        if code.isidentifier() and (later is None or not any(isinstance(child, FuncCall) for child in self.walk(later))):
+            return code, code, None
+        temp = self.temp()
+        return f"({temp} := {code})", temp, None
+
+    def expr_BinaryOp(self, node):
+        op = node.op.type
+        left_code, left, left_type = self.operand(node.left, later=node.right)
+        right_code, right, right_type = self.operand(node.right)
+        slow = f"_binary(_TokenType.{op.name}, {{}}, {{}}, {self.token(node.op)})"
+        if str in (left_type, right_type) or (op == TokenType.DIVIDE and right_type is int and not node.right.value):
+            return slow.format(left_code, right_code)
+
+        # Both operands are evaluated before either is checked.
+        unknown = [code for code, literal_type in ((left_code, left_type), (right_code, right_type)) if literal_type is not int]
+        checks = [" is ".join(f"type({code})" for code in unknown) + " is int"] if unknown else []
+        if op == TokenType.DIVIDE and right_type is not int:
+            checks.append(right)
+        fast = f"{left} {PYTHON_OPERATORS[op]} {right}"
+        if not checks:
+            return f"({fast})"
+        return f"({fast} if {' and '.join(checks)} else {slow.format(left, right)})"
+
+    def expr_UnaryOp(self, node):
+        if node.op.type == TokenType.MINUS:
+            return f"(-{self.expr(node.expr)})"
+        return self.expr(node.expr)
+
+    def expr_ArrayLiteral(self, node):
+        return "_new_array([" + ", ".join(self.expr(element) for element in node.elements) + "])"
+
+    def expr_ArrayAccess(self, node):
+        array_code, array_obj, _ = self.operand(node.ident, later=node.index_expr)
+        index_code, index, index_type = self.operand(node.index_expr)
+        in_bounds = f"0 <= {index} < len({array_obj})"
+        if index_type is not int:
+            in_bounds = f"type({index_code}) is int and {in_bounds}"
+        # The index is only evaluated once the array is known to be one.
+        return (f"({array_obj}[{index}] if isinstance({array_code}, _ARRAYS) and {in_bounds} "
+                f"else _index({array_obj}, {index} if isinstance({array_obj}, _ARRAYS) else None, {self.node(node.ident)}))")
+
+    def expr_MemberAccess(self, node):
+        instance_code, instance, _ = self.operand(node.struct_expr)
+        name = node.member_ident.value
+        value = self.temp()
+        return (f"({value} if isinstance({instance_code}, _StructInstance) "
+                f"and ({value} := getattr({instance}, {field_slot(name)!r}, _MISSING)) is not _MISSING "
+                f"else _member({instance}, {name!r}, {self.token(node.member_ident.token)}))")
+
+    def expr_FuncCall(self, node):
+        name = node.name.value
+        args = ", ".join(self.expr(arg) for arg in node.args)
+        func = self.fixed.get(name)
+        if isinstance(func, FuncDef) and len(node.args) == len(func.params):
+            return f"{self.function_names[func]}({args})"
+        callee = f"_function({self.lookup(name)}, {name!r}, {len(node.args)}, {self.token(node.name.token)})"
+        return f"{callee}({args})"
+
+    def expr_StructInit(self, node):
+        name = node.name.value
+        args = [self.expr(arg) for arg in node.args]
+        struct_def = self.fixed.get(name)
+        if isinstance(struct_def, StructDef) and len(node.args) == len(struct_def.fields):
+            return f"{self.struct_names[struct_def]}({', '.join(args)})"
+        blueprint = f"_blueprint({self.lookup(name)}, {name!r}, {len(node.args)}, {self.token(node.name.token)})"
+        return f"_instance({', '.join([blueprint, repr(name)] + args)})"
+
+class TranspiledInterpreter:
+    """
+    Execution engine that runs a Program as Python code generated by
+    PythonTranspiler. Programs the generated code cannot express (e.g. one so
+    deeply nested that Python refuses to compile it) run on ClosureInterpreter.
+    """
+    def __init__(self, parser=None, tree=None):
+        self.tree = materialize(tree if tree is not None else parser.parse())
+        self.is_in_try_block = False
+        self.transpiler = None
+        self.source = None
+
+    def compile(self):
+        """Generates the Python source and returns its code object."""
+        self.transpiler = PythonTranspiler(self.tree)
+        self.source = self.transpiler.transpile()
+        return compile(self.source, f"<l25 {self.tree.name.value}>", 'exec')
+
+    def interpret(self):
+        try:
+            code = self.compile()
+        except (SyntaxError, RecursionError, MemoryError):
+            return ClosureInterpreter(tree=self.tree).interpret()
+
+        functions = {}
+        namespace = self.namespace(self.transpiler, functions)
+        exec(code, namespace)
+        for func_def, python_name in self.transpiler.function_names.items():
+            functions[func_def] = namespace[python_name]
+        namespace['_main']()
+
+    def namespace(self, transpiler, functions):
+        """
+        Module globals for the generated code: the L25 globals plus the runtime
+        helpers. `functions` maps each FuncDef to its Python function once the
+        code has run.
+        """
+        namespace = {}
+        state = self
+
+        def load(key, token):
+            value = namespace.get(key)
+            if value is None:
+                raise InterpreterError(f"Variable or struct '{key[2:]}' not defined.", token)
+            return value
+
+        def read(value, key, token):
+            if value is _MISSING:
+                value = namespace.get(key)
+            if value is None:
+                raise InterpreterError(f"Variable or struct '{key[2:]}' not defined.", token)
+            return value
+
+        def store(key, value):
+            if key not in namespace:
+                raise InterpreterError(f"Variable '{key[2:]}' not defined before assignment.")
+            namespace[key] = value
+
+        def binary(op, left, right, token):
+            return binary_value(op, left, right, token, state)
+
+        def index(array_obj, index, node):
+            if not isinstance(array_obj, ARRAY_TYPES):
+                raise InterpreterError("Cannot index a non-array type.", node.token)
+            return bad_index(array_obj, index)
+
+        def bad_index(array_obj, index):
+            if not isinstance(index, int):
+                raise InterpreterError("Array index must be an integer.")
+            if not 0 <= index < len(array_obj):
+                raise InterpreterError(f"Array index {index} out of bounds for array of size {len(array_obj)}.")
+            return array_obj[index]
+
+        def not_an_array(node):
+            raise InterpreterError("Cannot index a non-array type.", node.token)
+
+        def not_a_struct(token):
+            raise InterpreterError("Cannot access member of a non-struct type.", token)
+
+        def member(instance, name, token):
+            if not isinstance(instance, StructInstance):
+                not_a_struct(token)
+            value = instance.get(name, _MISSING)
+            if value is not _MISSING:
+                return value
+            raise InterpreterError(f"Struct '{instance.type_name}' has no member '{name}'", token)
+
+        def function(func, name, argc, token):
+            if not isinstance(func, FuncDef):
+                raise InterpreterError(f"'{name}' is not a function", token)
+            if argc != len(func.params):
+                raise InterpreterError(f"Function '{name}' expects {len(func.params)} arguments but got {argc}", token)
+            return functions[func]
+
+        def blueprint(value, name, argc, token):
+            if not isinstance(value, StructDefinition):
+                raise InterpreterError(f"'{name}' is not a defined struct type.", token)
+            if argc != len(value.fields):
+                raise InterpreterError(f"Struct '{name}' expects {len(value.fields)} fields but got {argc}", token)
+            return value
+
+        def instance(blueprint, name, *values):
+            return blueprint.new(name, values)
+
+        def fail(message):
+            raise InterpreterError(message)
+
+        namespace.update({
+            '_MISSING': _MISSING, '_T': tuple(transpiler.tokens), '_N': tuple(transpiler.nodes),
+            '_globals': namespace, '_state': state, '_InterpreterError': InterpreterError,
+            '_StructInstance': StructInstance, '_TokenType': TokenType, '_load': load, '_read': read, '_store': store,
+            '_binary': binary, '_index': index, '_bad_index': bad_index, '_not_an_array': not_an_array,
+            '_not_a_struct': not_a_struct, '_member': member, '_function': function,
+            '_blueprint': blueprint, '_instance': instance, '_fail': fail,
+            '_ARRAYS': ARRAY_TYPES, '_new_array': new_array, '_make_generic': make_generic,
+        })
+        for struct_def in self.tree.struct_defs:
+            namespace[variable(struct_def.name.value)] = StructDefinition(struct_def.name.value, struct_def.fields)
+        for func_def in self.tree.func_defs:
+            namespace[variable(func_def.name.value)] = func_def
+        return namespace
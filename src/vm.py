@@ -0,0 +1,311 @@
+from src.arena import materialize
+from src.ast import FuncDef
+from src.bytecode import (
+    LOAD_NAME, LOAD_CONST, STORE_NAME, BINARY_ADD, BINARY_SUBTRACT, BINARY_MULTIPLY,
+    BINARY_DIVIDE, COMPARE_OP, POP_JUMP_IF_FALSE, JUMP, CHECK_ARRAY, BINARY_INDEX,
+    LOAD_MEMBER, LOAD_FUNCTION, CALL_FUNCTION, RETURN_VALUE, DECLARE_NAME, STORE_INDEX,
+    STORE_MEMBER, LOAD_STRUCT, BUILD_STRUCT, BUILD_ARRAY, UNARY_NEGATIVE, OUTPUT, INPUT,
+    POP_TOP, SETUP_TRY, POP_TRY, POP_CATCH, RAISE_ERROR, OPNAMES, compile_program
+)
+from src.closure import binary_value
+from src.error import InterpreterError
+from src.interpreter import StructDefinition, StructInstance
+from src.lexer import TokenType
+from src.arrays import ARRAY_TYPES, make_generic, new_array
+from src.structs import field_slot
+
+_MISSING = object()
+
+# Default limit on the number of L25 calls in progress at once.
+DEFAULT_MAX_DEPTH = 200000
+
+class VirtualMachine:
+    """
+    Stack-based execution engine for the bytecode of src/bytecode.py, with the
+    same behaviour and error messages as Interpreter.
+
+    Each call runs its CodeObject with a fresh operand stack and a dict of
+    locals (main runs directly in the globals, as in Interpreter). Calls do not
+    recurse in Python: the caller's state is pushed on a call stack kept on the
+    heap and the same loop continues in the callee, so L25 recursion is only
+    bounded by `max_depth` (exceeding it raises an InterpreterError at the
+    call), not by Python's recursion limit.
+
+    try/catch is handled with a per-frame block stack: an InterpreterError about
+    a division by zero unwinds the operand stack to the innermost try block and
+    continues at its catch block; anything else leaves the frame, and the
+    search goes on in its caller.
+    """
+    def __init__(self, parser=None, tree=None, max_depth=DEFAULT_MAX_DEPTH):
+        # Compilation keys functions on their FuncDef, which arena views lack.
+        self.tree = materialize(tree if tree is not None else parser.parse())
+        self.globals = {}
+        self.is_in_try_block = False
+        self.program = None
+        self.max_depth = max_depth
+
+    def interpret(self):
+        program = self.tree
+        for struct_def in program.struct_defs:
+            self.globals[struct_def.name.value] = StructDefinition(struct_def.name.value, struct_def.fields)
+        for func_def in program.func_defs:
+            self.globals[func_def.name.value] = func_def
+
+        self.program = compile_program(program)
+        self.run(self.program.main, self.globals)
+
+    def run(self, code, frame):
+        """Executes `code` with `frame` as its variables and returns its result."""
+        instructions = code.code
+        constants = code.constants
+        names = code.names
+        globals_ = self.globals
+        functions = self.program.functions
+        max_depth = self.max_depth
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        blocks = []  # [catch offset, stack depth, previous try state, in catch block]
+        calls = []   # suspended callers: (code, resume offset, operand stack, frame, blocks)
+        pc = 0
+        while True:
+            try:
+                while True:
+                    opcode = instructions[pc]
+                    arg = instructions[pc + 1]
+                    pc += 2
+                    if opcode == LOAD_NAME:
+                        value = frame.get(names[arg], _MISSING)
+                        if value is _MISSING:
+                            value = globals_.get(names[arg])
+                        if value is None:
+                            raise InterpreterError(f"Variable or struct '{names[arg]}' not defined.", code.positions[pc - 2])
+                        push(value)
+                    elif opcode == LOAD_CONST:
+                        push(constants[arg])
+                    elif opcode == STORE_NAME:
+                        name = names[arg]
+                        if name in frame:
+                            frame[name] = pop()
+                        elif name in globals_:
+                            globals_[name] = pop()
+                        else:
+                            raise InterpreterError(f"Variable '{name}' not defined before assignment.")
+                    elif opcode == BINARY_ADD:
+                        right = pop()
+                        left = pop()
+                        if type(left) is int and type(right) is int:
+                            push(left + right)
+                        else:
+                            push(binary_value(TokenType.PLUS, left, right, code.positions[pc - 2], self))
+                    elif opcode == BINARY_SUBTRACT:
+                        right = pop()
+                        left = pop()
+                        if type(left) is int and type(right) is int:
+                            push(left - right)
+                        else:
+                            push(binary_value(TokenType.MINUS, left, right, code.positions[pc - 2], self))
+                    elif opcode == BINARY_MULTIPLY:
+                        right = pop()
+                        left = pop()
+                        if type(left) is int and type(right) is int:
+                            push(left * right)
+                        else:
+                            push(binary_value(TokenType.MULTIPLY, left, right, code.positions[pc - 2], self))
+                    elif opcode == BINARY_DIVIDE:
+                        right = pop()
+                        left = pop()
+                        if type(left) is int and type(right) is int and right:
+                            push(left // right)
+                        else:
+                            push(binary_value(TokenType.DIVIDE, left, right, code.positions[pc - 2], self))
+                    elif opcode == COMPARE_OP:
+                        right = pop()
+                        left = pop()
+                        if arg == 0: push(left == right)
+                        elif arg == 1: push(left != right)
+                        elif arg == 2: push(left < right)
+                        elif arg == 3: push(left <= right)
+                        elif arg == 4: push(left > right)
+                        else: push(left >= right)
+                    elif opcode == POP_JUMP_IF_FALSE:
+                        if not pop():
+                            pc = arg
+                    elif opcode == JUMP:
+                        pc = arg
+                    elif opcode == CHECK_ARRAY:
+                        if not isinstance(stack[-1], ARRAY_TYPES):
+                            raise InterpreterError("Cannot index a non-array type.", code.positions[pc - 2].token)
+                    elif opcode == BINARY_INDEX:
+                        index = pop()
+                        array_obj = pop()
+                        if not isinstance(index, int):
+                            raise InterpreterError("Array index must be an integer.")
+                        if not 0 <= index < len(array_obj):
+                            raise InterpreterError(f"Array index {index} out of bounds for array of size {len(array_obj)}.")
+                        push(array_obj[index])
+                    elif opcode == LOAD_MEMBER:
+                        instance = pop()
+                        if not isinstance(instance, StructInstance):
+                            raise InterpreterError("Cannot access member of a non-struct type.", code.positions[pc - 2])
+                        member_name = names[arg]
+                        value = getattr(instance, field_slot(member_name), _MISSING)
+                        if value is _MISSING:
+                            value = instance.get(member_name, _MISSING)
+                        if value is _MISSING:
+                            raise InterpreterError(f"Struct '{instance.type_name}' has no member '{member_name}'", code.positions[pc - 2])
+                        push(value)
+                    elif opcode == LOAD_FUNCTION:
+                        func_name, argc = constants[arg]
+                        func = frame.get(func_name, _MISSING)
+                        if func is _MISSING:
+                            func = globals_.get(func_name)
+                        if not isinstance(func, FuncDef):
+                            raise InterpreterError(f"'{func_name}' is not a function", code.positions[pc - 2])
+                        if argc != len(func.params):
+                            raise InterpreterError(f"Function '{func_name}' expects {len(func.params)} arguments but got {argc}", code.positions[pc - 2])
+                        push(functions[func])
+                    elif opcode == CALL_FUNCTION:
+                        if arg:
+                            args = stack[-arg:]
+                            del stack[-arg:]
+                        else:
+                            args = ()
+                        callee = pop()
+                        if len(calls) >= max_depth:
+                            raise InterpreterError(f"Maximum call depth of {max_depth} exceeded", code.positions[pc - 2])
+                        calls.append((code, pc, stack, frame, blocks))
+                        code = callee
+                        instructions = code.code
+                        constants = code.constants
+                        names = code.names
+                        frame = dict(zip(callee.params, args))
+                        stack = []
+                        push = stack.append
+                        pop = stack.pop
+                        blocks = []
+                        pc = 0
+                    elif opcode == RETURN_VALUE:
+                        if blocks:
+                            self.is_in_try_block = blocks[0][2]
+                        value = pop()
+                        if not calls:
+                            return value
+                        code, pc, stack, frame, blocks = calls.pop()
+                        instructions = code.code
+                        constants = code.constants
+                        names = code.names
+                        push = stack.append
+                        pop = stack.pop
+                        push(value)
+                    elif opcode == DECLARE_NAME:
+                        frame[names[arg]] = pop()
+                    elif opcode == STORE_INDEX:
+                        index = pop()
+                        array_obj = pop()
+                        value = pop()
+                        if not isinstance(index, int):
+                            raise InterpreterError("Array index must be an integer.")
+                        if not 0 <= index < len(array_obj):
+                            raise InterpreterError(f"Array index {index} out of bounds for array of size {len(array_obj)}.")
+                        try:
+                            array_obj[index] = value
+                        except (TypeError, OverflowError):
+                            make_generic(array_obj)[index] = value
+                    elif opcode == STORE_MEMBER:
+                        instance = pop()
+                        value = pop()
+                        if not isinstance(instance, StructInstance):
+                            raise InterpreterError("Cannot access member of a non-struct type.", code.positions[pc - 2])
+                        instance.set(names[arg], value)
+                    elif opcode == LOAD_STRUCT:
+                        struct_name, argc = constants[arg]
+                        blueprint = frame.get(struct_name, _MISSING)
+                        if blueprint is _MISSING:
+                            blueprint = globals_.get(struct_name)
+                        if not isinstance(blueprint, StructDefinition):
+                            raise InterpreterError(f"'{struct_name}' is not a defined struct type.", code.positions[pc - 2])
+                        if argc != len(blueprint.fields):
+                            raise InterpreterError(f"Struct '{struct_name}' expects {len(blueprint.fields)} fields but got {argc}", code.positions[pc - 2])
+                        push(blueprint)
+                    elif opcode == BUILD_STRUCT:
+                        struct_name, argc = constants[arg]
+                        if argc:
+                            values = stack[-argc:]
+                            del stack[-argc:]
+                        else:
+                            values = ()
+                        blueprint = pop()
+                        push(blueprint.new(struct_name, values))
+                    elif opcode == BUILD_ARRAY:
+                        if arg:
+                            values = stack[-arg:]
+                            del stack[-arg:]
+                        else:
+                            values = []
+                        push(new_array(values))
+                    elif opcode == UNARY_NEGATIVE:
+                        push(-pop())
+                    elif opcode == OUTPUT:
+                        values = stack[len(stack) - arg:]
+                        del stack[len(stack) - arg:]
+                        print(' '.join([str(value) for value in values]))
+                    elif opcode == INPUT:
+                        name = names[arg]
+                        try:
+                            val = input()
+                            # Attempt to convert to int, otherwise treat as string
+                            try:
+                                val = int(val)
+                            except ValueError:
+                                pass
+                            if name in frame:
+                                frame[name] = val
+                            elif name in globals_:
+                                globals_[name] = val
+                            else:
+                                raise InterpreterError(f"Variable '{name}' not defined before assignment.")
+                        except Exception:
+                            raise InterpreterError(f"Failed to read input for '{name}'", code.positions[pc - 2])
+                    elif opcode == POP_TOP:
+                        pop()
+                    elif opcode == SETUP_TRY:
+                        blocks.append((arg, len(stack), self.is_in_try_block, False))
+                        self.is_in_try_block = True
+                    elif opcode == POP_TRY or opcode == POP_CATCH:
+                        self.is_in_try_block = blocks.pop()[2]
+                    elif opcode == RAISE_ERROR:
+                        raise InterpreterError(constants[arg])
+                    else:
+                        raise InterpreterError(f"Unknown opcode {OPNAMES[opcode] if opcode < len(OPNAMES) else opcode}")
+            except Exception as e:
+                # Leave frames until one has a catch block for the error.
+                while True:
+                    pc = self.unwind(e, stack, blocks)
+                    if pc is not None:
+                        break
+                    if not calls:
+                        raise
+                    code, _, stack, frame, blocks = calls.pop()
+                instructions = code.code
+                constants = code.constants
+                names = code.names
+                push = stack.append
+                pop = stack.pop
+
+    def unwind(self, error, stack, blocks):
+        """
+        Finds the catch block for `error` in a frame, restoring the try state of
+        every block left on the way, and returns its offset; None if the frame
+        has none.
+        """
+        while blocks:
+            catch_offset, depth, previous_state, in_catch = blocks.pop()
+            if not in_catch and isinstance(error, InterpreterError) and "Division by zero" in str(error):
+                del stack[depth:]
+                print("Error: Division by zero detected. Jumping to catch block.")
+                # The catch block runs with the try state of its try block.
+                blocks.append((catch_offset, depth, previous_state, True))
+                return catch_offset
+            self.is_in_try_block = previous_state
+        return None
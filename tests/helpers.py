@@ -0,0 +1,23 @@
+import io
+import sys
+from unittest.mock import patch
+
+from src.arena import ASTArena
+from src.parser import parse_source
+
+def run(engine, source, arena=False, **options):
+    """Output and error of running `source` on `engine` constructed with `options`."""
+    old_stdout = sys.stdout
+    sys.stdout = captured_output = io.StringIO()
+    error = None
+    try:
+        with patch('builtins.input', side_effect=['4']):
+            tree = parse_source(source)
+            if arena:
+                tree = ASTArena.from_tree(tree).root
+            engine(tree=tree, **options).interpret()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        sys.stdout = old_stdout
+    return captured_output.getvalue(), error
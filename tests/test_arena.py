@@ -0,0 +1,74 @@
+import unittest
+import io
+import sys
+
+from src.lexer import Lexer
+from src.parser import Parser
+from src.interpreter import Interpreter
+from src.visualizer import ASTVisualizer
+from src.arena import ASTArena
+from src.ast import BinaryOp, FuncDef, Identifier
+
+CODE = """
+program P {
+    struct Point { x, y };
+    func add(a, b) {
+        let unused = 0;
+        return a + b;
+    }
+    main {
+        let p = Point(1, 2);
+        let arr = [10, 20, 30];
+        arr[1] = add(p.x, arr[2]) * -2;
+        output("arr:", arr[1]);
+        if (arr[1] < 0) { output("negative"); };
+    }
+}
+"""
+
+class TestArena(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = Parser(Lexer(CODE).tokens()).parse()
+        self.arena = ASTArena.from_tree(self.tree)
+
+    def run_tree(self, tree):
+        old_stdout = sys.stdout
+        sys.stdout = captured_output = io.StringIO()
+        try:
+            Interpreter(tree=tree).interpret()
+        finally:
+            sys.stdout = old_stdout
+        return captured_output.getvalue()
+
+    def test_slotted_nodes(self):
+        self.assertFalse(hasattr(self.tree, '__dict__'))
+        self.assertFalse(hasattr(self.tree.main_block, '__dict__'))
+
+    def test_views_behave_like_nodes(self):
+        root = self.arena.root
+        func = root.func_defs[0]
+        self.assertIsInstance(func, FuncDef)
+        self.assertEqual(type(func).__name__, 'FuncDef')
+        self.assertEqual([param.value for param in func.params], ['a', 'b'])
+        ret = func.body.stmts[-1]
+        self.assertIsInstance(ret.expr, BinaryOp)
+        self.assertEqual(ret.expr.op.value, '+')
+        self.assertEqual(ret.expr.op.line, self.tree.func_defs[0].body.stmts[-1].expr.op.line)
+
+    def test_interpreter_and_visualizer_on_arena(self):
+        self.assertEqual(self.run_tree(self.arena.root), self.run_tree(self.tree))
+        self.assertEqual(ASTVisualizer(self.arena.root).generate(), ASTVisualizer(self.tree).generate())
+
+    def test_traversal_and_materialisation(self):
+        walked = list(self.arena.walk())
+        self.assertEqual(sorted(walked), list(range(len(self.arena))))
+        self.assertEqual(self.arena.kind(0).__name__, 'Program')
+        identifiers = [i for i in walked if self.arena.kind(i) is Identifier]
+        self.assertIn('add', [self.arena.node(i).value for i in identifiers])
+        rebuilt = self.arena.to_tree()
+        self.assertNotIsInstance(rebuilt.main_block, type(self.arena.root.main_block))
+        self.assertEqual(ASTVisualizer(rebuilt).generate(), ASTVisualizer(self.tree).generate())
+
+if __name__ == '__main__':
+    unittest.main()
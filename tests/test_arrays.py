@@ -0,0 +1,98 @@
+import unittest
+import copy
+import pickle
+
+from src.arrays import IntArray, ObjectArray, new_array, store, store_slice
+from src.engines import ENGINES
+from tests.helpers import run
+
+class TestIntArrays(unittest.TestCase):
+    def test_int_literals_are_typed(self):
+        ints = new_array([1, -2, 2 ** 63 - 1])
+        self.assertIs(type(ints), IntArray)
+        self.assertEqual(ints.itemsize, 8)
+        self.assertIs(type(new_array([])), IntArray)
+        for values in ([1, "a"], [[1]], [2 ** 63]):
+            with self.subTest(values=values):
+                self.assertIs(new_array(values), values)
+
+    def test_non_int_stores_convert_in_place(self):
+        for value in ("x", [1], 2 ** 64):
+            with self.subTest(value=value):
+                ints = new_array([1, 2, 3])
+                store(ints, 1, value)
+                self.assertIs(type(ints), ObjectArray)
+                self.assertEqual((len(ints), ints[0], ints[1], list(ints)), (3, 1, value, [1, value, 3]))
+                store(ints, 2, 4)
+                self.assertEqual(ints.items, [1, value, 4])
+
+    def test_object_arrays_use_their_items(self):
+        objects = new_array([1, 2, 1])
+        store(objects, 2, "x")
+        self.assertTrue("x" in objects and 2 in objects and 3 not in objects)
+        self.assertEqual((objects.count(1), objects.index("x")), (1, 2))
+        self.assertTrue(objects == [1, 2, "x"] and objects == copy.deepcopy(objects) and objects != new_array([1, 2, 1]))
+        for result in (objects + new_array([4]), objects + ["y"], objects * 2, 2 * objects, copy.copy(objects), pickle.loads(pickle.dumps(objects))):
+            self.assertIs(type(result), ObjectArray)
+        self.assertEqual((objects + new_array([4]), objects * 2), ([1, 2, "x", 4], [1, 2, "x"] * 2))
+        objects.append(5)
+        objects.extend([6])
+        objects.insert(0, 0)
+        objects += [7]
+        objects.remove(2)
+        del objects[1]
+        self.assertEqual((objects.pop(), list(objects)), (7, [0, "x", 5, 6]))
+        objects.reverse()
+        objects *= 2
+        self.assertEqual(objects.tolist(), [6, 5, "x", 0] * 2)
+        for name in ('tobytes', 'buffer_info', 'byteswap'):
+            with self.subTest(method=name), self.assertRaises(TypeError):
+                getattr(objects, name)()
+        self.assertFalse(hasattr(objects, 'itemsize') or hasattr(objects, 'typecode'))
+
+    def test_slices_convert_in_place(self):
+        ints = new_array([0] * 5)
+        store_slice(ints, slice(0, 5, 2), range(3))
+        self.assertEqual((type(ints), ints.tolist()), (IntArray, [0, 0, 1, 0, 2]))
+        store_slice(ints, slice(1, 3), ["a", "b"])
+        self.assertEqual((type(ints), ints.tolist()), (ObjectArray, [0, "a", "b", 0, 2]))
+
+    def test_arrays_read_as_lists(self):
+        ints = new_array([1, 2])
+        self.assertEqual((repr(ints), str(ints), type(ints).__name__), ("[1, 2]", "[1, 2]", "list"))
+        self.assertTrue(ints == [1, 2] and [1, 2] == ints and ints < [1, 3] and ints != new_array([2]))
+        self.assertFalse(ints == 1)
+        with self.assertRaisesRegex(TypeError, "'<' not supported between instances of 'int' and 'list'"):
+            1 < ints
+        store(ints, 0, ints)
+        self.assertEqual(repr(ints), "[[...], 2]")
+
+class TestArrayPrograms(unittest.TestCase):
+    def test_engines_agree_on_array_programs(self):
+        source = """program P {
+            func put(xs, i, v) { xs[i] = v; return xs; }
+            main {
+                let a = [1, 2, 3]; let b = a; let big = 4611686018427387904;
+                put(a, 0, big * 2); output(b, b[0] - 1);
+                let c = [0, 0, 0, 0]; let i = 0;
+                while (i < 4) { c[i] = i * 10; i = i + 1; };
+                let d = c; i = 0;
+                while (i < 4) { c[i] = "x"; i = i + 1; };
+                output(d, [c, [5]]);
+                if (a == b) { output("same"); };
+                if (c == ["x", "x", "x", "x"]) { output("equal"); };
+                let e = [7, 8]; e[1] = e; output(e, e[0]);
+                output(e[2]);
+            }
+        }"""
+        expected = ("[9223372036854775808, 2, 3] 9223372036854775807\n"
+                    "['x', 'x', 'x', 'x'] [['x', 'x', 'x', 'x'], [5]]\nsame\nequal\n"
+                    "[7, [...]] 7\n",
+                    "InterpreterError: InterpreterError: Array index 2 out of bounds for array of size 2.")
+        for name, engine in ENGINES.items():
+            for arena in (False, True):
+                with self.subTest(engine=name, arena=arena):
+                    self.assertEqual(run(engine, source, arena=arena), expected)
+
+if __name__ == '__main__':
+    unittest.main()
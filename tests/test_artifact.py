@@ -0,0 +1,100 @@
+import unittest
+import io
+import os
+import sys
+import tempfile
+
+from src.artifact import MAGIC, FORMAT_VERSION, _HEADER, read_artifact, write_artifact, load_program, artifact_path_for
+from src.error import ArtifactError
+from src.interpreter import Interpreter
+from src.parser import parse_source
+from src.visualizer import ASTVisualizer
+
+CODE = """
+program P {
+    struct Point { x, y };
+    func add(a, b) {
+        let unused = 0;
+        return a + b;
+    }
+    main {
+        let p = Point(1, 2);
+        let arr = [10, 20, 30];
+        output("sum:", add(p.x, arr[2]), "text");
+    }
+}
+"""
+
+class TestArtifact(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.source_path = os.path.join(self.directory.name, 'prog.l25')
+        self.artifact_path = artifact_path_for(self.source_path)
+        self.write_source(CODE)
+        write_artifact(self.artifact_path, parse_source(CODE), CODE, self.source_path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_source(self, source):
+        with open(self.source_path, 'w') as f:
+            f.write(source)
+
+    def run_tree(self, tree):
+        old_stdout = sys.stdout
+        sys.stdout = captured_output = io.StringIO()
+        try:
+            Interpreter(tree=tree).interpret()
+        finally:
+            sys.stdout = old_stdout
+        return captured_output.getvalue()
+
+    def test_round_trip(self):
+        self.assertTrue(self.artifact_path.endswith('.l25c'))
+        program, status = load_program(self.artifact_path)
+        self.assertEqual(status, 'fresh')
+        self.assertEqual(ASTVisualizer(program).generate(), ASTVisualizer(parse_source(CODE)).generate())
+        self.assertEqual(self.run_tree(program), "sum: 31 text\n")
+
+    def test_header(self):
+        artifact = read_artifact(self.artifact_path)
+        self.assertEqual(artifact.version, FORMAT_VERSION)
+        self.assertEqual(artifact.source_path, os.path.abspath(self.source_path))
+
+    def test_stale_artifact_is_reparsed_and_rewritten(self):
+        self.write_source(CODE.replace('"text"', '"changed"'))
+        program, status = load_program(self.artifact_path)
+        self.assertEqual(status, 'stale')
+        self.assertEqual(self.run_tree(program), "sum: 31 changed\n")
+        self.assertEqual(load_program(self.artifact_path)[1], 'fresh')
+
+    def test_missing_source_uses_artifact(self):
+        os.remove(self.source_path)
+        program, status = load_program(self.artifact_path)
+        self.assertEqual(status, 'unchecked')
+        self.assertEqual(self.run_tree(program), "sum: 31 text\n")
+
+    def test_other_format_version_falls_back_to_source(self):
+        with open(self.artifact_path, 'rb') as f:
+            data = bytearray(f.read())
+        _, _, digest, path_length = _HEADER.unpack_from(data)
+        data[:_HEADER.size] = _HEADER.pack(MAGIC, FORMAT_VERSION + 1, digest, path_length)
+        with open(self.artifact_path, 'wb') as f:
+            f.write(data)
+        program, status = load_program(self.artifact_path)
+        self.assertEqual(status, 'stale')
+        self.assertEqual(read_artifact(self.artifact_path).version, FORMAT_VERSION)
+
+    def test_invalid_files(self):
+        with open(self.artifact_path, 'wb') as f:
+            f.write(b'not an artifact at all, just some bytes')
+        with self.assertRaises(ArtifactError):
+            load_program(self.artifact_path)
+        with open(self.artifact_path, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, bytes(32), 0) + b'\x00garbage')
+        with self.assertRaises(ArtifactError):
+            load_program(self.artifact_path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import os
+import tempfile
+
+from src.batch import collect_files, compile_file, run_batch, summarize, format_report
+
+PROGRAMS = {
+    'ok.l25': "program A { main { output(\"hello\", 1 + 2); } }",
+    'parse_error.l25': "program B { main { let x = 1 } }",
+    'runtime_error.l25': "program C { main { output(1 / 0); } }",
+    'lex_error.l25': "program D { main { let x = 1 # 2; } }",
+    'input.l25': "program E { main { let x; input(x); } }",
+}
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        os.mkdir(os.path.join(self.directory.name, 'nested'))
+        for name, source in PROGRAMS.items():
+            with open(os.path.join(self.directory.name, 'nested' if name == 'ok.l25' else '', name), 'w') as f:
+                f.write(source)
+        with open(os.path.join(self.directory.name, 'notes.txt'), 'w') as f:
+            f.write("not a program")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_collect_files(self):
+        files = collect_files([self.directory.name])
+        self.assertEqual(sorted(os.path.basename(path) for path in files), sorted(PROGRAMS))
+        self.assertEqual(collect_files(['a.l25', 'b.l25']), ['a.l25', 'b.l25'])
+
+    def test_statuses_and_captured_output(self):
+        by_name = {os.path.basename(r.path): r for r in run_batch(collect_files([self.directory.name]), jobs=1, execute=True)}
+        self.assertEqual(by_name['ok.l25'].status, 'ok')
+        self.assertEqual(by_name['ok.l25'].output, "hello 3\n")
+        self.assertEqual(set(by_name['ok.l25'].timings), {'read', 'lex', 'parse', 'execute'})
+        self.assertEqual(by_name['parse_error.l25'].status, 'compiler_error')
+        self.assertIn('ParserError', by_name['parse_error.l25'].error)
+        self.assertNotIn('execute', by_name['parse_error.l25'].timings)
+        self.assertEqual(by_name['runtime_error.l25'].status, 'compiler_error')
+        self.assertEqual(by_name['lex_error.l25'].status, 'error')
+        self.assertEqual(by_name['input.l25'].status, 'compiler_error')
+
+    def test_process_pool_keeps_order(self):
+        paths = collect_files([self.directory.name]) * 3
+        serial = run_batch(paths, jobs=1, execute=True)
+        parallel = run_batch(paths, jobs=2, execute=True)
+        self.assertEqual([(r.path, r.status, r.error, r.output) for r in parallel],
+                         [(r.path, r.status, r.error, r.output) for r in serial])
+        summary = summarize(parallel, wall_time=1.0)
+        self.assertEqual((summary['files'], summary['ok'], summary['compiler_errors'], summary['errors']), (15, 3, 9, 3))
+        self.assertIn("15 files: 3 ok, 9 compiler errors, 3 other errors", format_report(parallel, summary))
+
+    def test_compile_only(self):
+        result = compile_file(os.path.join(self.directory.name, 'runtime_error.l25'))
+        self.assertTrue(result.ok)
+        self.assertNotIn('execute', result.timings)
+
+if __name__ == '__main__':
+    unittest.main()
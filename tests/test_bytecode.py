@@ -0,0 +1,116 @@
+import unittest
+
+from src.bytecode import (
+    OPNAMES, JUMPS, LOAD_CONST, RETURN_VALUE, SETUP_TRY, POP_TOP,
+    compile_program, disassemble, disassemble_program
+)
+from src.error import InterpreterError
+from src.parser import parse_source
+from src.vm import VirtualMachine
+
+CODE = """program P {
+    func add(a, b) {
+        let s = a + b;
+        return s;
+    }
+    main {
+        let x = 1;
+        let i = 0;
+        while (i < 3) {
+            i = i + 1;
+        };
+        add(i, 1);
+        try {
+            x = x / 0;
+        } catch {
+            output("caught", x);
+        };
+    }
+}
+"""
+
+def instructions(code):
+    return [(OPNAMES[code.code[i]], code.code[i + 1]) for i in range(0, len(code.code), 2)]
+
+class TestBytecode(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = parse_source(CODE)
+        self.program = compile_program(self.tree)
+
+    def test_code_objects(self):
+        add = self.program.functions[self.tree.func_defs[0]]
+        self.assertEqual(add.name, 'add')
+        self.assertEqual(add.params, ('a', 'b'))
+        self.assertEqual(instructions(add)[-1][0], 'RETURN_VALUE')
+        self.assertEqual(self.program.main.code[-2], RETURN_VALUE)
+        self.assertEqual(self.program.main.code.typecode, 'i')
+
+    def test_constant_pool_and_names_are_shared(self):
+        main = self.program.main
+        self.assertEqual(main.constants.count(1), 1)
+        self.assertEqual(len(main.names), len(set(main.names)))
+        self.assertIn(('add', 2), main.constants)
+
+    def test_jumps_stay_inside_the_code(self):
+        for code in [self.program.main, *self.program.functions.values()]:
+            for i in range(0, len(code.code), 2):
+                if code.code[i] in JUMPS:
+                    target = code.code[i + 1]
+                    self.assertTrue(0 <= target < len(code.code) and target % 2 == 0)
+
+    def test_statement_call_drops_its_result(self):
+        ops = [name for name, _ in instructions(self.program.main)]
+        self.assertEqual(ops[ops.index('CALL_FUNCTION') + 1], 'POP_TOP')
+        self.assertIn(SETUP_TRY, self.program.main.code[::2])
+        self.assertIn(POP_TOP, self.program.main.code[::2])
+
+    def test_error_positions(self):
+        main = self.program.main
+        divide = next(i for i in range(0, len(main.code), 2) if OPNAMES[main.code[i]] == 'BINARY_DIVIDE')
+        self.assertEqual(main.positions[divide].line, 14)
+
+    def test_disassemble(self):
+        listing = disassemble(self.program.main)
+        self.assertTrue(listing.startswith("Disassembly of <main>:"))
+        self.assertRegex(listing, r"LOAD_FUNCTION +\d+ +\(add, 2 args\)")
+        self.assertIn("(to ", listing)
+        self.assertIn("(<)", listing)
+        self.assertIn(">>", listing)
+        full = disassemble_program(self.program)
+        self.assertTrue(full.startswith("Disassembly of add(a, b):"))
+        self.assertTrue(full.endswith("RETURN_VALUE"))
+        self.assertEqual(OPNAMES[LOAD_CONST], 'LOAD_CONST')
+
+class TestCallStack(unittest.TestCase):
+    """Calls run on the VM's own call stack, not on Python's."""
+
+    DEEP = """program P {
+        func depth(n) { let r = 0; if (n > 0) { r = 1 + depth(n - 1); }; return r; }
+        main { let d = depth(100000); }
+    }"""
+
+    def test_deep_recursion(self):
+        vm = VirtualMachine(tree=parse_source(self.DEEP))
+        vm.interpret()
+        self.assertEqual(vm.globals['d'], 100000)
+
+    def test_max_depth(self):
+        vm = VirtualMachine(tree=parse_source(self.DEEP), max_depth=1000)
+        with self.assertRaises(InterpreterError) as raised:
+            vm.interpret()
+        self.assertEqual(str(raised.exception), "[Line 2:62] InterpreterError: Maximum call depth of 1000 exceeded")
+
+    def test_errors_unwind_to_a_caller_try_block(self):
+        vm = VirtualMachine(tree=parse_source("""program P {
+            func f(n) { let r = 1; if (n > 0) { r = f(n - 1); } else { r = 1 / n; }; return r; }
+            main { let x = 5; try { x = f(3); } catch { x = -1; }; let y = f(2) + 1; }
+        }"""))
+        with self.assertRaises(InterpreterError):
+            vm.interpret()
+        self.assertEqual(vm.globals['x'], -1)
+        self.assertNotIn('y', vm.globals)
+        self.assertFalse(vm.is_in_try_block)
+
+if __name__ == '__main__':
+    unittest.main()
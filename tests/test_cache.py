@@ -0,0 +1,50 @@
+import unittest
+
+from src.cache import ParseCache
+from src.parser import parse_source
+from src.error import ParserError
+from src.ast import Program
+
+class TestParseCache(unittest.TestCase):
+
+    def make_source(self, n):
+        return f"program P{{main{{output({n});}}}}"
+
+    def test_hit_returns_same_tree_without_parsing(self):
+        calls = []
+        def counting_parse(source):
+            calls.append(source)
+            return parse_source(source)
+        cache = ParseCache(maxsize=4, parse=counting_parse)
+        first = cache.parse(self.make_source(1))
+        second = cache.parse(self.make_source(1))
+        self.assertIsInstance(first, Program)
+        self.assertIs(first, second)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1, 'evictions': 0, 'size': 1, 'maxsize': 4})
+
+    def test_lru_eviction(self):
+        cache = ParseCache(maxsize=2)
+        cache.parse(self.make_source(1))
+        cache.parse(self.make_source(2))
+        cache.parse(self.make_source(1))  # 1 becomes most recently used
+        cache.parse(self.make_source(3))  # evicts 2
+        self.assertIn(self.make_source(1), cache)
+        self.assertNotIn(self.make_source(2), cache)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_errors_are_not_cached(self):
+        cache = ParseCache(maxsize=2)
+        for _ in range(2):
+            with self.assertRaises(ParserError):
+                cache.parse("program P{main{let x = 1}}")
+        self.assertEqual((cache.misses, len(cache)), (2, 0))
+
+    def test_disabled_cache(self):
+        cache = ParseCache(maxsize=0)
+        cache.parse(self.make_source(1))
+        cache.parse(self.make_source(1))
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (0, 2, 0))
+
+if __name__ == '__main__':
+    unittest.main()
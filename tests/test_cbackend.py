@@ -0,0 +1,148 @@
+import unittest
+import glob
+import io
+import os
+import subprocess
+import sys
+import tempfile
+from unittest.mock import patch
+
+from src.cbackend import build_executable, find_compiler, generate_c, c_string
+from src.error import BackendError, CompilerError
+from src.interpreter import Interpreter
+from src.parser import parse_source
+from tests.test_engines import CASES, INPUTS, PROGRAMS_DIR
+
+# Integer-only programs for the corners of the C representation.
+NATIVE_CASES = {
+    'floor_division': "program P { main { output(7 / 2, -7 / 2, 7 / -2, -7 / -2, 0 / 5, -1 / 3); } }",
+    'large_integers': "program P { main { let x = 3037000499; output(x * x, 0 - 9223372036854775807 - 1); } }",
+    'comparisons': """program P { struct S { a }; main {
+        let s = S(1); let t = S(1);
+        if (s == s) { output(1); }; if (s == t) { output(2); }; if (s != t) { output(3); };
+        if ([1, [2]] == [1, [2]]) { output(4); }; if ([1, 2] < [1, 3]) { output(5); };
+        if ([1] < [1, 0]) { output(6); }; if (1 == [1]) { output(7); }; if (1 != [1]) { output(8); };
+    } }""",
+    'order_mixed': "program P { main { if ([1] < 2) { output(1); }; } }",
+    'negate_array': "program P { main { output(-[1]); } }",
+    'struct_fields': """program P { struct S { a, b, a }; main {
+        let s = S(1, 2, 3); s.c = [s.a, s.b]; output(s); s.a = 0; output(s);
+    } }""",
+    'output_text': 'program P { main { output("", "a  b ? ??= é", 1); output("%d"); } }',
+    'while_in_try': """program P {
+        func f(n) { let i = 0; let r = 0; try { while (i < n) { r = r + 10 / (n - i - 1); i = i + 1; }; } catch { r = -r; }; return r; }
+        main { output(f(3), f(4)); }
+    }""",
+    'input_numbers': "program P { main { let a; let b; let c; input(a, b, c); output(a + b + c); } }",
+}
+NATIVE_INPUTS = {'input_numbers': [' 12 ', '-3', '1_000']}
+
+def interpret(source, inputs=()):
+    """Runs a program on Interpreter and returns its output and error, the way main.py reports them."""
+    old_stdout = sys.stdout
+    sys.stdout = captured_output = io.StringIO()
+    error = None
+    try:
+        with patch('builtins.input', side_effect=list(inputs)):
+            Interpreter(tree=parse_source(source)).interpret()
+    except CompilerError as e:
+        error = str(e)
+    except Exception as e:
+        error = f"An unexpected error occurred: {e}"
+    finally:
+        sys.stdout = old_stdout
+    return captured_output.getvalue(), error
+
+@unittest.skipUnless(find_compiler(), "no C compiler installed")
+class TestCBackend(unittest.TestCase):
+    """The native executables must behave like Interpreter on every program the backend supports."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.work_dir = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.work_dir.cleanup()
+
+    def run_native(self, tree, inputs=()):
+        """Builds and runs a program; returns its output and error, or None if it is unsupported."""
+        try:
+            path = build_executable(tree, os.path.join(self.work_dir.name, 'program'), flags=('-O0',))
+        except BackendError as e:
+            self.assertNotIn("C compiler failed", str(e))
+            return None
+        result = subprocess.run([path], input="".join(line + "\n" for line in inputs),
+                                capture_output=True, text=True, timeout=60)
+        if "BackendError" in result.stderr:
+            return None
+        self.assertEqual(result.returncode, 1 if result.stderr else 0)
+        return result.stdout, result.stderr.rstrip("\n") or None
+
+    def assert_matches(self, source, inputs=()):
+        try:
+            tree = parse_source(source)
+        except CompilerError:
+            return False
+        native = self.run_native(tree, inputs)
+        if native is not None:
+            self.assertEqual(native, interpret(source, inputs))
+        return native is not None
+
+    def test_example_programs(self):
+        supported = set()
+        for path in sorted(glob.glob(os.path.join(PROGRAMS_DIR, '*.l25'))):
+            with open(path) as f:
+                source = f.read()
+            with self.subTest(program=os.path.basename(path)):
+                if self.assert_matches(source):
+                    supported.add(os.path.basename(path))
+        self.assertLessEqual({'example.l25', 'factorial.l25', 'division_by_zero.l25', 'test_arrays.l25'}, supported)
+
+    def test_engine_cases(self):
+        for name, source in CASES.items():
+            with self.subTest(case=name):
+                self.assert_matches(source, INPUTS.get(name, ()))
+
+    def test_native_cases(self):
+        for name, source in NATIVE_CASES.items():
+            with self.subTest(case=name):
+                self.assertTrue(self.assert_matches(source, NATIVE_INPUTS.get(name, ())))
+
+    def test_overflow_is_reported(self):
+        source = "program P { main { let x = 9223372036854775807; output(x + 1); } }"
+        self.assertIsNone(self.run_native(parse_source(source)))
+        path = build_executable(parse_source(source), os.path.join(self.work_dir.name, 'overflow'), flags=('-O0',))
+        result = subprocess.run([path], capture_output=True, text=True)
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("[Line 1:58] BackendError: Integer overflow", result.stderr)
+
+class TestUnsupportedFeatures(unittest.TestCase):
+    def assert_unsupported(self, source, message):
+        with self.assertRaises(BackendError) as raised:
+            generate_c(parse_source(source))
+        self.assertIn(message, str(raised.exception))
+
+    def test_strings(self):
+        self.assert_unsupported('program P { main { let s = "a"; output(s); } }',
+                                "[Line 1:28] BackendError: The C backend only supports strings as literal arguments of output().")
+
+    def test_function_values(self):
+        self.assert_unsupported("program P { func f(a) { let b = a; return b; } main { let g = f; } }",
+                                "[Line 1:64] BackendError: The C backend does not support using 'f'")
+
+    def test_shadowed_struct(self):
+        self.assert_unsupported("program P { struct S { a }; main { let S = 1; } }", "using 'S', a function or struct name")
+
+    def test_big_literal(self):
+        self.assert_unsupported("program P { main { output(9223372036854775808); } }", "only supports 64-bit integers")
+
+    def test_output_literals_are_supported(self):
+        source = generate_c(parse_source('program P { main { output("x", 1); } }'))
+        self.assertIn('l25_append(&t1, "x", 1);', source)
+
+    def test_c_string(self):
+        self.assertEqual(c_string('a"\\?\n é'), '"a\\"\\\\\\?\\012 \\303\\251"')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import unittest
+import glob
+import io
+import os
+import sys
+from unittest.mock import patch
+
+from src.arena import ASTArena
+from src.engines import ENGINES
+from src.parser import parse_source
+from src.optimizer import Optimizer
+
+PROGRAMS_DIR = os.path.join(os.path.dirname(__file__), 'test_programs')
+
+# Programs exercising the language semantics every engine must reproduce,
+# including the exact error messages (and positions) of the tree walker.
+CASES = {
+    'arithmetic': "program P { main { let x = 7; let y = -x / 2 + x * 3 - +4; output(x, y, 7 / 2, -7 / 2, 2 - 3 - 4); } }",
+    'strings': """program P { main {
+        let s = "ab"; output(s + 1, 1 + s, s * 3, 2 * s, s + [1, "x"]);
+        output("q" < "r", "" + -5);
+    } }""",
+    'string_times_string': 'program P { main { output("a" * "b"); } }',
+    'unsupported_operands': 'program P { main { output("a" - 1); } }',
+    'list_plus_list': 'program P { main { output([1] + [2]); } }',
+    'loops_and_ifs': """program P { main {
+        let i = 0; let total = 0;
+        while (i < 10) {
+            if (i / 2 * 2 == i) { total = total + i; } else { total = total - 1; };
+            if (i >= 8) { output("late", i); };
+            i = i + 1;
+        };
+        output(total);
+    } }""",
+    'functions_and_scopes': """program P {
+        func h(x) { let hx = x; return x + 1; }
+        func g(n) { let a = n; let b = h(1); return a + b; }
+        func fact(n) { let r = 1; if (n > 1) { r = n * fact(n - 1); }; return r; }
+        func uses_global(k) { g1 = g1 + k; return g1; }
+        main {
+            let g1 = 10;
+            output(h(1), g(5), fact(10), uses_global(5), g1);
+            let f = h;
+            output(f(41));
+        }
+    }""",
+    'undefined_local': """program P {
+        func h(x) { let hx = x; return x + 1; }
+        main { let r = h(1); output(hx); }
+    }""",
+    'declared_without_value': "program P { main { let x; x = 3; output(x); let y; output(y); } }",
+    'assign_undeclared': "program P { main { z = 1; } }",
+    'assign_undeclared_in_function': "program P { func f() { let a = 1; q = 2; return a; } main { output(f()); } }",
+    'shadowed_function': "program P { func f(a) { let b = a; return b; } main { output(f(1)); let f = 3; output(f(1)); } }",
+    'local_shadows_function': "program P { func f(a) { let b = a; return b; } func g(f) { let c = 1; return f(c); } main { output(g(2)); } }",
+    'arity': "program P { func f(a, b) { let c = a; return c + b; } main { output(f(1)); } }",
+    'not_a_function': "program P { main { let x = 1; output(x(2)); } }",
+    'structs': """program P {
+        struct Point { x, y };
+        func norm1(p) { let s = p.x; if (s < 0) { s = -s; }; return s + p.y; }
+        main {
+            let p = Point(-3, 4);
+            output(p, norm1(p), p.x);
+            p.x = 10; p.z = 5;
+            output(p.z, p);
+            let q = Point(p, [1, 2]);
+            q.x.y = 7;
+            output(q.x.y, q.y[1]);
+        }
+    }""",
+    'struct_arity': "program P { struct S { a, b }; main { let s = S(1); } }",
+    'missing_member': "program P { struct S { a }; main { let s = S(1); output(s.b); } }",
+    'member_of_non_struct': "program P { main { let s = 1; output(s.b); } }",
+    'assign_member_of_non_struct': "program P { main { let s = 1; s.b = 2; } }",
+    'not_a_struct': "program P { struct S { a }; main { let S = 1; output(S(2)); } }",
+    'arrays': """program P { main {
+        let a = [1, [2, 3], "s"];
+        a[0] = a[0] + 10; a[1][0] = 9;
+        output(a, a[1][1], [], [[]]);
+        let i = 0; let sum = 0; let b = [5, 6, 7];
+        while (i < 3) { sum = sum + b[i]; i = i + 1; };
+        output(sum);
+    } }""",
+    'index_out_of_bounds': "program P { main { let a = [1, 2]; output(a[2]); } }",
+    'negative_index': "program P { main { let a = [1, 2]; a[-1] = 3; } }",
+    'string_index': 'program P { main { let a = [1, 2]; output(a["0"]); } }',
+    'index_non_array': "program P { main { let a = 5; output(a[0]); } }",
+    'index_call_result': "program P { func f() { let a = 1; return a; } main { output(f()[0]); } }",
+    'division_by_zero': "program P { main { output(1); let x = 1 / 0; output(2); } }",
+    'try_catch': """program P {
+        func risky(d) { let r = 10 / d; return r; }
+        main {
+            try { output("before"); output(risky(0)); output("after"); } catch { output("caught"); };
+            try { output(risky(5)); } catch { output("not reached"); };
+            try { try { let x = 1 / 0; } catch { output("inner"); let y = 2 / 0; }; } catch { output("outer"); };
+            let z = 1 / 0;
+        }
+    }""",
+    'try_other_error': "program P { main { try { output(undefined_name); } catch { output(1); }; } }",
+    'input': "program P { main { let a; let b; input(a, b); output(a + 1, b + 1); } }",
+    'input_undeclared': "program P { main { input(a); } }",
+    'unary_string': 'program P { main { output(-"x"); } }',
+    'compare_mixed': 'program P { main { if (1 < "a") { output(1); }; } }',
+    'deep_recursion': "program P { func down(n) { let r = 0; if (n > 0) { r = down(n - 1) + 1; }; return r; } main { output(down(25)); } }",
+}
+INPUTS = {'input': ['41', 'text']}
+
+def run(engine, source, inputs=(), arena=False, optimize=False):
+    """Runs a program and returns its output and error, the way main.py reports them."""
+    old_stdout = sys.stdout
+    sys.stdout = captured_output = io.StringIO()
+    error = None
+    try:
+        with patch('builtins.input', side_effect=list(inputs)):
+            tree = parse_source(source)
+            if optimize:
+                tree = Optimizer(tree).optimize()
+            if arena:
+                tree = ASTArena.from_tree(tree).root
+            ENGINES[engine](tree=tree).interpret()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        sys.stdout = old_stdout
+    return captured_output.getvalue(), error
+
+class TestEngines(unittest.TestCase):
+    """Every engine must behave exactly like the tree-walking Interpreter."""
+
+    def test_cases(self):
+        for name, source in CASES.items():
+            expected = run('tree', source, INPUTS.get(name, ()))
+            for engine in ENGINES:
+                with self.subTest(case=name, engine=engine):
+                    self.assertEqual(run(engine, source, INPUTS.get(name, ())), expected)
+
+    def test_example_programs(self):
+        for path in sorted(glob.glob(os.path.join(PROGRAMS_DIR, '*.l25'))):
+            with open(path) as f:
+                source = f.read()
+            expected = run('tree', source)
+            for engine in ENGINES:
+                with self.subTest(program=os.path.basename(path), engine=engine):
+                    self.assertEqual(run(engine, source), expected)
+
+    def test_arena_trees(self):
+        for name in ('functions_and_scopes', 'structs', 'try_catch'):
+            expected = run('tree', CASES[name])
+            for engine in ENGINES:
+                with self.subTest(case=name, engine=engine):
+                    self.assertEqual(run(engine, CASES[name], arena=True), expected)
+
+    def test_scope_is_restored_after_calls(self):
+        output, error = run('tree', CASES['functions_and_scopes'])
+        self.assertIsNone(error)
+        self.assertEqual(output, "2 7 3628800 15 15\n42\n")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+
+from src.incremental import IncrementalParser, split_source
+from src.parser import parse_source
+from src.arena import ASTArena
+from src.ast import FuncCall, StructInit
+from src.error import ParserError
+from src.lexer import RegexLexer
+
+CODE = """program P {
+    func first(a) {
+        let s = "braces { in } strings; func";
+        return a + 1;
+    }
+    struct Point { x, y };
+    func second(b) {
+        let p = Point(b, 2);
+        return p.x * b;
+    }
+    main {
+        output(first(1), second(2));
+    }
+}
+"""
+
+class TestIncrementalParser(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = IncrementalParser()
+        self.previous = self.parser.parse(CODE)
+
+    def assertSameAsFullParse(self, tree, source):
+        # Compares every node and every token position.
+        self.assertEqual(ASTArena.from_tree(tree).to_payload(), ASTArena.from_tree(parse_source(source)).to_payload())
+
+    def test_split_source(self):
+        kinds = [kind for kind, _, _ in split_source(CODE)]
+        self.assertEqual(kinds, ['program', 'func', 'struct', 'func', 'main'])
+        self.assertIsNone(split_source("program P { func f() { "))
+
+    def test_slice_lexing_keeps_positions(self):
+        start = CODE.index("struct")
+        sliced = RegexLexer(CODE, start, CODE.index(";", start) + 1, line=CODE.count("\n", 0, start) + 1).tokens()
+        whole = RegexLexer(CODE).tokens()
+        offset = [token.value for token in whole].index("struct")
+        self.assertEqual([(t.type, t.value, t.line, t.column) for t in sliced[:-1]],
+                         [(t.type, t.value, t.line, t.column) for t in whole[offset:offset + len(sliced) - 1]])
+
+    def test_unchanged_definitions_are_reused(self):
+        self.assertSameAsFullParse(self.previous, CODE)
+        edited = CODE.replace("return p.x * b;", "return p.y * b;")
+        tree = self.parser.parse(edited)
+        self.assertSameAsFullParse(tree, edited)
+        self.assertIs(tree.func_defs[0], self.previous.func_defs[0])
+        self.assertIs(tree.struct_defs[0], self.previous.struct_defs[0])
+        self.assertIsNot(tree.func_defs[1], self.previous.func_defs[1])
+        self.assertEqual(self.parser.stats()['parsed'], 5)
+
+    def test_moved_definitions_get_new_positions(self):
+        edited = CODE.replace("return a + 1;", "let b = a;\n        return b + 1;")
+        tree = self.parser.parse(edited)
+        self.assertSameAsFullParse(tree, edited)
+        self.assertGreater(self.parser.stats()['moved'], 0)
+        self.assertEqual(tree.func_defs[1].name.token.line, self.previous.func_defs[1].name.token.line + 1)
+
+    def test_struct_names_are_part_of_the_key(self):
+        edited = CODE.replace("struct Point { x, y };", "").replace("func first", "struct Point { x, y };\n    func first")
+        self.assertIsInstance(self.previous.func_defs[1].body.stmts[0].expr, StructInit)
+        renamed = CODE.replace("struct Point { x, y };", "struct Other { x, y };")
+        tree = self.parser.parse(renamed)
+        self.assertSameAsFullParse(tree, renamed)
+        self.assertIsInstance(tree.func_defs[1].body.stmts[0].expr, FuncCall)
+        self.assertSameAsFullParse(self.parser.parse(edited), edited)
+
+    def test_errors_match_full_parse(self):
+        broken = CODE.replace("return a + 1;", "return a + ;")
+        with self.assertRaises(ParserError) as expected:
+            parse_source(broken)
+        with self.assertRaises(ParserError) as incremental:
+            self.parser.parse(broken)
+        self.assertEqual(str(incremental.exception), str(expected.exception))
+        self.assertEqual(self.parser.stats()['fallbacks'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+import glob
+import operator
+import os
+
+from src.ast import BinaryOp
+from src.inference import ANY, INT, STR, ARRAY, TypeInference, concatenate, infer_types
+from src.interpreter import Interpreter
+from src.optimizer import walk
+from src.parser import parse_source
+from tests.test_engines import PROGRAMS_DIR, run
+from tests.helpers import run as run_with
+
+def binary_ops(program):
+    """Every BinaryOp of `program`, in source order."""
+    found = [node for node in walk(program) if isinstance(node, BinaryOp)]
+    return sorted(found, key=lambda node: (node.op.line, node.op.column))
+
+class TestTypeInference(unittest.TestCase):
+    def test_variable_and_result_types(self):
+        program = parse_source("""program P {
+            struct Pt { x, y };
+            func add(a, b) { let s = a + b; return s; }
+            func greet(n) { output("hi", n); return [n]; }
+            main {
+                let i = add(1, 2); let t = "a" + i; let xs = [1, 2]; let p = Pt(1, "y");
+                let u = greet(i); let k; input(k);
+            }
+        }""")
+        inference = TypeInference(program)
+        inference.infer()
+        names = inference.names
+        self.assertEqual((names['a'], names['b'], names['s'], names['i'], names['t'], names['xs']), (INT, INT, INT, INT, STR, ARRAY))
+        self.assertEqual((names['p'], names['u'], names['k']), ('struct Pt', ARRAY, ANY))
+        self.assertEqual(inference.returns, {'add': INT, 'greet': ARRAY})
+        self.assertEqual((inference.member_types['x'], inference.member_types['y']), (INT, STR))
+
+    def test_specialized_operations(self):
+        program = parse_source("""program P {
+            struct Pt { x, y };
+            func f(a) { let r = a * 2 - 1; return r; }
+            main {
+                let p = Pt(1, 2); let xs = [0, 1, 2]; let s = "n=";
+                output(f(p.x) / 3, s + p.y, xs[p.x] + 1, s + s);
+                let v = 1; v = "one"; output(v + 1, p.z);
+            }
+        }""")
+        facts = infer_types(program)
+        ops = binary_ops(program)
+        self.assertEqual([facts.operators.get(node) for node in ops],
+                         [operator.mul, operator.sub, operator.floordiv, concatenate, operator.add, operator.add, None])
+        self.assertEqual(len(facts.indexed), 1)
+        self.assertEqual(facts.stats(), {'arithmetic': (6, 7), 'indexing': (1, 1), 'members': (3, 4)})
+
+    def test_rebound_names_and_dynamic_calls_are_not_specialized(self):
+        program = parse_source("""program P {
+            func one(a) { let r = a + 1; return r; }
+            func two(a) { let r = a + "!"; return r; }
+            func bump(k) { g = "g"; return k; }
+            main {
+                let f = one; f = two; let y = f(1) + 1;
+                let g = 1; let z = bump(g) + g;
+            }
+        }""")
+        facts = infer_types(program)
+        ops = binary_ops(program)
+        self.assertEqual([facts.operators.get(node) for node in ops], [operator.add, concatenate, None, None])
+
+    def test_call_statements_bind_parameters(self):
+        program = parse_source("""program P {
+            func f(a) { output(a + 1); return 0; }
+            func g(b) { let r = b - 1; return r; }
+            main { f(1); let z = f("s"); let x = g(5); g("s"); }
+        }""")
+        inference = TypeInference(program)
+        facts = inference.infer()
+        self.assertEqual((inference.names['a'], inference.names['b']), (ANY, ANY))
+        self.assertEqual([facts.operators.get(node) for node in binary_ops(program)], [None, None])
+        sources = [
+            'program P { func f(a) { output(a + 1); return 0; } main { f(1); let z = f("s"); } }',
+            'program P { func f(a) { let r = a - 1; return r; } main { let x = f(5); f("s"); output(x); } }',
+        ]
+        for source in sources:
+            with self.subTest(source=source):
+                expected = run_with(Interpreter, source, typed=False)
+                for engine in ('tree', 'slots', 'tiered'):
+                    self.assertEqual(run(engine, source), expected)
+
+    def test_checked_errors_are_kept(self):
+        sources = [
+            "program P { main { let a = 1; let b = 0; try { output(a / b); } catch { output(a); }; output(a / b); } }",
+            "program P { main { let xs = [1, 2]; let i = 2; output(xs[i - 1]); xs[i] = 3; } }",
+            "program P { main { let xs = [1, 2]; let i = 0; output(xs[i - 1]); } }",
+            "program P { func f(n) { let r = n + m; return r; } main { output(f(1)); } }",
+            "program P { struct S { a }; main { let s = S(1); s.b = 2; output(s.a + s.b, s); output(s.c); } }",
+        ]
+        for source in sources:
+            with self.subTest(source=source):
+                expected = run_with(Interpreter, source, typed=False)
+                self.assertEqual(run_with(Interpreter, source), expected)
+
+    def test_programs_match_the_checked_engines(self):
+        for path in sorted(glob.glob(os.path.join(PROGRAMS_DIR, '*.l25'))):
+            with open(path) as f:
+                source = f.read()
+            with self.subTest(program=os.path.basename(path)):
+                expected = run('vm', source)
+                for engine in ('tree', 'slots'):
+                    self.assertEqual(run(engine, source), expected)
+                self.assertEqual(run_with(Interpreter, source, typed=False), expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -108,5 +108,43 @@ class TestInterpreter(unittest.TestCase):
         output = self.helper_run_code(code, inputs=['123'])
         self.assertEqual(output, "124")
 
+    def test_return_restores_caller_scope(self):
+        code = """
+        program P {
+            func f(n) {
+                let local = n * 2;
+                return local;
+            }
+            main {
+                let x = f(4);
+                output(x);
+                output(local);
+            }
+        }
+        """
+        with self.assertRaises(InterpreterError):
+            self.helper_run_code(code)
+
+    def test_returns_do_not_raise(self):
+        code = "program P{func sq(n){let r=n*n; return r;} main{output(sq(sq(3)));}}"
+        with patch.object(Interpreter, 'visit_ReturnStmt', side_effect=AssertionError("return raised")):
+            output = self.helper_run_code(code)
+        self.assertEqual(output, "81")
+
+    def test_tail_calls_run_in_constant_stack(self):
+        # `next` is the function itself until n reaches 0, so every call is in tail position.
+        code = """program P{
+            func done(n, acc){let r=acc; return r;}
+            func sum(n, acc){let next=sum; if(n==0){next=done;}; return next(n-1, acc+n);}
+            main{output(sum(5000, 0));}
+        }"""
+        old_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(200)
+        try:
+            output = self.helper_run_code(code)
+        finally:
+            sys.setrecursionlimit(old_limit)
+        self.assertEqual(output, "12502500")
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
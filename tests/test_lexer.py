@@ -11,4 +11,72 @@ while True:
     token = lexer.get_next_token()
     if token.type == TokenType.EOF:
         break
-    print(token)
\ No newline at end of file
+    print(token)
+
+import glob
+import unittest
+from src.lexer import RegexLexer
+
+class TestRegexLexer(unittest.TestCase):
+
+    def assertSameTokens(self, code):
+        expected = [(t.type, t.value, t.line, t.column) for t in Lexer(code).tokens()]
+        actual = [(t.type, t.value, t.line, t.column) for t in RegexLexer(code).tokens()]
+        self.assertEqual(actual, expected)
+
+    def test_matches_char_lexer_on_programs(self):
+        for path in glob.glob('tests/test_programs/*.l25'):
+            with open(path) as f:
+                self.assertSameTokens(f.read())
+
+    def test_matches_char_lexer_on_edge_cases(self):
+        for code in ['', '  \n\n ', 'a<=b>=c!=d==e', '12abc x_1', '"multi\nline" y', '"unterminated', 'a !+ b']:
+            self.assertSameTokens(code)
+
+    def test_invalid_character(self):
+        with self.assertRaises(Exception) as char_error:
+            Lexer('let x = 1 # 2;').tokens()
+        with self.assertRaises(Exception) as regex_error:
+            RegexLexer('let x = 1 # 2;').tokens()
+        self.assertEqual(str(regex_error.exception), str(char_error.exception))
+
+    def test_get_next_token_repeats_eof(self):
+        lexer = RegexLexer('x')
+        self.assertEqual(lexer.get_next_token().type, TokenType.IDENT)
+        self.assertEqual(lexer.get_next_token().type, TokenType.EOF)
+        self.assertEqual(lexer.get_next_token().type, TokenType.EOF)
+
+
+from src.lexer import TokenBuffer
+from src.parser import Parser
+from src.error import ParserError
+
+class TestTokenBuffer(unittest.TestCase):
+
+    def test_matches_char_lexer(self):
+        codes = ['"unterminated', 'a !+ b\n  "two\nlines" 42 while']
+        for path in glob.glob('tests/test_programs/*.l25'):
+            with open(path) as f:
+                codes.append(f.read())
+        for code in codes:
+            expected = [(t.type, t.value, t.line, t.column) for t in Lexer(code).tokens()]
+            actual = [(t.type, t.value, t.line, t.column) for t in TokenBuffer(code)]
+            self.assertEqual(actual, expected)
+
+    def test_compact_storage(self):
+        buffer = TokenBuffer('let x = 10;\nlet y = "s";')
+        self.assertEqual(len(buffer), 11)
+        self.assertEqual(buffer.kinds.itemsize, 1)
+        self.assertIsNone(buffer._line_starts)  # positions are only indexed on demand
+        self.assertEqual((buffer[7].type, buffer[7].line, buffer[7].column), (TokenType.ASSIGN, 2, 7))
+
+    def test_parser_error_position(self):
+        code = "program P{main{\nlet x = 1}}"
+        with self.assertRaises(ParserError) as expected:
+            Parser(Lexer(code).tokens()).parse()
+        with self.assertRaises(ParserError) as actual:
+            Parser(TokenBuffer(code)).parse()
+        self.assertEqual(str(actual.exception), str(expected.exception))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+from unittest.mock import patch
+
+from src.ast import WhileStmt
+from src.interpreter import Interpreter
+from src.loops import CountedLoops, SUM_ELEMENTS, SUM_COUNTER, SUM_VALUE, COUNT, FILL, FILL_COUNTER
+from src.parser import parse_source
+from src.resolver import SlotInterpreter
+from tests.helpers import run
+
+def loops(source):
+    """The CountedLoop (or None) of every top-level while loop of main, in order."""
+    program = parse_source(source)
+    counted = CountedLoops(program)
+    return [counted.get(stmt) for stmt in program.main_block.stmts if isinstance(stmt, WhileStmt)]
+
+class TestCountedLoops(unittest.TestCase):
+    def test_recognized_loops(self):
+        found = loops("""program P { main {
+            let i = 0; let n = 10; let s = 0;
+            while (i < n) { output(i); i = i + 1; };
+            while (i <= 20) { s = s + i * i; i = 2 + i; };
+            while (i < n) { i = i + 1; };
+        } }""")
+        self.assertEqual([(loop.counter.value, loop.step, loop.inclusive, len(loop.body)) for loop in found],
+                         [('i', 1, False, 1), ('i', 2, True, 1), ('i', 1, False, 0)])
+        self.assertTrue(all(loop.reduction is None for loop in found))
+
+    def test_changed_counters_and_limits_are_not_recognized(self):
+        found = loops("""program P {
+            func bump(k) { i = i + k; return i; }
+            func twice(k) { let r = k * 2; return r; }
+            main {
+                let i = 0; let n = 10; let x = 0;
+                while (i < n) { n = n - 1; i = i + 1; };
+                while (i < n) { if (i == 3) { i = i + 1; }; i = i + 1; };
+                while (i < n) { let n = 3; i = i + 1; };
+                while (i < n) { input(n); i = i + 1; };
+                while (i < n) { x = bump(1); i = i + 1; };
+                while (i < n) { i = i + 1; output(i); };
+                while (i < n) { i = i + x; };
+                while (i < n) { i = i - 1; };
+                while (i > n) { i = i + 1; };
+                while (i < n) { x = twice(i); i = i + 1; };
+            }
+        }""")
+        self.assertEqual([loop is not None for loop in found], [False] * 9 + [True])
+
+    def test_reductions(self):
+        found = loops("""program P { main {
+            let i = 0; let n = 4; let s = 0; let c = 0; let a = [1, 2, 3, 4]; let k = 3;
+            while (i < n) { s = s + a[i]; i = i + 1; };
+            while (i < n) { s = i + s; i = i + 1; };
+            while (i < n) { s = s + k; i = i + 1; };
+            while (i < n) { if (a[i] == 2) { c = c + 1; }; i = i + 1; };
+            while (i < n) { a[i] = k; i = i + 1; };
+            while (i < n) { a[i] = i; i = i + 1; };
+            while (i < n) { s = s + a[i] * 2; i = i + 1; };
+            while (i < n) { a = a + a[i]; i = i + 1; };
+            while (i < n) { if (a[i] == c) { c = c + 1; }; i = i + 1; };
+        } }""")
+        self.assertEqual([loop.reduction.kind if loop.reduction else None for loop in found],
+                         [SUM_ELEMENTS, SUM_COUNTER, SUM_VALUE, COUNT, FILL, FILL_COUNTER, None, None, None])
+
+    def test_loops_behave_as_without_idioms(self):
+        sources = [
+            # Sums, counts and fills, in bulk after their first iteration.
+            """program P { main {
+                let i = 0; let n = 50; let s = 0; let c = 0; let a = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0];
+                while (i < 10) { a[i] = i; i = i + 1; };
+                i = 0; while (i < 10) { s = s + a[i]; i = i + 1; };
+                i = 0; while (i <= n) { s = s + i; i = i + 3; };
+                i = 1; while (i < 10) { if (a[i] == 4) { c = c + 2; }; i = i + 2; };
+                i = 2; while (i < 8) { a[i] = "x"; i = i + 1; };
+                output(i, s, c, a);
+            } }""",
+            # Values that rule the bulk operation out, or fail part way.
+            """program P { main {
+                let i = 0; let s = 0; let t = ""; let a = [1, "two", 3];
+                while (i < 3) { s = s + i; t = t + a[i]; i = i + 1; };
+                i = 0; while (i < 3) { t = t + a[i]; i = i + 1; };
+                output(s, t);
+                i = 0; while (i < 3) { s = s + a[i]; i = i + 1; };
+            } }""",
+            """program P { main {
+                let i = 0; let a = [1, 2, 3]; let s = 0;
+                try { while (i < 6) { s = s + 10 / (3 - i); i = i + 1; }; } catch { output("caught", i, s); };
+                i = 1; while (i < 6) { a[i] = 0; i = i + 1; };
+            } }""",
+            # Counters and limits that are not integers, and a global counter in a function.
+            """program P {
+                func count(k) { let j = 0; while (j < k) { i = i + 1; j = j + 1; }; return j; }
+                main {
+                    let i = "d"; let n = "c";
+                    while (i < n) { output(i); i = i + 1; };
+                    input(n); i = 0;
+                    output(count(n), i, n);
+                }
+            }""",
+        ]
+        for source in sources:
+            expected = run(Interpreter, source, loop_idioms=False)
+            with self.subTest(source=source):
+                self.assertEqual(run(Interpreter, source), expected)
+                self.assertEqual(run(Interpreter, source, arena=True), expected)
+                self.assertEqual(run(SlotInterpreter, source), expected)
+
+    def test_reductions_run_in_bulk(self):
+        source = """program P { main {
+            let i = 0; let s = 0; let a = [1, 2, 3, 4, 5, 6];
+            while (i < 6) { s = s + a[i]; i = i + 1; };
+            output(s, i);
+        } }"""
+        with patch.object(Interpreter, 'visit_ArrayAccess', side_effect=Interpreter.visit_ArrayAccess, autospec=True) as access:
+            self.assertEqual(run(Interpreter, source), ("21 6\n", None))
+        self.assertEqual(access.call_count, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+import io
+import sys
+
+from src.interpreter import Interpreter
+from src.memo import MemoTable, pure_functions
+from src.parser import parse_source
+from src.resolver import SlotInterpreter
+from src.tiering import TieredInterpreter
+from tests.helpers import run
+
+FIB = """program Fib {
+    func fib(n) { let r = n; if (n > 1) { r = fib(n - 1) + fib(n - 2); }; return r; }
+    main { output(fib(30), fib(40)); }
+}"""
+
+def pure_names(source):
+    return sorted(func_def.name.value for func_def in pure_functions(parse_source(source)))
+
+class TestPurity(unittest.TestCase):
+    def test_pure_functions(self):
+        self.assertEqual(pure_names("""program P {
+            struct Pt { x, y };
+            func square(n) { let r = n * n; return r; }
+            func norm(a, b) { let p = Pt(a, b); let xs = [p.x, p.y]; let r = square(xs[0]) + square(xs[1]); return r; }
+            func count(n) { let i = 0; while (i < n) { let t = i; i = t + 1; }; return i; }
+            func pick(c) { let r = "no"; if (c > 0) { r = "yes"; }; return r; }
+            main { output(norm(1, 2), count(3), pick(1)); }
+        }"""), ['count', 'norm', 'pick', 'square'])
+
+    def test_effects_and_outside_state_are_impure(self):
+        self.assertEqual(pure_names("""program P {
+            struct S { a };
+            func shows(n) { output(n); return n; }
+            func reads(n) { input(n); return n; }
+            func stores(s) { s.a = 1; return s; }
+            func fills(xs) { xs[0] = 1; return xs; }
+            func global(n) { let r = n + g; return r; }
+            func sets(n) { g = n; return n; }
+            func late(n) { let r = t; let t = n; return r; }
+            func branch(n) { if (n > 0) { let t = n; }; let r = t; return r; }
+            func catches(n) { let r = 0; try { r = 1 / n; } catch { r = 0; }; return r; }
+            func dynamic(f) { let r = f(1); return r; }
+            func calls(n) { let r = shows(n); return r; }
+            func rebound(n) { let r = h(n); return r; }
+            func h(n) { let r = n; return r; }
+            main { let g = 1; h = shows; output(g); }
+        }"""), [])
+
+    def test_recursion_through_impure_functions(self):
+        self.assertEqual(pure_names("""program P {
+            func even(n) { let r = 1; if (n > 0) { r = odd(n - 1); }; return r; }
+            func odd(n) { let r = 0; if (n > 0) { r = even(n - 1); }; return r; }
+            func loud(n) { let r = n; if (n > 0) { r = quiet(n - 1); }; output(r); return r; }
+            func quiet(n) { let r = n; if (n > 0) { r = loud(n - 1); }; return r; }
+            main { output(even(4), loud(3)); }
+        }"""), ['even', 'odd'])
+
+class TestMemoTable(unittest.TestCase):
+    def test_least_recently_used_results_are_evicted(self):
+        table = MemoTable(maxsize=2)
+        run_count = []
+        def square(func, args):
+            run_count.append(args[0])
+            return args[0] * args[0]
+        self.assertEqual([table.call(square, None, [n]) for n in (1, 2, 1, 3, 1, 2)], [1, 4, 1, 9, 1, 4])
+        self.assertEqual(run_count, [1, 2, 3, 2])
+        self.assertEqual(table.stats(), {'hits': 2, 'misses': 4, 'skipped': 0, 'evictions': 2, 'size': 2, 'maxsize': 2})
+
+    def test_only_ints_and_strings_are_cached(self):
+        table = MemoTable()
+        make = lambda func, args: [args[0]]
+        first = table.call(make, None, [1])
+        self.assertIsNot(table.call(make, None, [1]), first)
+        table.call(lambda func, args: 0, None, [[1]])
+        self.assertEqual(table.stats(), {'hits': 0, 'misses': 2, 'skipped': 1, 'evictions': 0, 'size': 0, 'maxsize': 1024})
+
+class TestMemoizedCalls(unittest.TestCase):
+    def test_exponential_recursion_runs_in_linear_time(self):
+        for engine in (Interpreter, SlotInterpreter, TieredInterpreter):
+            with self.subTest(engine=engine.__name__):
+                old_stdout = sys.stdout
+                sys.stdout = output = io.StringIO()
+                try:
+                    interpreter = engine(tree=parse_source(FIB))
+                    interpreter.interpret()
+                finally:
+                    sys.stdout = old_stdout
+                self.assertEqual(output.getvalue(), "832040 102334155\n")
+                self.assertEqual(interpreter.memo_stats(), {'fib': {'hits': 39, 'misses': 41, 'skipped': 0,
+                                                                    'evictions': 0, 'size': 41, 'maxsize': 1024}})
+
+    def test_memoized_programs_behave_as_without_memoization(self):
+        sources = [
+            """program P {
+                func fib(n) { let r = n; if (n > 1) { r = fib(n - 1) + fib(n - 2); }; return r; }
+                func div(a, b) { let r = a / b; return r; }
+                func row(n) { let r = [n, n]; return r; }
+                main {
+                    let xs = row(1); xs[0] = 5; let ys = row(1);
+                    output(fib(15), xs[0], ys[0], div(6, 3), div(6, 3));
+                    try { output(div(1, 0)); } catch { output("caught"); };
+                    output(div(2, 0));
+                }
+            }""",
+            """program P {
+                func tail(n, acc) { let r = acc; if (n > 0) { r = tail(n - 1, acc + n); }; return tail2(r); }
+                func tail2(n) { let r = n; return r; }
+                func name(s, n) { let r = s * n + "!"; return r; }
+                main { let i = 0; while (i < 4) { output(tail(i, 0), name("ab", i)); i = i + 1; }; }
+            }""",
+        ]
+        for source in sources:
+            expected = run(Interpreter, source, memoize=False)
+            for engine in (Interpreter, SlotInterpreter, TieredInterpreter):
+                with self.subTest(engine=engine.__name__, source=source):
+                    self.assertEqual(run(engine, source), expected)
+                    self.assertEqual(run(engine, source, memo_size=1), expected)
+
+    def test_memoization_can_be_turned_off(self):
+        interpreter = Interpreter(tree=parse_source(FIB.replace("fib(30), fib(40)", "fib(15)")), memoize=False)
+        old_stdout = sys.stdout
+        sys.stdout = io.StringIO()
+        try:
+            interpreter.interpret()
+        finally:
+            sys.stdout = old_stdout
+        self.assertEqual(interpreter.memo_tables, {})
+        self.assertEqual(interpreter.memo_stats(), {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,203 @@
+import unittest
+import glob
+import os
+
+from src.ast import AssignStmt, BinaryOp, DeclareStmt, Identifier, IfStmt, Number, OutputStmt, String, WhileStmt
+from src.engines import ENGINES
+from src.error import InterpreterError
+from src.interpreter import Interpreter
+from src.optimizer import Optimizer, LoopOptimizer, function_effects, optimize
+from src.parser import parse_source
+from tests.test_engines import CASES, INPUTS, PROGRAMS_DIR, run
+
+class TestOptimizer(unittest.TestCase):
+    def optimize(self, source):
+        optimizer = Optimizer(parse_source(source))
+        return optimizer.optimize(), optimizer
+
+    def test_constant_folding(self):
+        program, optimizer = self.optimize('program P { main { output(2 * 60 * 60, "ab" + 1, "-" * 3, -(4 - 6), 7 / 2); } }')
+        exprs = program.main_block.stmts[0].exprs
+        self.assertEqual([(type(expr), expr.value) for expr in exprs],
+                         [(Number, 7200), (String, "ab1"), (String, "---"), (Number, 2), (Number, 3)])
+        self.assertEqual((exprs[0].token.line, exprs[0].token.column), (1, 27))
+        self.assertEqual(optimizer.stats()['folded'], 7)
+
+    def test_failing_operations_are_kept(self):
+        program, _ = self.optimize('program P { main { let x = 1 / 0; output("a" - 1, -"a", 9223372036854775807 + 1); } }')
+        self.assertIsInstance(program.main_block.stmts[0].expr, BinaryOp)
+        self.assertNotIsInstance(program.main_block.stmts[1].exprs[0], String)
+        self.assertIsInstance(program.main_block.stmts[1].exprs[2], BinaryOp)
+
+        with self.assertRaises(InterpreterError) as raised:
+            Interpreter(tree=program).interpret()
+        self.assertEqual(str(raised.exception), "[Line 1:30] InterpreterError: Fatal: Division by zero outside a try block")
+        self.assertEqual(run('tree', 'program P { main { let x = 1; try { x = 2 / 0; } catch { x = 3; }; output(x); } }'),
+                         ("Error: Division by zero detected. Jumping to catch block.\n3\n", None))
+
+    def test_constant_propagation(self):
+        program, optimizer = self.optimize("""program P {
+            func f(n) { let k = 60; let r = n * k; return r + k; }
+            main { output(x); let x = 3; let y = 4; let z = 5; output(x * 2, y, z); y = 1; input(z); }
+        }""")
+        f_body = program.func_defs[0].body.stmts
+        self.assertEqual(f_body[1].expr.right.value, 60)
+        self.assertEqual(f_body[2].expr.right.value, 60)
+        main = program.main_block.stmts
+        self.assertIsInstance(main[0].exprs[0], Identifier)
+        self.assertEqual([type(expr) for expr in main[4].exprs], [Number, Identifier, Identifier])
+        self.assertEqual(main[4].exprs[0].value, 6)
+        self.assertEqual(optimizer.stats()['propagated'], 3)
+
+    def test_globals_assigned_by_functions_are_not_propagated(self):
+        program, _ = self.optimize("""program P {
+            func bump(n) { g = g + n; return g; }
+            main { let g = 1; let h = bump(2); output(g); }
+        }""")
+        self.assertIsInstance(program.main_block.stmts[2].exprs[0], Identifier)
+
+    def test_dead_branches(self):
+        program, optimizer = self.optimize("""program P {
+            main {
+                let debug = 0;
+                if (debug == 1) { output("debug"); } else { let x = 1; output(x); };
+                if (debug != 0) { output("never"); };
+                while (debug > 0) { output("loop"); };
+                let i = 0;
+                while (i < 3) { i = i + 1; };
+            }
+        }""")
+        stmts = program.main_block.stmts
+        self.assertEqual([type(stmt) for stmt in stmts], [DeclareStmt, DeclareStmt, OutputStmt, DeclareStmt, WhileStmt])
+        self.assertFalse(any(isinstance(stmt, IfStmt) for stmt in stmts))
+        stats = optimizer.stats()
+        self.assertEqual(stats['pruned'], 3)
+        self.assertGreater(stats['removed'], 10)
+
+    def test_input_tree_is_unchanged(self):
+        tree = parse_source('program P { main { let a = 1 + 2; if (a == 3) { output(a); }; } }')
+        stmts = list(tree.main_block.stmts)
+        optimized = optimize(tree)
+        self.assertIsNot(optimized, tree)
+        self.assertEqual(tree.main_block.stmts, stmts)
+        self.assertIsInstance(tree.main_block.stmts[0].expr, BinaryOp)
+        self.assertIsInstance(tree.main_block.stmts[1], IfStmt)
+        unchanged = parse_source('program P { main { let a; input(a); output(a); } }')
+        self.assertIs(optimize(unchanged), unchanged)
+
+    def test_behaviour_is_preserved(self):
+        sources = dict(CASES)
+        for path in sorted(glob.glob(os.path.join(PROGRAMS_DIR, '*.l25'))):
+            with open(path) as f:
+                sources[os.path.basename(path)] = f.read()
+        for name, source in sources.items():
+            with self.subTest(program=name):
+                expected = run('tree', source, INPUTS.get(name, ()))
+                self.assertEqual(run('tree', source, INPUTS.get(name, ()), optimize=True), expected)
+
+class TestLoopOptimizer(unittest.TestCase):
+    def optimize(self, source):
+        optimizer = LoopOptimizer(parse_source(source))
+        return optimizer.optimize(), optimizer
+
+    def test_condition_invariants_move_before_the_loop(self):
+        program, optimizer = self.optimize("""program P {
+            func f(n) { let i = 0; while (i < n * n - 1) { i = i + 1; }; return i; }
+            main { output(f(4)); }
+        }""")
+        stmts = program.func_defs[0].body.stmts
+        self.assertIsInstance(stmts[1], DeclareStmt)
+        self.assertEqual(stmts[1].ident.value, '.t0')
+        self.assertIsInstance(stmts[2], WhileStmt)
+        self.assertEqual(stmts[2].bool_expr.right.value, '.t0')
+        self.assertEqual(optimizer.hoisted, 1)
+
+    def test_body_invariants_are_computed_in_a_peeled_first_iteration(self):
+        source = """program P {
+            struct Pt { x, y };
+            main {
+                let p = Pt(2, 3); let i = 0; let s = 0;
+                while (i < 3) { s = s + p.x * 3; i = i + 1; };
+                output(s);
+            }
+        }"""
+        program, optimizer = self.optimize(source)
+        peeled = program.main_block.stmts[3]
+        self.assertIsInstance(peeled, IfStmt)
+        first = peeled.if_block.stmts
+        self.assertEqual([type(stmt) for stmt in first], [DeclareStmt, AssignStmt, AssignStmt, WhileStmt])
+        self.assertEqual(first[1].expr.right.value, '.t0')
+        self.assertEqual(first[3].body.stmts[0].expr.right.value, '.t0')
+        self.assertEqual(run('tree', source, optimize=True), ("18\n", None))
+
+    def test_changed_inputs_are_not_hoisted(self):
+        program, optimizer = self.optimize("""program P {
+            struct Pt { x };
+            func move(q) { q.x = q.x + 1; return q; }
+            func bump(k) { g = g + k; return g; }
+            main {
+                let g = 1; let p = Pt(1); let i = 0; let n = 5;
+                while (i < 3) { output(n * 2); n = n - 1; i = i + 1; };
+                while (i < 6) { output(g * 2); let b = bump(1); i = i + 1; };
+                while (i < 9) { output(p.x * 2); let q = move(p); i = i + 1; };
+            }
+        }""")
+        self.assertEqual(optimizer.hoisted, 0)
+        effects, anything = function_effects(parse_source("""program P {
+            func a(n) { let r = b(n); return r; }
+            func b(n) { g = n; return n; }
+            func c(n) { let f = a; let r = f(n); return r; }
+            main { let g = 0; }
+        }"""))
+        self.assertEqual(effects['a'].writes, {'g'})
+        self.assertTrue(effects['c'].writes == anything.writes == {'g'})
+        self.assertNotIn('f', effects)
+
+    def test_errors_keep_their_place(self):
+        source = """program P {
+            func f(n) { output("call", n); return n; }
+            main {
+                let i = 0; let z = 0; let s = [1];
+                try { while (i < 3) { output(i); s = 10 / z; i = i + 1; }; } catch { output("caught", i); };
+                while (i < 5) { output(f(i), i * [2]); i = i + 1; };
+            }
+        }"""
+        program, optimizer = self.optimize(source)
+        self.assertEqual(optimizer.hoisted, 1)
+        self.assertEqual(run('tree', source, optimize=True), run('tree', source))
+
+    def test_common_subexpressions(self):
+        program, optimizer = self.optimize("""program P {
+            func f(a, b) { output(a * b + 1, a * b); let c = a * b; a = 2; let d = a * b; return c + d; }
+            main { output(f(3, 4)); }
+        }""")
+        stmts = program.func_defs[0].body.stmts
+        self.assertEqual(stmts[0].ident.value, '.t0')
+        self.assertEqual(stmts[1].exprs[1].value, '.t0')
+        self.assertEqual(stmts[2].expr.value, '.t0')
+        self.assertIsInstance(stmts[4].expr, BinaryOp)
+        self.assertEqual(optimizer.shared, 1)
+
+    def test_call_statements_end_shared_values(self):
+        source = """program P {
+            func f1(a0) { arr[0] = a0; return 0; }
+            main { let arr = [1, 2, 3, 4]; f1(7); output(arr[0]); f1(2); output(arr[0]); }
+        }"""
+        program, optimizer = self.optimize(source)
+        self.assertEqual(optimizer.shared, 0)
+        for engine in ENGINES:
+            for arena in (False, True):
+                with self.subTest(engine=engine, arena=arena):
+                    self.assertEqual(run(engine, source, optimize=True, arena=arena), ("7\n2\n", None))
+
+    def test_programs_match_the_interpreter(self):
+        for path in sorted(glob.glob(os.path.join(PROGRAMS_DIR, '*.l25'))):
+            with open(path) as f:
+                source = f.read()
+            with self.subTest(program=os.path.basename(path)):
+                expected = run('tree', source)
+                for engine in ENGINES:
+                    self.assertEqual(run(engine, source, optimize=True), expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import pickle
+
+from src.parallel import parse_parallel
+from src.parser import parse_source
+from src.arena import ASTArena
+from src.ast import StructInit
+from src.error import ParserError
+from src.lexer import Token, TokenType
+
+FUNC = """
+    func f{i}(a) {{
+        let p = Point(a, {i});
+        let s = "text {{ with braces }}";
+        return p.x + a * {i};
+    }}"""
+
+def make_source(count, extra=""):
+    funcs = "".join(FUNC.format(i=i) for i in range(count))
+    return f"program Big {{\n    struct Point {{ x, y }};{funcs}{extra}\n    main {{\n        output(f1(2));\n    }}\n}}\n"
+
+class TestParallelParse(unittest.TestCase):
+
+    def assertSameAsSequential(self, source, jobs):
+        expected = ASTArena.from_tree(parse_source(source)).to_payload()
+        self.assertEqual(ASTArena.from_tree(parse_parallel(source, jobs=jobs, min_size=0)).to_payload(), expected)
+
+    def test_matches_sequential_parse(self):
+        source = make_source(40, extra="\n    struct Late { v };" + FUNC.format(i=99).replace("Point", "Late"))
+        self.assertSameAsSequential(source, jobs=1)
+        self.assertSameAsSequential(source, jobs=2)
+        tree = parse_parallel(source, jobs=1, min_size=0)
+        self.assertEqual([s.name.value for s in tree.struct_defs], ['Point', 'Late'])
+        self.assertIsInstance(tree.func_defs[-1].body.stmts[0].expr, StructInit)
+
+    def test_error_positions_match_sequential_parse(self):
+        broken_sources = [
+            make_source(40).replace("return p.x + a * 30;", "return p.x + * 30;"),
+            make_source(40).replace("func f20(a) {", "func f20(a) {{"),
+            make_source(40).replace("func f35", "oops func f35"),
+            make_source(40).replace("let s = \"text", "let s = # \"text", 1),
+            make_source(40).replace("output(f1(2));\n    }\n}", "output(f1(2));\n    }"),
+        ]
+        for source in broken_sources:
+            with self.assertRaises(Exception) as expected:
+                parse_source(source)
+            for jobs in (1, 2):
+                with self.assertRaises(Exception) as parallel:
+                    parse_parallel(source, jobs=jobs, min_size=0)
+                self.assertIs(type(parallel.exception), type(expected.exception))
+                self.assertEqual(str(parallel.exception), str(expected.exception))
+
+    def test_errors_keep_their_token_across_processes(self):
+        error = pickle.loads(pickle.dumps(ParserError("Invalid syntax", Token(TokenType.IDENT, 'x', 3, 4))))
+        self.assertEqual(str(error), "[Line 3:4] ParserError: Invalid syntax")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,7 @@
 import unittest
-from src.lexer import Lexer
+from src.lexer import Lexer, RegexLexer, TokenType
 from src.parser import Parser
-from src.ast import Program, DeclareStmt, BinaryOp, Number, Identifier
+from src.ast import Program, DeclareStmt, BinaryOp, UnaryOp, Number, Identifier, MemberAccess, ArrayAccess, FuncCall
 from src.error import ParserError
 
 class TestParser(unittest.TestCase):
@@ -63,5 +63,59 @@ class TestParser(unittest.TestCase):
         with self.assertRaises(ParserError):
             self.helper_get_ast(code)
 
+    def test_streaming_matches_list_parse(self):
+        code = "program P{struct S{a,b}; func f(x){let y = S(x, 2); return y.a * 2;} main{output(f(3)); let z = [1, 2];}}"
+        streamed = Parser(RegexLexer(code).stream()).parse()
+        listed = self.helper_get_ast(code)
+        self.assertEqual(streamed.func_defs[0].name.value, listed.func_defs[0].name.value)
+        self.assertEqual(len(streamed.main_block.stmts), len(listed.main_block.stmts))
+        self.assertEqual(streamed.main_block.stmts[1].expr.elements[1].value, 2)
+
+    def test_token_stream_lookahead(self):
+        stream = Lexer("let x = 1;").stream()
+        self.assertEqual(stream.peek(2).type, TokenType.ASSIGN)
+        self.assertEqual(stream.next().type, TokenType.LET)
+        self.assertEqual(stream.peek().type, TokenType.IDENT)
+        self.assertEqual([stream.next().type for _ in range(5)],
+                         [TokenType.IDENT, TokenType.ASSIGN, TokenType.NUMBER, TokenType.SEMICOLON, TokenType.EOF])
+
+    def test_streaming_syntax_error(self):
+        with self.assertRaises(ParserError) as ctx:
+            Parser(RegexLexer("program P{main{let x = 1}}").stream()).parse()
+        self.assertEqual(ctx.exception.token.type, TokenType.RBRACE)
+
+    def test_unary_and_postfix_binding(self):
+        code = "program P{main{let x = -a.b * -f(1)[2] - 3 - 4;}}"
+        expr = self.helper_get_ast(code).main_block.stmts[0].expr
+        # ((-(a.b) * -(f(1)[2])) - 3) - 4
+        self.assertEqual(expr.right.value, 4)
+        self.assertEqual(expr.left.right.value, 3)
+        product = expr.left.left
+        self.assertEqual(product.op.type, TokenType.MULTIPLY)
+        self.assertIsInstance(product.left, UnaryOp)
+        self.assertIsInstance(product.left.expr, MemberAccess)
+        self.assertIsInstance(product.right.expr, ArrayAccess)
+        self.assertIsInstance(product.right.expr.ident, FuncCall)
+
+    def test_nesting_beyond_recursion_limit(self):
+        depth = 20000
+        nested = "(" * depth + "1" + ")" * depth
+        unary = "-" * depth + "1"
+        calls = "f(" * depth + "1" + ")" * depth
+        code = f"program P{{main{{let x = {nested}; let y = {unary}; let z = {calls};}}}}"
+        stmts = Parser(RegexLexer(code).stream()).parse().main_block.stmts
+        self.assertIsInstance(stmts[0].expr, Number)
+        node = stmts[1].expr
+        for _ in range(depth):
+            self.assertIsInstance(node, UnaryOp)
+            node = node.expr
+        self.assertEqual(node.value, 1)
+        self.assertIsInstance(stmts[2].expr, FuncCall)
+
+    def test_unbalanced_parentheses(self):
+        with self.assertRaises(ParserError) as ctx:
+            self.helper_get_ast("program P{main{let x = ((1 + 2);}}")
+        self.assertEqual(ctx.exception.token.type, TokenType.SEMICOLON)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,101 @@
+import unittest
+
+from src.ast import FuncCall, Identifier
+from src.parser import parse_source
+from src.resolver import GLOBAL, LOCAL, Resolver, SlotInterpreter
+
+class TestResolver(unittest.TestCase):
+    def resolve(self, source):
+        program = parse_source(source)
+        return program, Resolver(program).resolve()
+
+    def identifiers(self, node, name):
+        """Every Identifier node named `name` below `node`, in source order."""
+        found = [ident for ident in Resolver(None).walk(node) if isinstance(ident, Identifier) and ident.value == name]
+        return sorted(found, key=lambda ident: (ident.token.line, ident.token.column))
+
+    def test_frame_layouts(self):
+        program, resolution = self.resolve("""program P {
+            struct S { a };
+            func f(a, b) { let c = a; if (b > 0) { let d = b; }; return c; }
+            main { let x = f(1, 2); let y; }
+        }""")
+        layout = resolution.frames[program.func_defs[0]]
+        self.assertEqual(layout.names, ['a', 'b', 'c', 'd'])
+        self.assertEqual(layout.param_slots, [0, 1])
+        self.assertEqual(resolution.global_names, ['S', 'f', 'x', 'y'])
+
+    def test_addresses(self):
+        program, resolution = self.resolve("""program P {
+            func f(a) { let c = a + g; let d; d = c; output(e); return d; }
+            main { let g = 1; output(g, f(g)); }
+        }""")
+        func_def = program.func_defs[0]
+        a = resolution.addresses[self.identifiers(func_def.body, 'a')[0]]
+        self.assertEqual((a.depth, a.slot, a.checked), (LOCAL, 0, False))
+        g = resolution.addresses[self.identifiers(func_def.body, 'g')[0]]
+        self.assertEqual((g.depth, g.slot, g.checked), (GLOBAL, 1, True))
+        d = resolution.addresses[self.identifiers(func_def.body, 'd')[-1]]
+        self.assertEqual((d.depth, d.slot, d.checked), (LOCAL, 2, True))
+        e = resolution.addresses[self.identifiers(func_def.body, 'e')[0]]
+        self.assertIsNone(e.depth)
+
+        main_reads = self.identifiers(program.main_block, 'g')
+        self.assertEqual([resolution.addresses[ident].checked for ident in main_reads], [True, False, False])
+        call = program.main_block.stmts[1].exprs[1]
+        self.assertIsInstance(call, FuncCall)
+        self.assertEqual(resolution.addresses[call.name].depth, LOCAL)
+
+    def test_conditional_declarations_stay_checked(self):
+        program, resolution = self.resolve("""program P {
+            func f(a) { if (a > 0) { let x = 1; }; output(x); return a; }
+            main { let x = 5; output(f(1)); }
+        }""")
+        read = self.identifiers(program.func_defs[0].body, 'x')[-1]
+        address = resolution.addresses[read]
+        self.assertEqual((address.depth, address.checked), (LOCAL, True))
+        self.assertEqual(address.fallback, 1)
+
+    def test_undefined_names_are_reported(self):
+        _, resolution = self.resolve("""program P {
+            func f(a) { let b = a + missing; q = 2; return b; }
+            main { let x = 1; output(f(x), y); input(z); nothing(1); }
+        }""")
+        self.assertEqual([str(error) for error in resolution.errors], [
+            "[Line 2:44] InterpreterError: Variable or struct 'missing' not defined.",
+            "[Line 2:47] InterpreterError: Variable 'q' not defined before assignment.",
+            "[Line 3:45] InterpreterError: Variable or struct 'y' not defined.",
+            "[Line 3:55] InterpreterError: Variable 'z' not defined before assignment.",
+            "[Line 3:65] InterpreterError: 'nothing' is not a function",
+        ])
+
+    def test_defined_programs_have_no_errors(self):
+        _, resolution = self.resolve("""program P {
+            struct S { a };
+            func f(a) { let s = S(a); g = g + 1; return s.a; }
+            main { let g = 0; output(f(1), g); }
+        }""")
+        self.assertEqual(resolution.errors, [])
+
+    def test_slot_interpreter_reuses_frames_per_call(self):
+        program = parse_source("""program P {
+            func fact(n) { let r = 1; if (n > 1) { r = n * fact(n - 1); }; return r; }
+            main { let x = fact(10); }
+        }""")
+        interpreter = SlotInterpreter(tree=program)
+        interpreter.interpret()
+        self.assertEqual(interpreter.globals, [program.func_defs[0], 3628800])
+        self.assertIs(interpreter.frame, interpreter.globals)
+
+    def test_slot_interpreter_eliminates_tail_calls(self):
+        program = parse_source("""program P {
+            func done(n, acc) { let r = acc; return r; }
+            func sum(n, acc) { let next = sum; if (n == 0) { next = done; }; return next(n - 1, acc + n); }
+            main { let total = sum(20000, 0); }
+        }""")
+        interpreter = SlotInterpreter(tree=program)
+        interpreter.interpret()
+        self.assertEqual(interpreter.globals[-1], 200010000)
+
+if __name__ == '__main__':
+    unittest.main()
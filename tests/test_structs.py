@@ -0,0 +1,97 @@
+import unittest
+import tracemalloc
+
+from src.ast import Identifier, MemberAccess
+from src.engines import ENGINES
+from src.inference import infer_types
+from src.lexer import Token, TokenType
+from src.optimizer import walk
+from src.parser import parse_source
+from src.structs import StructDefinition, StructInstance
+from tests.helpers import run
+
+def definition(name, *fields):
+    return StructDefinition(name, [Identifier(Token(TokenType.IDENT, field)) for field in fields])
+
+class TestStructClasses(unittest.TestCase):
+    def test_fields_are_slots_at_fixed_offsets(self):
+        blueprint = definition('Pt', 'x', 'y')
+        point = blueprint.new('Pt', (1, 2))
+        self.assertEqual(type(point).__slots__, ('f_x', 'f_y'))
+        self.assertFalse(hasattr(point, '__dict__'))
+        self.assertEqual(type(point).__name__, 'StructInstance')
+        self.assertEqual((point.get('x'), point.get('y'), point.get('z')), (1, 2, None))
+        self.assertIs(type(blueprint.new('Pt', (3, 4))), type(point))
+        self.assertIsInstance(point, StructInstance)
+
+    def test_undeclared_members_and_repeated_fields(self):
+        blueprint = definition('D', 'a', 'b', 'a')
+        instance = blueprint.new('D', (1, 2, 3))
+        self.assertEqual(type(instance).__slots__, ('f_a', 'f_b'))
+        self.assertIsNone(instance.extra)
+        instance.set('c', 4)
+        instance.set('b', 5)
+        self.assertEqual(instance.members, {'a': 3, 'b': 5, 'c': 4})
+        self.assertEqual(instance.extra, {'c': 4})
+        self.assertEqual(blueprint.new('E', (0, 0, 0)).type_name, 'E')
+
+    def test_repr_shows_every_member(self):
+        instance = definition('S', 'a').new('S', ("one",))
+        instance.set('self', instance)
+        self.assertEqual(repr(instance), "<Struct S: {'a': 'one', 'self': <Struct S: {...}>}>")
+
+    def test_instances_are_smaller_than_a_members_dict(self):
+        class DictInstance:
+            def __init__(self, type_name):
+                self.type_name = type_name
+                self.members = {}
+        def retained(build):
+            tracemalloc.start()
+            instances = [build(i) for i in range(1000)]
+            size, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            # Every instance is still alive, so all of them count towards `size`.
+            self.assertEqual(len({id(instance) for instance in instances}), 1000)
+            return size
+        def build_dict(i):
+            instance = DictInstance('Pt')
+            instance.members.update(x=i, y=i)
+            return instance
+        blueprint = definition('Pt', 'x', 'y')
+        self.assertLess(retained(lambda i: blueprint.new('Pt', (i, i))) * 2, retained(build_dict))
+
+class TestMemberResolution(unittest.TestCase):
+    def test_known_fields_resolve_to_slots(self):
+        program = parse_source("""program P {
+            struct Pt { x, y };
+            main { let p = Pt(1, 2); p.z = 3; output(p.x, p.y, p.z); }
+        }""")
+        facts = infer_types(program)
+        accesses = sorted((node for node in walk(program) if isinstance(node, MemberAccess)),
+                          key=lambda node: node.member_ident.token.column)
+        self.assertEqual([facts.members.get(node) for node in accesses], [None, 'f_x', 'f_y', None])
+
+    def test_engines_agree_on_struct_programs(self):
+        source = """program P {
+            struct Pt { x, y };
+            struct D { a, a };
+            func shift(p, d) { p.x = p.x + d; return p; }
+            main {
+                let p = Pt(1, "one"); let q = Pt(2, [3]);
+                p.z = q; q.y[0] = p.x;
+                output(shift(p, 4), q, D(1, 2));
+                let n = D(5, 6); n.self = n; output(n.a, n);
+                output(q.w);
+            }
+        }"""
+        expected = ("<Struct Pt: {'x': 5, 'y': 'one', 'z': <Struct Pt: {'x': 2, 'y': [1]}>}> "
+                    "<Struct Pt: {'x': 2, 'y': [1]}> <Struct D: {'a': 2}>\n"
+                    "6 <Struct D: {'a': 6, 'self': <Struct D: {...}>}>\n",
+                    "InterpreterError: [Line 10:27] InterpreterError: Struct 'Pt' has no member 'w'")
+        for name, engine in ENGINES.items():
+            for arena in (False, True):
+                with self.subTest(engine=name, arena=arena):
+                    self.assertEqual(run(engine, source, arena=arena), expected)
+
+if __name__ == '__main__':
+    unittest.main()
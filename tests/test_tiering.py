@@ -0,0 +1,121 @@
+import unittest
+import sys
+import unittest.mock
+import glob
+import os
+
+from src.interpreter import Interpreter
+from src.parser import parse_source
+from src.tiering import TieredInterpreter, SpecializingCompiler
+from tests.test_engines import CASES, INPUTS, PROGRAMS_DIR, run
+from tests.helpers import run as run_with
+
+SOURCE = """program P {
+    struct Pt { x, y };
+    func fib(n) { let r = n; if (n >= 2) { r = fib(n - 1) + fib(n - 2); }; return r; }
+    func add(a, b) { let r = a + b; return r; }
+    func norm(p, xs, i) { let r = p.x * p.x + p.y * p.y + xs[i]; return r; }
+    main {
+        output(fib(12));
+        let i = 0; let s = 0;
+        while (i < 30) { s = add(s, i); i = i + 1; };
+        output(s, add("a", 1), add(1, "b"));
+        i = 0;
+        while (i < 30) { s = norm(Pt(i, 1), [1, 2, 3], 2); i = i + 1; };
+        output(s);
+    }
+}"""
+
+class TestTieredInterpreter(unittest.TestCase):
+    def run_tiered(self, source, threshold=10):
+        interpreter = TieredInterpreter(tree=parse_source(source), threshold=threshold, memoize=False)
+        interpreter.interpret()
+        return interpreter
+
+    def test_hot_functions_are_promoted(self):
+        expected = run_with(Interpreter, SOURCE)
+        self.assertEqual(run_with(TieredInterpreter, SOURCE, threshold=10), expected)
+        self.assertEqual(expected, ("144\n435 a1 1b\n845\n", None))
+
+        with unittest.mock.patch('sys.stdout'):
+            interpreter = self.run_tiered(SOURCE)
+        self.assertEqual(interpreter.events, [
+            "promote fib(int) after 10 calls",
+            "promote add(int, int) after 10 calls",
+            "deopt add(int, int): called with (str, int)",
+            "promote norm(StructInstance, list, int) after 10 calls",
+        ])
+        stats = interpreter.stats()
+        self.assertEqual((stats['promotions'], stats['deopts']), (3, 1))
+        # fib(12) makes 465 calls; the specialized code's own calls stay specialized.
+        self.assertEqual(stats['generic_calls'], 10 + 10 + 2 + 10)
+        self.assertEqual(stats['specialized_calls'], 465 - 10 + 20 + 20)
+        self.assertTrue(interpreter.report().startswith("Tiering: {'promotions': 3"))
+
+    def test_polymorphic_arguments_are_not_guarded(self):
+        source = """program P {
+            func twice(v, n) { let r = v * n; return r; }
+            main {
+                let i = 0;
+                while (i < 20) { output(twice(i, 2), twice("ab", i)); i = i + 1; };
+            }
+        }"""
+        with unittest.mock.patch('sys.stdout'):
+            interpreter = self.run_tiered(source)
+        self.assertEqual(interpreter.events, ["promote twice(any, int) after 10 calls"])
+        profile = next(iter(interpreter.profiles.values()))
+        self.assertEqual(profile.guard, ((1, int),))
+        self.assertEqual(run_with(TieredInterpreter, source, threshold=10), run_with(Interpreter, source))
+
+    def test_rebound_parameters_lose_their_type(self):
+        program = parse_source("""program P {
+            func f(a, b, c) { a = "x"; let c = 1; let r = a + b + c; return r; }
+            main { output(f(1, 2, 3)); }
+        }""")
+        func_def = program.func_defs[0]
+        compiler = SpecializingCompiler(TieredInterpreter(tree=program), program, func_def, [int, int, None])
+        self.assertEqual(compiler.known, {'b': int})
+
+    def test_promoted_tail_calls_run_in_constant_stack(self):
+        source = """program P {
+            func done(n, acc) { let r = acc; return r; }
+            func sum(n, acc) { let next = sum; if (n == 0) { next = done; }; return next(n - 1, acc + n); }
+            main { let i = 0; while (i < 3) { output(sum(5, 0)); i = i + 1; }; output(sum(5000, 0)); }
+        }"""
+        old_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(200)
+        try:
+            with unittest.mock.patch('sys.stdout'):
+                interpreter = self.run_tiered(source)
+        finally:
+            sys.setrecursionlimit(old_limit)
+        self.assertEqual(interpreter.events, ["promote sum(int, int) after 10 calls"])
+        self.assertEqual(run_with(TieredInterpreter, source, threshold=10), ("15\n15\n15\n12502500\n", None))
+
+    def test_errors_match_the_tree_interpreter(self):
+        sources = [
+            "program P { func d(a, b) { let r = a / b; return r; } main { let i = 3; while (i >= 0) { output(d(6, i)); i = i - 1; }; } }",
+            "program P { func d(a, b) { let r = a / b; return r; } main { let i = 3; while (i >= 0) { try { output(d(6, i)); } catch { output(i); }; i = i - 1; }; } }",
+            "program P { func at(xs, i) { let r = xs[i]; return r; } main { let i = 0; while (i < 5) { output(at([1, 2, 3], i)); i = i + 1; }; } }",
+            "program P { struct S { a }; func g(s) { let r = s.a + s.b; return r; } main { let s = S(1); let i = 0; while (i < 3) { output(g(s)); s.b = i; i = i + 1; }; } }",
+            "program P { func f(n) { let r = n + 1; return r; } main { let i = 0; while (i < 4) { output(f(i)); i = i + 1; }; output(f(S)); } }",
+        ]
+        for source in sources:
+            with self.subTest(source=source):
+                expected = run_with(Interpreter, source)
+                for threshold in (1, 2, 100):
+                    self.assertEqual(run_with(TieredInterpreter, source, threshold=threshold), expected)
+
+    def test_programs_match_the_tree_interpreter(self):
+        for path in sorted(glob.glob(os.path.join(PROGRAMS_DIR, '*.l25'))):
+            with open(path) as f:
+                source = f.read()
+            with self.subTest(program=os.path.basename(path)):
+                self.assertEqual(run_with(TieredInterpreter, source, threshold=1), run('tree', source))
+        for name, source in CASES.items():
+            if name not in INPUTS:
+                with self.subTest(case=name):
+                    self.assertEqual(run_with(TieredInterpreter, source, threshold=1), run('tree', source))
+
+if __name__ == '__main__':
+    unittest.main()
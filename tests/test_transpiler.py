@@ -0,0 +1,78 @@
+import unittest
+import io
+import sys
+
+from src.parser import parse_source
+from src.transpiler import PythonTranspiler, TranspiledInterpreter
+
+CODE = """program P {
+    struct Point { x, y };
+    func square(n) {
+        let r = n * n;
+        return r;
+    }
+    func pick(f) {
+        let v = 3;
+        return f(v);
+    }
+    main {
+        let i = 0;
+        let total = 0;
+        let p = Point(1, 2);
+        while (i < 5) {
+            total = total + square(i) + p.y;
+            i = i + 1;
+        };
+        output(total, pick(square));
+    }
+}
+"""
+
+def run(tree):
+    old_stdout = sys.stdout
+    sys.stdout = captured_output = io.StringIO()
+    try:
+        TranspiledInterpreter(tree=tree).interpret()
+    finally:
+        sys.stdout = old_stdout
+    return captured_output.getvalue()
+
+class TestTranspiler(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = parse_source(CODE)
+        self.source = PythonTranspiler(self.tree).transpile()
+
+    def test_generated_module(self):
+        compile(self.source, '<test>', 'exec')
+        self.assertIn("def f0_square(v_n):", self.source)
+        self.assertIn("def s0_Point(a0, a1):", self.source)
+        self.assertIn("def _main():", self.source)
+        self.assertIn("while (v_i < 5):", self.source)
+
+    def test_fixed_callees_are_called_directly(self):
+        self.assertIn("f0_square(v_i)", self.source)
+        self.assertIn("s0_Point(1, 2)", self.source)
+        # `f` is a parameter, so the call goes through a run-time lookup.
+        self.assertIn("_function(v_f, 'f', 1,", self.source)
+
+    def test_conditionally_declared_locals_fall_back_to_globals(self):
+        tree = parse_source("""program P {
+            func f(a) { if (a > 0) { let g = 1; }; return g; }
+            main { let g = 7; output(f(0), f(1)); }
+        }""")
+        self.assertIn("v_g = _MISSING", PythonTranspiler(tree).transpile())
+        self.assertEqual(run(tree), "7 1\n")
+
+    def test_run(self):
+        self.assertEqual(run(self.tree), "40 9\n")
+
+    def test_deep_nesting_falls_back(self):
+        depth = 300
+        tree = parse_source("program P { main { output(" + "(" * depth + "1" + " + 1)" * depth + "); } }")
+        with self.assertRaises(SyntaxError):
+            compile(PythonTranspiler(tree).transpile(), '<test>', 'exec')
+        self.assertEqual(run(tree), f"{depth + 1}\n")
+
+if __name__ == '__main__':
+    unittest.main()